@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date, datetime
+
+
+class BillingRunCreateDTO(BaseModel):
+    """DTO for starting a billing run"""
+    run_id: str = Field(..., min_length=1, max_length=100, description="Client supplied idempotency key")
+    school_id: int
+    grade_level: Optional[int] = None
+    active_only: bool = True
+    amount: float
+    tax_amount: float = 0.0
+    description: str
+    invoice_date: date
+    due_date: date
+
+
+class BillingRunResponseDTO(BaseModel):
+    """DTO for billing run summaries"""
+    run_id: str
+    school_id: int
+    grade_level: Optional[int] = None
+    active_only: bool
+    amount: float
+    tax_amount: float
+    total_amount: float
+    description: str
+    invoice_date: date
+    due_date: date
+    invoice_count: int
+    created_at: Optional[datetime] = None
+    replayed: bool = False
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, ValidationError
+from typing import List
+
+
+class BulkRowErrorDTO(BaseModel):
+    """Validation errors of one row in a bulk request"""
+    index: int
+    errors: List[str]
+
+    @classmethod
+    def from_exception(cls, index: int, error: ValueError) -> "BulkRowErrorDTO":
+        """Build a row error from a DTO (pydantic) or domain validation error"""
+        if isinstance(error, ValidationError):
+            messages = [
+                f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+                for detail in error.errors()
+            ]
+        else:
+            messages = [str(error)]
+        return cls(index=index, errors=messages)
+
+
+class BulkCreateResultDTO(BaseModel):
+    """DTO for bulk create results"""
+    created: int
+    failed: int
+    ids: List[int]
+    errors: List[BulkRowErrorDTO]
@@ -0,0 +1,44 @@
+from pydantic import BaseModel, model_validator
+from typing import List, Optional
+from datetime import date
+from app.domain.enums import PaymentMethod
+
+
+class PaymentImportRowDTO(BaseModel):
+    """DTO for one payment row of an import file"""
+    invoice_id: Optional[int] = None
+    invoice_number: Optional[str] = None
+    payment_date: date
+    payment_method: PaymentMethod
+    notes: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_reference(self):
+        """A row must reference its invoice by ID or number"""
+        if self.invoice_id is None and not self.invoice_number:
+            raise ValueError("invoice_id or invoice_number is required")
+        return self
+
+    @property
+    def reference(self) -> str:
+        return str(self.invoice_id) if self.invoice_id is not None else self.invoice_number
+
+
+class PaymentImportIssueDTO(BaseModel):
+    """A row that was not applied"""
+    line: int
+    outcome: str  # already_paid, unmatched or invalid
+    reference: Optional[str] = None
+    reason: str
+
+
+class PaymentImportResultDTO(BaseModel):
+    """DTO for payment import results"""
+    rows: int = 0
+    matched: int = 0
+    already_paid: int = 0
+    unmatched: int = 0
+    invalid: int = 0
+    issues: List[PaymentImportIssueDTO] = []
+    issues_truncated: bool = False
+    error: Optional[str] = None
@@ -107,6 +107,9 @@ class SchoolAccountStatementDTO(BaseModel):
     paid_invoices: int
     overdue_invoices: int
     
+    # Invoices included from the cold archive (paid or cancelled)
+    archived_invoices: int = 0
+    
     # Student financial details
     student_summaries: List[StudentFinancialSummaryDTO]
     
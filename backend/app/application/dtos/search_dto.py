@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class SearchResultDTO(BaseModel):
+    """DTO for a single search result"""
+    type: str
+    id: int
+    title: str
+    subtitle: Optional[str] = None
+    score: float
+
+    class Config:
+        from_attributes = True
+
+
+class SearchResponseDTO(BaseModel):
+    """DTO for unified search responses"""
+    query: str
+    results: List[SearchResultDTO]
@@ -15,6 +15,7 @@ class StudentFilterDTO(BaseModel):
     enrollment_date: Optional[date] = None
     address: Optional[str] = None
     is_active: Optional[bool] = None
+    ids: Optional[List[int]] = None
 
 
 class StudentCreateDTO(BaseModel):
@@ -105,6 +106,9 @@ class StudentAccountStatementDTO(BaseModel):
     paid_amount: float
     overdue_amount: float
     
+    # Invoices included from the cold archive (paid or cancelled)
+    archived_invoices: int = 0
+    
     # Generated timestamp
     generated_at: date
 
@@ -0,0 +1,70 @@
+from typing import Optional
+from app.domain.models.billing_run import BillingRun
+from app.domain.repositories.billing_run_repository import BillingRunRepositoryInterface
+from app.domain.repositories.school_repository import SchoolRepositoryInterface
+from app.application.dtos.billing_run_dto import BillingRunCreateDTO, BillingRunResponseDTO
+
+
+class BillingRunService:
+    """Service layer for billing runs"""
+
+    def __init__(
+        self,
+        billing_run_repository: BillingRunRepositoryInterface,
+        school_repository: SchoolRepositoryInterface
+    ):
+        self.billing_run_repository = billing_run_repository
+        self.school_repository = school_repository
+
+    async def run_billing(self, run_data: BillingRunCreateDTO) -> BillingRunResponseDTO:
+        """
+        Generate one pending invoice per matching student of the school.
+
+        Idempotent per run ID: repeating a run returns the original summary
+        (``replayed=True``) without generating invoices again.
+        """
+        existing = await self.billing_run_repository.get_by_run_id(run_data.run_id)
+        if existing:
+            return self._to_response_dto(existing, replayed=True)
+
+        # Domain validation covers the invoice template (amounts and dates)
+        billing_run = BillingRun(
+            run_id=run_data.run_id,
+            school_id=run_data.school_id,
+            grade_level=run_data.grade_level,
+            active_only=run_data.active_only,
+            amount=run_data.amount,
+            tax_amount=run_data.tax_amount,
+            description=run_data.description,
+            invoice_date=run_data.invoice_date,
+            due_date=run_data.due_date
+        )
+        school = await self.school_repository.get_by_id(billing_run.school_id)
+        if not school:
+            raise ValueError(f"School with ID {billing_run.school_id} not found")
+
+        stored, executed = await self.billing_run_repository.execute(billing_run)
+        return self._to_response_dto(stored, replayed=not executed)
+
+    async def get_billing_run(self, run_id: str) -> Optional[BillingRunResponseDTO]:
+        """Get a billing run summary by run ID"""
+        billing_run = await self.billing_run_repository.get_by_run_id(run_id)
+        return self._to_response_dto(billing_run) if billing_run else None
+
+    def _to_response_dto(self, billing_run: BillingRun, replayed: bool = False) -> BillingRunResponseDTO:
+        """Convert domain model to response DTO"""
+        return BillingRunResponseDTO(
+            run_id=billing_run.run_id,
+            school_id=billing_run.school_id,
+            grade_level=billing_run.grade_level,
+            active_only=billing_run.active_only,
+            amount=billing_run.amount,
+            tax_amount=billing_run.tax_amount,
+            total_amount=billing_run.total_amount,
+            description=billing_run.description,
+            invoice_date=billing_run.invoice_date,
+            due_date=billing_run.due_date,
+            invoice_count=billing_run.invoice_count,
+            created_at=billing_run.created_at,
+            replayed=replayed
+        )
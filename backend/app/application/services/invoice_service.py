@@ -1,23 +1,79 @@
-from typing import List, Optional
-from datetime import datetime
+import csv
+import json
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime
 from app.domain.models.invoice import Invoice
 from app.domain.enums import InvoiceStatus, PaymentMethod
 from app.domain.repositories.invoice_repository import InvoiceRepositoryInterface
+from app.domain.repositories.student_repository import StudentRepositoryInterface
 from app.application.dtos.invoice_dto import InvoiceCreateDTO, InvoiceUpdateDTO, InvoiceResponseDTO, PaymentRecordDTO, InvoiceFilterDTO
+from app.application.dtos.bulk_dto import BulkCreateResultDTO, BulkRowErrorDTO
+from app.application.dtos.payment_import_dto import PaymentImportIssueDTO, PaymentImportResultDTO, PaymentImportRowDTO
 from app.core.pagination import PaginationParams, PaginatedResponse
+from app.core.fields import select_fields
+from app.core.streaming import batched
+
+# Response field -> invoice attribute, for sparse fieldsets
+INVOICE_RESPONSE_ATTRIBUTES = {field: field for field in InvoiceResponseDTO.model_fields}
+
+# Payment imports
+PAYMENT_IMPORT_FORMATS = ("csv", "ndjson")
+MAX_REPORTED_ISSUES = 100
+PAYABLE_STATUSES = (InvoiceStatus.PENDING, InvoiceStatus.OVERDUE)
+
+
+def payment_record_parser(file_format: str) -> Callable[[str], Optional[Dict[str, Any]]]:
+    """
+    Return a parser turning one line of an import file into a record.
+
+    CSV files start with a header line (the parser returns None for it);
+    NDJSON files have one JSON object per line. Raises ValueError for an
+    unknown format or a malformed line.
+    """
+    if file_format == "ndjson":
+        def parse_json(line: str) -> Optional[Dict[str, Any]]:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            return record
+        return parse_json
+
+    if file_format == "csv":
+        header: List[str] = []
+
+        def parse_csv(line: str) -> Optional[Dict[str, Any]]:
+            try:
+                values = next(csv.reader([line]))
+            except csv.Error as e:
+                raise ValueError(f"Malformed CSV line: {e}") from e
+            if not header:
+                header.extend(value.strip() for value in values)
+                return None
+            if len(values) != len(header):
+                raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            # Empty cells are missing values
+            return {name: value.strip() for name, value in zip(header, values) if value.strip()}
+        return parse_csv
+
+    raise ValueError(f"Unknown import format '{file_format}', expected one of: {', '.join(PAYMENT_IMPORT_FORMATS)}")
 
 
 class InvoiceService:
     """Service layer for invoice operations"""
 
-    def __init__(self, invoice_repository: InvoiceRepositoryInterface):
+    def __init__(
+        self,
+        invoice_repository: InvoiceRepositoryInterface,
+        student_repository: Optional[StudentRepositoryInterface] = None
+    ):
         self.invoice_repository = invoice_repository
+        self.student_repository = student_repository
 
     async def get_all_invoices(self, pagination: PaginationParams) -> PaginatedResponse[InvoiceResponseDTO]:
         """Get all invoices with pagination"""
-        invoices, total = await self.invoice_repository.get_all(pagination.offset, pagination.limit)
-        invoice_dtos = [self._to_response_dto(invoice) for invoice in invoices]
-        return PaginatedResponse.create(invoice_dtos, total, pagination)
+        page = await self.invoice_repository.get_all(pagination.offset, pagination.limit, pagination.count_mode, pagination.after)
+        invoice_dtos = [self._to_response_dto(invoice) for invoice in page.items]
+        return PaginatedResponse.from_page(invoice_dtos, page, pagination)
 
     async def get_invoice_by_id(self, invoice_id: int) -> Optional[InvoiceResponseDTO]:
         """Get invoice by ID"""
@@ -28,45 +84,53 @@ class InvoiceService:
 
     async def create_invoice(self, invoice_data: InvoiceCreateDTO) -> InvoiceResponseDTO:
         """Create a new invoice"""
-        current_time = datetime.now()
-        total_amount = invoice_data.amount + invoice_data.tax_amount
-        
         # Create domain model
-        invoice = Invoice(
-            invoice_number=invoice_data.invoice_number,
-            student_id=invoice_data.student_id,
-            school_id=invoice_data.school_id,
-            amount=invoice_data.amount,
-            tax_amount=invoice_data.tax_amount,
-            total_amount=total_amount,
-            description=invoice_data.description,
-            invoice_date=invoice_data.invoice_date,
-            due_date=invoice_data.due_date,
-            status=InvoiceStatus.PENDING,
-            created_at=current_time,
-            updated_at=current_time
-        )
+        invoice = self._to_domain(invoice_data, datetime.now())
         
         created_invoice = await self.invoice_repository.create(invoice)
         return self._to_response_dto(created_invoice)
 
-    async def update_invoice(self, invoice_id: int, invoice_data: InvoiceUpdateDTO) -> Optional[InvoiceResponseDTO]:
-        """Update an existing invoice"""
-        invoice = await self.invoice_repository.get_by_id(invoice_id)
-        if not invoice:
-            return None
+    async def bulk_create_invoices(self, rows: List[Dict[str, Any]]) -> BulkCreateResultDTO:
+        """Validate and create many invoices in one transaction, reporting per-row errors"""
+        current_time = datetime.now()
+        errors: List[BulkRowErrorDTO] = []
+        valid: List[Tuple[int, Invoice]] = []
+        
+        # Validate every row with the create DTO and the domain model
+        for index, row in enumerate(rows):
+            try:
+                valid.append((index, self._to_domain(InvoiceCreateDTO.model_validate(row), current_time)))
+            except ValueError as e:
+                errors.append(BulkRowErrorDTO.from_exception(index, e))
+        
+        # Check referenced students (and that they belong to the school) with a single query
+        if self.student_repository and valid:
+            student_schools = await self.student_repository.get_school_ids(invoice.student_id for _, invoice in valid)
+            checked = []
+            for index, invoice in valid:
+                if invoice.student_id not in student_schools:
+                    errors.append(BulkRowErrorDTO(index=index, errors=[f"Student with ID {invoice.student_id} not found"]))
+                elif student_schools[invoice.student_id] != invoice.school_id:
+                    errors.append(BulkRowErrorDTO(
+                        index=index,
+                        errors=[f"Student with ID {invoice.student_id} does not belong to school {invoice.school_id}"]
+                    ))
+                else:
+                    checked.append((index, invoice))
+            valid = checked
+        
+        ids = await self.invoice_repository.create_many([invoice for _, invoice in valid])
+        errors.sort(key=lambda error: error.index)
+        return BulkCreateResultDTO(created=len(ids), failed=len(errors), ids=ids, errors=errors)
 
-        # Update only provided fields
+    async def update_invoice(self, invoice_id: int, invoice_data: InvoiceUpdateDTO) -> Optional[InvoiceResponseDTO]:
+        """Update an existing invoice (one UPDATE ... RETURNING, validated by the domain model)"""
+        # Update only provided fields; the repository recalculates the total when amounts change
         update_data = invoice_data.model_dump(exclude_unset=True)
-        
-        # If amount or tax_amount changed, recalculate total
-        if "amount" in update_data or "tax_amount" in update_data:
-            new_amount = update_data.get("amount", invoice.amount)
-            new_tax = update_data.get("tax_amount", invoice.tax_amount)
-            update_data["total_amount"] = new_amount + new_tax
-
-        updated_invoice = invoice.update(**update_data)
-        updated_invoice = await self.invoice_repository.update(updated_invoice)
+
+        updated_invoice = await self.invoice_repository.update_fields(invoice_id, update_data)
+        if not updated_invoice:
+            return None
         return self._to_response_dto(updated_invoice)
 
     async def delete_invoice(self, invoice_id: int) -> bool:
@@ -74,35 +138,159 @@ class InvoiceService:
         return await self.invoice_repository.delete(invoice_id)
 
     async def record_payment(self, invoice_id: int, payment_data: PaymentRecordDTO) -> Optional[InvoiceResponseDTO]:
-        """Record a payment for an invoice"""
-        invoice = await self.invoice_repository.get_by_id(invoice_id)
-        if not invoice:
-            return None
+        """
+        Record a payment for an invoice.
+
+        Returns None if the invoice does not exist and raises
+        InvoiceNotPayableError if it is already paid or cancelled.
+        """
+        paid_invoice = await self.invoice_repository.mark_paid(
+            invoice_id,
+            payment_data.payment_date,
+            payment_data.payment_method,
+            payment_data.notes
+        )
+        return self._to_response_dto(paid_invoice) if paid_invoice else None
+
+    async def mark_overdue_invoices(self, as_of: Optional[date] = None) -> int:
+        """Store the overdue status of pending invoices past their due date; returns how many changed"""
+        return await self.invoice_repository.mark_overdue(as_of or date.today())
 
-        if invoice.status == InvoiceStatus.PAID:
-            raise ValueError("Invoice is already paid")
+    async def import_payments(
+        self,
+        lines: AsyncIterable[Tuple[int, str]],
+        file_format: str,
+        batch_size: int = 500
+    ) -> PaymentImportResultDTO:
+        """
+        Apply payments streamed from a CSV or NDJSON file.
 
-        update_data = {
-            "payment_date": payment_data.payment_date,
-            "payment_method": payment_data.payment_method,
-            "status": InvoiceStatus.PAID
-        }
+        Lines are processed in batches: one query matches a batch to invoices by
+        ID or invoice number, and one conditional UPDATE marks the payable ones
+        paid. Each batch is committed on its own, so memory stays bounded by the
+        batch size. A stream error stops the import and is reported in ``error``
+        (earlier batches stay applied).
+        """
+        parse = payment_record_parser(file_format)
+        result = PaymentImportResultDTO()
         
-        if payment_data.notes:
-            update_data["notes"] = payment_data.notes
+        try:
+            async for batch in batched(lines, batch_size):
+                rows: List[Tuple[int, PaymentImportRowDTO]] = []
+                for line_number, line in batch:
+                    try:
+                        record = parse(line)
+                        if record is None:
+                            continue
+                        rows.append((line_number, PaymentImportRowDTO.model_validate(record)))
+                    except ValueError as e:
+                        reason = "; ".join(BulkRowErrorDTO.from_exception(line_number, e).errors)
+                        self._add_import_issue(result, line_number, "invalid", None, reason)
+                await self._apply_payment_batch(rows, result)
+        except ValueError as e:
+            result.error = str(e)
+        
+        # Every row gets exactly one outcome
+        result.rows = result.matched + result.already_paid + result.unmatched + result.invalid
+        result.issues.sort(key=lambda issue: issue.line)
+        return result
 
-        updated_invoice = invoice.update(**update_data)
-        updated_invoice = await self.invoice_repository.update(updated_invoice)
-        return self._to_response_dto(updated_invoice)
+    async def _apply_payment_batch(self, rows: List[Tuple[int, PaymentImportRowDTO]], result: PaymentImportResultDTO) -> None:
+        """Match one batch of payment rows to invoices and mark the payable ones paid"""
+        if not rows:
+            return
+        
+        states = await self.invoice_repository.get_payment_states(
+            (row.invoice_id for _, row in rows if row.invoice_id is not None),
+            (row.invoice_number for _, row in rows if row.invoice_id is None)
+        )
+        by_id = {invoice_id: status for invoice_id, _, status in states}
+        by_number: Dict[str, List[int]] = {}
+        for invoice_id, invoice_number, _ in states:
+            by_number.setdefault(invoice_number, []).append(invoice_id)
+        
+        payments: List[Dict[str, Any]] = []
+        paying = set()
+        for line_number, row in rows:
+            invoice_id = row.invoice_id
+            if invoice_id is None:
+                candidates = by_number.get(row.invoice_number, [])
+                if len(candidates) > 1:
+                    self._add_import_issue(result, line_number, "unmatched", row.reference, f"Invoice number matches {len(candidates)} invoices")
+                    continue
+                invoice_id = candidates[0] if candidates else None
+            
+            status = by_id.get(invoice_id)
+            if status is None:
+                self._add_import_issue(result, line_number, "unmatched", row.reference, "Invoice not found")
+            elif status == InvoiceStatus.PAID or invoice_id in paying:
+                self._add_import_issue(result, line_number, "already_paid", row.reference, "Invoice is already paid")
+            elif status not in PAYABLE_STATUSES:
+                self._add_import_issue(result, line_number, "unmatched", row.reference, "Cannot pay a cancelled invoice")
+            else:
+                paying.add(invoice_id)
+                payments.append({
+                    "invoice_id": invoice_id,
+                    "payment_date": row.payment_date,
+                    "payment_method": row.payment_method,
+                    "notes": row.notes
+                })
+        
+        updated = await self.invoice_repository.mark_paid_many(payments)
+        result.matched += updated
+        # Paid by someone else between the match query and the update
+        result.already_paid += len(payments) - updated
+
+    def _add_import_issue(self, result: PaymentImportResultDTO, line: int, outcome: str, reference: Optional[str], reason: str) -> None:
+        """Count a row that was not applied and keep a bounded sample of them"""
+        setattr(result, outcome, getattr(result, outcome) + 1)
+        if len(result.issues) < MAX_REPORTED_ISSUES:
+            result.issues.append(PaymentImportIssueDTO(line=line, outcome=outcome, reference=reference, reason=reason))
+        else:
+            result.issues_truncated = True
 
     async def get_invoices_with_filters(self, filters: InvoiceFilterDTO, pagination: PaginationParams) -> PaginatedResponse[InvoiceResponseDTO]:
         """Get invoices with flexible filtering and pagination"""
         # Convert DTO to dict, excluding None values
         filter_dict = {k: v for k, v in filters.model_dump().items() if v is not None}
         
-        invoices, total = await self.invoice_repository.get_with_filters(filter_dict, pagination.offset, pagination.limit)
-        invoice_dtos = [self._to_response_dto(invoice) for invoice in invoices]
-        return PaginatedResponse.create(invoice_dtos, total, pagination)
+        page = await self.invoice_repository.get_with_filters(filter_dict, pagination.offset, pagination.limit, pagination.count_mode, pagination.after)
+        invoice_dtos = [self._to_response_dto(invoice) for invoice in page.items]
+        return PaginatedResponse.from_page(invoice_dtos, page, pagination)
+
+    async def get_invoices_projection(self, filters: InvoiceFilterDTO, pagination: PaginationParams, fields: List[str]) -> PaginatedResponse[Dict[str, Any]]:
+        """Get invoices with only the requested response fields"""
+        filter_dict = {k: v for k, v in filters.model_dump().items() if v is not None}
+        attributes = [INVOICE_RESPONSE_ATTRIBUTES[field] for field in fields]
+        
+        page = await self.invoice_repository.get_projection(
+            filter_dict, attributes, pagination.offset, pagination.limit, pagination.count_mode, pagination.after
+        )
+        items = [select_fields(row, fields, INVOICE_RESPONSE_ATTRIBUTES) for row in page.items]
+        return PaginatedResponse.from_page(items, page, pagination)
+
+    async def get_invoice_projection(self, invoice_id: int, fields: List[str]) -> Optional[Dict[str, Any]]:
+        """Get an invoice with only the requested response fields"""
+        attributes = [INVOICE_RESPONSE_ATTRIBUTES[field] for field in fields]
+        row = await self.invoice_repository.get_projection_by_id(invoice_id, attributes)
+        return select_fields(row, fields, INVOICE_RESPONSE_ATTRIBUTES) if row else None
+
+    def _to_domain(self, invoice_data: InvoiceCreateDTO, current_time: datetime) -> Invoice:
+        """Convert create DTO to a pending invoice (runs domain validation)"""
+        return Invoice(
+            invoice_number=invoice_data.invoice_number,
+            student_id=invoice_data.student_id,
+            school_id=invoice_data.school_id,
+            amount=invoice_data.amount,
+            tax_amount=invoice_data.tax_amount,
+            total_amount=invoice_data.amount + invoice_data.tax_amount,
+            description=invoice_data.description,
+            invoice_date=invoice_data.invoice_date,
+            due_date=invoice_data.due_date,
+            status=InvoiceStatus.PENDING,
+            created_at=current_time,
+            updated_at=current_time
+        )
 
     def _to_response_dto(self, invoice: Invoice) -> InvoiceResponseDTO:
         """Convert domain model to response DTO"""
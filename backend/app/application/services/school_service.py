@@ -1,8 +1,11 @@
-from typing import List, Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 from app.domain.models.school import School
 from app.domain.repositories.school_repository import SchoolRepositoryInterface
 from app.domain.repositories.student_repository import StudentRepositoryInterface
 from app.domain.repositories.invoice_repository import InvoiceRepositoryInterface
+from app.domain.repositories.invoice_archive_repository import InvoiceArchiveRepositoryInterface
+from app.domain.models.archived_invoice_totals import ArchivedInvoiceTotals
 from app.application.dtos.school_dto import (
     SchoolCreateDTO, 
     SchoolUpdateDTO, 
@@ -12,7 +15,16 @@ from app.application.dtos.school_dto import (
     StudentFinancialSummaryDTO
 )
 from app.domain.enums import InvoiceStatus
+from app.domain.repositories.page import CountMode
 from app.core.pagination import PaginationParams, PaginatedResponse
+from app.core.fields import select_fields
+
+# Response field -> school attribute, for sparse fieldsets (student_count is computed)
+SCHOOL_RESPONSE_ATTRIBUTES = {
+    **{field: field for field in SchoolResponseDTO.model_fields if field != "student_count"},
+    "phone": "phone_number",
+    "principal": "principal_name",
+}
 from datetime import datetime, date
 
 
@@ -23,32 +35,30 @@ class SchoolService:
         self, 
         school_repository: SchoolRepositoryInterface, 
         student_repository: StudentRepositoryInterface,
-        invoice_repository: Optional[InvoiceRepositoryInterface] = None
+        invoice_repository: Optional[InvoiceRepositoryInterface] = None,
+        archive_repository: Optional[InvoiceArchiveRepositoryInterface] = None
     ):
         self.school_repository = school_repository
         self.student_repository = student_repository
         self.invoice_repository = invoice_repository
+        self.archive_repository = archive_repository
 
     async def get_all_schools(self, pagination: PaginationParams) -> PaginatedResponse[SchoolResponseDTO]:
         """Get all schools with pagination"""
-        schools, total = await self.school_repository.get_all(pagination.offset, pagination.limit)
-        school_dtos = []
-        for school in schools:
-            dto = await self._to_response_dto(school)
-            school_dtos.append(dto)
-        return PaginatedResponse.create(school_dtos, total, pagination)
+        page = await self.school_repository.get_all(pagination.offset, pagination.limit, pagination.count_mode, pagination.after)
+        # Converted concurrently so the per-school student counts load with one GROUP BY
+        school_dtos = await asyncio.gather(*(self._to_response_dto(school) for school in page.items))
+        return PaginatedResponse.from_page(list(school_dtos), page, pagination)
 
     async def get_schools_with_filters(self, filters: SchoolFilterDTO, pagination: PaginationParams) -> PaginatedResponse[SchoolResponseDTO]:
         """Get schools with flexible filtering and pagination"""
         # Convert DTO to dict, excluding None values
         filter_dict = {k: v for k, v in filters.model_dump().items() if v is not None}
         
-        schools, total = await self.school_repository.get_with_filters(filter_dict, pagination.offset, pagination.limit)
-        school_dtos = []
-        for school in schools:
-            dto = await self._to_response_dto(school)
-            school_dtos.append(dto)
-        return PaginatedResponse.create(school_dtos, total, pagination)
+        page = await self.school_repository.get_with_filters(filter_dict, pagination.offset, pagination.limit, pagination.count_mode, pagination.after)
+        # Converted concurrently so the per-school student counts load with one GROUP BY
+        school_dtos = await asyncio.gather(*(self._to_response_dto(school) for school in page.items))
+        return PaginatedResponse.from_page(list(school_dtos), page, pagination)
 
     async def get_school_by_id(self, school_id: int) -> Optional[SchoolResponseDTO]:
         """Get school by ID"""
@@ -75,11 +85,7 @@ class SchoolService:
         return await self._to_response_dto(created_school)
 
     async def update_school(self, school_id: int, school_data: SchoolUpdateDTO) -> Optional[SchoolResponseDTO]:
-        """Update an existing school"""
-        school = await self.school_repository.get_by_id(school_id)
-        if not school:
-            return None
-
+        """Update an existing school (one UPDATE ... RETURNING, validated by the domain model)"""
         # Map DTO fields to domain model fields
         update_data = {}
         dto_data = school_data.model_dump(exclude_unset=True)
@@ -103,8 +109,9 @@ class SchoolService:
         if 'is_active' in dto_data:
             update_data['is_active'] = dto_data['is_active']
 
-        updated_school = school.update(**update_data)
-        updated_school = await self.school_repository.update(updated_school)
+        updated_school = await self.school_repository.update_fields(school_id, update_data)
+        if not updated_school:
+            return None
         return await self._to_response_dto(updated_school)
 
     async def delete_school(self, school_id: int) -> bool:
@@ -133,9 +140,9 @@ class SchoolService:
             date_to = date.today()
         
         # Get all students for this school
-        all_students, _ = await self.student_repository.get_with_filters(
-            {'school_id': school_id}, 0, 1000
-        )
+        all_students = (await self.student_repository.get_with_filters(
+            {'school_id': school_id}, 0, 1000, CountMode.NONE
+        )).items
         
         # Initialize aggregated totals
         total_charges = 0.0
@@ -155,6 +162,14 @@ class SchoolService:
         
         current_date = date.today()
         
+        # Settled invoices moved to the cold archive, per student
+        archived_by_student: Dict[int, ArchivedInvoiceTotals] = {}
+        if self.archive_repository:
+            watermark = await self.archive_repository.get_watermark()
+            if watermark is not None and date_from < watermark:
+                archived_by_student = await self.archive_repository.get_school_totals_by_student(school_id, date_from, date_to)
+        archived_invoices = 0
+        
         # Process each student
         for student in all_students:
             # Get student invoices in date range
@@ -163,7 +178,7 @@ class SchoolService:
                 'invoice_date_from': date_from,
                 'invoice_date_to': date_to
             }
-            student_invoices, _ = await self.invoice_repository.get_with_filters(filter_dict, 0, 1000)
+            student_invoices = (await self.invoice_repository.get_with_filters(filter_dict, 0, 1000, CountMode.NONE)).items
             
             # Calculate student financial summary
             student_charges = 0.0
@@ -184,25 +199,36 @@ class SchoolService:
                     total_payments += invoice.total_amount
                     paid_amount += invoice.total_amount
                     paid_invoices_count += 1
-                elif invoice.status == InvoiceStatus.PENDING:
-                    if invoice.due_date < current_date:
-                        student_overdue += invoice.total_amount
-                        overdue_amount += invoice.total_amount
-                        overdue_invoices_count += 1
-                        student_overdue_count += 1
-                    else:
-                        student_pending += invoice.total_amount
-                        pending_amount += invoice.total_amount
-                        pending_invoices_count += 1
-                else:  # Other statuses
+                elif invoice.is_overdue(current_date):
+                    student_overdue += invoice.total_amount
+                    overdue_amount += invoice.total_amount
+                    overdue_invoices_count += 1
+                    student_overdue_count += 1
+                else:  # Pending, and other statuses
                     student_pending += invoice.total_amount
                     pending_amount += invoice.total_amount
                     pending_invoices_count += 1
             
+            # Archived invoices count like their live counterparts (paid, or cancelled as pending)
+            archived = archived_by_student.get(student.id, ArchivedInvoiceTotals())
+            if archived.invoice_count:
+                student_charges += archived.total_amount
+                student_payments += archived.paid_amount
+                student_paid += archived.paid_amount
+                student_pending += archived.cancelled_amount
+                total_charges += archived.total_amount
+                total_payments += archived.paid_amount
+                paid_amount += archived.paid_amount
+                pending_amount += archived.cancelled_amount
+                total_invoices += archived.invoice_count
+                paid_invoices_count += archived.paid_count
+                pending_invoices_count += archived.cancelled_count
+                archived_invoices += archived.invoice_count
+            
             student_balance = student_charges - student_payments
             
             # Only include students with invoices
-            if student_invoices:
+            if student_invoices or archived.invoice_count:
                 students_with_invoices += 1
                 
                 if student_balance > 0:
@@ -220,7 +246,7 @@ class SchoolService:
                     pending_amount=student_pending,
                     paid_amount=student_paid,
                     overdue_amount=student_overdue,
-                    total_invoices=len(student_invoices),
+                    total_invoices=len(student_invoices) + archived.invoice_count,
                     overdue_invoices=student_overdue_count
                 )
                 student_summaries.append(student_summary)
@@ -260,12 +286,43 @@ class SchoolService:
             pending_invoices=pending_invoices_count,
             paid_invoices=paid_invoices_count,
             overdue_invoices=overdue_invoices_count,
+            archived_invoices=archived_invoices,
             student_summaries=student_summaries,
             highest_balance_student=highest_balance_student,
             most_overdue_student=most_overdue_student,
             generated_at=date.today()
         )
 
+    async def get_schools_projection(self, filters: SchoolFilterDTO, pagination: PaginationParams, fields: List[str]) -> PaginatedResponse[Dict[str, Any]]:
+        """Get schools with only the requested response fields"""
+        filter_dict = {k: v for k, v in filters.model_dump().items() if v is not None}
+        
+        page = await self.school_repository.get_projection(
+            filter_dict, self._projection_attributes(fields),
+            pagination.offset, pagination.limit, pagination.count_mode, pagination.after
+        )
+        items = await asyncio.gather(*(self._to_response_fields(row, fields) for row in page.items))
+        return PaginatedResponse.from_page(list(items), page, pagination)
+
+    async def get_school_projection(self, school_id: int, fields: List[str]) -> Optional[Dict[str, Any]]:
+        """Get a school with only the requested response fields"""
+        row = await self.school_repository.get_projection_by_id(school_id, self._projection_attributes(fields))
+        return await self._to_response_fields(row, fields) if row else None
+
+    def _projection_attributes(self, fields: List[str]) -> List[str]:
+        """Attributes to select for the requested fields (student_count needs the id)"""
+        attributes = [SCHOOL_RESPONSE_ATTRIBUTES[field] for field in fields if field in SCHOOL_RESPONSE_ATTRIBUTES]
+        if "student_count" in fields and "id" not in attributes:
+            attributes.append("id")
+        return attributes
+
+    async def _to_response_fields(self, row: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+        """Convert a projected row to a sparse response item"""
+        item = select_fields(row, fields, SCHOOL_RESPONSE_ATTRIBUTES)
+        if "student_count" in fields:
+            item["student_count"] = await self.student_repository.count_by_school_id(row["id"])
+        return {field: item[field] for field in fields}
+
     async def _to_response_dto(self, school: School) -> SchoolResponseDTO:
         """Convert domain model to response DTO"""
         # Get student count for this school
@@ -0,0 +1,36 @@
+from typing import List, Optional
+from app.domain.repositories.search_repository import SearchRepositoryInterface
+from app.application.dtos.search_dto import SearchResultDTO, SearchResponseDTO
+
+SEARCH_ENTITY_TYPES = ("student", "school", "invoice")
+
+
+class SearchService:
+    """Service layer for the unified search"""
+
+    def __init__(self, search_repository: SearchRepositoryInterface):
+        self.search_repository = search_repository
+
+    async def search(self, query: str, entity_types: Optional[List[str]] = None, limit: int = 20) -> SearchResponseDTO:
+        """Search students, schools and invoices and rank the matches together"""
+        term = query.strip()
+        if not term:
+            raise ValueError("Search query cannot be empty")
+
+        types = entity_types or list(SEARCH_ENTITY_TYPES)
+        unknown = [t for t in types if t not in SEARCH_ENTITY_TYPES]
+        if unknown:
+            raise ValueError(f"Unknown search types: {', '.join(unknown)}")
+
+        hits = await self.search_repository.search(term, types, limit)
+        results = [
+            SearchResultDTO(
+                type=hit.entity_type,
+                id=hit.entity_id,
+                title=hit.title,
+                subtitle=hit.subtitle,
+                score=hit.score
+            )
+            for hit in hits
+        ]
+        return SearchResponseDTO(query=term, results=results)
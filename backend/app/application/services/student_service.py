@@ -1,9 +1,10 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import date, datetime
 from app.domain.models.student import Student
 from app.domain.repositories.student_repository import StudentRepositoryInterface
 from app.domain.repositories.invoice_repository import InvoiceRepositoryInterface
 from app.domain.repositories.school_repository import SchoolRepositoryInterface
+from app.domain.repositories.invoice_archive_repository import InvoiceArchiveRepositoryInterface
 from app.application.dtos.student_dto import (
     StudentCreateDTO, 
     StudentUpdateDTO, 
@@ -12,8 +13,17 @@ from app.application.dtos.student_dto import (
     StudentAccountStatementDTO,
     InvoiceSummaryDTO
 )
+from app.application.dtos.bulk_dto import BulkCreateResultDTO, BulkRowErrorDTO
 from app.domain.enums import InvoiceStatus
+from app.domain.repositories.page import CountMode
 from app.core.pagination import PaginationParams, PaginatedResponse
+from app.core.fields import select_fields
+
+# Response field -> student attribute, for sparse fieldsets
+STUDENT_RESPONSE_ATTRIBUTES = {
+    **{field: field for field in StudentResponseDTO.model_fields},
+    "phone": "phone_number",
+}
 
 
 class StudentService:
@@ -23,26 +33,28 @@ class StudentService:
         self, 
         student_repository: StudentRepositoryInterface,
         invoice_repository: Optional[InvoiceRepositoryInterface] = None,
-        school_repository: Optional[SchoolRepositoryInterface] = None
+        school_repository: Optional[SchoolRepositoryInterface] = None,
+        archive_repository: Optional[InvoiceArchiveRepositoryInterface] = None
     ):
         self.student_repository = student_repository
         self.invoice_repository = invoice_repository
         self.school_repository = school_repository
+        self.archive_repository = archive_repository
 
     async def get_all_students(self, pagination: PaginationParams) -> PaginatedResponse[StudentResponseDTO]:
         """Get all students with pagination"""
-        students, total = await self.student_repository.get_all(pagination.offset, pagination.limit)
-        student_dtos = [self._to_response_dto(student) for student in students]
-        return PaginatedResponse.create(student_dtos, total, pagination)
+        page = await self.student_repository.get_all(pagination.offset, pagination.limit, pagination.count_mode, pagination.after)
+        student_dtos = [self._to_response_dto(student) for student in page.items]
+        return PaginatedResponse.from_page(student_dtos, page, pagination)
 
     async def get_students_with_filters(self, filters: StudentFilterDTO, pagination: PaginationParams) -> PaginatedResponse[StudentResponseDTO]:
         """Get students with flexible filtering and pagination"""
         # Convert DTO to dict, excluding None values
         filter_dict = {k: v for k, v in filters.model_dump().items() if v is not None}
         
-        students, total = await self.student_repository.get_with_filters(filter_dict, pagination.offset, pagination.limit)
-        student_dtos = [self._to_response_dto(student) for student in students]
-        return PaginatedResponse.create(student_dtos, total, pagination)
+        page = await self.student_repository.get_with_filters(filter_dict, pagination.offset, pagination.limit, pagination.count_mode, pagination.after)
+        student_dtos = [self._to_response_dto(student) for student in page.items]
+        return PaginatedResponse.from_page(student_dtos, page, pagination)
 
     async def get_student_by_id(self, student_id: int) -> Optional[StudentResponseDTO]:
         """Get student by ID"""
@@ -53,27 +65,38 @@ class StudentService:
 
     async def create_student(self, student_data: StudentCreateDTO) -> StudentResponseDTO:
         """Create a new student"""
-        student = Student(
-            first_name=student_data.first_name,
-            last_name=student_data.last_name,
-            email=student_data.email or "",
-            phone_number=student_data.phone or "",
-            date_of_birth=student_data.date_of_birth,
-            grade_level=student_data.grade_level,
-            school_id=student_data.school_id,
-            enrollment_date=student_data.enrollment_date,
-            address=student_data.address,
-            is_active=student_data.is_active
-        )
+        student = self._to_domain(student_data)
         created_student = await self.student_repository.create(student)
         return self._to_response_dto(created_student)
 
-    async def update_student(self, student_id: int, student_data: StudentUpdateDTO) -> Optional[StudentResponseDTO]:
-        """Update an existing student"""
-        student = await self.student_repository.get_by_id(student_id)
-        if not student:
-            return None
+    async def bulk_create_students(self, rows: List[Dict[str, Any]]) -> BulkCreateResultDTO:
+        """Validate and create many students in one transaction, reporting per-row errors"""
+        errors: List[BulkRowErrorDTO] = []
+        valid: List[Tuple[int, Student]] = []
+        
+        # Validate every row with the create DTO and the domain model
+        for index, row in enumerate(rows):
+            try:
+                valid.append((index, self._to_domain(StudentCreateDTO.model_validate(row))))
+            except ValueError as e:
+                errors.append(BulkRowErrorDTO.from_exception(index, e))
+        
+        # Check referenced schools with a single query
+        if self.school_repository and valid:
+            existing_schools = await self.school_repository.get_existing_ids(student.school_id for _, student in valid)
+            missing = [(index, student) for index, student in valid if student.school_id not in existing_schools]
+            errors.extend(
+                BulkRowErrorDTO(index=index, errors=[f"School with ID {student.school_id} not found"])
+                for index, student in missing
+            )
+            valid = [(index, student) for index, student in valid if student.school_id in existing_schools]
+        
+        ids = await self.student_repository.create_many([student for _, student in valid])
+        errors.sort(key=lambda error: error.index)
+        return BulkCreateResultDTO(created=len(ids), failed=len(errors), ids=ids, errors=errors)
 
+    async def update_student(self, student_id: int, student_data: StudentUpdateDTO) -> Optional[StudentResponseDTO]:
+        """Update an existing student (one UPDATE ... RETURNING, validated by the domain model)"""
         # Map DTO fields to domain model fields
         update_data = {}
         dto_data = student_data.model_dump(exclude_unset=True)
@@ -87,8 +110,9 @@ class StudentService:
             if field in dto_data:
                 update_data[field] = dto_data[field]
 
-        updated_student = student.update(**update_data)
-        updated_student = await self.student_repository.update(updated_student)
+        updated_student = await self.student_repository.update_fields(student_id, update_data)
+        if not updated_student:
+            return None
         return self._to_response_dto(updated_student)
 
     async def delete_student(self, student_id: int) -> bool:
@@ -126,7 +150,7 @@ class StudentService:
             'invoice_date_from': date_from,
             'invoice_date_to': date_to
         }
-        all_invoices, _ = await self.invoice_repository.get_with_filters(filter_dict, 0, 1000)
+        all_invoices = (await self.invoice_repository.get_with_filters(filter_dict, 0, 1000, CountMode.NONE)).items
         
         # Categorize invoices
         pending_invoices = []
@@ -162,17 +186,23 @@ class StudentService:
                 paid_invoices.append(invoice_summary)
                 paid_amount += invoice.total_amount
                 total_payments += invoice.total_amount
-            elif invoice.status == InvoiceStatus.PENDING:
-                if invoice.due_date < current_date:
-                    overdue_invoices.append(invoice_summary)
-                    overdue_amount += invoice.total_amount
-                else:
-                    pending_invoices.append(invoice_summary)
-                    pending_amount += invoice.total_amount
-            else:  # Other statuses like CANCELLED, etc.
+            elif invoice.is_overdue(current_date):
+                overdue_invoices.append(invoice_summary)
+                overdue_amount += invoice.total_amount
+            else:  # Pending, and other statuses like CANCELLED, etc.
                 pending_invoices.append(invoice_summary)
                 pending_amount += invoice.total_amount
         
+        # Settled invoices moved to the cold archive count like their live counterparts
+        archived_invoices = 0
+        if await self._range_reaches_archive(date_from):
+            archived = await self.archive_repository.get_student_totals(student_id, date_from, date_to)
+            total_charges += archived.total_amount
+            total_payments += archived.paid_amount
+            paid_amount += archived.paid_amount
+            pending_amount += archived.cancelled_amount
+            archived_invoices = archived.invoice_count
+        
         # Calculate current balance
         current_balance = total_charges - total_payments
         
@@ -188,13 +218,53 @@ class StudentService:
             pending_invoices=pending_invoices,
             paid_invoices=paid_invoices,
             overdue_invoices=overdue_invoices,
-            total_invoices=len(all_invoices),
+            total_invoices=len(all_invoices) + archived_invoices,
             pending_amount=pending_amount,
             paid_amount=paid_amount,
             overdue_amount=overdue_amount,
+            archived_invoices=archived_invoices,
             generated_at=date.today()
         )
 
+    async def _range_reaches_archive(self, date_from: date) -> bool:
+        """Whether a statement starting on date_from may include archived invoices"""
+        if not self.archive_repository:
+            return False
+        watermark = await self.archive_repository.get_watermark()
+        return watermark is not None and date_from < watermark
+
+    async def get_students_projection(self, filters: StudentFilterDTO, pagination: PaginationParams, fields: List[str]) -> PaginatedResponse[Dict[str, Any]]:
+        """Get students with only the requested response fields"""
+        filter_dict = {k: v for k, v in filters.model_dump().items() if v is not None}
+        attributes = [STUDENT_RESPONSE_ATTRIBUTES[field] for field in fields]
+        
+        page = await self.student_repository.get_projection(
+            filter_dict, attributes, pagination.offset, pagination.limit, pagination.count_mode, pagination.after
+        )
+        items = [select_fields(row, fields, STUDENT_RESPONSE_ATTRIBUTES) for row in page.items]
+        return PaginatedResponse.from_page(items, page, pagination)
+
+    async def get_student_projection(self, student_id: int, fields: List[str]) -> Optional[Dict[str, Any]]:
+        """Get a student with only the requested response fields"""
+        attributes = [STUDENT_RESPONSE_ATTRIBUTES[field] for field in fields]
+        row = await self.student_repository.get_projection_by_id(student_id, attributes)
+        return select_fields(row, fields, STUDENT_RESPONSE_ATTRIBUTES) if row else None
+
+    def _to_domain(self, student_data: StudentCreateDTO) -> Student:
+        """Convert create DTO to domain model (runs domain validation)"""
+        return Student(
+            first_name=student_data.first_name,
+            last_name=student_data.last_name,
+            email=student_data.email or "",
+            phone_number=student_data.phone or "",
+            date_of_birth=student_data.date_of_birth,
+            grade_level=student_data.grade_level,
+            school_id=student_data.school_id,
+            enrollment_date=student_data.enrollment_date,
+            address=student_data.address,
+            is_active=student_data.is_active
+        )
+
     def _to_response_dto(self, student: Student) -> StudentResponseDTO:
         """Convert domain model to response DTO"""
         return StudentResponseDTO(
@@ -4,29 +4,48 @@ Handles token creation, validation, and user authentication.
 """
 
 from datetime import datetime, timedelta
+from functools import lru_cache
+from time import perf_counter
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_DURATION
 
 # Configuration
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# The crypto backends (passlib with bcrypt, python-jose with cryptography) are
+# imported on first use: workers and test runs that never hash or sign skip them
+
+
+@lru_cache(maxsize=None)
+def get_password_context():
+    """Password hashing context, created on first use"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    context = get_password_context()
+    started = perf_counter()
+    try:
+        return context.verify(plain_password, hashed_password)
+    finally:
+        PASSWORD_HASH_DURATION.observe(perf_counter() - started, "verify")
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    context = get_password_context()
+    started = perf_counter()
+    try:
+        return context.hash(password)
+    finally:
+        PASSWORD_HASH_DURATION.observe(perf_counter() - started, "hash")
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -48,6 +67,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -70,6 +90,7 @@ def verify_token(token: str) -> Dict[str, Any]:
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    from jose import JWTError, jwt
     
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -94,6 +115,7 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=7)  # 7 days for refresh token
     to_encode.update({"exp": expire, "type": "refresh"})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -116,6 +138,7 @@ def verify_refresh_token(token: str) -> Dict[str, Any]:
         detail="Could not validate refresh token",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    from jose import JWTError, jwt
     
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -5,19 +5,90 @@ Provides decorators and utilities for caching API responses.
 
 import functools
 import hashlib
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any, Callable, Optional, Union
-from cachetools import TTLCache
+from cachetools import Cache, TTLCache
 from datetime import datetime, timedelta
 import json
 import inspect
+import threading
+import time
+from app.core.config import settings
+from app.core.metrics import CACHE_EVICTIONS, CACHE_HITS, CACHE_INVALIDATIONS, CACHE_MISSES
+
+
+class RegionCache(TTLCache):
+    """TTL cache that reports the entries it evicts (cache full or expired) under its region"""
+    
+    def __init__(self, region: str, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize=maxsize, ttl=ttl, timer=timer)
+        self.region = region
+        self._clearing = False
+    
+    def popitem(self):
+        item = super().popitem()
+        if not self._clearing:
+            CACHE_EVICTIONS.inc(self.region, "capacity")
+        return item
+    
+    def expire(self, time=None):
+        # Cache.currsize: the timed cache's currsize would expire (and recurse) first
+        size = Cache.currsize.fget(self)
+        super().expire(time)
+        expired = size - Cache.currsize.fget(self)
+        if expired:
+            CACHE_EVICTIONS.inc(self.region, "expired", amount=expired)
+    
+    def clear(self):
+        # MutableMapping.clear pops every item: not evictions
+        self._clearing = True
+        try:
+            super().clear()
+        finally:
+            self._clearing = False
 
 
 # Global cache instances
 # TTL Cache for API responses (time-to-live: 5 minutes, max size: 1000 items)
-api_cache = TTLCache(maxsize=1000, ttl=300)  # 5 minutes TTL
+api_cache = RegionCache("api", maxsize=1000, ttl=300)  # 5 minutes TTL
 
 # Longer TTL cache for less frequently changing data (30 minutes)
-static_cache = TTLCache(maxsize=500, ttl=1800)  # 30 minutes TTL
+static_cache = RegionCache("static", maxsize=500, ttl=1800)  # 30 minutes TTL
+
+# Short TTL cache for list totals, keyed by table and normalized filter
+count_cache = RegionCache("count", maxsize=1000, ttl=settings.COUNT_CACHE_TTL)
+
+# TTLCache is not thread safe and scheduler jobs invalidate entries from worker
+# threads, so every access goes through this lock
+cache_lock = threading.RLock()
+
+# Region name of each cache instance, as reported in cache activity
+CACHE_REGIONS = {"api": api_cache, "static": static_cache, "count": count_cache}
+
+
+@dataclass
+class CacheActivity:
+    """Cache hits, misses and invalidated entries per region while serving one request"""
+    hits: Counter = field(default_factory=Counter)
+    misses: Counter = field(default_factory=Counter)
+    invalidations: Counter = field(default_factory=Counter)
+
+    def to_dict(self) -> dict:
+        return {"hits": dict(self.hits), "misses": dict(self.misses), "invalidations": dict(self.invalidations)}
+
+
+# Activity of the request being profiled in the current context (None when not profiling)
+current_cache_activity: ContextVar[Optional[CacheActivity]] = ContextVar("current_cache_activity", default=None)
+
+
+def record_cache_lookup(region: str, hit: bool) -> None:
+    """Count a cache lookup in the metrics and for the request being profiled, if any"""
+    (CACHE_HITS if hit else CACHE_MISSES).inc(region)
+    activity = current_cache_activity.get()
+    if activity is not None:
+        (activity.hits if hit else activity.misses)[region] += 1
 
 
 def _generate_cache_key(*args, **kwargs) -> str:
@@ -75,12 +146,16 @@ def simple_cache(cache_instance: TTLCache, key_prefix: str = ""):
             
             # Try to get from cache
             try:
-                if cache_key in cache_instance:
-                    cached_result = cache_instance[cache_key]
+                with cache_lock:
+                    found = cache_key in cache_instance
+                    cached_result = cache_instance[cache_key] if found else None
+                if found:
+                    record_cache_lookup(key_prefix, True)
                     return cached_result
             except Exception:
                 # If cache lookup fails, proceed without caching
                 pass
+            record_cache_lookup(key_prefix, False)
             
             # Execute function and cache result
             result = await func(*args, **kwargs)
@@ -89,7 +164,8 @@ def simple_cache(cache_instance: TTLCache, key_prefix: str = ""):
             try:
                 # Test if result can be stored (basic serialization check)
                 if result is not None:
-                    cache_instance[cache_key] = result
+                    with cache_lock:
+                        cache_instance[cache_key] = result
             except Exception:
                 # If caching fails, still return the result
                 pass
@@ -127,17 +203,33 @@ def invalidate_cache_pattern(pattern: str) -> int:
         Number of entries invalidated
     """
     invalidated = 0
+    activity = current_cache_activity.get()
     
-    # Invalidate from both cache instances
-    for cache_instance in [api_cache, static_cache]:
-        keys_to_remove = [key for key in cache_instance.keys() if pattern in key]
-        for key in keys_to_remove:
-            del cache_instance[key]
-            invalidated += 1
+    # Invalidate from all cache instances
+    for region, cache_instance in CACHE_REGIONS.items():
+        with cache_lock:
+            keys_to_remove = [key for key in cache_instance.keys() if pattern in key]
+            for key in keys_to_remove:
+                del cache_instance[key]
+                invalidated += 1
+        if keys_to_remove:
+            CACHE_INVALIDATIONS.inc(region, amount=len(keys_to_remove))
+            if activity is not None:
+                activity.invalidations[region] += len(keys_to_remove)
     
     return invalidated
 
 
+def invalidate_count_cache(table_name: str) -> int:
+    """
+    Invalidate the cached totals of one table (call after writes to it).
+    
+    Returns:
+        Number of entries invalidated
+    """
+    return invalidate_cache_pattern(f"count:{table_name}:")
+
+
 def clear_all_caches() -> int:
     """
     Clear all caches.
@@ -145,9 +237,11 @@ def clear_all_caches() -> int:
     Returns:
         Total number of entries cleared
     """
-    total_cleared = len(api_cache) + len(static_cache)
-    api_cache.clear()
-    static_cache.clear()
+    with cache_lock:
+        total_cleared = len(api_cache) + len(static_cache) + len(count_cache)
+        api_cache.clear()
+        static_cache.clear()
+        count_cache.clear()
     return total_cleared
 
 
@@ -168,5 +262,10 @@ def get_cache_stats() -> dict:
             "size": len(static_cache),
             "maxsize": static_cache.maxsize,
             "ttl": static_cache.ttl
+        },
+        "count_cache": {
+            "size": len(count_cache),
+            "maxsize": count_cache.maxsize,
+            "ttl": count_cache.ttl
         }
     }
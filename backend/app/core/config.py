@@ -26,7 +26,69 @@ class Settings:
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
     
     # Database
-    DB_ECHO: bool = os.getenv("DB_ECHO", "true").lower() == "true"
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    DB_POOL_WARMUP_CONNECTIONS: int = int(os.getenv("DB_POOL_WARMUP_CONNECTIONS", "2"))
+    
+    # What workers do with the schema on boot: "setup" creates, migrates and seeds
+    # (serialized by a lock), "verify" only checks the migration version
+    STARTUP_SCHEMA_MODE: str = os.getenv("STARTUP_SCHEMA_MODE", "setup")
+    
+    # Query instrumentation
+    QUERY_INSTRUMENTATION: bool = os.getenv("QUERY_INSTRUMENTATION", "true").lower() == "true"
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    SLOW_QUERY_LOG_SIZE: int = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    SLOW_QUERY_PARAM_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_PARAM_SAMPLE_RATE", "0.1"))
+    REQUEST_QUERY_BUDGET: int = int(os.getenv("REQUEST_QUERY_BUDGET", "50"))
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+    
+    # On-demand request profiling for superusers (X-Profile: 1 header or ?profile=1);
+    # at most PROFILER_MAX_CONCURRENT captures at once across the workers of a host
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "true").lower() == "true"
+    PROFILER_DIR: str = os.getenv("PROFILER_DIR", "/tmp/mattilda-profiles")
+    PROFILER_MAX_CONCURRENT: int = int(os.getenv("PROFILER_MAX_CONCURRENT", "1"))
+    PROFILER_INTERVAL_MS: float = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+    PROFILER_MAX_SECONDS: float = float(os.getenv("PROFILER_MAX_SECONDS", "30"))
+    PROFILER_KEEP: int = int(os.getenv("PROFILER_KEEP", "50"))
+    
+    # Prometheus metrics at /metrics; every worker writes a snapshot to METRICS_DIR
+    # every METRICS_FLUSH_SECONDS and a scrape merges the snapshots of the host
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "/tmp/mattilda-metrics")
+    METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+    EVENT_LOOP_LAG_INTERVAL_MS: float = float(os.getenv("EVENT_LOOP_LAG_INTERVAL_MS", "500"))
+    
+    # Pagination: "auto" estimates large unfiltered totals and caches the rest,
+    # "window" returns the total with the page query (count(*) OVER ()),
+    # "exact" runs a separate COUNT(*)
+    PAGINATION_COUNT_MODE: str = os.getenv("PAGINATION_COUNT_MODE", "auto")
+    COUNT_CACHE_TTL: int = int(os.getenv("COUNT_CACHE_TTL", "30"))
+    COUNT_ESTIMATE_THRESHOLD: int = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", "100000"))
+    
+    # Bulk endpoints
+    BULK_MAX_ROWS: int = int(os.getenv("BULK_MAX_ROWS", "5000"))
+    PAYMENT_IMPORT_BATCH_SIZE: int = int(os.getenv("PAYMENT_IMPORT_BATCH_SIZE", "500"))
+    
+    # Background job scheduler (one leader among the workers runs the jobs)
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_LOCK_FILE: str = os.getenv("SCHEDULER_LOCK_FILE", "/tmp/mattilda-scheduler.lock")
+    SCHEDULER_JITTER_SECONDS: float = float(os.getenv("SCHEDULER_JITTER_SECONDS", "30"))
+    
+    # Jobs (an interval of 0 disables the job)
+    OVERDUE_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("OVERDUE_SWEEP_INTERVAL_SECONDS", "3600"))
+    OVERDUE_SWEEP_TIMEOUT_SECONDS: float = float(os.getenv("OVERDUE_SWEEP_TIMEOUT_SECONDS", "300"))
+    
+    # Invoice table partitioning (PostgreSQL): partition size used by the convert
+    # command and how many future periods the daily job keeps created
+    INVOICE_PARTITION_INTERVAL: str = os.getenv("INVOICE_PARTITION_INTERVAL", "year")
+    INVOICE_PARTITIONS_AHEAD: int = int(os.getenv("INVOICE_PARTITIONS_AHEAD", "2"))
+    
+    # Cold archive of settled invoices (requires pyarrow): paid and cancelled
+    # invoices dated before the last ARCHIVE_RETENTION_YEARS full years move to Parquet files
+    ARCHIVE_ENABLED: bool = os.getenv("ARCHIVE_ENABLED", "false").lower() == "true"
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "./archive")
+    ARCHIVE_RETENTION_YEARS: int = int(os.getenv("ARCHIVE_RETENTION_YEARS", "3"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "50000"))
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
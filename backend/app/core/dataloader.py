@@ -0,0 +1,83 @@
+"""
+DataLoader-style batching for lookups by key.
+
+Every ``load(key)`` made in the same event-loop tick is collected and resolved
+with one call to the batch function, and results are memoized per loader (an
+identity map), so each key is fetched at most once:
+
+    loader = DataLoader(repository.get_by_ids)
+    school_a, school_b = await asyncio.gather(loader.load(1), loader.load(2))
+
+Loaders are meant to live as long as one request (see
+``app.infrastructure.repositories.loaders``).
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Mapping, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Receives the distinct keys requested in one tick; keys missing from the result load as None
+BatchLoadFunction = Callable[[List[K]], Awaitable[Mapping[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """Coalesces loads made in the same tick into one batch call and memoizes the results"""
+
+    def __init__(self, batch_load: BatchLoadFunction):
+        self._batch_load = batch_load
+        self._results: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        # Dispatches in flight: the event loop only keeps weak references to tasks
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+        self.batch_count = 0
+
+    async def load(self, key: K) -> Optional[V]:
+        """Load one key, batched with every other key requested in this tick"""
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._results[key] = loop.create_future()
+            if not self._queue:
+                # Runs after the other tasks ready in this tick have queued their keys
+                loop.call_soon(self._start_dispatch, loop)
+            self._queue.append(key)
+        return await future
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """Load several keys with a single batch call"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        """Store a known value (e.g. after a write) so the next load skips the database"""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._results[key] = future
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """Forget one key, or every memoized result"""
+        if key is None:
+            self._results = {k: f for k, f in self._results.items() if not f.done()}
+        else:
+            future = self._results.get(key)
+            if future is not None and future.done():
+                del self._results[key]
+
+    def _start_dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        task = loop.create_task(self._dispatch())
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        self.batch_count += 1
+        try:
+            values = await self._batch_load(keys)
+        except Exception as e:
+            # Do not memoize failures: the next load retries
+            for key in keys:
+                self._results.pop(key).set_exception(e)
+            return
+        for key in keys:
+            self._results[key].set_result(values.get(key))
@@ -6,7 +6,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session
 from typing import Optional
-from app.infrastructure.database.connection import get_session
+from app.infrastructure.database.connection import engine, get_session
 from app.infrastructure.repositories.user_repository import UserRepository
 from app.application.services.auth_service import AuthService
 from app.domain.models.user import User
@@ -141,3 +141,23 @@ async def get_current_user_optional(
         return await auth_service.get_current_user(username)
     except Exception:
         return None
+
+
+async def is_superuser_token(token: str) -> bool:
+    """
+    Check a bearer token outside dependency injection (used by middleware).
+    
+    Args:
+        token: JWT access token
+        
+    Returns:
+        True if the token is valid and belongs to an active superuser
+    """
+    try:
+        username = verify_token(token).get("sub")
+    except Exception:
+        return False
+    
+    with Session(engine) as session:
+        user = await AuthService(UserRepository(session)).get_current_user(username)
+    return user is not None and user.is_active and user.is_superuser
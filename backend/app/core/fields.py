@@ -0,0 +1,27 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Parse a comma separated ``fields=`` query parameter (sparse fieldset).
+
+    Returns None when no fields were requested, so the full response is used.
+    Raises ValueError for unknown field names.
+    """
+    if not fields:
+        return None
+
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    if not requested:
+        return None
+
+    allowed = list(allowed)
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(allowed)}")
+    return requested
+
+
+def select_fields(row: Dict[str, Any], fields: Sequence[str], attributes: Dict[str, str]) -> Dict[str, Any]:
+    """Build a sparse response item from a projected row, renaming attributes to response fields"""
+    return {field: row[attributes[field]] for field in fields if field in attributes}
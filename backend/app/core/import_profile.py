@@ -0,0 +1,132 @@
+"""
+Import-time profile of the application.
+
+Imports a module in a fresh interpreter with ``python -X importtime`` and
+reports the modules with the highest cumulative import cost, or the self time
+summed per package.
+
+    python -m app.core.import_profile                       # app.main, top 25 modules
+    python -m app.core.import_profile --by-package --level 2
+    python -m app.core.import_profile app.core.auth --top 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Modules app.main must not import: used only by CLIs, at boot in setup mode or on first use
+DEFERRED_MODULES = (
+    "app.infrastructure.database.seed_data",
+    "app.infrastructure.database.migrations",
+    "app.infrastructure.database.synthetic_data",
+    "passlib",
+    "jose",
+    "pyarrow",
+)
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """One imported module: its own time and the time including its imports (microseconds)"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse the ``-X importtime`` report (written to stderr) in import order"""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        module = name.strip()
+        records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(name) - len(name.lstrip()) - 1) // 2))
+    return records
+
+
+def profile_imports(module: str = "app.main", env: Optional[Dict[str, str]] = None) -> List[ImportRecord]:
+    """Import ``module`` in a new interpreter and return its import records"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=BACKEND_DIR, env={**os.environ, **(env or {})},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def import_cost_ms(records: List[ImportRecord], module: str) -> float:
+    """Cumulative import time of ``module`` in milliseconds"""
+    for record in records:
+        if record.module == module:
+            return record.cumulative_us / 1000
+    raise KeyError(f"{module} was not imported")
+
+
+def imported_modules(records: List[ImportRecord]) -> List[str]:
+    return [record.module for record in records]
+
+
+def by_package(records: List[ImportRecord], level: int = 1) -> List[Tuple[str, int]]:
+    """Self time summed per package (first ``level`` name components), highest first"""
+    totals: Dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[".".join(record.module.split(".")[:level])] += record.self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-module import cost of the application")
+    parser.add_argument("module", nargs="?", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Rows to show")
+    parser.add_argument("--by-package", action="store_true", help="Sum self time per package instead")
+    parser.add_argument("--level", type=int, default=1, help="Package name components to group by")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    try:
+        records = profile_imports(args.module)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    total_ms = import_cost_ms(records, args.module)
+
+    if args.by_package:
+        rows = by_package(records, args.level)[:args.top]
+        if args.json:
+            print(json.dumps({"module": args.module, "total_ms": total_ms, "packages": [
+                {"package": name, "self_ms": self_us / 1000} for name, self_us in rows
+            ]}, indent=2))
+            return
+        print(f"Importing {args.module} took {total_ms:.1f} ms ({len(records)} modules)\n")
+        print(f"{'self ms':>9}  {'share':>6}  package")
+        for name, self_us in rows:
+            print(f"{self_us / 1000:>9.1f}  {self_us / 10 / total_ms:>5.1f}%  {name}")
+        return
+
+    rows = sorted(records, key=lambda record: record.cumulative_us, reverse=True)[:args.top]
+    if args.json:
+        print(json.dumps({"module": args.module, "total_ms": total_ms, "modules": [asdict(row) for row in rows]}, indent=2))
+        return
+    print(f"Importing {args.module} took {total_ms:.1f} ms ({len(records)} modules)\n")
+    print(f"{'cumul. ms':>10}  {'self ms':>8}  module")
+    for record in rows:
+        print(f"{record.cumulative_us / 1000:>10.1f}  {record.self_us / 1000:>8.1f}  {record.module}")
+    deferred = [name for name in DEFERRED_MODULES if name in imported_modules(records)]
+    if deferred:
+        print(f"\n⚠️  Imported eagerly but meant to be deferred: {', '.join(deferred)}")
+
+
+if __name__ == "__main__":
+    main()
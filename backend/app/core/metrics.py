@@ -0,0 +1,484 @@
+"""
+Prometheus metrics.
+
+Counters, gauges and histograms are kept in memory and updated on the hot path
+with one dict update under a lock, cheap enough to stay on in production.
+``MetricsMiddleware`` records per-route latency, status codes and requests in
+flight; the database, cache, password hashing and scheduler code record into
+the metrics defined at the bottom of this module.
+
+Uvicorn workers are separate processes, so each one writes a snapshot of its
+metrics to METRICS_DIR every METRICS_FLUSH_SECONDS (and right before serving a
+scrape). ``/metrics`` merges the snapshots of every worker of the host:
+
+- counters and histograms are summed over all snapshots. Snapshots of workers
+  that have exited are folded into an archive file when a worker starts, so
+  totals do not go backwards when a worker is replaced
+- gauges only count live workers (fresh snapshot, running process) and are
+  summed or maxed depending on the gauge
+
+Values from other workers are up to one flush interval old.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from time import perf_counter, time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+logger = logging.getLogger("app.metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Route label of requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+
+# First word of the statements reported as their own query operation
+QUERY_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+Labels = Tuple[str, ...]
+
+
+class Metric:
+    """A named metric with a fixed set of label names"""
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def samples(self) -> List[Tuple[Labels, Any]]:
+        with self._lock:
+            return [(labels, self._copy(value)) for labels, value in self._values.items()]
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+
+class Counter(Metric):
+    """Monotonic total, summed across workers"""
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Current value; ``mode`` is how live workers combine ("sum" or "max")"""
+    type = "gauge"
+
+    def __init__(self, *args, mode: str = "sum", **kwargs):
+        if mode not in ("sum", "max"):
+            raise ValueError(f"Unknown gauge mode: {mode}")
+        self.mode = mode
+        super().__init__(*args, **kwargs)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = float(value)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """
+    Observations counted per bucket, summed across workers.
+
+    Each label set holds the (non-cumulative) count of every bucket plus +Inf,
+    followed by the sum of the observations.
+    """
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(*args, **kwargs)
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return list(value)
+
+
+class Registry:
+    """The metrics of this process plus collectors that refresh gauges before a snapshot"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, List[List[Any]]]:
+        """Samples of every metric as ``{name: [[labels, value], ...]}`` (JSON friendly)"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception("Metrics collector failed")
+        return {
+            name: [[list(labels), value] for labels, value in metric.samples()]
+            for name, metric in self.metrics.items()
+        }
+
+
+REGISTRY = Registry()
+
+
+def _process_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsExporter:
+    """Writes this worker's snapshot to a directory shared by the workers and merges them all"""
+
+    ARCHIVE = "archive.json"
+
+    def __init__(self, registry: Registry, directory: str, flush_seconds: float = 5.0):
+        self.registry = registry
+        self.directory = Path(directory)
+        self.flush_seconds = flush_seconds
+
+    @property
+    def pid(self) -> int:
+        return os.getpid()
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.directory / f"worker-{self.pid}.json"
+
+    def write_snapshot(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshot = {"pid": self.pid, "written_at": time(), "metrics": self.registry.snapshot()}
+        temporary = self.snapshot_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(snapshot))
+        os.replace(temporary, self.snapshot_path)
+
+    def archive_exited_workers(self) -> int:
+        """
+        Fold the counters and histograms of exited workers into the archive.
+
+        A snapshot carrying this worker's pid is from an earlier process that
+        had the same pid. Returns the number of snapshots archived.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            archive = self._read(self.directory / self.ARCHIVE) or {"pid": None, "metrics": {}}
+            archived = []
+            for path, snapshot in self._snapshots():
+                if snapshot["pid"] == self.pid or not _process_running(snapshot["pid"]):
+                    archive["metrics"] = self._merge([archive, snapshot], live_gauges=False, as_snapshot=True)
+                    archived.append(path)
+            if archived:
+                temporary = self.directory / f"{self.ARCHIVE}.tmp"
+                temporary.write_text(json.dumps(archive))
+                os.replace(temporary, self.directory / self.ARCHIVE)
+                for path in archived:
+                    path.unlink(missing_ok=True)
+        return len(archived)
+
+    def collect(self) -> str:
+        """Metrics of every worker in the Prometheus text format"""
+        try:
+            self.write_snapshot()
+        except OSError:
+            logger.exception("Could not write metrics snapshot")
+            own = {"pid": self.pid, "written_at": time(), "metrics": self.registry.snapshot()}
+            return render(self.registry, self._merge([own], live_gauges=True))
+        snapshots = [snapshot for _, snapshot in self._snapshots()]
+        archive = self._read(self.directory / self.ARCHIVE)
+        if archive is not None:
+            snapshots.append(archive)
+        return render(self.registry, self._merge(snapshots, live_gauges=True))
+
+    def _snapshots(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        snapshots = []
+        for path in sorted(self.directory.glob("worker-*.json")):
+            snapshot = self._read(path)
+            if snapshot is not None:
+                snapshots.append((path, snapshot))
+        return snapshots
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None  # removed or being replaced by another worker
+
+    def _is_live(self, snapshot: Dict[str, Any], now: float) -> bool:
+        if snapshot.get("pid") is None:
+            return False
+        if snapshot["pid"] == self.pid:
+            return True
+        fresh = now - snapshot.get("written_at", 0) <= max(3 * self.flush_seconds, 15.0)
+        return fresh and _process_running(snapshot["pid"])
+
+    def _merge(self, snapshots: Iterable[Dict[str, Any]], live_gauges: bool, as_snapshot: bool = False):
+        """
+        Combine snapshots per metric and label set.
+
+        Returns ``{name: {labels: value}}``, or the snapshot layout with
+        ``as_snapshot`` (gauges are then left out: they only make sense live).
+        """
+        now = time()
+        merged: Dict[str, Dict[Labels, Any]] = {name: {} for name in self.registry.metrics}
+        for snapshot in snapshots:
+            live = live_gauges and self._is_live(snapshot, now)
+            for name, samples in snapshot.get("metrics", {}).items():
+                metric = self.registry.metrics.get(name)
+                if metric is None or (isinstance(metric, Gauge) and not live):
+                    continue
+                values = merged[name]
+                for labels, value in samples:
+                    labels = tuple(labels)
+                    current = values.get(labels)
+                    if current is None:
+                        values[labels] = list(value) if isinstance(value, list) else value
+                    elif isinstance(metric, Histogram):
+                        if len(current) == len(value):  # skip snapshots taken with other buckets
+                            values[labels] = [a + b for a, b in zip(current, value)]
+                    elif isinstance(metric, Gauge) and metric.mode == "max":
+                        values[labels] = max(current, value)
+                    else:
+                        values[labels] = current + value
+        if as_snapshot:
+            return {
+                name: [[list(labels), value] for labels, value in values.items()]
+                for name, values in merged.items()
+                if not isinstance(self.registry.metrics[name], Gauge)
+            }
+        return merged
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def render(registry: Registry, merged: Dict[str, Dict[Labels, Any]]) -> str:
+    """Prometheus text format of samples merged by the exporter (``{name: {labels: value}}``)"""
+    lines: List[str] = []
+    for name, metric in registry.metrics.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.type}")
+        for labels, value in sorted(merged.get(name, {}).items()):
+            if isinstance(metric, Histogram):
+                cumulative = 0.0
+                for bound, count in zip(metric.buckets + (float("inf"),), value[:-1]):
+                    cumulative += count
+                    bucket_labels = _format_labels(metric.labelnames + ("le",), labels + (_format_value(bound),))
+                    lines.append(f"{name}_bucket{bucket_labels} {_format_value(cumulative)}")
+                label_text = _format_labels(metric.labelnames, labels)
+                lines.append(f"{name}_sum{label_text} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{label_text} {_format_value(cumulative)}")
+            else:
+                lines.append(f"{name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsReporter:
+    """
+    Background task of a worker: measures event loop lag and flushes snapshots.
+
+    Lag is how late the task wakes up from a ``sleep(interval)``, i.e. how long
+    the loop was blocked by something else.
+    """
+
+    def __init__(self, exporter: MetricsExporter, lag_interval_ms: float = 500.0):
+        self.exporter = exporter
+        self.lag_interval = lag_interval_ms / 1000
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        try:
+            archived = self.exporter.archive_exited_workers()
+            if archived:
+                logger.info("Archived metrics of %d exited worker(s)", archived)
+        except OSError:
+            logger.exception("Could not archive metrics of exited workers")
+        self._task = asyncio.create_task(self._run(), name="metrics-reporter")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        try:
+            self.exporter.write_snapshot()  # keep the final totals for the archive
+        except OSError:
+            logger.exception("Could not write metrics snapshot")
+
+    async def _run(self) -> None:
+        last_flush = perf_counter()
+        while True:
+            started = perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, perf_counter() - started - self.lag_interval)
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+            if perf_counter() - last_flush >= self.exporter.flush_seconds:
+                last_flush = perf_counter()
+                try:
+                    self.exporter.write_snapshot()
+                except OSError:
+                    logger.exception("Could not write metrics snapshot")
+
+
+def route_label(scope: Scope) -> str:
+    """Path template of the route that served the request (set by FastAPI's router)"""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status codes and requests in flight per route.
+
+    Scrapes (``exclude_paths``) are not recorded: a snapshot written while
+    serving one would count it as a request in flight.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500  # if the app fails before starting a response
+
+        async def send_and_record(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            elapsed = perf_counter() - started
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            method, route = scope["method"], route_label(scope)
+            HTTP_REQUEST_DURATION.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+
+
+def query_operation(statement: str) -> str:
+    """Query operation label of a statement (its first keyword)"""
+    word = statement.lstrip()[:6].upper()
+    return word if word in QUERY_OPERATIONS else "OTHER"
+
+
+def register_pool_metrics(engine, registry: Optional[Registry] = None) -> None:
+    """Report the connection pool of an engine (pools without a fixed size report nothing)"""
+    def collect() -> None:
+        pool = engine.pool
+        for gauge, method in ((DB_POOL_SIZE, "size"), (DB_POOL_CHECKED_OUT, "checkedout"), (DB_POOL_OVERFLOW, "overflow")):
+            if hasattr(pool, method):
+                gauge.set(getattr(pool, method)())
+    (registry if registry is not None else REGISTRY).add_collector(collect)
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route"), buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served")
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Database statement latency by operation", ("operation",), buckets=QUERY_BUCKETS
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Connections the pools keep open")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Pooled connections in use")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections opened beyond the pool size (negative while the pool fills)")
+
+CACHE_HITS = Counter("cache_hits_total", "Cache hits by region", ("region",))
+CACHE_MISSES = Counter("cache_misses_total", "Cache misses by region", ("region",))
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total", "Cache entries evicted by region and reason (capacity or expired)", ("region", "reason")
+)
+CACHE_INVALIDATIONS = Counter("cache_invalidations_total", "Cache entries invalidated after writes by region", ("region",))
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "bcrypt time by operation (hash or verify)", ("operation",), buckets=HASH_BUCKETS
+)
+
+EVENT_LOOP_LAG = Histogram("event_loop_lag_seconds", "How late the event loop runs a scheduled wake-up", buckets=LOOP_LAG_BUCKETS)
+EVENT_LOOP_LAG_LAST = Gauge("event_loop_lag_last_seconds", "Latest event loop lag, worst of the workers", mode="max")
+
+SCHEDULER_JOB_RUNS = Counter(
+    "scheduler_job_runs_total", "Scheduled job runs by job and outcome (success, failure, timeout or cancelled)", ("job", "outcome")
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds", "Scheduled job run time (until the timeout for timed-out runs)", ("job",), buckets=JOB_BUCKETS
+)
+SCHEDULER_JOB_SKIPPED = Counter(
+    "scheduler_job_skipped_total", "Scheduled job runs skipped by job and reason (follower or still_running)", ("job", "reason")
+)
+
+metrics_exporter = MetricsExporter(REGISTRY, settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS)
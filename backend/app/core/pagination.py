@@ -1,14 +1,40 @@
-from typing import Generic, List, TypeVar, Optional
+import base64
+import binascii
+import json
+from typing import Any, Generic, List, Sequence, TypeVar, Optional
 from pydantic import BaseModel, model_validator
 from math import ceil
+from datetime import date
+from app.core.config import settings
+from app.domain.repositories.page import CountMode, Page
 
 T = TypeVar('T')
 
 
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Encode a sort key as an opaque, URL-safe cursor"""
+    payload = json.dumps(list(key), default=lambda value: value.isoformat() if isinstance(value, date) else str(value))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor``"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(payload)
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(key, list) or not key:
+        raise ValueError("Invalid pagination cursor")
+    return key
+
+
 class PaginationParams(BaseModel):
     """Pagination parameters"""
     page: int = 1
     size: int = 10
+    include_total: bool = True
+    cursor: Optional[str] = None
     
     @model_validator(mode='after')
     def validate_pagination(self):
@@ -30,27 +56,48 @@ class PaginationParams(BaseModel):
     def limit(self) -> int:
         """Get limit for database queries"""
         return self.size
+    
+    @property
+    def count_mode(self) -> CountMode:
+        """How the repository should compute the total for this request"""
+        if not self.include_total:
+            return CountMode.NONE
+        return CountMode(settings.PAGINATION_COUNT_MODE)
+    
+    @property
+    def after(self) -> Optional[List[Any]]:
+        """Sort key to continue after when a cursor was given (keyset pagination)"""
+        return decode_cursor(self.cursor) if self.cursor else None
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """Paginated response model"""
     items: List[T]
-    total: int
+    total: Optional[int]
     page: int
     size: int
-    pages: int
+    pages: Optional[int]
     has_next: bool
     has_previous: bool
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
     
     @classmethod
     def create(
         cls, 
         items: List[T], 
-        total: int, 
-        pagination: PaginationParams
+        total: Optional[int], 
+        pagination: PaginationParams,
+        has_next: Optional[bool] = None,
+        next_key: Optional[Sequence[Any]] = None,
+        total_is_estimate: bool = False
     ) -> "PaginatedResponse[T]":
-        """Create paginated response"""
-        pages = ceil(total / pagination.size) if total > 0 else 1
+        """Create paginated response (total and pages are None when counting was skipped)"""
+        pages = None
+        if total is not None:
+            pages = ceil(total / pagination.size) if total > 0 else 1
+            if has_next is None:
+                has_next = pagination.page < pages
         
         return cls(
             items=items,
@@ -58,6 +105,13 @@ class PaginatedResponse(BaseModel, Generic[T]):
             page=pagination.page,
             size=pagination.size,
             pages=pages,
-            has_next=pagination.page < pages,
-            has_previous=pagination.page > 1
+            has_next=bool(has_next),
+            has_previous=pagination.page > 1 or pagination.cursor is not None,
+            next_cursor=encode_cursor(next_key) if next_key else None,
+            total_is_estimate=total_is_estimate
         )
+    
+    @classmethod
+    def from_page(cls, items: List[T], page: Page[Any], pagination: PaginationParams) -> "PaginatedResponse[T]":
+        """Create paginated response from a repository page and its converted items"""
+        return cls.create(items, page.total, pagination, page.has_next, page.next_key, page.total_is_estimate)
@@ -0,0 +1,20 @@
+from typing import List, Optional
+
+
+def parse_ids(ids: Optional[str], max_ids: int = 100) -> Optional[List[int]]:
+    """
+    Parse a comma separated ``ids=`` query parameter.
+
+    Returns None when no IDs were given. Raises ValueError for values that are
+    not integers or for more than ``max_ids`` distinct IDs.
+    """
+    if not ids:
+        return None
+
+    try:
+        requested = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise ValueError("ids must be a comma separated list of integers")
+    if len(requested) > max_ids:
+        raise ValueError(f"At most {max_ids} ids can be requested at once")
+    return requested or None
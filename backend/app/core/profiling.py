@@ -0,0 +1,363 @@
+"""
+On-demand profiling of single requests.
+
+A superuser adds ``X-Profile: 1`` (or ``?profile=1``) to a request and
+``RequestProfilerMiddleware`` runs that request under a stack sampler. Only the
+frames of that request are kept: samples taken while the event loop was running
+something else count as waiting time. The profile records the request's
+database queries and time, and its cache hits, misses and invalidations per
+region.
+
+Profiles are written as JSON files to PROFILER_DIR, so any worker can serve
+them, and the newest PROFILER_KEEP are kept. The admin endpoints return them in
+folded stack format (one ``frame;frame;frame count`` line per stack), which
+flamegraph.pl, speedscope and inferno read.
+
+Concurrent captures are limited across the workers of a host by flock-ed slot
+files. When every slot is taken, the request runs unprofiled and the response
+says so in ``X-Profile-Status``.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from types import FrameType
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache import CacheActivity, current_cache_activity
+from app.core.config import settings
+from app.infrastructure.database.instrumentation import current_request_stats
+
+logger = logging.getLogger("app.profiling")
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAMETER = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_STATUS_HEADER = "X-Profile-Status"
+
+# Leaf frames that are waiting on the database driver
+DB_CALL_FRAMES = ("do_execute", "do_executemany", "do_execute_no_params")
+WAITING_FRAME = "[waiting]"
+DB_FRAME = "[db]"
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{12}$")
+
+# Checks a bearer token, returning whether its user may profile requests
+Authorizer = Callable[[str], Awaitable[bool]]
+
+
+def frame_label(frame: FrameType) -> str:
+    """``module:qualified function`` name of a frame (plain function name before Python 3.11)"""
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread at a fixed interval from a background thread.
+
+    Only stacks that pass through ``root`` (the frame of the profiled request) are
+    kept, cut at the root; others are counted as waiting samples. If sampling
+    fails, it stops and ``error`` says why; the samples taken so far are kept.
+    """
+
+    def __init__(self, root: FrameType, thread_id: int, interval_ms: float, max_seconds: float):
+        self.root = root
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.waiting = 0
+        self.truncated = False
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            self._sample()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            logger.exception("Stack sampler failed")
+
+    def _sample(self) -> None:
+        deadline = perf_counter() + self.max_seconds
+        while not self._stop.wait(self.interval):
+            if perf_counter() > deadline:
+                self.truncated = True
+                return
+            stack = self._stack(sys._current_frames().get(self.thread_id))
+            if stack:
+                self.stacks[stack] += 1
+            else:
+                self.waiting += 1
+
+    def _stack(self, frame: Optional[FrameType]) -> Optional[str]:
+        labels: List[str] = []
+        if frame is not None and frame.f_code.co_name in DB_CALL_FRAMES:
+            labels.append(DB_FRAME)
+        while frame is not None:
+            labels.append(frame_label(frame))
+            if frame is self.root:
+                return ";".join(reversed(labels))
+            frame = frame.f_back
+        return None
+
+
+@dataclass
+class RequestProfile:
+    """One profiled request: stack samples plus database and cache activity"""
+    id: str
+    method: str
+    path: str
+    query_string: str
+    started_at: str
+    interval_ms: float
+    duration_ms: float = 0.0
+    status_code: Optional[int] = None
+    samples: int = 0
+    waiting_samples: int = 0
+    truncated: bool = False
+    error: Optional[str] = None
+    db: Optional[Dict[str, Any]] = None
+    cache: Dict[str, Any] = field(default_factory=dict)
+    stacks: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        """Everything but the stacks"""
+        return {key: value for key, value in asdict(self).items() if key != "stacks"}
+
+    def folded(self) -> str:
+        """Stacks in folded format under a root frame naming the request"""
+        root = f"{self.method} {self.path}"
+        lines = [f"{root};{stack} {count}" for stack, count in sorted(self.stacks.items())]
+        if self.waiting_samples:
+            lines.append(f"{root};{WAITING_FRAME} {self.waiting_samples}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RequestProfile":
+        return cls(**data)
+
+
+class ProfileStore:
+    """Profiles as JSON files in a directory shared by the workers, newest ``keep`` kept"""
+
+    def __init__(self, directory: str, keep: int = 50):
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def save(self, profile: RequestProfile) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{profile.id}.json"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(asdict(profile)))
+        os.replace(temporary, path)
+        self._prune()
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            return RequestProfile.from_dict(json.loads((self.directory / f"{profile_id}.json").read_text()))
+        except FileNotFoundError:
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of the stored profiles, newest first"""
+        summaries = []
+        for path in self._files():
+            try:
+                summaries.append(RequestProfile.from_dict(json.loads(path.read_text())).summary())
+            except (FileNotFoundError, ValueError):
+                continue  # pruned or being replaced by another worker
+        return summaries
+
+    def clear(self) -> int:
+        files = self._files()
+        for path in files:
+            path.unlink(missing_ok=True)
+        return len(files)
+
+    def _files(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        return [path for _, path in sorted(files, reverse=True)]
+
+    def _prune(self) -> None:
+        for path in self._files()[self.keep:]:
+            path.unlink(missing_ok=True)
+
+
+class ProfileSlots:
+    """At most ``limit`` concurrent captures per host, as non-blocking flocks on slot files"""
+
+    def __init__(self, directory: str, limit: int):
+        self.directory = Path(directory)
+        self.limit = limit
+
+    def acquire(self) -> Optional[IO[str]]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for slot in range(self.limit):
+            slot_file = open(self.directory / f"slot-{slot}.lock", "a+")
+            try:
+                fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                slot_file.close()
+                continue
+            return slot_file
+        return None
+
+    def release(self, slot_file: IO[str]) -> None:
+        fcntl.flock(slot_file, fcntl.LOCK_UN)
+        slot_file.close()
+
+
+profile_store = ProfileStore(settings.PROFILER_DIR, settings.PROFILER_KEEP)
+
+
+def profiling_requested(scope: Scope) -> bool:
+    """Whether the request asks to be profiled (header or query parameter)"""
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER.encode():
+            return value.strip().lower() in (b"1", b"true")
+    query_string = scope.get("query_string", b"")
+    if PROFILE_QUERY_PARAMETER.encode() not in query_string:
+        return False
+    values = parse_qs(query_string.decode("latin-1")).get(PROFILE_QUERY_PARAMETER, [])
+    return any(value.lower() in ("1", "true") for value in values)
+
+
+def bearer_token(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token.strip() if scheme.lower() == "bearer" and token.strip() else None
+    return None
+
+
+class RequestProfilerMiddleware:
+    """ASGI middleware that profiles requests asking for it, when their user is a superuser"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        authorize: Authorizer,
+        store: ProfileStore = profile_store,
+        max_concurrent: int = 1,
+        interval_ms: float = 5.0,
+        max_seconds: float = 30.0,
+    ):
+        self.app = app
+        self.authorize = authorize
+        self.store = store
+        self.slots = ProfileSlots(str(store.directory), max_concurrent)
+        self.interval_ms = interval_ms
+        self.max_seconds = max_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        token = bearer_token(scope)
+        if token is None or not await self.authorize(token):
+            # Not allowed: serve the request as if profiling had not been asked for
+            await self.app(scope, receive, send)
+            return
+
+        slot = self.slots.acquire()
+        if slot is None:
+            await self.app(scope, receive, self._with_headers(send, {PROFILE_STATUS_HEADER: "busy"}))
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self.slots.release(slot)
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile = RequestProfile(
+            id=secrets.token_hex(6),
+            method=scope["method"],
+            path=scope["path"],
+            query_string=scope.get("query_string", b"").decode("latin-1"),
+            started_at=datetime.now().isoformat(timespec="milliseconds"),
+            interval_ms=self.interval_ms,
+        )
+        headers = {PROFILE_ID_HEADER: profile.id, PROFILE_STATUS_HEADER: "captured"}
+
+        async def send_and_record(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+            await send(message)
+
+        # Queries already run for this request (the superuser check) are not part of the profile
+        query_stats = current_request_stats.get()
+        queries_before = (query_stats.count, query_stats.db_time_ms, Counter(query_stats.shapes)) if query_stats else None
+        activity = CacheActivity()
+        activity_token = current_cache_activity.set(activity)
+        sampler = StackSampler(sys._getframe(), threading.get_ident(), self.interval_ms, self.max_seconds)
+        started = perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, self._with_headers(send_and_record, headers))
+        finally:
+            sampler.stop()
+            profile.duration_ms = (perf_counter() - started) * 1000
+            current_cache_activity.reset(activity_token)
+            profile.stacks = dict(sampler.stacks)
+            profile.samples = sum(sampler.stacks.values())
+            profile.waiting_samples = sampler.waiting
+            profile.truncated = sampler.truncated
+            profile.error = sampler.error
+            profile.cache = activity.to_dict()
+            if query_stats is not None:
+                count, db_time_ms, shapes = queries_before
+                profile.db = {
+                    "queries": query_stats.count - count,
+                    "time_ms": round(query_stats.db_time_ms - db_time_ms, 3),
+                    "shapes": [
+                        {"statement": shape, "count": repeated}
+                        for shape, repeated in (query_stats.shapes - shapes).most_common(20)
+                    ],
+                }
+            try:
+                self.store.save(profile)
+                logger.info("Profiled %s %s in %.1f ms (profile %s)", profile.method, profile.path, profile.duration_ms, profile.id)
+            except OSError:
+                logger.exception("Could not store profile %s", profile.id)
+
+    @staticmethod
+    def _with_headers(send: Send, headers: Dict[str, str]) -> Send:
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers.items():
+                    response_headers[name] = value
+            await send(message)
+        return send_with_headers
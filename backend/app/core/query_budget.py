@@ -0,0 +1,114 @@
+"""
+Per-request query budget tracking and N+1 detection.
+
+``QueryBudgetMiddleware`` gives every HTTP request its own ``RequestQueryStats``
+which the query recorder fills in. When a request is done, repeated query
+shapes (likely N+1 patterns) and budget overruns are logged, and in debug mode
+the counts are returned as response headers.
+
+``assert_max_queries`` is the test-side helper:
+
+    with assert_max_queries(5):
+        client.get("/api/v1/schools/")
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.infrastructure.database.instrumentation import RequestQueryStats, current_request_stats
+
+logger = logging.getLogger("app.db.query_budget")
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+DB_TIME_HEADER = "X-DB-Time-Ms"
+N_PLUS_ONE_HEADER = "X-DB-N-Plus-One"
+
+# Called with (method, path, stats) once a request has finished
+RequestListener = Callable[[str, str, RequestQueryStats], None]
+_listeners: List[RequestListener] = []
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware that tracks queries and DB time per request"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        expose_headers: bool = False,
+        budget: Optional[int] = None,
+        n_plus_one_threshold: int = 5
+    ):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.budget = budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = current_request_stats.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = MutableHeaders(scope=message)
+                headers[QUERY_COUNT_HEADER] = str(stats.count)
+                headers[DB_TIME_HEADER] = f"{stats.db_time_ms:.2f}"
+                headers[N_PLUS_ONE_HEADER] = str(len(stats.repeated_shapes(self.n_plus_one_threshold)))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_request_stats.reset(token)
+            self._report(scope["method"], scope["path"], stats)
+
+    def _report(self, method: str, path: str, stats: RequestQueryStats) -> None:
+        for shape, count in stats.repeated_shapes(self.n_plus_one_threshold):
+            logger.warning("Possible N+1 on %s %s: %d x %s", method, path, count, shape)
+
+        if self.budget is not None and stats.count > self.budget:
+            logger.warning(
+                "Query budget exceeded on %s %s: %d queries (budget %d), %.1f ms in database",
+                method, path, stats.count, self.budget, stats.db_time_ms
+            )
+
+        for listener in list(_listeners):
+            listener(method, path, stats)
+
+
+@contextmanager
+def capture_request_queries() -> Iterator[List[Tuple[str, str, RequestQueryStats]]]:
+    """Collect the query stats of every request finished inside the block"""
+    captured: List[Tuple[str, str, RequestQueryStats]] = []
+
+    def listener(method: str, path: str, stats: RequestQueryStats) -> None:
+        captured.append((method, path, stats))
+
+    _listeners.append(listener)
+    try:
+        yield captured
+    finally:
+        _listeners.remove(listener)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[List[Tuple[str, str, RequestQueryStats]]]:
+    """
+    Fail if any request served inside the block ran more than ``max_queries`` queries.
+
+    Requests must go through an app with ``QueryBudgetMiddleware`` installed.
+    """
+    with capture_request_queries() as captured:
+        yield captured
+
+    for method, path, stats in captured:
+        if stats.count > max_queries:
+            shapes = "\n".join(f"  {count} x {shape}" for shape, count in stats.shapes.most_common())
+            raise AssertionError(
+                f"{method} {path} ran {stats.count} queries (max {max_queries}):\n{shapes}"
+            )
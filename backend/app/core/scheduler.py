@@ -0,0 +1,305 @@
+"""
+In-process periodic job scheduler.
+
+Jobs are plain (blocking) callables run on an interval or a cron schedule. Each
+job has its own asyncio task, started and stopped with the application
+lifespan, and every run executes in a worker thread so the event loop keeps
+serving requests:
+
+    scheduler = Scheduler(leader=FileLeaderLock("/tmp/app.lock"))
+    scheduler.add_job("overdue_sweep", sweep, IntervalTrigger(3600), timeout=300, jitter=30)
+    await scheduler.start()
+
+Every worker runs the same scheduler, so a ``LeaderLock`` decides which one
+actually executes the jobs: before each run the worker tries to become (or
+checks that it still is) the leader and skips the run otherwise. A worker that
+dies releases its lock and another one takes over on its next tick.
+
+A run that exceeds its timeout is recorded as a timeout right away, but a
+thread cannot be interrupted: it runs on in the background and later runs of
+that job are skipped until it has finished.
+
+Runs, their outcome and duration, and skipped runs are exported as the
+``scheduler_job_*`` Prometheus metrics.
+"""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Protocol, Set
+from app.core.metrics import SCHEDULER_JOB_DURATION, SCHEDULER_JOB_RUNS, SCHEDULER_JOB_SKIPPED
+
+logger = logging.getLogger("app.scheduler")
+
+# Blocking work, run in a worker thread
+JobFunction = Callable[[], Any]
+
+
+class LeaderLock(Protocol):
+    """Decides which worker runs the scheduled jobs"""
+
+    def acquire(self) -> bool:
+        """Become or stay the leader without blocking; returns whether this worker leads"""
+        ...
+
+    def release(self) -> None:
+        """Give up leadership"""
+        ...
+
+
+class Trigger(Protocol):
+    """When a job runs next"""
+
+    def next_run(self, previous: Optional[datetime], now: datetime) -> datetime:
+        """Next run time given the previous scheduled run (None before the first one)"""
+        ...
+
+
+class IntervalTrigger:
+    """Fires every ``seconds``, first on start"""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_run(self, previous: Optional[datetime], now: datetime) -> datetime:
+        if previous is None:
+            return now
+        return max(previous + timedelta(seconds=self.seconds), now)
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+class CronTrigger:
+    """
+    Fires on a five-field cron schedule: minute hour day-of-month month day-of-week.
+
+    Fields accept ``*``, numbers, ranges (``1-5``), lists (``1,15``) and steps
+    (``*/10``, ``0-30/5``). Day of week is 0-6 with 0 (or 7) for Sunday. As in
+    cron, when both day fields are restricted a day matching either one fires.
+    """
+
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            self._parse_field(value, low, high) for value, (low, high) in zip(fields, self.FIELD_RANGES)
+        )
+        self.minutes, self.hours, self.days, self.months = minutes, hours, days, months
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(value: str, low: int, high: int) -> Set[int]:
+        allowed: Set[int] = set()
+        for part in value.split(","):
+            span, _, step = part.partition("/")
+            try:
+                if span == "*":
+                    start, end = low, high
+                elif "-" in span:
+                    start, end = (int(bound) for bound in span.split("-", 1))
+                else:
+                    start = end = int(span)
+                increment = int(step) if step else 1
+            except ValueError:
+                raise ValueError(f"Invalid cron field: {value!r}")
+            if not low <= start <= end <= high or increment < 1:
+                raise ValueError(f"Cron field {value!r} is out of range {low}-{high}")
+            allowed.update(range(start, end + 1, increment))
+        return allowed
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day or weekday
+        return day and weekday
+
+    def next_run(self, previous: Optional[datetime], now: datetime) -> datetime:
+        """First matching minute strictly after ``now``"""
+        moment = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skip whole months, days and hours that cannot match; five years covers every valid schedule
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return f"cron {self.expression!r}"
+
+
+@dataclass
+class Job:
+    """A scheduled job and its run statistics"""
+    name: str
+    func: JobFunction
+    trigger: Trigger
+    timeout: Optional[float] = None
+    jitter: float = 0.0
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    skipped: int = 0
+    total_duration_ms: float = 0.0
+    last_duration_ms: Optional[float] = None
+    last_started_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    next_run_at: Optional[datetime] = None
+    running: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "schedule": repr(self.trigger),
+            "timeout": self.timeout,
+            "jitter": self.jitter,
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "total_duration_ms": round(self.total_duration_ms, 3),
+            "last_duration_ms": round(self.last_duration_ms, 3) if self.last_duration_ms is not None else None,
+            "last_started_at": self.last_started_at,
+            "last_error": self.last_error,
+            "next_run_at": self.next_run_at,
+            "running": self.running,
+        }
+
+
+class Scheduler:
+    """Runs registered jobs on their triggers while started"""
+
+    def __init__(self, leader: Optional[LeaderLock] = None):
+        self.leader = leader
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        # Outcome of the last leader check
+        self.leading = False
+
+    def add_job(self, name: str, func: JobFunction, trigger: Trigger, timeout: Optional[float] = None, jitter: float = 0.0) -> Job:
+        """Register a job; ``jitter`` delays each run by up to that many seconds"""
+        if name in self.jobs:
+            raise ValueError(f"Job {name!r} is already registered")
+        job = self.jobs[name] = Job(name=name, func=func, trigger=trigger, timeout=timeout, jitter=jitter)
+        return job
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def is_leader(self) -> bool:
+        """Whether this worker may run jobs now (always true without a leader lock)"""
+        if self.leader is None:
+            self.leading = True
+        else:
+            try:
+                self.leading = self.leader.acquire()
+            except Exception:
+                logger.exception("Leader election failed")
+                self.leading = False
+        return self.leading
+
+    async def start(self) -> None:
+        """Start one task per job"""
+        if self.started:
+            return
+        self._tasks = [asyncio.create_task(self._run_forever(job), name=f"job:{job.name}") for job in self.jobs.values()]
+
+    async def stop(self) -> None:
+        """Cancel every job task and give up leadership"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.leader is not None:
+            self.leader.release()
+        self.leading = False
+
+    async def run_job(self, job: Job) -> None:
+        """Run a job once in a worker thread if this worker is the leader, recording the outcome"""
+        if job.running:
+            # A timed-out run is still going in its thread
+            job.skipped += 1
+            SCHEDULER_JOB_SKIPPED.inc(job.name, "still_running")
+            logger.warning("Skipping job %s: its previous run is still running", job.name)
+            return
+        if not self.is_leader():
+            job.skipped += 1
+            SCHEDULER_JOB_SKIPPED.inc(job.name, "follower")
+            return
+
+        job.running = True
+        job.last_started_at = datetime.now()
+        started = perf_counter()
+        timed_out = False
+        outcome = "success"
+        run = asyncio.get_running_loop().run_in_executor(None, job.func)
+
+        def finished(run: asyncio.Future) -> None:
+            # Called when the thread is done, also after a timeout
+            job.running = False
+            error = run.exception() if not run.cancelled() else None
+            if timed_out:
+                logger.warning("Timed-out run of job %s finished%s", job.name, f" with {type(error).__name__}: {error}" if error else "")
+
+        run.add_done_callback(finished)
+        try:
+            # shield: on timeout stop waiting, but keep the run's future (the thread cannot be stopped)
+            await asyncio.wait_for(asyncio.shield(run), job.timeout)
+            job.last_error = None
+        except asyncio.TimeoutError:
+            timed_out = True
+            outcome = "timeout"
+            job.timeouts += 1
+            job.failures += 1
+            job.last_error = f"Timed out after {job.timeout:g}s"
+            logger.error("Job %s timed out after %ss", job.name, job.timeout)
+        except asyncio.CancelledError:
+            # Scheduler stopped while waiting; the thread itself runs on
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome = "failure"
+            job.failures += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            logger.exception("Job %s failed", job.name)
+        finally:
+            job.runs += 1
+            job.last_duration_ms = (perf_counter() - started) * 1000
+            job.total_duration_ms += job.last_duration_ms
+            SCHEDULER_JOB_RUNS.inc(job.name, outcome)
+            SCHEDULER_JOB_DURATION.observe(job.last_duration_ms / 1000, job.name)
+
+    async def _run_forever(self, job: Job) -> None:
+        previous: Optional[datetime] = None
+        while True:
+            now = datetime.now()
+            job.next_run_at = job.trigger.next_run(previous, now)
+            delay = (job.next_run_at - now).total_seconds() + random.uniform(0, job.jitter)
+            await asyncio.sleep(max(delay, 0))
+            previous = job.next_run_at
+            await self.run_job(job)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Run statistics of every job"""
+        return [job.to_dict() for job in self.jobs.values()]
@@ -0,0 +1,48 @@
+"""
+Startup time breakdown.
+
+The application lifespan times each boot phase (imports, schema setup or
+check, pool warm-up, scheduler) and logs them as one line, so slow boots show
+where the time went.
+"""
+
+import logging
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, List, Tuple
+
+logger = logging.getLogger("app.startup")
+
+
+class StartupTimer:
+    """Durations of named startup phases, in the order they ran"""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds * 1000))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one phase (recorded even if it raises)"""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - started)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(ms for _, ms in self.phases)
+
+    def summary(self) -> str:
+        """One log line: total first, then every phase"""
+        phases = ", ".join(f"{name} {ms:.1f} ms" for name, ms in self.phases)
+        return f"Startup took {self.total_ms:.1f} ms ({phases})"
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "total_ms": round(self.total_ms, 1),
+            "phases": [{"name": name, "ms": round(ms, 1)} for name, ms in self.phases],
+        }
@@ -0,0 +1,67 @@
+"""
+Helpers for processing request bodies as streams.
+
+``iter_lines`` turns the raw body chunks (``request.stream()``) into text lines
+and ``batched`` groups them, so an import only ever holds one chunk and one
+batch in memory regardless of the file size.
+"""
+
+from typing import AsyncIterable, AsyncIterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Longest line accepted before the stream is rejected (bounds the line buffer)
+MAX_LINE_BYTES = 64 * 1024
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes],
+    encoding: str = "utf-8",
+    max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yield ``(line_number, line)`` for every non-blank line of a byte stream.
+
+    Raises ValueError when a line is longer than ``max_line_bytes`` or is not
+    valid text in ``encoding``.
+    """
+    buffer = b""
+    line_number = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_number += 1
+            if len(raw) > max_line_bytes:
+                raise ValueError(f"Line {line_number} is longer than {max_line_bytes} bytes")
+            line = _decode(raw, encoding, line_number)
+            if line.strip():
+                yield line_number, line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Line {line_number + 1} is longer than {max_line_bytes} bytes")
+
+    if buffer:
+        line_number += 1
+        line = _decode(buffer, encoding, line_number)
+        if line.strip():
+            yield line_number, line
+
+
+def _decode(raw: bytes, encoding: str, line_number: int) -> str:
+    try:
+        return raw.decode(encoding).rstrip("\r")
+    except UnicodeDecodeError:
+        raise ValueError(f"Line {line_number} is not valid {encoding}")
+
+
+async def batched(items: AsyncIterable[T], size: int) -> AsyncIterator[List[T]]:
+    """Group an async iterable into lists of at most ``size`` items"""
+    batch: List[T] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
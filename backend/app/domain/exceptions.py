@@ -0,0 +1,20 @@
+from app.domain.enums import InvoiceStatus
+
+
+class DomainError(ValueError):
+    """Base class for business rule violations"""
+    pass
+
+
+class InvoiceNotPayableError(DomainError):
+    """Raised when a payment is recorded for an invoice that cannot take one"""
+
+    def __init__(self, status: InvoiceStatus):
+        self.status = status
+        if status == InvoiceStatus.PAID:
+            message = "Invoice is already paid"
+        elif status == InvoiceStatus.CANCELLED:
+            message = "Cannot pay a cancelled invoice"
+        else:
+            message = f"Cannot pay an invoice with status {status.value}"
+        super().__init__(message)
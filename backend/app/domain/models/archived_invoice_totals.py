@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ArchivedInvoiceTotals:
+    """Totals of settled invoices moved to the cold archive"""
+    paid_count: int = 0
+    paid_amount: float = 0.0
+    cancelled_count: int = 0
+    cancelled_amount: float = 0.0
+
+    def __post_init__(self):
+        """Validate business rules"""
+        if self.paid_count < 0 or self.cancelled_count < 0:
+            raise ValueError("Archived invoice counts cannot be negative")
+
+    @property
+    def invoice_count(self) -> int:
+        return self.paid_count + self.cancelled_count
+
+    @property
+    def total_amount(self) -> float:
+        return self.paid_amount + self.cancelled_amount
@@ -0,0 +1,54 @@
+from typing import Optional
+from datetime import date, datetime
+from dataclasses import dataclass
+from app.domain.enums import InvoiceStatus
+from app.domain.models.invoice import Invoice
+
+
+@dataclass
+class BillingRun:
+    """Pure domain model for a billing run (one invoice per matching student of a school)"""
+    run_id: str
+    school_id: int
+    amount: float
+    tax_amount: float
+    description: str
+    invoice_date: date
+    due_date: date
+    grade_level: Optional[int] = None
+    active_only: bool = True
+    invoice_count: int = 0
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        """Validate business rules"""
+        if not self.run_id.strip():
+            raise ValueError("Run ID cannot be empty")
+        if len(self.run_id) > 100:
+            raise ValueError("Run ID cannot be longer than 100 characters")
+        if not self.description.strip():
+            raise ValueError("Description cannot be empty")
+        if self.grade_level is not None and (self.grade_level < 1 or self.grade_level > 12):
+            raise ValueError("Grade level must be between 1 and 12")
+        # The template has to make a valid invoice
+        self.to_invoice(student_id=0, invoice_number="")
+
+    @property
+    def total_amount(self) -> float:
+        return self.amount + self.tax_amount
+
+    def to_invoice(self, student_id: int, invoice_number: str) -> Invoice:
+        """Build the pending invoice this run generates for one student"""
+        return Invoice(
+            invoice_number=invoice_number,
+            student_id=student_id,
+            school_id=self.school_id,
+            amount=self.amount,
+            tax_amount=self.tax_amount,
+            total_amount=self.total_amount,
+            description=self.description,
+            invoice_date=self.invoice_date,
+            due_date=self.due_date,
+            status=InvoiceStatus.PENDING
+        )
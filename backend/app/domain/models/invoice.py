@@ -2,6 +2,10 @@ from typing import Optional
 from datetime import date, datetime
 from dataclasses import dataclass
 from app.domain.enums import InvoiceStatus, PaymentMethod
+from app.domain.exceptions import InvoiceNotPayableError
+
+# Statuses that cannot take a payment
+NON_PAYABLE_STATUSES = (InvoiceStatus.PAID, InvoiceStatus.CANCELLED)
 
 
 @dataclass
@@ -39,10 +43,8 @@ class Invoice:
 
     def mark_as_paid(self, payment_date: date, payment_method: PaymentMethod, notes: Optional[str] = None) -> None:
         """Mark invoice as paid"""
-        if self.status == InvoiceStatus.PAID:
-            raise ValueError("Invoice is already paid")
-        if self.status == InvoiceStatus.CANCELLED:
-            raise ValueError("Cannot pay a cancelled invoice")
+        if self.status in NON_PAYABLE_STATUSES:
+            raise InvoiceNotPayableError(self.status)
         
         self.status = InvoiceStatus.PAID
         self.payment_date = payment_date
@@ -60,7 +62,9 @@ class Invoice:
             self.notes = reason
 
     def is_overdue(self, current_date: Optional[date] = None) -> bool:
-        """Check if invoice is overdue"""
+        """Check if invoice is overdue (flagged by the overdue sweep, or pending past due and not swept yet)"""
+        if self.status == InvoiceStatus.OVERDUE:
+            return True
         if current_date is None:
             current_date = date.today()
         return self.status == InvoiceStatus.PENDING and self.due_date < current_date
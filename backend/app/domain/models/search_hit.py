@@ -0,0 +1,19 @@
+from typing import Optional
+from dataclasses import dataclass
+
+
+@dataclass
+class SearchHit:
+    """A single ranked match from the unified search"""
+    entity_type: str
+    entity_id: int
+    title: str
+    subtitle: Optional[str] = None
+    score: float = 0.0
+
+    def __post_init__(self):
+        """Validate business rules"""
+        if self.entity_type not in ("student", "school", "invoice"):
+            raise ValueError("Invalid search entity type")
+        if self.score < 0:
+            raise ValueError("Search score cannot be negative")
@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+from app.domain.models.billing_run import BillingRun
+
+
+class BillingRunRepositoryInterface(ABC):
+    """Interface for billing run repository"""
+
+    @abstractmethod
+    async def get_by_run_id(self, run_id: str) -> Optional[BillingRun]:
+        """Get a billing run by its client supplied run ID"""
+        pass
+
+    @abstractmethod
+    async def execute(self, billing_run: BillingRun) -> Tuple[BillingRun, bool]:
+        """
+        Generate the run's invoices in one transaction.
+
+        Returns the stored run and whether it was executed now (False when the
+        run ID had already been executed, in which case nothing is generated).
+        """
+        pass
@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, Optional
+from app.domain.models.archived_invoice_totals import ArchivedInvoiceTotals
+
+
+class InvoiceArchiveRepositoryInterface(ABC):
+    """Interface for the cold archive of settled invoices"""
+
+    @abstractmethod
+    async def get_watermark(self) -> Optional[date]:
+        """Every archived invoice is dated before this day (None while nothing is archived)"""
+        pass
+
+    @abstractmethod
+    async def get_student_totals(self, student_id: int, date_from: date, date_to: date) -> ArchivedInvoiceTotals:
+        """Totals of a student's archived invoices dated within the range"""
+        pass
+
+    @abstractmethod
+    async def get_school_totals_by_student(self, school_id: int, date_from: date, date_to: date) -> Dict[int, ArchivedInvoiceTotals]:
+        """Totals of a school's archived invoices dated within the range, keyed by student ID"""
+        pass
@@ -1,18 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import date
 from app.domain.models.invoice import Invoice
+from app.domain.enums import InvoiceStatus, PaymentMethod
+from app.domain.repositories.page import CountMode, Page
 
 
 class InvoiceRepositoryInterface(ABC):
     """Interface for invoice repository"""
 
     @abstractmethod
-    async def get_all(self, offset: int = 0, limit: int = 10) -> Tuple[List[Invoice], int]:
+    async def get_all(self, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Invoice]:
         """Get all invoices with pagination"""
         pass
 
     @abstractmethod
-    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10) -> Tuple[List[Invoice], int]:
+    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Invoice]:
         """Get invoices with flexible filtering and pagination"""
         pass
 
@@ -21,11 +24,57 @@ class InvoiceRepositoryInterface(ABC):
         """Get invoice by ID"""
         pass
 
+    @abstractmethod
+    async def get_by_ids(self, invoice_ids: Iterable[int]) -> Dict[int, Invoice]:
+        """Get invoices by ID with one query, keyed by ID"""
+        pass
+
     @abstractmethod
     async def create(self, invoice: Invoice) -> Invoice:
         """Create a new invoice"""
         pass
 
+    @abstractmethod
+    async def create_many(self, invoices: List[Invoice]) -> List[int]:
+        """Create many invoices in one transaction, returning their IDs in order"""
+        pass
+
+    @abstractmethod
+    async def get_payment_states(self, invoice_ids: Iterable[int], invoice_numbers: Iterable[str]) -> List[Tuple[int, str, InvoiceStatus]]:
+        """Return (id, invoice_number, status) of the invoices matching any of the IDs or numbers"""
+        pass
+
+    @abstractmethod
+    async def mark_paid_many(self, payments: List[Dict[str, Any]]) -> int:
+        """
+        Mark invoices paid in one transaction.
+
+        Each payment has ``invoice_id``, ``payment_date``, ``payment_method`` and
+        ``notes``. Invoices that are no longer pending or overdue are left alone.
+        Returns the number of invoices updated.
+        """
+        pass
+
+    @abstractmethod
+    async def mark_paid(self, invoice_id: int, payment_date: date, payment_method: PaymentMethod, notes: Optional[str] = None) -> Optional[Invoice]:
+        """
+        Atomically mark an invoice paid.
+
+        Returns None if the invoice does not exist and raises
+        InvoiceNotPayableError if it is already paid or cancelled.
+        """
+        pass
+
+    @abstractmethod
+    async def mark_overdue(self, as_of: date) -> int:
+        """Set pending invoices due before ``as_of`` to overdue and overdue ones due from ``as_of`` on to pending; returns the number updated"""
+        pass
+
+    @abstractmethod
+    async def update_fields(self, invoice_id: int, changes: Dict[str, Any]) -> Optional[Invoice]:
+        """Update only the given fields; returns None if the invoice does not exist, raises ValueError if the result is invalid"""
+        pass
+
     @abstractmethod
     async def update(self, invoice: Invoice) -> Invoice:
         """Update an existing invoice"""
@@ -35,3 +84,13 @@ class InvoiceRepositoryInterface(ABC):
     async def delete(self, invoice_id: int) -> bool:
         """Delete an invoice"""
         pass
+
+    @abstractmethod
+    async def get_projection(self, filters: dict, attributes: Sequence[str], offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Dict[str, Any]]:
+        """Get only the given attributes of filtered invoices, as dicts"""
+        pass
+
+    @abstractmethod
+    async def get_projection_by_id(self, invoice_id: int, attributes: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Get only the given attributes of one invoice"""
+        pass
@@ -0,0 +1,35 @@
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+U = TypeVar('U')
+
+
+class CountMode(str, Enum):
+    """How a paginated query works out the total number of rows"""
+    AUTO = "auto"      # Estimated for large unfiltered tables, cached exact count otherwise
+    EXACT = "exact"    # Separate COUNT(*) query
+    WINDOW = "window"  # COUNT(*) OVER () on the page query itself
+    NONE = "none"      # No total, fetch one extra row to compute has_next
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of results returned by a repository"""
+    items: List[T]
+    total: Optional[int]
+    has_next: bool
+    # Sort key of the last item when there is a next page, for keyset pagination
+    next_key: Optional[Tuple[Any, ...]] = None
+    # True when total is a planner estimate rather than an exact count
+    total_is_estimate: bool = False
+
+    def __post_init__(self):
+        """Validate page data"""
+        if self.total is not None and self.total < 0:
+            raise ValueError("Page total cannot be negative")
+
+    def map(self, function: Callable[[T], U]) -> "Page[U]":
+        """Return a page with every item converted by ``function``"""
+        return replace(self, items=[function(item) for item in self.items])
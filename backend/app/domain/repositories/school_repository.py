@@ -1,18 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, Optional, Sequence, Set
 from app.domain.models.school import School
+from app.domain.repositories.page import CountMode, Page
 
 
 class SchoolRepositoryInterface(ABC):
     """Interface for school repository"""
 
     @abstractmethod
-    async def get_all(self, offset: int = 0, limit: int = 10) -> Tuple[List[School], int]:
+    async def get_all(self, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[School]:
         """Get all schools with pagination"""
         pass
 
     @abstractmethod
-    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10) -> Tuple[List[School], int]:
+    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[School]:
         """Get schools with flexible filtering and pagination"""
         pass
 
@@ -21,11 +22,26 @@ class SchoolRepositoryInterface(ABC):
         """Get school by ID"""
         pass
 
+    @abstractmethod
+    async def get_by_ids(self, school_ids: Iterable[int]) -> Dict[int, School]:
+        """Get schools by ID with one query, keyed by ID"""
+        pass
+
+    @abstractmethod
+    async def get_existing_ids(self, school_ids: Iterable[int]) -> Set[int]:
+        """Return which of the given school IDs exist"""
+        pass
+
     @abstractmethod
     async def create(self, school: School) -> School:
         """Create a new school"""
         pass
 
+    @abstractmethod
+    async def update_fields(self, school_id: int, changes: Dict[str, Any]) -> Optional[School]:
+        """Update only the given fields; returns None if the school does not exist, raises ValueError if the result is invalid"""
+        pass
+
     @abstractmethod
     async def update(self, school: School) -> School:
         """Update an existing school"""
@@ -36,4 +52,12 @@ class SchoolRepositoryInterface(ABC):
         """Delete a school"""
         pass
 
+    @abstractmethod
+    async def get_projection(self, filters: dict, attributes: Sequence[str], offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Dict[str, Any]]:
+        """Get only the given attributes of filtered schools, as dicts"""
+        pass
 
+    @abstractmethod
+    async def get_projection_by_id(self, school_id: int, attributes: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Get only the given attributes of one school"""
+        pass
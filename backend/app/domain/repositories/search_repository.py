@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+from typing import List, Sequence
+from app.domain.models.search_hit import SearchHit
+
+
+class SearchRepositoryInterface(ABC):
+    """Interface for the unified search repository"""
+
+    @abstractmethod
+    async def search(self, term: str, entity_types: Sequence[str], limit: int = 20) -> List[SearchHit]:
+        """Search the given entity types and return hits ranked best first"""
+        pass
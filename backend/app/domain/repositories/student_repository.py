@@ -1,13 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 from app.domain.models.student import Student
+from app.domain.repositories.page import CountMode, Page
 
 
 class StudentRepositoryInterface(ABC):
     """Interface for student repository"""
 
     @abstractmethod
-    async def get_all(self, offset: int = 0, limit: int = 10) -> Tuple[List[Student], int]:
+    async def get_all(self, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Student]:
         """Get all students with pagination"""
         pass
 
@@ -16,11 +17,26 @@ class StudentRepositoryInterface(ABC):
         """Get student by ID"""
         pass
 
+    @abstractmethod
+    async def get_by_ids(self, student_ids: Iterable[int]) -> Dict[int, Student]:
+        """Get students by ID with one query, keyed by ID"""
+        pass
+
     @abstractmethod
     async def create(self, student: Student) -> Student:
         """Create a new student"""
         pass
 
+    @abstractmethod
+    async def create_many(self, students: List[Student]) -> List[int]:
+        """Create many students in one transaction, returning their IDs in order"""
+        pass
+
+    @abstractmethod
+    async def update_fields(self, student_id: int, changes: Dict[str, Any]) -> Optional[Student]:
+        """Update only the given fields; returns None if the student does not exist, raises ValueError if the result is invalid"""
+        pass
+
     @abstractmethod
     async def update(self, student: Student) -> Student:
         """Update an existing student"""
@@ -37,6 +53,26 @@ class StudentRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10) -> Tuple[List[Student], int]:
+    async def count_by_school_ids(self, school_ids: Iterable[int]) -> Dict[int, int]:
+        """Count students for several schools, keyed by school ID"""
+        pass
+
+    @abstractmethod
+    async def get_school_ids(self, student_ids: Iterable[int]) -> Dict[int, int]:
+        """Map the given student IDs that exist to their school ID"""
+        pass
+
+    @abstractmethod
+    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Student]:
         """Get students with flexible filtering and pagination"""
         pass
+
+    @abstractmethod
+    async def get_projection(self, filters: dict, attributes: Sequence[str], offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Dict[str, Any]]:
+        """Get only the given attributes of filtered students, as dicts"""
+        pass
+
+    @abstractmethod
+    async def get_projection_by_id(self, student_id: int, attributes: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Get only the given attributes of one student"""
+        pass
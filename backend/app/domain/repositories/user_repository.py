@@ -3,7 +3,7 @@ User repository interface for domain layer.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Dict, Iterable, List, Optional
 from app.domain.models.user import User
 
 
@@ -19,6 +19,11 @@ class UserRepositoryInterface(ABC):
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
         pass
+
+    @abstractmethod
+    async def get_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        """Get users by ID with one query, keyed by ID."""
+        pass
     
     @abstractmethod
     async def get_by_username(self, username: str) -> Optional[User]:
@@ -0,0 +1 @@
+# Cold storage of settled invoices
@@ -0,0 +1,287 @@
+"""
+Cold archive of settled invoices in compressed Parquet files.
+
+Paid and cancelled invoices dated before the retention horizon are moved out of
+``invoices`` in batches. Each batch is written to zstd-compressed Parquet files
+partitioned by school and year:
+
+    {ARCHIVE_DIR}/invoices/school_id=3/year=2019/part-<run_id>-0000.parquet
+
+and then deleted from the table in the same transaction that records the batch
+in ``invoice_archive_runs``. Files of a batch whose transaction never committed
+are ignored by readers and removed by the next run, so a crash never counts an
+invoice twice. Runs (the nightly job and the CLI) are serialized by a lock, an
+advisory lock on PostgreSQL or a ``flock`` on ``ARCHIVE_DIR/.lock`` otherwise,
+so a run never removes the files of a batch another run is still writing. The highest ``archived_before`` of the recorded runs is the
+watermark: statements whose range starts before it merge in archived totals.
+
+Requires the optional ``pyarrow`` package.
+
+    python -m app.infrastructure.archive.parquet_archive run --retention-years 3
+    python -m app.infrastructure.archive.parquet_archive status
+"""
+
+import argparse
+import fcntl
+import logging
+import os
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, delete, func, select
+from app.domain.enums import InvoiceStatus
+from app.infrastructure.persistence.invoice_archive_run_entity import InvoiceArchiveRunEntity
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.core.cache import invalidate_count_cache
+
+logger = logging.getLogger("app.archive")
+
+# Arbitrary application-wide key, next to the setup lock key
+ARCHIVE_LOCK_KEY = 72_811_029
+
+SETTLED_STATUSES = (InvoiceStatus.PAID, InvoiceStatus.CANCELLED)
+ARCHIVE_TABLE_DIR = "invoices"
+COMPRESSION = "zstd"
+
+
+def require_pyarrow():
+    """Import pyarrow, with an actionable error when the optional dependency is missing"""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("The invoice archive requires pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def archive_schema():
+    """Column types of the archive files (one column per invoice column)"""
+    pa = require_pyarrow()
+    return pa.schema([
+        ("id", pa.int64()),
+        ("invoice_number", pa.string()),
+        ("student_id", pa.int64()),
+        ("school_id", pa.int64()),
+        ("amount", pa.float64()),
+        ("tax_amount", pa.float64()),
+        ("total_amount", pa.float64()),
+        ("description", pa.string()),
+        ("invoice_date", pa.date32()),
+        ("due_date", pa.date32()),
+        ("payment_date", pa.date32()),
+        ("status", pa.string()),
+        ("payment_method", pa.string()),
+        ("notes", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+    ])
+
+
+def archive_horizon(today: date, retention_years: int) -> date:
+    """Invoices dated before this day are archived (whole years, so year partitions are complete)"""
+    return date(today.year - retention_years, 1, 1)
+
+
+def partition_dir(root: Path, school_id: int, year: int) -> Path:
+    return root / ARCHIVE_TABLE_DIR / f"school_id={school_id}" / f"year={year}"
+
+
+def run_id_of(path: Path) -> str:
+    """Run ID encoded in a part file name: part-<run_id>-<n>.parquet"""
+    return path.stem.split("-")[1]
+
+
+def archive_files(root: Path, years: Optional[Iterable[int]] = None, school_ids: Optional[Iterable[int]] = None) -> List[Path]:
+    """Part files, optionally restricted to some years and schools (directory pruning)"""
+    table_dir = root / ARCHIVE_TABLE_DIR
+    if not table_dir.is_dir():
+        return []
+    schools = [table_dir / f"school_id={school_id}" for school_id in school_ids] if school_ids is not None else sorted(table_dir.glob("school_id=*"))
+    files = []
+    for school_dir in schools:
+        year_dirs = [school_dir / f"year={year}" for year in years] if years is not None else sorted(school_dir.glob("year=*"))
+        for year_dir in year_dirs:
+            files.extend(sorted(year_dir.glob("part-*.parquet")))
+    return files
+
+
+@contextmanager
+def archive_lock(engine: Engine, root: Path) -> Iterator[None]:
+    """Hold the archive lock: a session-level advisory lock on PostgreSQL, a flock on ``root/.lock`` otherwise"""
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ARCHIVE_LOCK_KEY}).scalar()
+            if not acquired:
+                logger.info("Waiting for another archive run to finish")
+                connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ARCHIVE_LOCK_KEY})
+            # Commit so the connection does not sit idle in a transaction (the lock is session level)
+            connection.commit()
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ARCHIVE_LOCK_KEY})
+                connection.commit()
+        return
+
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", "a+") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            logger.info("Waiting for another archive run to finish")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def committed_run_ids(session: Session) -> Set[str]:
+    return set(session.exec(select(InvoiceArchiveRunEntity.run_id)).all())
+
+
+@dataclass
+class ArchiveResult:
+    """Outcome of one archive run"""
+    archived_before: date
+    batches: int = 0
+    invoices: int = 0
+    files: int = 0
+    orphans_removed: int = 0
+
+
+class InvoiceArchiver:
+    """Moves settled invoices past the horizon into Parquet files"""
+
+    def __init__(self, session: Session, root: str, batch_size: int = 50_000):
+        self.session = session
+        self.root = Path(root)
+        self.batch_size = batch_size
+
+    def archive(self, before: date) -> ArchiveResult:
+        """
+        Archive every paid or cancelled invoice dated before ``before``, one transaction per batch.
+
+        Waits for a run already in progress (see ``archive_lock``).
+        """
+        require_pyarrow()
+        with archive_lock(self.session.get_bind(), self.root):
+            return self._archive(before)
+
+    def _archive(self, before: date) -> ArchiveResult:
+        result = ArchiveResult(archived_before=before, orphans_removed=self.remove_orphans())
+        while True:
+            statement = (
+                select(InvoiceEntity)
+                .where(InvoiceEntity.status.in_(SETTLED_STATUSES), InvoiceEntity.invoice_date < before)
+                .order_by(InvoiceEntity.id)
+                .limit(self.batch_size)
+            )
+            invoices = self.session.exec(statement).all()
+            if not invoices:
+                break
+            result.files += self._archive_batch(invoices, before)
+            result.batches += 1
+            result.invoices += len(invoices)
+
+        if result.invoices:
+            invalidate_count_cache(InvoiceEntity.__tablename__)
+            logger.info("Archived %d invoices dated before %s in %d files", result.invoices, before, result.files)
+        return result
+
+    def _archive_batch(self, invoices: List[InvoiceEntity], before: date) -> int:
+        run_id = uuid.uuid4().hex
+        written = []
+        try:
+            groups: Dict[Tuple[int, int], List[dict]] = defaultdict(list)
+            for invoice in invoices:
+                groups[(invoice.school_id, invoice.invoice_date.year)].append(self._record(invoice))
+            for (school_id, year), records in groups.items():
+                written.append(self._write(partition_dir(self.root, school_id, year), run_id, len(written), records))
+
+            ids = [invoice.id for invoice in invoices]
+            self.session.exec(delete(InvoiceEntity).where(InvoiceEntity.id.in_(ids)))
+            self.session.add(InvoiceArchiveRunEntity(
+                run_id=run_id,
+                archived_before=before,
+                invoice_count=len(invoices),
+                total_amount=sum(invoice.total_amount for invoice in invoices),
+                file_count=len(written),
+            ))
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            for path in written:
+                path.unlink(missing_ok=True)
+            raise
+        return len(written)
+
+    @staticmethod
+    def _record(invoice: InvoiceEntity) -> dict:
+        record = invoice.model_dump()
+        record["status"] = invoice.status.value
+        record["payment_method"] = invoice.payment_method.value if invoice.payment_method else None
+        return record
+
+    @staticmethod
+    def _write(directory: Path, run_id: str, number: int, records: List[dict]) -> Path:
+        """Write one part file atomically (temporary name, then rename)"""
+        pa = require_pyarrow()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{run_id}-{number:04d}.parquet"
+        temporary = path.with_suffix(".tmp")
+        pa.parquet.write_table(pa.Table.from_pylist(records, schema=archive_schema()), temporary, compression=COMPRESSION)
+        os.replace(temporary, path)
+        return path
+
+    def remove_orphans(self) -> int:
+        """Delete files left by batches whose transaction never committed (call with the archive lock held)"""
+        committed = committed_run_ids(self.session)
+        orphans = [path for path in archive_files(self.root) if run_id_of(path) not in committed]
+        for path in orphans:
+            path.unlink()
+        return len(orphans)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive settled invoices to Parquet files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Archive paid and cancelled invoices past the retention horizon")
+    run.add_argument("--retention-years", type=int, default=None, help="Years kept in the database (default: ARCHIVE_RETENTION_YEARS)")
+    commands.add_parser("status", help="Show the archive watermark and size")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    from app.core.config import settings
+    from app.infrastructure.database.connection import engine
+
+    with Session(engine) as session:
+        if args.command == "run":
+            retention = settings.ARCHIVE_RETENTION_YEARS if args.retention_years is None else args.retention_years
+            archiver = InvoiceArchiver(session, settings.ARCHIVE_DIR, settings.ARCHIVE_BATCH_SIZE)
+            try:
+                result = archiver.archive(archive_horizon(date.today(), retention))
+            except RuntimeError as e:
+                raise SystemExit(str(e))
+            print(f"✅ Archived {result.invoices} invoices dated before {result.archived_before} ({result.files} files)")
+        else:
+            runs, invoices, watermark = session.exec(select(
+                func.count(InvoiceArchiveRunEntity.id),
+                func.coalesce(func.sum(InvoiceArchiveRunEntity.invoice_count), 0),
+                func.max(InvoiceArchiveRunEntity.archived_before),
+            )).one()
+            files = archive_files(Path(settings.ARCHIVE_DIR))
+            size = sum(path.stat().st_size for path in files)
+            print(f"Watermark: {watermark or 'nothing archived'}")
+            print(f"{invoices} invoices in {runs} batches, {len(files)} files, {size / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,54 @@
+"""
+Application engine and sessions.
+
+Pool metrics (and query timing, with QUERY_INSTRUMENTATION) are hooked into the
+engine on import; schema creation, migrations and pool warm-up are exposed for
+the setup and startup code.
+"""
+
+from sqlalchemy import text
 from sqlmodel import create_engine, SQLModel, Session
 from app.core.config import settings
+from app.core.metrics import register_pool_metrics
+from app.infrastructure.database.instrumentation import QueryRecorder
 
 # Create engine
 engine = create_engine(settings.DATABASE_URL, echo=settings.DB_ECHO)
 
+# Per-statement latency and slow query log
+query_recorder = QueryRecorder.from_settings(settings)
+if settings.QUERY_INSTRUMENTATION:
+    query_recorder.install(engine)
+
+# Pool usage, read when metrics are collected
+register_pool_metrics(engine)
+
 
 def create_db_and_tables():
     """Create database tables"""
     SQLModel.metadata.create_all(bind=engine)
 
 
+def run_schema_migrations():
+    """Apply pending versioned migrations and sync indexes declared on entities"""
+    from app.infrastructure.database.migrations import MIGRATIONS, run_migrations
+    return run_migrations(engine, MIGRATIONS)
+
+
+def warm_up_pool(connections: int) -> int:
+    """Open pooled connections ahead of the first requests; returns how many were opened"""
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            opened.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
 def get_session():
     """Dependency to get database session"""
     with Session(engine) as session:
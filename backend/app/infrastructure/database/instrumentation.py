@@ -0,0 +1,225 @@
+"""
+Query instrumentation built on SQLAlchemy engine events.
+
+Every statement executed through the engine is timed. Per-statement latency
+totals are kept in memory, and statements slower than the configured threshold
+are logged, kept in a ring buffer (with a sample of their parameters) and get
+their ``EXPLAIN`` plan captured in the background.
+"""
+
+import logging
+import random
+import re
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.metrics import DB_QUERY_DURATION, query_operation
+
+logger = logging.getLogger("app.db.slow_query")
+
+# Statements whose plan can be captured with a plain EXPLAIN (never EXPLAIN ANALYZE)
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+# Upper bounds that keep the recorder's memory constant
+MAX_TRACKED_STATEMENTS = 500
+MAX_PARAMETERS_LENGTH = 500
+
+# Placeholder lists such as "IN (?, ?, ?)" or "IN (%(id_1)s, %(id_2)s)"
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s)(?:\s*,\s*(?:\?|%\(\w+\)s))*\s*\)")
+
+
+def query_shape(statement: str) -> str:
+    """Normalize a statement so repeated executions of the same query compare equal"""
+    return _PLACEHOLDER_LIST.sub("(...)", " ".join(statement.split()))
+
+
+@dataclass
+class RequestQueryStats:
+    """Queries executed while serving one request"""
+    count: int = 0
+    db_time_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def add(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.db_time_ms += duration_ms
+        self.shapes[query_shape(statement)] += 1
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        """Query shapes executed at least ``threshold`` times (likely N+1), most repeated first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+# Stats of the request being served in the current context, set by QueryBudgetMiddleware
+current_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_request_stats", default=None)
+
+
+@dataclass
+class SlowQuery:
+    """A statement that exceeded the slow query threshold"""
+    recorded_at: datetime
+    statement: str
+    duration_ms: float
+    parameters: Optional[str] = None
+    plan: Optional[List[str]] = None
+    explain_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class StatementStats:
+    """Aggregated latency for one statement text"""
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+
+@dataclass
+class QueryRecorder:
+    """Times statements, aggregates latency and keeps a ring buffer of slow queries"""
+    threshold_ms: float = 200.0
+    log_size: int = 100
+    explain: bool = True
+    param_sample_rate: float = 0.1
+    _slow: Deque[SlowQuery] = field(init=False, repr=False)
+    _stats: Dict[str, StatementStats] = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False)
+    _engine: Optional[Engine] = field(init=False, default=None, repr=False)
+    _executor: Optional[ThreadPoolExecutor] = field(init=False, default=None, repr=False)
+
+    def __post_init__(self):
+        self._slow = deque(maxlen=self.log_size)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings) -> "QueryRecorder":
+        """Build a recorder from application settings"""
+        return cls(
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            log_size=settings.SLOW_QUERY_LOG_SIZE,
+            explain=settings.SLOW_QUERY_EXPLAIN,
+            param_sample_rate=settings.SLOW_QUERY_PARAM_SAMPLE_RATE,
+        )
+
+    def install(self, engine: Engine) -> None:
+        """Attach the recorder to an engine"""
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        duration_ms = (perf_counter() - started) * 1000
+        self.record(statement, parameters, duration_ms, executemany)
+
+    def record(self, statement: str, parameters: Any, duration_ms: float, executemany: bool = False) -> None:
+        """Record one executed statement"""
+        DB_QUERY_DURATION.observe(duration_ms / 1000, query_operation(statement))
+        request_stats = current_request_stats.get()
+        if request_stats is not None:
+            request_stats.add(statement, duration_ms)
+
+        with self._lock:
+            stats = self._stats.get(statement)
+            if stats is None and len(self._stats) < MAX_TRACKED_STATEMENTS:
+                stats = self._stats[statement] = StatementStats()
+            if stats is not None:
+                stats.add(duration_ms)
+
+        if duration_ms < self.threshold_ms:
+            return
+
+        sampled_parameters = None
+        if parameters and random.random() < self.param_sample_rate:
+            sampled_parameters = repr(parameters)[:MAX_PARAMETERS_LENGTH]
+
+        slow_query = SlowQuery(
+            recorded_at=datetime.now(),
+            statement=statement,
+            duration_ms=round(duration_ms, 3),
+            parameters=sampled_parameters,
+        )
+        with self._lock:
+            self._slow.append(slow_query)
+
+        logger.warning(
+            "Slow query (%.1f ms): %s%s",
+            duration_ms,
+            " ".join(statement.split()),
+            f" -- parameters: {sampled_parameters}" if sampled_parameters else "",
+        )
+
+        if self.explain and not executemany and self._engine is not None:
+            if statement.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+                self._explain_executor().submit(self._capture_plan, slow_query, parameters)
+
+    def _explain_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        return self._executor
+
+    def _capture_plan(self, slow_query: SlowQuery, parameters: Any) -> None:
+        """Run EXPLAIN for a slow statement on a raw connection (bypasses engine events)"""
+        prefix = "EXPLAIN QUERY PLAN " if self._engine.dialect.name == "sqlite" else "EXPLAIN "
+        connection = self._engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(prefix + slow_query.statement, parameters or ())
+            slow_query.plan = [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+            cursor.close()
+            connection.rollback()
+        except Exception as e:
+            slow_query.explain_error = str(e)
+        finally:
+            connection.close()
+
+    def wait_for_plans(self) -> None:
+        """Block until pending EXPLAIN captures have finished"""
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def slow_queries(self) -> List[Dict[str, Any]]:
+        """Slow queries, newest first"""
+        with self._lock:
+            return [slow_query.to_dict() for slow_query in reversed(self._slow)]
+
+    def statement_stats(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Statements with the highest total time"""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].total_ms, reverse=True)[:limit]
+            return [
+                {
+                    "statement": statement,
+                    "count": stats.count,
+                    "total_ms": round(stats.total_ms, 3),
+                    "avg_ms": round(stats.total_ms / stats.count, 3),
+                    "max_ms": round(stats.max_ms, 3),
+                }
+                for statement, stats in items
+            ]
+
+    def reset(self) -> int:
+        """Clear the slow query buffer and statement stats"""
+        with self._lock:
+            cleared = len(self._slow)
+            self._slow.clear()
+            self._stats.clear()
+        return cleared
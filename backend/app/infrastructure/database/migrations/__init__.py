@@ -0,0 +1,18 @@
+# Versioned schema migrations
+from app.infrastructure.database.migrations import (
+    v0001_foreign_key_indexes,
+    v0002_text_search_indexes,
+    v0003_invoice_keyset_index,
+    v0004_invoice_number_sequence,
+)
+from app.infrastructure.database.migrations.runner import Migration, run_migrations, sync_declared_indexes
+
+# Register new migrations here, in version order
+MIGRATIONS = [
+    Migration.from_module(v0001_foreign_key_indexes),
+    Migration.from_module(v0002_text_search_indexes),
+    Migration.from_module(v0003_invoice_keyset_index),
+    Migration.from_module(v0004_invoice_number_sequence),
+]
+
+LATEST_VERSION = max(migration.version for migration in MIGRATIONS)
@@ -0,0 +1,119 @@
+"""
+Versioned schema migration runner.
+
+Migrations are plain modules exposing ``VERSION``, ``DESCRIPTION`` and an
+``upgrade(connection)`` function. Applied versions are recorded in the
+``schema_migrations`` table so every migration runs exactly once per database.
+
+Indexes declared on persistence entities (``__table_args__``) are synced after
+the versioned migrations, so an index added to an entity ships with the entity
+change instead of depending on ``SQLModel.metadata.create_all``, which never
+touches tables that already exist.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+from typing import Callable, List, Set
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+# Arbitrary application-wide key used to serialize migrations across workers
+MIGRATION_LOCK_KEY = 72_811_026
+
+CREATE_SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single versioned migration"""
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+    @classmethod
+    def from_module(cls, module: ModuleType) -> "Migration":
+        """Build a migration from a module exposing VERSION, DESCRIPTION and upgrade()"""
+        return cls(version=module.VERSION, description=module.DESCRIPTION, upgrade=module.upgrade)
+
+
+def _acquire_migration_lock(connection: Connection) -> None:
+    """Serialize concurrent migration runs (one per worker on boot)"""
+    if connection.dialect.name == "postgresql":
+        # Released automatically when the surrounding transaction ends
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+def get_applied_versions(connection: Connection) -> Set[int]:
+    """Return the set of migration versions already applied"""
+    connection.execute(text(CREATE_SCHEMA_MIGRATIONS_TABLE))
+    rows = connection.execute(text("SELECT version FROM schema_migrations"))
+    return {row[0] for row in rows}
+
+
+def sync_declared_indexes(connection: Connection) -> List[str]:
+    """
+    Create every index declared in the SQLModel metadata that is missing in the database.
+
+    Returns:
+        Names of the indexes that were created
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=connection, checkfirst=True)
+                created.append(index.name)
+
+    return created
+
+
+def run_migrations(engine: Engine, migrations: List[Migration]) -> List[int]:
+    """
+    Apply pending migrations in version order, then sync declared indexes.
+
+    Everything runs in a single transaction so a failing migration leaves the
+    schema untouched.
+
+    Returns:
+        Versions applied during this run
+    """
+    applied_now = []
+
+    with engine.begin() as connection:
+        _acquire_migration_lock(connection)
+        applied = get_applied_versions(connection)
+
+        for migration in sorted(migrations, key=lambda m: m.version):
+            if migration.version in applied:
+                continue
+            migration.upgrade(connection)
+            connection.execute(
+                text(
+                    "INSERT INTO schema_migrations (version, description, applied_at) "
+                    "VALUES (:version, :description, :applied_at)"
+                ),
+                {
+                    "version": migration.version,
+                    "description": migration.description,
+                    "applied_at": datetime.now(),
+                },
+            )
+            applied_now.append(migration.version)
+
+        sync_declared_indexes(connection)
+
+    return applied_now
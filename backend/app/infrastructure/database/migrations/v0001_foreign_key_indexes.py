@@ -0,0 +1,25 @@
+"""
+Index foreign keys and the composite access paths used by statements and filters.
+
+- students(school_id): student lists per school and per-school student counts
+- invoices(student_id, invoice_date): student account statements
+- invoices(school_id, status, due_date): school statements and status/due date filters
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 1
+DESCRIPTION = "Index foreign keys and statement access paths"
+
+CREATE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_students_school_id ON students (school_id)",
+    "CREATE INDEX IF NOT EXISTS idx_invoices_student_id_invoice_date ON invoices (student_id, invoice_date)",
+    "CREATE INDEX IF NOT EXISTS idx_invoices_school_id_status_due_date ON invoices (school_id, status, due_date)",
+]
+
+
+def upgrade(connection: Connection) -> None:
+    """Create the indexes"""
+    for statement in CREATE_INDEXES:
+        connection.execute(text(statement))
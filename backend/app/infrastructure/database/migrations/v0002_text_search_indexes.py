@@ -0,0 +1,57 @@
+"""
+Substring search indexes for the text filters.
+
+- PostgreSQL: pg_trgm GIN index per searchable column (serves ILIKE '%x%')
+- SQLite: one FTS5 trigram shadow table per entity, synced by triggers
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.infrastructure.search.text_search import SEARCHABLE_COLUMNS, fts_table_name
+
+VERSION = 2
+DESCRIPTION = "Trigram / FTS5 substring search indexes"
+
+
+def _postgresql_statements():
+    yield "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+    for table_name, columns in SEARCHABLE_COLUMNS.items():
+        for column_name in columns:
+            yield (
+                f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{column_name}_trgm "
+                f"ON {table_name} USING gin ({column_name} gin_trgm_ops)"
+            )
+
+
+def _sqlite_statements():
+    for table_name, columns in SEARCHABLE_COLUMNS.items():
+        fts = fts_table_name(table_name)
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{name}" for name in columns)
+        old_values = ", ".join(f"old.{name}" for name in columns)
+        insert_new = f"INSERT INTO {fts} (rowid, {column_list}) VALUES (new.id, {new_values});"
+        delete_old = f"INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});"
+
+        yield (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{column_list}, content='{table_name}', content_rowid='id', tokenize='trigram')"
+        )
+        yield f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN {insert_new} END"
+        yield f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN {delete_old} END"
+        yield f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table_name} BEGIN {delete_old} {insert_new} END"
+        # Index rows that existed before the shadow table
+        yield f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')"
+
+
+def upgrade(connection: Connection) -> None:
+    """Create the search indexes for the current database"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        statements = _postgresql_statements()
+    elif dialect == "sqlite":
+        statements = _sqlite_statements()
+    else:
+        return
+
+    for statement in statements:
+        connection.execute(text(statement))
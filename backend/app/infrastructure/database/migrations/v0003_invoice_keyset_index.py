@@ -0,0 +1,16 @@
+"""
+Index the invoice list sort key.
+
+- invoices(invoice_date, id): ORDER BY and keyset (cursor) pagination of invoice lists
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 3
+DESCRIPTION = "Index invoice list sort key for keyset pagination"
+
+
+def upgrade(connection: Connection) -> None:
+    """Create the index"""
+    connection.execute(text("CREATE INDEX IF NOT EXISTS idx_invoices_invoice_date_id ON invoices (invoice_date, id)"))
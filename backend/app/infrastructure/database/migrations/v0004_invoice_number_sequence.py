@@ -0,0 +1,28 @@
+"""
+Invoice number sequence for generated (billing run) invoices.
+
+- PostgreSQL: a native sequence, read with nextval() inside INSERT ... SELECT
+- SQLite: a counter row in sequence_counters, advanced by a whole block per run
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.infrastructure.persistence.invoice_entity import INVOICE_NUMBER_SEQUENCE
+
+VERSION = 4
+DESCRIPTION = "Invoice number sequence for billing runs"
+
+
+def upgrade(connection: Connection) -> None:
+    """Create the sequence for the current database"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {INVOICE_NUMBER_SEQUENCE}"))
+    elif dialect == "sqlite":
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS sequence_counters ("
+            "name VARCHAR(50) PRIMARY KEY, value INTEGER NOT NULL)"
+        ))
+        connection.execute(text(
+            "INSERT OR IGNORE INTO sequence_counters (name, value) VALUES (:name, 0)"
+        ), {"name": INVOICE_NUMBER_SEQUENCE})
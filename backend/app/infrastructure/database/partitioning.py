@@ -0,0 +1,250 @@
+"""
+Range partitioning of the invoices table by invoice_date (PostgreSQL only).
+
+``convert`` rebuilds ``invoices`` as a table partitioned by ``RANGE
+(invoice_date)`` with one partition per year or month, copying the existing
+rows in a single transaction (the table is locked meanwhile). The primary key
+becomes ``(id, invoice_date)``, as PostgreSQL requires the partition key in
+unique constraints; ids still come from the same sequence. A ``DEFAULT``
+partition catches rows outside every range.
+
+``ensure`` creates the partitions for the next periods ahead of time. It runs
+daily as the ``invoice_partitions`` job and moves any matching rows out of the
+default partition before attaching a new one.
+
+Queries bounded by ``invoice_date`` with plain comparisons (statements, list
+date filters, keyset pages) only touch the partitions in range. Lookups by id
+alone check every partition's primary key index.
+
+    python -m app.infrastructure.database.partitioning status
+    python -m app.infrastructure.database.partitioning convert --interval month
+    python -m app.infrastructure.database.partitioning ensure --ahead 3
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("app.db.partitioning")
+
+PARTITIONED_TABLE = "invoices"
+PARTITION_KEY = "invoice_date"
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+INTERVALS = ("year", "month")
+
+# Partition name prefixes per interval: invoices_y2024, invoices_m2024_01
+_NAME_PREFIXES = {"year": f"{PARTITIONED_TABLE}_y", "month": f"{PARTITIONED_TABLE}_m"}
+
+
+@dataclass(frozen=True)
+class PartitionRange:
+    """One partition: rows with start <= invoice_date < end"""
+    name: str
+    start: date
+    end: date
+
+
+def partition_for(day: date, interval: str) -> PartitionRange:
+    """The partition holding ``day``"""
+    if interval == "year":
+        return PartitionRange(f"{_NAME_PREFIXES['year']}{day.year}", date(day.year, 1, 1), date(day.year + 1, 1, 1))
+    if interval == "month":
+        start = date(day.year, day.month, 1)
+        end = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        return PartitionRange(f"{_NAME_PREFIXES['month']}{day.year}_{day.month:02d}", start, end)
+    raise ValueError(f"Unknown partition interval {interval!r}. Use one of: {', '.join(INTERVALS)}")
+
+
+def partition_ranges(first: date, last: date, interval: str) -> List[PartitionRange]:
+    """Consecutive partitions covering ``first`` through ``last``"""
+    ranges = [partition_for(first, interval)]
+    while ranges[-1].end <= last:
+        ranges.append(partition_for(ranges[-1].end, interval))
+    return ranges
+
+
+def periods_ahead(today: date, ahead: int, interval: str) -> List[PartitionRange]:
+    """The current partition and the next ``ahead`` ones"""
+    ranges = [partition_for(today, interval)]
+    for _ in range(ahead):
+        ranges.append(partition_for(ranges[-1].end, interval))
+    return ranges
+
+
+def detect_interval(partition_names: List[str]) -> Optional[str]:
+    """Interval used by existing partitions, from their names"""
+    for interval, prefix in _NAME_PREFIXES.items():
+        if any(name.startswith(prefix) for name in partition_names):
+            return interval
+    return None
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """Whether the invoices table is partitioned (always false outside PostgreSQL)"""
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": PARTITIONED_TABLE},
+    ).scalar()
+
+
+def list_partitions(connection: Connection) -> List[str]:
+    """Names of the invoices partitions, in name order"""
+    rows = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table) ORDER BY child.relname"
+        ),
+        {"table": PARTITIONED_TABLE},
+    )
+    return [row[0] for row in rows]
+
+
+def _bounds(partition: PartitionRange) -> str:
+    return f"FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+
+
+def create_partition(connection: Connection, partition: PartitionRange, parent: str = PARTITIONED_TABLE) -> None:
+    """
+    Create one partition, moving the rows in its range out of the default partition.
+
+    PostgreSQL refuses to add a partition while the default partition holds rows
+    for its range, so those rows are copied into the new table before attaching it.
+    """
+    has_default = connection.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}).scalar()
+    in_range = f"{PARTITION_KEY} >= '{partition.start.isoformat()}' AND {PARTITION_KEY} < '{partition.end.isoformat()}'"
+    if has_default and connection.execute(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})")).scalar():
+        connection.execute(text(f"CREATE TABLE {partition.name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        connection.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {partition.name} SELECT * FROM moved"
+        ))
+        connection.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {partition.name} FOR VALUES {_bounds(partition)}"))
+    else:
+        connection.execute(text(f"CREATE TABLE {partition.name} PARTITION OF {parent} FOR VALUES {_bounds(partition)}"))
+    logger.info("Created partition %s", partition.name)
+
+
+def ensure_partitions(connection: Connection, ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Create the current and the next ``ahead`` partitions if they are missing.
+
+    Does nothing when the invoices table is not partitioned. Returns the names
+    of the partitions created.
+    """
+    if not is_partitioned(connection):
+        return []
+    existing = list_partitions(connection)
+    interval = detect_interval(existing) or "year"
+    created = []
+    for partition in periods_ahead(today or date.today(), ahead, interval):
+        if partition.name not in existing:
+            create_partition(connection, partition)
+            created.append(partition.name)
+    return created
+
+
+def convert_to_partitioned(connection: Connection, interval: str, ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Rebuild the invoices table as a partitioned table and copy its rows.
+
+    Run inside one transaction. Returns the names of the partitions created.
+    """
+    if connection.dialect.name != "postgresql":
+        raise ValueError("Table partitioning requires PostgreSQL")
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown partition interval {interval!r}. Use one of: {', '.join(INTERVALS)}")
+    if is_partitioned(connection):
+        raise ValueError("The invoices table is already partitioned")
+
+    from app.infrastructure.database.migrations import sync_declared_indexes, v0002_text_search_indexes
+
+    today = today or date.today()
+    staging = f"{PARTITIONED_TABLE}_partitioned"
+    connection.execute(text(f"LOCK TABLE {PARTITIONED_TABLE} IN ACCESS EXCLUSIVE MODE"))
+    first, last = connection.execute(text(f"SELECT min({PARTITION_KEY}), max({PARTITION_KEY}) FROM {PARTITIONED_TABLE}")).one()
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": PARTITIONED_TABLE}).scalar()
+
+    connection.execute(text(
+        f"CREATE TABLE {staging} (LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({PARTITION_KEY})"
+    ))
+    connection.execute(text(f"ALTER TABLE {staging} ADD CONSTRAINT {staging}_pkey PRIMARY KEY (id, {PARTITION_KEY})"))
+    connection.execute(text(f"ALTER TABLE {staging} ADD FOREIGN KEY (student_id) REFERENCES students (id)"))
+    connection.execute(text(f"ALTER TABLE {staging} ADD FOREIGN KEY (school_id) REFERENCES schools (id)"))
+
+    # Partitions from the oldest invoice through the periods ahead, plus the catch-all
+    ranges = periods_ahead(today, ahead, interval)
+    if first is not None:
+        ranges = partition_ranges(min(first, today), max(last, ranges[-1].start), interval)
+    for partition in ranges:
+        create_partition(connection, partition, parent=staging)
+    connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {staging} DEFAULT"))
+
+    connection.execute(text(f"INSERT INTO {staging} SELECT * FROM {PARTITIONED_TABLE}"))
+
+    # Swap the tables, keeping the id sequence
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    connection.execute(text(f"DROP TABLE {PARTITIONED_TABLE}"))
+    connection.execute(text(f"ALTER TABLE {staging} RENAME TO {PARTITIONED_TABLE}"))
+    connection.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} RENAME CONSTRAINT {staging}_pkey TO {PARTITIONED_TABLE}_pkey"))
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {PARTITIONED_TABLE}.id"))
+
+    # Indexes dropped with the old table are recreated on the parent (and so on every partition)
+    sync_declared_indexes(connection)
+    v0002_text_search_indexes.upgrade(connection)
+    connection.execute(text(f"ANALYZE {PARTITIONED_TABLE}"))
+    return [partition.name for partition in ranges]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Range partitioning of the invoices table (PostgreSQL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show whether invoices is partitioned and its partitions")
+    convert = commands.add_parser("convert", help="Rebuild invoices as a partitioned table (locks the table)")
+    convert.add_argument("--interval", choices=INTERVALS, default=None, help="Partition size (default: INVOICE_PARTITION_INTERVAL)")
+    convert.add_argument("--ahead", type=int, default=None, help="Future periods to create (default: INVOICE_PARTITIONS_AHEAD)")
+    ensure = commands.add_parser("ensure", help="Create missing current and future partitions")
+    ensure.add_argument("--ahead", type=int, default=None, help="Future periods to create (default: INVOICE_PARTITIONS_AHEAD)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    from app.core.config import settings
+    from app.infrastructure.database.connection import engine
+    from app.infrastructure.database.migrations.runner import MIGRATION_LOCK_KEY
+
+    ahead = getattr(args, "ahead", None)
+    ahead = settings.INVOICE_PARTITIONS_AHEAD if ahead is None else ahead
+    with engine.begin() as connection:
+        if args.command == "convert":
+            if connection.dialect.name == "postgresql":
+                # Never convert while a worker is migrating
+                connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                created = convert_to_partitioned(connection, args.interval or settings.INVOICE_PARTITION_INTERVAL, ahead)
+            except ValueError as e:
+                raise SystemExit(str(e))
+            print(f"✅ invoices is now partitioned ({len(created)} range partitions + default)")
+        elif args.command == "ensure":
+            created = ensure_partitions(connection, ahead)
+            print(f"✅ Created {len(created)} partitions: {', '.join(created)}" if created else "✅ Partitions up to date")
+        else:
+            if not is_partitioned(connection):
+                print("invoices is not partitioned")
+                return
+            partitions = list_partitions(connection)
+            print(f"invoices is partitioned by {detect_interval(partitions) or 'range'} ({len(partitions)} partitions)")
+            for name in partitions:
+                print(f"  {name}")
+
+
+if __name__ == "__main__":
+    main()
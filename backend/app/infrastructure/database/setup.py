@@ -0,0 +1,116 @@
+"""
+Database setup: tables, versioned migrations, default admin user and sample data.
+
+Run it once per deployment, before starting the workers:
+
+    python -m app.infrastructure.database.setup run
+    python -m app.infrastructure.database.setup verify
+
+``STARTUP_SCHEMA_MODE`` picks what each worker does on boot:
+
+- ``setup`` (default): run the whole setup, serialized across workers by a
+  PostgreSQL advisory lock. Convenient in development.
+- ``verify``: only check that the schema is at the latest migration version and
+  refuse to start otherwise. No DDL, seed probes or password hashing on boot.
+"""
+
+import argparse
+import asyncio
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+from app.core.startup import StartupTimer
+
+# Arbitrary application-wide key; differs from MIGRATION_LOCK_KEY, which run_migrations takes inside
+SETUP_LOCK_KEY = 72_811_028
+
+SETUP_COMMAND = "python -m app.infrastructure.database.setup run"
+
+
+def schema_version(connection: Connection) -> Optional[int]:
+    """Latest applied migration version (None before the first migration)"""
+    if not inspect(connection).has_table("schema_migrations"):
+        return None
+    return connection.execute(text("SELECT max(version) FROM schema_migrations")).scalar()
+
+
+def verify_schema(engine: Engine) -> int:
+    """Raise RuntimeError unless the database is at the latest migration version"""
+    from app.infrastructure.database.migrations import LATEST_VERSION
+
+    with engine.connect() as connection:
+        version = schema_version(connection)
+    if version is None or version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version or 0}, this release needs {LATEST_VERSION}. "
+            f"Run `{SETUP_COMMAND}` first."
+        )
+    return version
+
+
+@contextmanager
+def setup_lock(engine: Engine) -> Iterator[None]:
+    """Hold a session-level advisory lock while setting up (no-op outside PostgreSQL)"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SETUP_LOCK_KEY})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SETUP_LOCK_KEY})
+
+
+async def setup_database(engine: Engine, seed: bool = True, timer: Optional[StartupTimer] = None) -> None:
+    """Create missing tables, apply pending migrations and seed (idempotent)"""
+    from app.infrastructure.database.migrations import MIGRATIONS, run_migrations
+
+    timer = timer or StartupTimer()
+    waiting = perf_counter()
+    with setup_lock(engine):
+        timer.record("setup lock", perf_counter() - waiting)
+        with timer.phase("tables"):
+            SQLModel.metadata.create_all(bind=engine)
+        with timer.phase("migrations"):
+            run_migrations(engine, MIGRATIONS)
+        if seed:
+            from app.infrastructure.database.seed_data import seed_data
+            with timer.phase("seed"):
+                await seed_data()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set up or check the database schema")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Create tables, apply migrations and seed the default data")
+    run.add_argument("--no-seed", action="store_true", help="Skip the admin user and sample data")
+    commands.add_parser("verify", help="Exit with an error unless the schema is at the latest version")
+    args = parser.parse_args()
+
+    from app.infrastructure.database.connection import engine
+    # Register every entity so create_all sees its table
+    from app.infrastructure.persistence.school_entity import SchoolEntity  # noqa: F401
+    from app.infrastructure.persistence.student_entity import StudentEntity  # noqa: F401
+    from app.infrastructure.persistence.invoice_entity import InvoiceEntity  # noqa: F401
+    from app.infrastructure.persistence.user_entity import UserEntity  # noqa: F401
+    from app.infrastructure.persistence.billing_run_entity import BillingRunEntity  # noqa: F401
+    from app.infrastructure.persistence.invoice_archive_run_entity import InvoiceArchiveRunEntity  # noqa: F401
+
+    if args.command == "run":
+        timer = StartupTimer()
+        asyncio.run(setup_database(engine, seed=not args.no_seed, timer=timer))
+        print(f"✅ Database at schema version {verify_schema(engine)}: {timer.summary()}")
+    else:
+        try:
+            version = verify_schema(engine)
+        except RuntimeError as e:
+            raise SystemExit(str(e))
+        print(f"✅ Database at schema version {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+"""
+Synthetic dataset generator for benchmarks and load tests.
+
+Generates N schools with skewed (Zipf) sizes averaging M students each, and K
+invoices per student spread over the last few years. Statuses follow the due
+dates (old invoices are mostly paid, some overdue or cancelled; invoices not yet
+due are mostly pending), paid invoices get a payment date and method, and every
+row satisfies the validation of the domain models. The same seed and ``today``
+always produce the same rows.
+
+Rows are streamed in batches: ``COPY ... FROM STDIN`` on PostgreSQL,
+``executemany`` elsewhere. Ids are assigned by the generator after the current
+maximum of each table, so existing data is kept.
+
+    python -m app.infrastructure.database.synthetic_data --schools 100 \\
+        --students-per-school 1000 --invoices-per-student 100 --seed 42
+"""
+
+import argparse
+import csv
+import io
+import logging
+import random
+from bisect import bisect
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from enum import Enum
+from itertools import accumulate
+from time import perf_counter
+from typing import Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.domain.enums import InvoiceStatus, PaymentMethod
+from app.domain.models.invoice import Invoice
+from app.domain.models.school import School
+from app.domain.models.student import Student
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.persistence.school_entity import SchoolEntity
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.search.text_search import SEARCHABLE_COLUMNS, fts_table_name
+
+logger = logging.getLogger("app.db.synthetic_data")
+
+SCHOOL_COLUMNS = (
+    "id", "name", "address", "city", "state", "zip_code", "phone_number", "email",
+    "principal_name", "established_year", "is_active", "created_at", "updated_at",
+)
+STUDENT_COLUMNS = (
+    "id", "first_name", "last_name", "email", "phone_number", "date_of_birth", "grade_level",
+    "school_id", "enrollment_date", "address", "is_active", "created_at", "updated_at",
+)
+INVOICE_COLUMNS = (
+    "id", "invoice_number", "student_id", "school_id", "amount", "tax_amount", "total_amount",
+    "description", "invoice_date", "due_date", "payment_date", "status", "payment_method",
+    "notes", "created_at", "updated_at",
+)
+
+DATE_COLUMNS = {"date_of_birth", "enrollment_date", "invoice_date", "due_date", "payment_date"}
+
+INVOICE_NUMBER_PREFIX = "SYN-"
+
+FIRST_NAMES = (
+    "Sofia", "Mateo", "Valentina", "Santiago", "Camila", "Sebastian", "Isabella", "Leonardo",
+    "Emma", "Diego", "Lucia", "Daniel", "Mia", "Alejandro", "Olivia", "Nicolas", "Ana", "Lucas",
+    "Elena", "Gabriel", "Maria", "Samuel", "Victoria", "Tomas", "Julia", "Martin", "Sara", "Pablo",
+)
+LAST_NAMES = (
+    "Garcia", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Perez", "Sanchez",
+    "Ramirez", "Torres", "Flores", "Rivera", "Gomez", "Diaz", "Cruz", "Morales", "Reyes", "Ortiz",
+    "Gutierrez", "Chavez", "Ramos", "Ruiz", "Alvarez", "Mendoza", "Castillo", "Jimenez", "Vargas",
+)
+CITIES = (
+    ("Springfield", "IL", "62701"), ("Austin", "TX", "73301"), ("Denver", "CO", "80202"),
+    ("Portland", "OR", "97201"), ("Madison", "WI", "53703"), ("Raleigh", "NC", "27601"),
+    ("Phoenix", "AZ", "85001"), ("Boston", "MA", "02108"), ("Columbus", "OH", "43004"),
+)
+STREETS = ("Main St", "Oak Ave", "Maple Dr", "Cedar Ln", "Elm St", "Pine Rd", "Lakeview Blvd", "Park Ave")
+SCHOOL_KINDS = ("Academy", "Elementary School", "High School", "Preparatory School", "Montessori School")
+
+# Invoice kinds: description, share of invoices, amount relative to the school's tuition
+INVOICE_KINDS = (
+    ("Monthly tuition", 70, 1.0),
+    ("School transport", 10, 0.12),
+    ("Books and materials", 8, 0.25),
+    ("Laboratory fee", 7, 0.15),
+    ("Extracurricular activities", 5, 0.1),
+)
+TAX_RATES = (0.0, 0.0, 0.08, 0.16)
+DUE_DAYS = (15, 30, 30, 30, 45, 60)
+
+# Status weights for invoices already due and not yet due
+PAST_DUE_STATUSES = ((InvoiceStatus.PAID, 85), (InvoiceStatus.OVERDUE, 11), (InvoiceStatus.CANCELLED, 4))
+NOT_DUE_STATUSES = ((InvoiceStatus.PENDING, 78), (InvoiceStatus.PAID, 20), (InvoiceStatus.CANCELLED, 2))
+PAYMENT_METHODS = (
+    (PaymentMethod.BANK_TRANSFER, 45), (PaymentMethod.CREDIT_CARD, 35),
+    (PaymentMethod.CASH, 12), (PaymentMethod.CHECK, 8),
+)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Size and shape of a synthetic dataset"""
+    schools: int = 10
+    students_per_school: int = 100
+    invoices_per_student: int = 12
+    years: int = 3
+    seed: int = 42
+    # Zipf exponent of school sizes: 0 gives equal schools, larger values fewer big schools
+    skew: float = 1.1
+
+    def __post_init__(self):
+        if self.schools < 1 or self.students_per_school < 1:
+            raise ValueError("A dataset needs at least one school and one student per school")
+        if self.invoices_per_student < 0:
+            raise ValueError("Invoices per student cannot be negative")
+        if self.years < 1:
+            raise ValueError("Invoice history must span at least one year")
+        if self.skew < 0:
+            raise ValueError("Skew cannot be negative")
+
+    @property
+    def students(self) -> int:
+        return self.schools * self.students_per_school
+
+    @property
+    def invoices(self) -> int:
+        return self.students * self.invoices_per_student
+
+
+@dataclass
+class LoadResult:
+    """Rows written by one load and how long it took"""
+    schools: int = 0
+    students: int = 0
+    invoices: int = 0
+    seconds: float = 0.0
+    first_ids: Tuple[int, int, int] = field(default=(1, 1, 1))
+
+
+def school_sizes(students: int, schools: int, skew: float) -> List[int]:
+    """Split ``students`` over ``schools`` following Zipf weights (largest first, at least one each)"""
+    weights = [1 / (rank ** skew) for rank in range(1, schools + 1)]
+    spare = students - schools
+    total = sum(weights)
+    shares = [spare * weight / total for weight in weights]
+    sizes = [1 + int(share) for share in shares]
+    # Hand out what rounding down left over, largest remainders first
+    by_remainder = sorted(range(schools), key=lambda index: shares[index] - int(shares[index]), reverse=True)
+    for index in by_remainder[:students - sum(sizes)]:
+        sizes[index] += 1
+    return sizes
+
+
+class DatasetGenerator:
+    """
+    Produces the rows of a synthetic dataset as tuples in the *_COLUMNS order.
+
+    Values are ready for the database: dates and timestamps as ISO strings and
+    enums as their names, as stored by the entities.
+    """
+
+    def __init__(
+        self,
+        spec: DatasetSpec,
+        today: Optional[date] = None,
+        first_ids: Tuple[int, int, int] = (1, 1, 1),
+    ):
+        self.spec = spec
+        self.today = today or date.today()
+        self.first_school_id, self.first_student_id, self.first_invoice_id = first_ids
+        self.history_start = date(self.today.year - spec.years + 1, 1, 1)
+        self.rng = random.Random(spec.seed)
+        self.sizes = school_sizes(spec.students, spec.schools, spec.skew)
+        self._tuition: List[float] = []
+        self._tax_rates: List[float] = []
+        # ISO strings of every day a row can use (enrollments up to 3 years before the history starts)
+        self._first_ordinal = self.history_start.toordinal() - 3 * 366
+        last_ordinal = self.today.toordinal() + max(DUE_DAYS)
+        self._days = [date.fromordinal(ordinal).isoformat() for ordinal in range(self._first_ordinal, last_ordinal + 1)]
+
+    def _timestamp(self, ordinal: int, hour: int) -> str:
+        return f"{self._days[ordinal - self._first_ordinal]} {hour:02d}:00:00.000000"
+
+    def schools(self) -> List[tuple]:
+        """Every school row (generate these before the students)"""
+        rng = self.rng
+        created = self._timestamp(self.history_start.toordinal(), 8)
+        rows = []
+        for index in range(self.spec.schools):
+            school_id = self.first_school_id + index
+            city, state, zip_code = rng.choice(CITIES)
+            self._tuition.append(round(rng.uniform(250, 1500), -1))
+            self._tax_rates.append(rng.choice(TAX_RATES))
+            rows.append((
+                school_id,
+                f"{rng.choice(LAST_NAMES)} {rng.choice(SCHOOL_KINDS)} {school_id}",
+                f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+                city, state, zip_code,
+                f"555-{rng.randint(0, 9999):04d}",
+                f"office{school_id}@school{school_id}.example.edu",
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                rng.randint(1900, self.today.year - 1), True, created, created,
+            ))
+        return rows
+
+    def students(self) -> Iterator[Tuple[tuple, List[tuple]]]:
+        """Each student row with its invoice rows, school by school"""
+        if not self._tuition:
+            raise RuntimeError("Generate the schools before the students")
+        rng = self.rng
+        random_value, randint, uniform = rng.random, rng.randint, rng.uniform
+        days = self._days
+        first = self._first_ordinal
+        today_ordinal = self.today.toordinal()
+        start_ordinal = self.history_start.toordinal()
+        # Per-day timestamps for invoice creation (10:00) and payment (15:00)
+        created_at = [f"{day} 10:00:00.000000" for day in days]
+        paid_at = [f"{day} 15:00:00.000000" for day in days]
+        kinds, kind_cumulative = _cumulative([(kind, weight) for kind, weight, _ in INVOICE_KINDS])
+        kind_factors = {kind: factor for kind, _, factor in INVOICE_KINDS}
+        past_statuses, past_cumulative = _cumulative(PAST_DUE_STATUSES)
+        future_statuses, future_cumulative = _cumulative(NOT_DUE_STATUSES)
+        methods, method_cumulative = _cumulative(PAYMENT_METHODS)
+        paid, count = InvoiceStatus.PAID.name, self.spec.invoices_per_student
+
+        student_id = self.first_student_id
+        invoice_id = self.first_invoice_id
+        for index, size in enumerate(self.sizes):
+            school_id = self.first_school_id + index
+            tuition = self._tuition[index]
+            tax_rate = self._tax_rates[index]
+            for _ in range(size):
+                grade = randint(1, 12)
+                first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                birth = date(self.today.year - grade - 6, randint(1, 12), randint(1, 28)).isoformat()
+                enrolled = start_ordinal - randint(0, 365 * 3)
+                created = self._timestamp(enrolled, 9)
+                student = (
+                    student_id, first_name, last_name,
+                    f"{first_name}.{last_name}.{student_id}@students.example.com".lower(),
+                    f"555-{randint(0, 9999):04d}", birth, grade, school_id, days[enrolled - first],
+                    f"{randint(1, 9999)} {rng.choice(STREETS)}", random_value() > 0.03, created, created,
+                )
+
+                invoices = []
+                for _ in range(count):
+                    description = kinds[bisect(kind_cumulative, random_value())]
+                    invoice_ordinal = randint(start_ordinal, today_ordinal)
+                    due_ordinal = invoice_ordinal + rng.choice(DUE_DAYS)
+                    if due_ordinal < today_ordinal:
+                        status = past_statuses[bisect(past_cumulative, random_value())]
+                    else:
+                        status = future_statuses[bisect(future_cumulative, random_value())]
+                    amount = round(tuition * kind_factors[description] * uniform(0.9, 1.1), 2)
+                    tax_amount = round(amount * tax_rate, 2)
+                    payment_date = payment_method = None
+                    updated = created_at[invoice_ordinal - first]
+                    if status == paid:
+                        paid_ordinal = min(today_ordinal, invoice_ordinal + int(rng.expovariate(1 / 20)))
+                        payment_date = days[paid_ordinal - first]
+                        payment_method = methods[bisect(method_cumulative, random_value())]
+                        updated = paid_at[paid_ordinal - first]
+                    invoices.append((
+                        invoice_id, f"{INVOICE_NUMBER_PREFIX}{invoice_id:09d}", student_id, school_id,
+                        amount, tax_amount, amount + tax_amount, description, days[invoice_ordinal - first],
+                        days[due_ordinal - first], payment_date, status, payment_method,
+                        None, created_at[invoice_ordinal - first], updated,
+                    ))
+                    invoice_id += 1
+                yield student, invoices
+                student_id += 1
+
+
+def _cumulative(weighted) -> Tuple[list, List[float]]:
+    """Values (enum names for enums) and their cumulative probabilities, for bisect"""
+    values = [value.name if isinstance(value, Enum) else value for value, _ in weighted]
+    total = sum(weight for _, weight in weighted)
+    cumulative = list(accumulate(weight / total for _, weight in weighted))
+    cumulative[-1] = 1.0
+    return values, cumulative[:-1]
+
+
+def parse_row(columns: Sequence[str], row: tuple) -> dict:
+    """Generated row as keyword arguments for the domain model or entity (dates and enums parsed)"""
+    values = dict(zip(columns, row))
+    for column in DATE_COLUMNS.intersection(columns):
+        if values[column] is not None:
+            values[column] = date.fromisoformat(values[column])
+    for column in ("created_at", "updated_at"):
+        values[column] = datetime.fromisoformat(values[column])
+    if "status" in values:
+        values["status"] = InvoiceStatus[values["status"]]
+        if values["payment_method"]:
+            values["payment_method"] = PaymentMethod[values["payment_method"]]
+    return values
+
+
+def validate_rows(schools: Sequence[tuple], students: Sequence[tuple], invoices: Sequence[tuple]) -> None:
+    """Build the domain models from generated rows, raising ValueError on the first invalid one"""
+    for row in schools:
+        School(**parse_row(SCHOOL_COLUMNS, row))
+    for row in students:
+        Student(**parse_row(STUDENT_COLUMNS, row))
+    for row in invoices:
+        Invoice(**parse_row(INVOICE_COLUMNS, row))
+
+
+def next_ids(connection: Connection) -> Tuple[int, int, int]:
+    """First free id of the schools, students and invoices tables"""
+    return tuple(
+        connection.execute(select(func.coalesce(func.max(entity.id), 0))).scalar() + 1
+        for entity in (SchoolEntity, StudentEntity, InvoiceEntity)
+    )
+
+
+def _copy(connection: Connection, table: str, columns: Sequence[str], rows: Sequence[tuple]) -> None:
+    """Stream rows through COPY FROM STDIN (CSV; None becomes NULL)"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def write_rows(connection: Connection, table, columns: Sequence[str], rows: Sequence[tuple]) -> None:
+    """Insert a batch of rows with COPY on PostgreSQL and executemany elsewhere"""
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql":
+        _copy(connection, table.name, columns, rows)
+        return
+    placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+    connection.exec_driver_sql(
+        f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})",
+        list(rows),
+    )
+
+
+def drop_search_indexes(connection: Connection) -> None:
+    """
+    Stop maintaining the text search indexes row by row during a bulk load.
+
+    Drops the FTS insert triggers on SQLite and the trigram indexes on
+    PostgreSQL; ``v0002_text_search_indexes.upgrade`` recreates them and indexes
+    every row in one pass.
+    """
+    dialect = connection.dialect.name
+    for table_name, columns in SEARCHABLE_COLUMNS.items():
+        if dialect == "sqlite":
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {fts_table_name(table_name)}_ai"))
+        elif dialect == "postgresql":
+            for column_name in columns:
+                connection.execute(text(f"DROP INDEX IF EXISTS idx_{table_name}_{column_name}_trgm"))
+
+
+def load_dataset(
+    engine: Engine,
+    spec: DatasetSpec,
+    batch_size: int = 100_000,
+    today: Optional[date] = None,
+    validate: bool = False,
+) -> LoadResult:
+    """
+    Generate and insert a dataset in one transaction.
+
+    ``validate`` also builds a domain model from every row (several times slower).
+    """
+    from app.infrastructure.database.migrations import v0002_text_search_indexes
+
+    started = perf_counter()
+    schools_table = SchoolEntity.__table__
+    students_table = StudentEntity.__table__
+    invoices_table = InvoiceEntity.__table__
+    with engine.begin() as connection:
+        result = LoadResult(first_ids=next_ids(connection))
+        drop_search_indexes(connection)
+        generator = DatasetGenerator(spec, today, result.first_ids)
+        schools = generator.schools()
+        if validate:
+            validate_rows(schools, [], [])
+        write_rows(connection, schools_table, SCHOOL_COLUMNS, schools)
+        result.schools = len(schools)
+
+        students: List[tuple] = []
+        invoices: List[tuple] = []
+
+        def flush():
+            # Students first: invoices reference them
+            if validate:
+                validate_rows([], students, invoices)
+            write_rows(connection, students_table, STUDENT_COLUMNS, students)
+            write_rows(connection, invoices_table, INVOICE_COLUMNS, invoices)
+            result.students += len(students)
+            result.invoices += len(invoices)
+            students.clear()
+            invoices.clear()
+            logger.info("%d students, %d invoices written", result.students, result.invoices)
+
+        for student, student_invoices in generator.students():
+            students.append(student)
+            invoices.extend(student_invoices)
+            if len(invoices) >= batch_size or len(students) >= batch_size:
+                flush()
+        flush()
+
+        v0002_text_search_indexes.upgrade(connection)
+        if connection.dialect.name == "postgresql":
+            # Explicit ids bypass the sequences
+            for table in (schools_table, students_table, invoices_table):
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))"
+                ))
+            for table in (schools_table, students_table, invoices_table):
+                connection.execute(text(f"ANALYZE {table.name}"))
+    result.seconds = perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a synthetic dataset for benchmarks")
+    parser.add_argument("--schools", type=int, default=DatasetSpec.schools, help="Schools to generate")
+    parser.add_argument("--students-per-school", type=int, default=DatasetSpec.students_per_school, help="Average students per school")
+    parser.add_argument("--invoices-per-student", type=int, default=DatasetSpec.invoices_per_student, help="Invoices per student")
+    parser.add_argument("--years", type=int, default=DatasetSpec.years, help="Years of invoice history, ending today")
+    parser.add_argument("--skew", type=float, default=DatasetSpec.skew, help="Zipf exponent of school sizes (0: equal sizes)")
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed, help="Random seed")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="Rows per COPY or executemany batch")
+    parser.add_argument("--validate", action="store_true", help="Check every row against the domain models")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    from app.infrastructure.database.connection import create_db_and_tables, engine, run_schema_migrations
+    # Register the remaining entities so their tables are created too
+    from app.infrastructure.persistence.user_entity import UserEntity  # noqa: F401
+    from app.infrastructure.persistence.billing_run_entity import BillingRunEntity  # noqa: F401
+    from app.infrastructure.persistence.invoice_archive_run_entity import InvoiceArchiveRunEntity  # noqa: F401
+
+    try:
+        spec = DatasetSpec(args.schools, args.students_per_school, args.invoices_per_student, args.years, args.seed, args.skew)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    create_db_and_tables()
+    run_schema_migrations()
+    print(f"Generating {spec.schools} schools, {spec.students} students and {spec.invoices} invoices (seed {spec.seed})")
+    result = load_dataset(engine, spec, args.batch_size, validate=args.validate)
+    rate = result.invoices / result.seconds if result.seconds else 0
+    print(f"✅ Loaded {result.invoices} invoices in {result.seconds:.1f}s ({rate:,.0f} invoices/s)")
+
+
+if __name__ == "__main__":
+    main()
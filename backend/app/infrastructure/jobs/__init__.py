@@ -0,0 +1 @@
+# Background jobs run inside the application lifespan
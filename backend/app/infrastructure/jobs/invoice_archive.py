@@ -0,0 +1,26 @@
+"""
+Invoice archive job.
+
+Moves paid and cancelled invoices older than ARCHIVE_RETENTION_YEARS into the
+Parquet archive (see ``app.infrastructure.archive.parquet_archive``).
+"""
+
+from datetime import date
+from typing import Optional
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from app.core.cache import invalidate_cache_pattern
+from app.core.config import settings
+from app.infrastructure.archive.parquet_archive import ArchiveResult, InvoiceArchiver, archive_horizon
+from app.infrastructure.jobs.overdue_sweep import INVOICE_STATUS_CACHES
+
+
+def archive_settled_invoices(engine: Engine, today: Optional[date] = None) -> ArchiveResult:
+    """Run one archive pass up to the retention horizon (blocking: runs in a scheduler thread)"""
+    before = archive_horizon(today or date.today(), settings.ARCHIVE_RETENTION_YEARS)
+    with Session(engine) as session:
+        result = InvoiceArchiver(session, settings.ARCHIVE_DIR, settings.ARCHIVE_BATCH_SIZE).archive(before)
+    if result.invoices:
+        for pattern in INVOICE_STATUS_CACHES:
+            invalidate_cache_pattern(pattern)
+    return result
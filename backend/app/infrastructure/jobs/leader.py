@@ -0,0 +1,111 @@
+"""
+Leader election for the job scheduler.
+
+On PostgreSQL the leader holds a session-level advisory lock on a dedicated
+connection; on SQLite (single host) it holds an exclusive ``flock`` on a lock
+file. Either lock is released by the database or the OS when the worker dies,
+so another worker takes over.
+"""
+
+import fcntl
+import logging
+import os
+from typing import IO, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from app.core.scheduler import LeaderLock
+
+logger = logging.getLogger("app.scheduler")
+
+# Arbitrary application-wide key, next to the migration lock key
+SCHEDULER_LOCK_KEY = 72_811_027
+
+
+class AdvisoryLeaderLock:
+    """Leadership through pg_try_advisory_lock held on its own connection"""
+
+    def __init__(self, engine: Engine, key: int = SCHEDULER_LOCK_KEY):
+        self.engine = engine
+        self.key = key
+        self._connection: Optional[Connection] = None
+
+    def acquire(self) -> bool:
+        if self._connection is not None:
+            try:
+                # Still leader as long as the connection holding the lock is alive
+                self._connection.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                logger.warning("Lost the scheduler leader connection")
+                self._discard()
+
+        connection = self.engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            # Commit so the connection does not sit idle in a transaction (the lock is session level)
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        logger.info("Became scheduler leader (advisory lock %s)", self.key)
+        return True
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+        except Exception:
+            logger.warning("Could not release the scheduler advisory lock")
+        self._discard()
+
+    def _discard(self) -> None:
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+
+class FileLeaderLock:
+    """Leadership through an exclusive non-blocking flock on a lock file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[IO[str]] = None
+
+    def acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        logger.info("Became scheduler leader (lock file %s)", self.path)
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def create_leader_lock(engine: Engine, lock_file: str) -> LeaderLock:
+    """Advisory lock on PostgreSQL, file lock otherwise"""
+    if engine.dialect.name == "postgresql":
+        return AdvisoryLeaderLock(engine)
+    return FileLeaderLock(lock_file)
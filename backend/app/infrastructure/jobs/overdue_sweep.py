@@ -0,0 +1,46 @@
+"""
+Overdue sweep.
+
+Pending invoices whose due date has passed are flipped to ``OVERDUE`` with one
+set-based UPDATE, so overdue invoices can be queried directly through the
+``(status, due_date)`` index instead of loading every pending invoice and
+comparing due dates in Python. Overdue invoices whose due date has since been
+extended go back to ``PENDING`` in the same sweep.
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Optional
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from app.application.services.invoice_service import InvoiceService
+from app.core.cache import invalidate_cache_pattern
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+
+logger = logging.getLogger("app.jobs.overdue_sweep")
+
+# Cached responses that show invoice statuses
+INVOICE_STATUS_CACHES = (
+    "api:get_invoices",
+    "api:get_invoice",
+    "api:search",
+    "api:get_student_account_statement",
+    "api:get_school_account_statement",
+)
+
+
+def sweep_overdue_invoices(engine: Engine, as_of: Optional[date] = None) -> int:
+    """
+    Run one sweep; returns the number of invoices whose status changed.
+
+    Blocking: runs in a scheduler thread, with its own event loop for the async
+    service call.
+    """
+    with Session(engine) as session:
+        updated = asyncio.run(InvoiceService(InvoiceRepository(session)).mark_overdue_invoices(as_of))
+    if updated:
+        for pattern in INVOICE_STATUS_CACHES:
+            invalidate_cache_pattern(pattern)
+        logger.info("Updated the overdue status of %d invoices", updated)
+    return updated
@@ -0,0 +1,53 @@
+"""
+The application's job scheduler and the jobs registered on it.
+
+Started and stopped by the application lifespan; every worker runs it and the
+leader lock picks the one that executes the jobs.
+"""
+
+from app.core.config import settings
+from app.core.scheduler import CronTrigger, IntervalTrigger, Scheduler
+from app.infrastructure.database.connection import engine
+from app.infrastructure.jobs.leader import create_leader_lock
+from app.infrastructure.jobs.overdue_sweep import sweep_overdue_invoices
+from app.infrastructure.jobs.invoice_archive import archive_settled_invoices
+from app.infrastructure.database.partitioning import ensure_partitions
+
+
+def build_scheduler() -> Scheduler:
+    """Create the scheduler with every enabled job"""
+    scheduler = Scheduler(leader=create_leader_lock(engine, settings.SCHEDULER_LOCK_FILE))
+    if settings.OVERDUE_SWEEP_INTERVAL_SECONDS > 0:
+        scheduler.add_job(
+            "overdue_sweep",
+            lambda: sweep_overdue_invoices(engine),
+            IntervalTrigger(settings.OVERDUE_SWEEP_INTERVAL_SECONDS),
+            timeout=settings.OVERDUE_SWEEP_TIMEOUT_SECONDS,
+            jitter=settings.SCHEDULER_JITTER_SECONDS,
+        )
+    if engine.dialect.name == "postgresql":
+        scheduler.add_job(
+            "invoice_partitions",
+            create_future_partitions,
+            CronTrigger("15 2 * * *"),
+            timeout=600,
+            jitter=settings.SCHEDULER_JITTER_SECONDS,
+        )
+    if settings.ARCHIVE_ENABLED:
+        scheduler.add_job(
+            "invoice_archive",
+            lambda: archive_settled_invoices(engine),
+            CronTrigger("30 3 * * *"),
+            timeout=3600,
+            jitter=settings.SCHEDULER_JITTER_SECONDS,
+        )
+    return scheduler
+
+
+def create_future_partitions() -> None:
+    """Keep INVOICE_PARTITIONS_AHEAD future invoice partitions created (no-op while unpartitioned)"""
+    with engine.begin() as connection:
+        ensure_partitions(connection, settings.INVOICE_PARTITIONS_AHEAD)
+
+
+scheduler = build_scheduler()
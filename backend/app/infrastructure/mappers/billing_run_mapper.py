@@ -0,0 +1,47 @@
+from app.domain.models.billing_run import BillingRun
+from app.infrastructure.persistence.billing_run_entity import BillingRunEntity
+
+
+class BillingRunMapper:
+    """Mapper between BillingRun domain model and BillingRunEntity persistence model"""
+
+    @staticmethod
+    def to_domain(entity: BillingRunEntity) -> BillingRun:
+        """Convert BillingRunEntity to BillingRun domain model"""
+        return BillingRun(
+            id=entity.id,
+            run_id=entity.run_id,
+            school_id=entity.school_id,
+            grade_level=entity.grade_level,
+            active_only=entity.active_only,
+            amount=entity.amount,
+            tax_amount=entity.tax_amount,
+            description=entity.description,
+            invoice_date=entity.invoice_date,
+            due_date=entity.due_date,
+            invoice_count=entity.invoice_count,
+            created_at=entity.created_at
+        )
+
+    @staticmethod
+    def to_entity(domain: BillingRun) -> BillingRunEntity:
+        """Convert BillingRun domain model to BillingRunEntity"""
+        entity = BillingRunEntity(
+            run_id=domain.run_id,
+            school_id=domain.school_id,
+            grade_level=domain.grade_level,
+            active_only=domain.active_only,
+            amount=domain.amount,
+            tax_amount=domain.tax_amount,
+            description=domain.description,
+            invoice_date=domain.invoice_date,
+            due_date=domain.due_date,
+            invoice_count=domain.invoice_count
+        )
+        
+        if domain.id is not None:
+            entity.id = domain.id
+        if domain.created_at is not None:
+            entity.created_at = domain.created_at
+            
+        return entity
@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import date, datetime
+
+
+class BillingRunEntity(SQLModel, table=True):
+    """Billing run persistence entity, one row per executed run ID"""
+    
+    __tablename__ = "billing_runs" # type: ignore
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: str = Field(max_length=100, unique=True)
+    school_id: int = Field(foreign_key="schools.id", index=True)
+    grade_level: Optional[int] = None
+    active_only: bool = True
+    amount: float
+    tax_amount: float
+    description: str
+    invoice_date: date
+    due_date: date
+    invoice_count: int = 0
+    created_at: datetime = Field(default_factory=datetime.now)
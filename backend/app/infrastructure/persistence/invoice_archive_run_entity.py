@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import date, datetime
+
+
+class InvoiceArchiveRunEntity(SQLModel, table=True):
+    """One committed batch of invoices moved to the cold archive"""
+    
+    __tablename__ = "invoice_archive_runs" # type: ignore
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: str = Field(max_length=32, unique=True)
+    archived_before: date
+    invoice_count: int = 0
+    total_amount: float = 0.0
+    file_count: int = 0
+    created_at: datetime = Field(default_factory=datetime.now)
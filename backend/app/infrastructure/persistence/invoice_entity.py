@@ -1,4 +1,4 @@
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Index
 from typing import Optional, TYPE_CHECKING
 from datetime import date, datetime
 from app.domain.enums import InvoiceStatus, PaymentMethod
@@ -7,6 +7,9 @@ if TYPE_CHECKING:
     from .student_entity import StudentEntity
     from .school_entity import SchoolEntity
 
+# Numbers the invoices generated by billing runs (a counter row in sequence_counters on SQLite)
+INVOICE_NUMBER_SEQUENCE = "invoice_number_seq"
+
 
 class InvoiceBase(SQLModel):
     """Base invoice entity with common fields"""
@@ -29,6 +32,12 @@ class InvoiceEntity(InvoiceBase, table=True):
     """Invoice persistence entity"""
     
     __tablename__ = "invoices" # type: ignore
+    __table_args__ = (
+        Index("idx_invoices_student_id_invoice_date", "student_id", "invoice_date"),
+        Index("idx_invoices_school_id_status_due_date", "school_id", "status", "due_date"),
+        Index("idx_invoices_invoice_date_id", "invoice_date", "id"),
+        Index("idx_invoices_status_due_date", "status", "due_date"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
@@ -1,4 +1,4 @@
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, date
 
@@ -25,6 +25,9 @@ class StudentEntity(StudentBase, table=True):
     """Student persistence entity"""
     
     __tablename__ = "students" # type: ignore
+    __table_args__ = (
+        Index("idx_students_school_id", "school_id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import Integer, Sequence, String, cast, func, insert, literal, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from app.domain.enums import InvoiceStatus
+from app.domain.models.billing_run import BillingRun
+from app.domain.repositories.billing_run_repository import BillingRunRepositoryInterface
+from app.infrastructure.persistence.billing_run_entity import BillingRunEntity
+from app.infrastructure.persistence.invoice_entity import INVOICE_NUMBER_SEQUENCE, InvoiceEntity
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.mappers.billing_run_mapper import BillingRunMapper
+from app.core.cache import invalidate_count_cache
+
+INVOICE_NUMBER_PREFIX = "INV-"
+INVOICE_NUMBER_DIGITS = 8
+
+# Reserves a block of numbers on SQLite, returning the last number used before it
+RESERVE_SQLITE_BLOCK = text(
+    "UPDATE sequence_counters SET value = value + :size WHERE name = :name RETURNING value - :size"
+)
+
+
+class BillingRunRepository(BillingRunRepositoryInterface):
+    """Implementation of billing run repository"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def get_by_run_id(self, run_id: str) -> Optional[BillingRun]:
+        """Get a billing run by its client supplied run ID"""
+        statement = select(BillingRunEntity).where(BillingRunEntity.run_id == run_id)
+        entity = self.session.exec(statement).scalars().first()
+        return BillingRunMapper.to_domain(entity) if entity else None
+
+    async def execute(self, billing_run: BillingRun) -> Tuple[BillingRun, bool]:
+        """Record the run and generate its invoices with one INSERT ... SELECT, in one transaction"""
+        existing = await self.get_by_run_id(billing_run.run_id)
+        if existing:
+            return existing, False
+
+        # Claim the run ID first: a concurrent run with the same ID fails on the unique constraint
+        entity = BillingRunMapper.to_entity(billing_run)
+        self.session.add(entity)
+        try:
+            self.session.flush()
+        except IntegrityError:
+            self.session.rollback()
+            return await self.get_by_run_id(billing_run.run_id), False
+
+        conditions = [StudentEntity.school_id == billing_run.school_id]
+        if billing_run.active_only:
+            conditions.append(StudentEntity.is_active == True)
+        if billing_run.grade_level is not None:
+            conditions.append(StudentEntity.grade_level == billing_run.grade_level)
+
+        now = datetime.now()
+        status_type = InvoiceEntity.__table__.c.status.type
+        template = {
+            "invoice_number": self._invoice_numbers(conditions),
+            "student_id": StudentEntity.id,
+            "school_id": StudentEntity.school_id,
+            "amount": literal(billing_run.amount),
+            "tax_amount": literal(billing_run.tax_amount),
+            "total_amount": literal(billing_run.total_amount),
+            "description": literal(billing_run.description),
+            "invoice_date": literal(billing_run.invoice_date),
+            "due_date": literal(billing_run.due_date),
+            "status": literal(InvoiceStatus.PENDING, status_type),
+            "created_at": literal(now),
+            "updated_at": literal(now),
+        }
+        students = select(*template.values()).where(*conditions).order_by(StudentEntity.id)
+        result = self.session.exec(insert(InvoiceEntity).from_select(list(template), students))
+
+        entity.invoice_count = result.rowcount
+        self.session.commit()
+        invalidate_count_cache(InvoiceEntity.__tablename__)
+        self.session.refresh(entity)
+        return BillingRunMapper.to_domain(entity), True
+
+    def _invoice_numbers(self, conditions):
+        """Column expression producing one sequence-generated invoice number per student row"""
+        if self.session.get_bind().dialect.name == "postgresql":
+            number = Sequence(INVOICE_NUMBER_SEQUENCE).next_value()
+            return literal(INVOICE_NUMBER_PREFIX) + func.lpad(cast(number, String), INVOICE_NUMBER_DIGITS, "0")
+
+        # SQLite has no sequences: reserve a block sized to the matching students (the run's
+        # insert already holds the write lock) and number the rows inside it
+        size = self.session.exec(select(func.count()).select_from(StudentEntity).where(*conditions)).scalar_one()
+        start = self.session.exec(RESERVE_SQLITE_BLOCK, params={"size": size, "name": INVOICE_NUMBER_SEQUENCE}).scalar_one()
+        number = literal(start, Integer) + func.row_number().over(order_by=StudentEntity.id)
+        return literal(INVOICE_NUMBER_PREFIX) + func.printf(f"%0{INVOICE_NUMBER_DIGITS}d", number)
@@ -0,0 +1,69 @@
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlmodel import Session, func, select
+from app.domain.enums import InvoiceStatus
+from app.domain.models.archived_invoice_totals import ArchivedInvoiceTotals
+from app.domain.repositories.invoice_archive_repository import InvoiceArchiveRepositoryInterface
+from app.infrastructure.archive.parquet_archive import archive_files, committed_run_ids, require_pyarrow, run_id_of
+from app.infrastructure.persistence.invoice_archive_run_entity import InvoiceArchiveRunEntity
+
+
+class InvoiceArchiveRepository(InvoiceArchiveRepositoryInterface):
+    """Reads archived invoice totals from the Parquet archive"""
+
+    def __init__(self, session: Session, root: str):
+        self.session = session
+        self.root = Path(root)
+
+    async def get_watermark(self) -> Optional[date]:
+        """Highest horizon any committed archive run used"""
+        return self.session.exec(select(func.max(InvoiceArchiveRunEntity.archived_before))).one()
+
+    async def get_student_totals(self, student_id: int, date_from: date, date_to: date) -> ArchivedInvoiceTotals:
+        """Totals of a student's archived invoices (every school's files for the years in range)"""
+        totals = self._totals_by_student(date_from, date_to, student_id=student_id)
+        return totals.get(student_id, ArchivedInvoiceTotals())
+
+    async def get_school_totals_by_student(self, school_id: int, date_from: date, date_to: date) -> Dict[int, ArchivedInvoiceTotals]:
+        """Totals of a school's archived invoices per student (only that school's files)"""
+        return self._totals_by_student(date_from, date_to, school_id=school_id)
+
+    def _totals_by_student(
+        self, date_from: date, date_to: date, student_id: Optional[int] = None, school_id: Optional[int] = None
+    ) -> Dict[int, ArchivedInvoiceTotals]:
+        files = self._committed_files(date_from, date_to, school_id)
+        if not files:
+            return {}
+
+        pyarrow = require_pyarrow()
+        field = pyarrow.dataset.field
+        condition = (field("invoice_date") >= date_from) & (field("invoice_date") <= date_to)
+        if student_id is not None:
+            condition &= field("student_id") == student_id
+        if school_id is not None:
+            condition &= field("school_id") == school_id
+        table = pyarrow.dataset.dataset([str(path) for path in files], format="parquet").to_table(
+            columns=["student_id", "status", "total_amount"], filter=condition
+        )
+        grouped = table.group_by(["student_id", "status"]).aggregate([("total_amount", "sum"), ("total_amount", "count")])
+
+        totals: Dict[int, ArchivedInvoiceTotals] = {}
+        for row in grouped.to_pylist():
+            student_totals = totals.setdefault(row["student_id"], ArchivedInvoiceTotals())
+            if row["status"] == InvoiceStatus.PAID.value:
+                student_totals.paid_count += row["total_amount_count"]
+                student_totals.paid_amount += row["total_amount_sum"]
+            else:
+                student_totals.cancelled_count += row["total_amount_count"]
+                student_totals.cancelled_amount += row["total_amount_sum"]
+        return totals
+
+    def _committed_files(self, date_from: date, date_to: date, school_id: Optional[int]) -> List[Path]:
+        """Part files of committed runs for the years in range"""
+        years = range(date_from.year, date_to.year + 1)
+        files = archive_files(self.root, years, [school_id] if school_id is not None else None)
+        if not files:
+            return []
+        committed = committed_run_ids(self.session)
+        return [path for path in files if run_id_of(path) in committed]
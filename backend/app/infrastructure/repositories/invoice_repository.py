@@ -1,45 +1,238 @@
-from typing import List, Optional, Tuple
-from sqlmodel import Session, func, select, col
-from datetime import datetime
-from app.domain.models.invoice import Invoice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, case, func, insert, literal, or_, select, update
+from sqlmodel import Session
+from datetime import date, datetime
+from app.domain.models.invoice import Invoice, NON_PAYABLE_STATUSES
+from app.domain.enums import InvoiceStatus, PaymentMethod
+from app.domain.exceptions import InvoiceNotPayableError
+from app.domain.repositories.page import CountMode, Page
 from app.domain.repositories.invoice_repository import InvoiceRepositoryInterface
 from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.search.text_search import get_text_search
 from app.infrastructure.mappers.invoice_mapper import InvoiceMapper
+from app.core.cache import invalidate_count_cache
+from app.infrastructure.repositories.pagination import fetch_page
+from app.infrastructure.repositories.loaders import get_loader
+from app.infrastructure.repositories.updates import reject_required_nulls
+from app.core.dataloader import DataLoader
 
 
 class InvoiceRepository(InvoiceRepositoryInterface):
     """Implementation of invoice repository"""
 
+    # List order, unique last column so keyset pagination is stable
+    SORT_KEY = (InvoiceEntity.invoice_date, InvoiceEntity.id)
+
     def __init__(self, session: Session):
         self.session = session
+        self.text_search = get_text_search(session.get_bind().dialect.name)
 
-    async def get_all(self, offset: int = 0, limit: int = 10) -> Tuple[List[Invoice], int]:
+    async def get_all(self, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Invoice]:
         """Get all invoices with pagination"""
-        # Get total count
-        count_statement = select(func.count()).select_from(InvoiceEntity)
-        total = self.session.exec(count_statement).one()
-        
-        # Get paginated results
-        statement = select(InvoiceEntity).offset(offset).limit(limit)
-        result = self.session.exec(statement)
-        entities = list(result.all())
+        page = fetch_page(self.session, InvoiceEntity, [], offset, limit, count_mode, self.SORT_KEY, after)
         
         # Convert to domain models
-        invoices = [InvoiceMapper.to_domain(entity) for entity in entities]
-        return invoices, total
+        return page.map(InvoiceMapper.to_domain)
 
     async def get_by_id(self, invoice_id: int) -> Optional[Invoice]:
-        """Get invoice by ID"""
-        entity = self.session.get(InvoiceEntity, invoice_id)
-        return InvoiceMapper.to_domain(entity) if entity else None
+        """Get invoice by ID (batched with the other lookups of the same tick, memoized per request)"""
+        return await self._loader().load(invoice_id)
+
+    async def get_by_ids(self, invoice_ids: Iterable[int]) -> Dict[int, Invoice]:
+        """Get invoices by ID with one query, keyed by ID (missing IDs are left out)"""
+        invoice_ids = set(invoice_ids)
+        if not invoice_ids:
+            return {}
+        entities = self.session.exec(select(InvoiceEntity).where(InvoiceEntity.id.in_(invoice_ids))).scalars().all()
+        return {entity.id: InvoiceMapper.to_domain(entity) for entity in entities}
+
+    def _loader(self) -> DataLoader[int, Invoice]:
+        return get_loader(self.session, InvoiceEntity.__tablename__, self.get_by_ids)
 
     async def create(self, invoice: Invoice) -> Invoice:
-        """Create a new invoice"""
-        entity = InvoiceMapper.to_entity(invoice)
-        self.session.add(entity)
+        """Create a new invoice with one INSERT ... RETURNING"""
+        values = InvoiceMapper.to_entity(invoice).model_dump(exclude={"id"})
+        entity = self.session.exec(insert(InvoiceEntity).values(**values).returning(InvoiceEntity)).scalar_one()
+        # Map before committing: the commit expires the entity
+        created = InvoiceMapper.to_domain(entity)
         self.session.commit()
-        self.session.refresh(entity)
-        return InvoiceMapper.to_domain(entity)
+        invalidate_count_cache(InvoiceEntity.__tablename__)
+        self._loader().prime(created.id, created)
+        return created
+
+    async def mark_paid(self, invoice_id: int, payment_date: date, payment_method: PaymentMethod, notes: Optional[str] = None) -> Optional[Invoice]:
+        """
+        Mark an invoice paid with one conditional UPDATE ... RETURNING.
+
+        The status check runs inside the UPDATE, so concurrent payments for the
+        same invoice cannot both succeed. Only when no row was updated is the
+        status read to tell a missing invoice from one that cannot be paid.
+        """
+        values = {
+            "status": InvoiceStatus.PAID,
+            "payment_date": payment_date,
+            "payment_method": payment_method,
+            "updated_at": datetime.now()
+        }
+        if notes:
+            values["notes"] = notes
+        
+        statement = (
+            update(InvoiceEntity)
+            .where(InvoiceEntity.id == invoice_id, InvoiceEntity.status.notin_(NON_PAYABLE_STATUSES))
+            .values(**values)
+            .returning(InvoiceEntity)
+        )
+        entity = self.session.exec(statement).scalar_one_or_none()
+        if entity is None:
+            self.session.rollback()
+            status = self.session.exec(select(InvoiceEntity.status).where(InvoiceEntity.id == invoice_id)).scalar_one_or_none()
+            if status is None:
+                return None
+            raise InvoiceNotPayableError(status)
+        
+        paid = InvoiceMapper.to_domain(entity)
+        self.session.commit()
+        invalidate_count_cache(InvoiceEntity.__tablename__)
+        self._loader().prime(invoice_id, paid)
+        return paid
+
+    async def update_fields(self, invoice_id: int, changes: Dict[str, Any]) -> Optional[Invoice]:
+        """
+        Apply a partial update with one UPDATE ... RETURNING.
+
+        Only the given columns are written. The returned row goes through the
+        domain model and the update is rolled back if it breaks an invariant.
+        Moving the due date of an overdue invoice to today or later sets it back
+        to pending in the same UPDATE, unless the status is part of the change.
+        Raises ValueError for an explicit null in a required column.
+        """
+        reject_required_nulls(InvoiceEntity, changes)
+        
+        if "status" not in changes and changes.get("due_date") is not None and changes["due_date"] >= date.today():
+            changes = dict(changes, status=case(
+                (InvoiceEntity.status == InvoiceStatus.OVERDUE, literal(InvoiceStatus.PENDING, InvoiceEntity.status.type)),
+                else_=InvoiceEntity.status,
+            ))
+        
+        # Keep the total consistent in SQL, against the row's current values
+        if "amount" in changes or "tax_amount" in changes:
+            changes = dict(
+                changes,
+                total_amount=changes.get("amount", InvoiceEntity.amount) + changes.get("tax_amount", InvoiceEntity.tax_amount)
+            )
+        
+        statement = (
+            update(InvoiceEntity)
+            .where(InvoiceEntity.id == invoice_id)
+            .values(**changes, updated_at=datetime.now())
+            .returning(InvoiceEntity)
+        )
+        entity = self.session.exec(statement).scalar_one_or_none()
+        if entity is None:
+            self.session.rollback()
+            return None
+        
+        try:
+            updated = InvoiceMapper.to_domain(entity)
+        except ValueError:
+            self.session.rollback()
+            raise
+        self.session.commit()
+        invalidate_count_cache(InvoiceEntity.__tablename__)
+        self._loader().prime(invoice_id, updated)
+        return updated
+
+    async def create_many(self, invoices: List[Invoice]) -> List[int]:
+        """Create many invoices in one transaction, returning their IDs in order"""
+        if not invoices:
+            return []
+        
+        # Batched multi-row INSERT ... RETURNING (executemany), one commit for the whole batch.
+        # Generated IDs ascend in VALUES order, so sorting restores the input order without
+        # sort_by_parameter_order (which makes SQLite fall back to one INSERT per row).
+        rows = [InvoiceMapper.to_entity(invoice).model_dump(exclude={"id"}) for invoice in invoices]
+        statement = insert(InvoiceEntity).returning(InvoiceEntity.id)
+        ids = sorted(self.session.exec(statement, params=rows).scalars().all())
+        self.session.commit()
+        invalidate_count_cache(InvoiceEntity.__tablename__)
+        return ids
+
+    async def get_payment_states(self, invoice_ids: Iterable[int], invoice_numbers: Iterable[str]) -> List[Tuple[int, str, InvoiceStatus]]:
+        """Return (id, invoice_number, status) of the invoices matching any of the IDs or numbers"""
+        invoice_ids, invoice_numbers = set(invoice_ids), set(invoice_numbers)
+        conditions = []
+        if invoice_ids:
+            conditions.append(InvoiceEntity.id.in_(invoice_ids))
+        if invoice_numbers:
+            conditions.append(InvoiceEntity.invoice_number.in_(invoice_numbers))
+        if not conditions:
+            return []
+        
+        statement = select(InvoiceEntity.id, InvoiceEntity.invoice_number, InvoiceEntity.status).where(or_(*conditions))
+        return [tuple(row) for row in self.session.exec(statement).all()]
+
+    async def mark_paid_many(self, payments: List[Dict[str, Any]]) -> int:
+        """Mark invoices paid with one conditional UPDATE executed for the whole batch"""
+        if not payments:
+            return 0
+        
+        # The status condition keeps invoices paid (or cancelled) since they were read untouched
+        columns = InvoiceEntity.__table__.c
+        statement = (
+            update(InvoiceEntity)
+            .where(
+                InvoiceEntity.id == bindparam("target_id"),
+                # Not IN (...): expanding parameters cannot be used with executemany
+                or_(InvoiceEntity.status == InvoiceStatus.PENDING, InvoiceEntity.status == InvoiceStatus.OVERDUE)
+            )
+            .values(
+                status=InvoiceStatus.PAID,
+                payment_date=bindparam("new_payment_date", type_=columns.payment_date.type),
+                payment_method=bindparam("new_payment_method", type_=columns.payment_method.type),
+                notes=func.coalesce(bindparam("new_notes", type_=columns.notes.type), InvoiceEntity.notes),
+                updated_at=datetime.now()
+            )
+        )
+        # Bind names must differ from the column names SQLAlchemy reserves for SET
+        params = [
+            {
+                "target_id": payment["invoice_id"],
+                "new_payment_date": payment["payment_date"],
+                "new_payment_method": payment["payment_method"],
+                "new_notes": payment.get("notes"),
+            }
+            for payment in payments
+        ]
+        result = self.session.connection().execute(statement, params)
+        self.session.commit()
+        invalidate_count_cache(InvoiceEntity.__tablename__)
+        self._loader().clear()
+        return result.rowcount
+
+    async def mark_overdue(self, as_of: date) -> int:
+        """
+        Flag pending invoices past due as overdue, and set overdue ones no longer
+        past due (due date extended) back to pending.
+
+        Two set-based UPDATEs in one transaction, both using the (status, due_date) index.
+        """
+        now = datetime.now()
+        flagged = self.session.exec(
+            update(InvoiceEntity)
+            .where(InvoiceEntity.status == InvoiceStatus.PENDING, InvoiceEntity.due_date < as_of)
+            .values(status=InvoiceStatus.OVERDUE, updated_at=now)
+        ).rowcount
+        cleared = self.session.exec(
+            update(InvoiceEntity)
+            .where(InvoiceEntity.status == InvoiceStatus.OVERDUE, InvoiceEntity.due_date >= as_of)
+            .values(status=InvoiceStatus.PENDING, updated_at=now)
+        ).rowcount
+        self.session.commit()
+        if flagged or cleared:
+            invalidate_count_cache(InvoiceEntity.__tablename__)
+            self._loader().clear()
+        return flagged + cleared
 
     async def update(self, invoice: Invoice) -> Invoice:
         """Update an existing invoice"""
@@ -56,8 +249,11 @@ class InvoiceRepository(InvoiceRepositoryInterface):
         
         self.session.add(entity)
         self.session.commit()
+        invalidate_count_cache(InvoiceEntity.__tablename__)
         self.session.refresh(entity)
-        return InvoiceMapper.to_domain(entity)
+        updated = InvoiceMapper.to_domain(entity)
+        self._loader().prime(updated.id, updated)
+        return updated
 
     async def delete(self, invoice_id: int) -> bool:
         """Delete an invoice"""
@@ -65,20 +261,36 @@ class InvoiceRepository(InvoiceRepositoryInterface):
         if entity:
             self.session.delete(entity)
             self.session.commit()
+            invalidate_count_cache(InvoiceEntity.__tablename__)
+            self._loader().clear(invoice_id)
             return True
         return False
 
-    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10) -> Tuple[List[Invoice], int]:
+    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Invoice]:
         """Get invoices with flexible filtering and pagination"""
-        # Build the base query
-        statement = select(InvoiceEntity)
-        count_statement = select(func.count()).select_from(InvoiceEntity)
+        conditions = self._build_conditions(filters)
+        page = fetch_page(self.session, InvoiceEntity, conditions, offset, limit, count_mode, self.SORT_KEY, after)
         
-        # Apply filters
+        # Convert to domain models
+        return page.map(InvoiceMapper.to_domain)
+
+    async def get_projection(self, filters: dict, attributes: Sequence[str], offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Dict[str, Any]]:
+        """Get only the given attributes of filtered invoices, as dicts"""
+        conditions = self._build_conditions(filters)
+        return fetch_page(self.session, InvoiceEntity, conditions, offset, limit, count_mode, self.SORT_KEY, after, attributes)
+
+    async def get_projection_by_id(self, invoice_id: int, attributes: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Get only the given attributes of one invoice"""
+        statement = select(*(getattr(InvoiceEntity, name) for name in attributes)).where(InvoiceEntity.id == invoice_id)
+        row = self.session.exec(statement).first()
+        return dict(row._mapping) if row else None
+
+    def _build_conditions(self, filters: dict) -> List[Any]:
+        """Translate list filters into SQL conditions"""
         conditions = []
         
         if filters.get('invoice_number'):
-            conditions.append(col(InvoiceEntity.invoice_number).ilike(f"%{filters['invoice_number']}%"))
+            conditions.append(self.text_search.contains(InvoiceEntity, 'invoice_number', filters['invoice_number']))
         
         if filters.get('student_id') is not None:
             conditions.append(InvoiceEntity.student_id == filters['student_id'])
@@ -106,7 +318,7 @@ class InvoiceRepository(InvoiceRepositoryInterface):
             conditions.append(InvoiceEntity.total_amount <= filters['total_amount_max'])
         
         if filters.get('description'):
-            conditions.append(col(InvoiceEntity.description).ilike(f"%{filters['description']}%"))
+            conditions.append(self.text_search.contains(InvoiceEntity, 'description', filters['description']))
         
         # Date range filters
         if filters.get('invoice_date_from'):
@@ -133,21 +345,4 @@ class InvoiceRepository(InvoiceRepositoryInterface):
         if filters.get('payment_method'):
             conditions.append(InvoiceEntity.payment_method == filters['payment_method'])
         
-        # Apply conditions to both statements
-        if conditions:
-            from sqlmodel import and_
-            filter_condition = and_(*conditions)
-            statement = statement.where(filter_condition)
-            count_statement = count_statement.where(filter_condition)
-        
-        # Get total count
-        total = self.session.exec(count_statement).one()
-        
-        # Get paginated results
-        statement = statement.offset(offset).limit(limit)
-        result = self.session.exec(statement)
-        entities = list(result.all())
-        
-        # Convert to domain models
-        invoices = [InvoiceMapper.to_domain(entity) for entity in entities]
-        return invoices, total
+        return conditions
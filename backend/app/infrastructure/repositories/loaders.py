@@ -0,0 +1,22 @@
+"""
+Request-scoped DataLoaders.
+
+Loaders are kept in ``session.info``. A session lives for one request (see
+``get_session``), so the memoized rows act as a per-request identity map and
+are discarded with the session.
+"""
+
+from typing import Any
+from sqlmodel import Session
+from app.core.dataloader import BatchLoadFunction, DataLoader
+
+LOADERS_KEY = "dataloaders"
+
+
+def get_loader(session: Session, name: str, batch_load: BatchLoadFunction) -> DataLoader[Any, Any]:
+    """Return the session's loader called ``name``, creating it on first use"""
+    loaders = session.info.setdefault(LOADERS_KEY, {})
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = DataLoader(batch_load)
+    return loader
@@ -0,0 +1,181 @@
+import hashlib
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+from sqlalchemy import select as select_rows, text
+from sqlmodel import Session, and_, func, select, tuple_
+from app.core.cache import cache_lock, count_cache, record_cache_lookup
+from app.core.config import settings
+from app.domain.repositories.page import CountMode, Page
+
+
+def _coerce_key(sort_key: Sequence[Any], after: Sequence[Any]) -> Tuple[Any, ...]:
+    """Convert decoded cursor values back to the sort columns' Python types"""
+    if len(after) != len(sort_key):
+        raise ValueError("Invalid pagination cursor")
+
+    values = []
+    for column, value in zip(sort_key, after):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            elif python_type is date and isinstance(value, str):
+                value = date.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                value = python_type(value)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid pagination cursor")
+        values.append(value)
+    return tuple(values)
+
+
+def exact_count(session: Session, entity_class: Type[Any], filter_condition: Optional[Any] = None) -> int:
+    """COUNT(*) of the rows matching ``filter_condition``"""
+    statement = select(func.count()).select_from(entity_class)
+    if filter_condition is not None:
+        statement = statement.where(filter_condition)
+    return session.exec(statement).one()
+
+
+def estimate_count(session: Session, entity_class: Type[Any]) -> Optional[int]:
+    """Planner row estimate for a whole table (PostgreSQL only, None when unknown)"""
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    estimate = session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": entity_class.__tablename__}
+    ).scalar()
+    # reltuples is -1 until the table has been vacuumed or analyzed
+    return int(estimate) if estimate is not None and estimate >= 0 else None
+
+
+def _count_cache_key(session: Session, entity_class: Type[Any], filter_condition: Optional[Any]) -> str:
+    """Cache key for a table and normalized filter (SQL text plus bound values)"""
+    if filter_condition is None:
+        return f"count:{entity_class.__tablename__}:all"
+    compiled = filter_condition.compile(dialect=session.get_bind().dialect)
+    normalized = f"{compiled}|{sorted(compiled.params.items())!r}"
+    return f"count:{entity_class.__tablename__}:{hashlib.md5(normalized.encode()).hexdigest()}"
+
+
+def auto_count(session: Session, entity_class: Type[Any], filter_condition: Optional[Any] = None) -> Tuple[int, bool]:
+    """
+    Count with the cheapest strategy that fits, returning ``(total, is_estimate)``.
+
+    Unfiltered lists of tables above COUNT_ESTIMATE_THRESHOLD rows use the planner
+    estimate. Everything else is an exact count cached per normalized filter for
+    COUNT_CACHE_TTL seconds; repositories invalidate a table's entries on writes.
+    """
+    if filter_condition is None:
+        estimate = estimate_count(session, entity_class)
+        if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+            return estimate, True
+
+    cache_key = _count_cache_key(session, entity_class, filter_condition)
+    with cache_lock:
+        total = count_cache.get(cache_key)
+    record_cache_lookup("count", total is not None)
+    if total is None:
+        total = exact_count(session, entity_class, filter_condition)
+        with cache_lock:
+            count_cache[cache_key] = total
+    return total, False
+
+
+def fetch_page(
+    session: Session,
+    entity_class: Type[Any],
+    conditions: List[Any],
+    offset: int,
+    limit: int,
+    count_mode: CountMode = CountMode.EXACT,
+    sort_key: Optional[Sequence[Any]] = None,
+    after: Optional[Sequence[Any]] = None,
+    columns: Optional[Sequence[str]] = None
+) -> Page[Any]:
+    """
+    Fetch one page of entities matching ``conditions``, ordered by ``sort_key``.
+
+    EXACT runs a separate COUNT(*), WINDOW gets the total from ``count(*) OVER ()``
+    in the same round trip, AUTO uses ``auto_count`` and NONE skips the total and
+    fetches ``limit + 1`` rows to find out whether there is a next page.
+
+    When ``after`` (the sort key of the previous page's last row) is given the page
+    is located with a keyset condition instead of OFFSET, so every page costs the
+    same. ``sort_key`` must end with a unique column (the id) to break ties.
+
+    With ``columns`` only those columns are selected and the items are dicts
+    instead of entities.
+    """
+    sort_key = list(sort_key or [entity_class.id])
+    filter_condition = and_(*conditions) if conditions else None
+
+    if columns is None:
+        def page_select(*extra):
+            return select(entity_class, *extra)
+
+        def key_of(entity) -> Tuple[Any, ...]:
+            return tuple(getattr(entity, column.key) for column in sort_key)
+    else:
+        # Sort key columns are selected too so the next cursor can be built
+        selected = list(dict.fromkeys([*columns, *(column.key for column in sort_key)]))
+
+        def page_select(*extra):
+            return select_rows(*(getattr(entity_class, name) for name in selected), *extra)
+
+        def key_of(row: Dict[str, Any]) -> Tuple[Any, ...]:
+            return tuple(row[column.key] for column in sort_key)
+
+    def where(statement):
+        return statement.where(filter_condition) if filter_condition is not None else statement
+
+    def count() -> int:
+        return exact_count(session, entity_class, filter_condition)
+
+    total_is_estimate = False
+    if after is not None or count_mode in (CountMode.NONE, CountMode.AUTO):
+        statement = where(page_select())
+        if after is not None:
+            statement = statement.where(tuple_(*sort_key) > tuple_(*_coerce_key(sort_key, after)))
+        else:
+            statement = statement.offset(offset)
+        entities = list(session.exec(statement.order_by(*sort_key).limit(limit + 1)).all())
+        has_next = len(entities) > limit
+        entities = entities[:limit]
+        if count_mode == CountMode.NONE:
+            total = None
+        elif count_mode == CountMode.AUTO:
+            total, total_is_estimate = auto_count(session, entity_class, filter_condition)
+        else:
+            # The window total would only cover rows after the cursor
+            total = count()
+    elif count_mode == CountMode.WINDOW:
+        statement = where(page_select(func.count().over().label("total_count")))
+        rows = session.exec(statement.order_by(*sort_key).offset(offset).limit(limit)).all()
+        entities = [row[0] if columns is None else row for row in rows]
+        if rows:
+            total = rows[0][-1]
+        else:
+            # An empty page past the end carries no window total
+            total = count() if offset > 0 else 0
+        has_next = offset + len(entities) < total
+    else:
+        total = count()
+        statement = where(page_select()).order_by(*sort_key).offset(offset).limit(limit)
+        entities = list(session.exec(statement).all())
+        has_next = offset + len(entities) < total
+
+    if columns is not None:
+        rows = [row._mapping for row in entities]
+        next_key = key_of(rows[-1]) if has_next and rows else None
+        entities = [{name: row[name] for name in columns} for row in rows]
+    else:
+        next_key = key_of(entities[-1]) if has_next and entities else None
+
+    return Page(
+        items=entities,
+        total=total,
+        has_next=has_next,
+        next_key=next_key,
+        total_is_estimate=total_is_estimate
+    )
@@ -1,45 +1,100 @@
-from typing import List, Optional, Tuple
-from sqlmodel import Session, select, col, func
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+from sqlalchemy import insert, select, update
+from sqlmodel import Session
 from datetime import datetime
 from app.domain.models.school import School
+from app.domain.repositories.page import CountMode, Page
 from app.domain.repositories.school_repository import SchoolRepositoryInterface
 from app.infrastructure.persistence.school_entity import SchoolEntity
+from app.infrastructure.search.text_search import get_text_search
 from app.infrastructure.mappers.school_mapper import SchoolMapper
+from app.core.cache import invalidate_count_cache
+from app.infrastructure.repositories.pagination import fetch_page
+from app.infrastructure.repositories.loaders import get_loader
+from app.infrastructure.repositories.updates import reject_required_nulls
+from app.core.dataloader import DataLoader
 
 
 class SchoolRepository(SchoolRepositoryInterface):
     """Implementation of school repository"""
 
+    # List order, unique last column so keyset pagination is stable
+    SORT_KEY = (SchoolEntity.id,)
+
     def __init__(self, session: Session):
         self.session = session
+        self.text_search = get_text_search(session.get_bind().dialect.name)
 
-    async def get_all(self, offset: int = 0, limit: int = 10) -> Tuple[List[School], int]:
+    async def get_all(self, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[School]:
         """Get all schools with pagination"""
-        # Get total count
-        count_statement = select(func.count()).select_from(SchoolEntity)
-        total = self.session.exec(count_statement).one()
-        
-        # Get paginated results
-        statement = select(SchoolEntity).offset(offset).limit(limit)
-        result = self.session.exec(statement)
-        entities = list(result.all())
+        page = fetch_page(self.session, SchoolEntity, [], offset, limit, count_mode, self.SORT_KEY, after)
         
         # Convert to domain models
-        schools = [SchoolMapper.to_domain(entity) for entity in entities]
-        return schools, total
+        return page.map(SchoolMapper.to_domain)
 
     async def get_by_id(self, school_id: int) -> Optional[School]:
-        """Get school by ID"""
-        entity = self.session.get(SchoolEntity, school_id)
-        return SchoolMapper.to_domain(entity) if entity else None
+        """Get school by ID (batched with the other lookups of the same tick, memoized per request)"""
+        return await self._loader().load(school_id)
+
+    async def get_by_ids(self, school_ids: Iterable[int]) -> Dict[int, School]:
+        """Get schools by ID with one query, keyed by ID (missing IDs are left out)"""
+        school_ids = set(school_ids)
+        if not school_ids:
+            return {}
+        entities = self.session.exec(select(SchoolEntity).where(SchoolEntity.id.in_(school_ids))).scalars().all()
+        return {entity.id: SchoolMapper.to_domain(entity) for entity in entities}
+
+    def _loader(self) -> DataLoader[int, School]:
+        return get_loader(self.session, SchoolEntity.__tablename__, self.get_by_ids)
+
+    async def get_existing_ids(self, school_ids: Iterable[int]) -> Set[int]:
+        """Return which of the given school IDs exist"""
+        school_ids = set(school_ids)
+        if not school_ids:
+            return set()
+        statement = select(SchoolEntity.id).where(SchoolEntity.id.in_(school_ids))
+        return set(self.session.exec(statement).scalars().all())
 
     async def create(self, school: School) -> School:
-        """Create a new school"""
-        entity = SchoolMapper.to_entity(school)
-        self.session.add(entity)
+        """Create a new school with one INSERT ... RETURNING"""
+        values = SchoolMapper.to_entity(school).model_dump(exclude={"id"})
+        entity = self.session.exec(insert(SchoolEntity).values(**values).returning(SchoolEntity)).scalar_one()
+        # Map before committing: the commit expires the entity
+        created = SchoolMapper.to_domain(entity)
         self.session.commit()
-        self.session.refresh(entity)
-        return SchoolMapper.to_domain(entity)
+        invalidate_count_cache(SchoolEntity.__tablename__)
+        self._loader().prime(created.id, created)
+        return created
+
+    async def update_fields(self, school_id: int, changes: Dict[str, Any]) -> Optional[School]:
+        """
+        Apply a partial update with one UPDATE ... RETURNING.
+
+        Only the given columns are written. The returned row goes through the
+        domain model and the update is rolled back if it breaks an invariant.
+        Raises ValueError for an explicit null in a required column.
+        """
+        reject_required_nulls(SchoolEntity, changes)
+        statement = (
+            update(SchoolEntity)
+            .where(SchoolEntity.id == school_id)
+            .values(**changes, updated_at=datetime.now())
+            .returning(SchoolEntity)
+        )
+        entity = self.session.exec(statement).scalar_one_or_none()
+        if entity is None:
+            self.session.rollback()
+            return None
+        
+        try:
+            updated = SchoolMapper.to_domain(entity)
+        except ValueError:
+            self.session.rollback()
+            raise
+        self.session.commit()
+        invalidate_count_cache(SchoolEntity.__tablename__)
+        self._loader().prime(school_id, updated)
+        return updated
 
     async def update(self, school: School) -> School:
         """Update an existing school"""
@@ -56,8 +111,11 @@ class SchoolRepository(SchoolRepositoryInterface):
         
         self.session.add(entity)
         self.session.commit()
+        invalidate_count_cache(SchoolEntity.__tablename__)
         self.session.refresh(entity)
-        return SchoolMapper.to_domain(entity)
+        updated = SchoolMapper.to_domain(entity)
+        self._loader().prime(updated.id, updated)
+        return updated
 
     async def delete(self, school_id: int) -> bool:
         """Delete a school"""
@@ -65,62 +123,61 @@ class SchoolRepository(SchoolRepositoryInterface):
         if entity:
             self.session.delete(entity)
             self.session.commit()
+            invalidate_count_cache(SchoolEntity.__tablename__)
+            self._loader().clear(school_id)
             return True
         return False
 
 
 
-    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10) -> Tuple[List[School], int]:
+    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[School]:
         """Get schools with flexible filtering and pagination"""
-        # Build the base query
-        statement = select(SchoolEntity)
-        count_statement = select(func.count()).select_from(SchoolEntity)
+        conditions = self._build_conditions(filters)
+        page = fetch_page(self.session, SchoolEntity, conditions, offset, limit, count_mode, self.SORT_KEY, after)
         
-        # Apply filters
+        # Convert to domain models
+        return page.map(SchoolMapper.to_domain)
+
+    async def get_projection(self, filters: dict, attributes: Sequence[str], offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Dict[str, Any]]:
+        """Get only the given attributes of filtered schools, as dicts"""
+        conditions = self._build_conditions(filters)
+        return fetch_page(self.session, SchoolEntity, conditions, offset, limit, count_mode, self.SORT_KEY, after, attributes)
+
+    async def get_projection_by_id(self, school_id: int, attributes: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Get only the given attributes of one school"""
+        statement = select(*(getattr(SchoolEntity, name) for name in attributes)).where(SchoolEntity.id == school_id)
+        row = self.session.exec(statement).first()
+        return dict(row._mapping) if row else None
+
+    def _build_conditions(self, filters: dict) -> List[Any]:
+        """Translate list filters into SQL conditions"""
         conditions = []
         
         if filters.get('name'):
-            conditions.append(col(SchoolEntity.name).ilike(f"%{filters['name']}%"))
+            conditions.append(self.text_search.contains(SchoolEntity, 'name', filters['name']))
         
         if filters.get('address'):
-            conditions.append(col(SchoolEntity.address).ilike(f"%{filters['address']}%"))
+            conditions.append(self.text_search.contains(SchoolEntity, 'address', filters['address']))
         
         if filters.get('city'):
-            conditions.append(col(SchoolEntity.city).ilike(f"%{filters['city']}%"))
+            conditions.append(self.text_search.contains(SchoolEntity, 'city', filters['city']))
         
         if filters.get('state'):
-            conditions.append(col(SchoolEntity.state).ilike(f"%{filters['state']}%"))
+            conditions.append(self.text_search.contains(SchoolEntity, 'state', filters['state']))
         
         if filters.get('zip_code'):
-            conditions.append(col(SchoolEntity.zip_code).ilike(f"%{filters['zip_code']}%"))
+            conditions.append(self.text_search.contains(SchoolEntity, 'zip_code', filters['zip_code']))
         
         if filters.get('phone'):
-            conditions.append(col(SchoolEntity.phone_number).ilike(f"%{filters['phone']}%"))
+            conditions.append(self.text_search.contains(SchoolEntity, 'phone_number', filters['phone']))
         
         if filters.get('email'):
-            conditions.append(col(SchoolEntity.email).ilike(f"%{filters['email']}%"))
+            conditions.append(self.text_search.contains(SchoolEntity, 'email', filters['email']))
         
         if filters.get('principal'):
-            conditions.append(col(SchoolEntity.principal_name).ilike(f"%{filters['principal']}%"))
+            conditions.append(self.text_search.contains(SchoolEntity, 'principal_name', filters['principal']))
         
         if filters.get('is_active') is not None:
             conditions.append(SchoolEntity.is_active == filters['is_active'])
         
-        # Apply conditions to both statements
-        if conditions:
-            from sqlmodel import and_
-            filter_condition = and_(*conditions)
-            statement = statement.where(filter_condition)
-            count_statement = count_statement.where(filter_condition)
-        
-        # Get total count
-        total = self.session.exec(count_statement).one()
-        
-        # Get paginated results
-        statement = statement.offset(offset).limit(limit)
-        result = self.session.exec(statement)
-        entities = list(result.all())
-        
-        # Convert to domain models
-        schools = [SchoolMapper.to_domain(entity) for entity in entities]
-        return schools, total
+        return conditions
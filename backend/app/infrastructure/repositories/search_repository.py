@@ -0,0 +1,106 @@
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Type
+from sqlmodel import Session, select
+from app.domain.models.search_hit import SearchHit
+from app.domain.repositories.search_repository import SearchRepositoryInterface
+from app.infrastructure.persistence.school_entity import SchoolEntity
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.search.text_search import get_text_search
+
+# Candidates fetched per entity type, relative to the requested limit
+CANDIDATE_FACTOR = 3
+
+
+def _field_score(term: str, value: str) -> float:
+    """Score how well a single field matches the term (0 = no match)"""
+    value = value.lower()
+    if value == term:
+        return 1.0
+    if value.startswith(term):
+        return 0.9
+    if any(word.startswith(term) for word in value.split()):
+        return 0.8
+    if term in value:
+        return 0.6
+    return 0.0
+
+
+def score_match(term: str, values: Sequence[str]) -> float:
+    """
+    Score a row by its best matching field.
+
+    Shorter fields rank higher for the same kind of match, so "Ana" beats "Anastasia".
+    """
+    term = term.lower()
+    best = 0.0
+    for value in values:
+        if not value:
+            continue
+        score = _field_score(term, value)
+        if score:
+            best = max(best, score + 0.1 * len(term) / len(value))
+    return round(best, 4)
+
+
+def _student_hit(entity: StudentEntity) -> Tuple[str, str]:
+    return f"{entity.first_name} {entity.last_name}", entity.email
+
+
+def _school_hit(entity: SchoolEntity) -> Tuple[str, str]:
+    return entity.name, f"{entity.city}, {entity.state}"
+
+
+def _invoice_hit(entity: InvoiceEntity) -> Tuple[str, str]:
+    return entity.invoice_number, entity.description
+
+
+# entity type -> (entity class, title/subtitle builder)
+SEARCH_TARGETS: Dict[str, Tuple[Type[Any], Callable[[Any], Tuple[str, str]]]] = {
+    "student": (StudentEntity, _student_hit),
+    "school": (SchoolEntity, _school_hit),
+    "invoice": (InvoiceEntity, _invoice_hit),
+}
+
+
+class SearchRepository(SearchRepositoryInterface):
+    """Implementation of the unified search repository"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.text_search = get_text_search(session.get_bind().dialect.name)
+
+    async def search(self, term: str, entity_types: Sequence[str], limit: int = 20) -> List[SearchHit]:
+        """Search the given entity types and return hits ranked best first"""
+        hits: List[Tuple[float, SearchHit]] = []
+
+        for entity_type in entity_types:
+            entity_class, describe = SEARCH_TARGETS[entity_type]
+
+            # Index-backed candidate lookup, ordered by the backend's own relevance
+            candidates = self.session.exec(
+                self.text_search.candidates(entity_class, term, limit * CANDIDATE_FACTOR)
+            ).all()
+            if not candidates:
+                continue
+            relevance = {row[0]: row[1] for row in candidates}
+
+            entities = self.session.exec(
+                select(entity_class).where(entity_class.id.in_(list(relevance)))
+            ).all()
+
+            columns = self.text_search.searchable_columns(entity_class)
+            for entity in entities:
+                title, subtitle = describe(entity)
+                score = score_match(term, [getattr(entity, name) for name in columns])
+                hit = SearchHit(
+                    entity_type=entity_type,
+                    entity_id=entity.id,
+                    title=title,
+                    subtitle=subtitle,
+                    score=score,
+                )
+                hits.append((relevance[entity.id], hit))
+
+        # Rank across entity types by match quality, backend relevance breaks ties
+        hits.sort(key=lambda item: (item[1].score, item[0]), reverse=True)
+        return [hit for _, hit in hits[:limit]]
@@ -1,45 +1,110 @@
-from typing import List, Optional, Tuple
-from sqlmodel import Session, select, col, func
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import insert, select as select_rows, update
+from sqlmodel import Session, select, func
 from datetime import datetime
 from app.domain.models.student import Student
+from app.domain.repositories.page import CountMode, Page
 from app.domain.repositories.student_repository import StudentRepositoryInterface
 from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.search.text_search import get_text_search
 from app.infrastructure.mappers.student_mapper import StudentMapper
+from app.core.cache import invalidate_count_cache
+from app.infrastructure.repositories.pagination import fetch_page
+from app.infrastructure.repositories.loaders import get_loader
+from app.infrastructure.repositories.updates import reject_required_nulls
+from app.core.dataloader import DataLoader
 
 
 class StudentRepository(StudentRepositoryInterface):
     """Implementation of student repository"""
 
+    # List order, unique last column so keyset pagination is stable
+    SORT_KEY = (StudentEntity.id,)
+
     def __init__(self, session: Session):
         self.session = session
+        self.text_search = get_text_search(session.get_bind().dialect.name)
 
-    async def get_all(self, offset: int = 0, limit: int = 10) -> Tuple[List[Student], int]:
+    async def get_all(self, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Student]:
         """Get all students with pagination"""
-        # Get total count
-        count_statement = select(func.count()).select_from(StudentEntity)
-        total = self.session.exec(count_statement).one()
-        
-        # Get paginated results
-        statement = select(StudentEntity).offset(offset).limit(limit)
-        result = self.session.exec(statement)
-        entities = list(result.all())
+        page = fetch_page(self.session, StudentEntity, [], offset, limit, count_mode, self.SORT_KEY, after)
         
         # Convert to domain models
-        students = [StudentMapper.to_domain(entity) for entity in entities]
-        return students, total
+        return page.map(StudentMapper.to_domain)
 
     async def get_by_id(self, student_id: int) -> Optional[Student]:
-        """Get student by ID"""
-        entity = self.session.get(StudentEntity, student_id)
-        return StudentMapper.to_domain(entity) if entity else None
+        """Get student by ID (batched with the other lookups of the same tick, memoized per request)"""
+        return await self._loader().load(student_id)
+
+    async def get_by_ids(self, student_ids: Iterable[int]) -> Dict[int, Student]:
+        """Get students by ID with one query, keyed by ID (missing IDs are left out)"""
+        student_ids = set(student_ids)
+        if not student_ids:
+            return {}
+        entities = self.session.exec(select_rows(StudentEntity).where(StudentEntity.id.in_(student_ids))).scalars().all()
+        return {entity.id: StudentMapper.to_domain(entity) for entity in entities}
+
+    def _loader(self) -> DataLoader[int, Student]:
+        return get_loader(self.session, StudentEntity.__tablename__, self.get_by_ids)
 
     async def create(self, student: Student) -> Student:
-        """Create a new student"""
-        entity = StudentMapper.to_entity(student)
-        self.session.add(entity)
+        """Create a new student with one INSERT ... RETURNING"""
+        values = StudentMapper.to_entity(student).model_dump(exclude={"id"})
+        entity = self.session.exec(insert(StudentEntity).values(**values).returning(StudentEntity)).scalar_one()
+        # Map before committing: the commit expires the entity
+        created = StudentMapper.to_domain(entity)
         self.session.commit()
-        self.session.refresh(entity)
-        return StudentMapper.to_domain(entity)
+        invalidate_count_cache(StudentEntity.__tablename__)
+        self._loader().prime(created.id, created)
+        self._count_loader().clear()
+        return created
+
+    async def update_fields(self, student_id: int, changes: Dict[str, Any]) -> Optional[Student]:
+        """
+        Apply a partial update with one UPDATE ... RETURNING.
+
+        Only the given columns are written. The returned row goes through the
+        domain model and the update is rolled back if it breaks an invariant.
+        Raises ValueError for an explicit null in a required column.
+        """
+        reject_required_nulls(StudentEntity, changes)
+        statement = (
+            update(StudentEntity)
+            .where(StudentEntity.id == student_id)
+            .values(**changes, updated_at=datetime.now())
+            .returning(StudentEntity)
+        )
+        entity = self.session.exec(statement).scalar_one_or_none()
+        if entity is None:
+            self.session.rollback()
+            return None
+        
+        try:
+            updated = StudentMapper.to_domain(entity)
+        except ValueError:
+            self.session.rollback()
+            raise
+        self.session.commit()
+        invalidate_count_cache(StudentEntity.__tablename__)
+        self._loader().prime(student_id, updated)
+        self._count_loader().clear()
+        return updated
+
+    async def create_many(self, students: List[Student]) -> List[int]:
+        """Create many students in one transaction, returning their IDs in order"""
+        if not students:
+            return []
+        
+        # Batched multi-row INSERT ... RETURNING (executemany), one commit for the whole batch.
+        # Generated IDs ascend in VALUES order, so sorting restores the input order without
+        # sort_by_parameter_order (which makes SQLite fall back to one INSERT per row).
+        rows = [StudentMapper.to_entity(student).model_dump(exclude={"id"}) for student in students]
+        statement = insert(StudentEntity).returning(StudentEntity.id)
+        ids = sorted(self.session.exec(statement, params=rows).scalars().all())
+        self.session.commit()
+        invalidate_count_cache(StudentEntity.__tablename__)
+        self._count_loader().clear()
+        return ids
 
     async def update(self, student: Student) -> Student:
         """Update an existing student"""
@@ -56,8 +121,12 @@ class StudentRepository(StudentRepositoryInterface):
         
         self.session.add(entity)
         self.session.commit()
+        invalidate_count_cache(StudentEntity.__tablename__)
         self.session.refresh(entity)
-        return StudentMapper.to_domain(entity)
+        updated = StudentMapper.to_domain(entity)
+        self._loader().prime(updated.id, updated)
+        self._count_loader().clear()
+        return updated
 
     async def delete(self, student_id: int) -> bool:
         """Delete a student"""
@@ -65,34 +134,73 @@ class StudentRepository(StudentRepositoryInterface):
         if entity:
             self.session.delete(entity)
             self.session.commit()
+            invalidate_count_cache(StudentEntity.__tablename__)
+            self._loader().clear(student_id)
+            self._count_loader().clear()
             return True
         return False
 
     async def count_by_school_id(self, school_id: int) -> int:
-        """Count students by school ID"""
-        count_statement = select(func.count()).select_from(StudentEntity).where(StudentEntity.school_id == school_id)
-        return self.session.exec(count_statement).one()
+        """Count students by school ID (batched with the other counts of the same tick)"""
+        return await self._count_loader().load(school_id) or 0
+
+    async def count_by_school_ids(self, school_ids: Iterable[int]) -> Dict[int, int]:
+        """Count students for several schools with one GROUP BY, keyed by school ID (schools without students are left out)"""
+        school_ids = set(school_ids)
+        if not school_ids:
+            return {}
+        statement = (
+            select(StudentEntity.school_id, func.count())
+            .where(StudentEntity.school_id.in_(school_ids))
+            .group_by(StudentEntity.school_id)
+        )
+        return {school_id: count for school_id, count in self.session.exec(statement).all()}
+
+    def _count_loader(self) -> DataLoader[int, int]:
+        return get_loader(self.session, "student_counts_by_school", self.count_by_school_ids)
 
-    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10) -> Tuple[List[Student], int]:
+    async def get_school_ids(self, student_ids: Iterable[int]) -> Dict[int, int]:
+        """Map the given student IDs that exist to their school ID"""
+        student_ids = set(student_ids)
+        if not student_ids:
+            return {}
+        statement = select(StudentEntity.id, StudentEntity.school_id).where(StudentEntity.id.in_(student_ids))
+        return {student_id: school_id for student_id, school_id in self.session.exec(statement).all()}
+
+    async def get_with_filters(self, filters: dict, offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Student]:
         """Get students with flexible filtering and pagination"""
-        # Build the base query
-        statement = select(StudentEntity)
-        count_statement = select(func.count()).select_from(StudentEntity)
+        conditions = self._build_conditions(filters)
+        page = fetch_page(self.session, StudentEntity, conditions, offset, limit, count_mode, self.SORT_KEY, after)
         
-        # Apply filters
+        # Convert to domain models
+        return page.map(StudentMapper.to_domain)
+
+    async def get_projection(self, filters: dict, attributes: Sequence[str], offset: int = 0, limit: int = 10, count_mode: CountMode = CountMode.EXACT, after: Optional[Sequence[Any]] = None) -> Page[Dict[str, Any]]:
+        """Get only the given attributes of filtered students, as dicts"""
+        conditions = self._build_conditions(filters)
+        return fetch_page(self.session, StudentEntity, conditions, offset, limit, count_mode, self.SORT_KEY, after, attributes)
+
+    async def get_projection_by_id(self, student_id: int, attributes: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Get only the given attributes of one student"""
+        statement = select_rows(*(getattr(StudentEntity, name) for name in attributes)).where(StudentEntity.id == student_id)
+        row = self.session.exec(statement).first()
+        return dict(row._mapping) if row else None
+
+    def _build_conditions(self, filters: dict) -> List[Any]:
+        """Translate list filters into SQL conditions"""
         conditions = []
         
         if filters.get('first_name'):
-            conditions.append(col(StudentEntity.first_name).ilike(f"%{filters['first_name']}%"))
+            conditions.append(self.text_search.contains(StudentEntity, 'first_name', filters['first_name']))
         
         if filters.get('last_name'):
-            conditions.append(col(StudentEntity.last_name).ilike(f"%{filters['last_name']}%"))
+            conditions.append(self.text_search.contains(StudentEntity, 'last_name', filters['last_name']))
         
         if filters.get('email'):
-            conditions.append(col(StudentEntity.email).ilike(f"%{filters['email']}%"))
+            conditions.append(self.text_search.contains(StudentEntity, 'email', filters['email']))
         
         if filters.get('phone'):
-            conditions.append(col(StudentEntity.phone_number).ilike(f"%{filters['phone']}%"))
+            conditions.append(self.text_search.contains(StudentEntity, 'phone_number', filters['phone']))
         
         if filters.get('date_of_birth'):
             conditions.append(StudentEntity.date_of_birth == filters['date_of_birth'])
@@ -107,26 +215,12 @@ class StudentRepository(StudentRepositoryInterface):
             conditions.append(StudentEntity.enrollment_date == filters['enrollment_date'])
         
         if filters.get('address'):
-            conditions.append(col(StudentEntity.address).ilike(f"%{filters['address']}%"))
+            conditions.append(self.text_search.contains(StudentEntity, 'address', filters['address']))
         
         if filters.get('is_active') is not None:
             conditions.append(StudentEntity.is_active == filters['is_active'])
         
-        # Apply conditions to both statements
-        if conditions:
-            from sqlmodel import and_
-            filter_condition = and_(*conditions)
-            statement = statement.where(filter_condition)
-            count_statement = count_statement.where(filter_condition)
-        
-        # Get total count
-        total = self.session.exec(count_statement).one()
+        if filters.get('ids'):
+            conditions.append(StudentEntity.id.in_(filters['ids']))
         
-        # Get paginated results
-        statement = statement.offset(offset).limit(limit)
-        result = self.session.exec(statement)
-        entities = list(result.all())
-        
-        # Convert to domain models
-        students = [StudentMapper.to_domain(entity) for entity in entities]
-        return students, total
+        return conditions
@@ -0,0 +1,12 @@
+"""Checks shared by the repositories' partial updates"""
+
+from typing import Any, Dict, Type
+from sqlmodel import SQLModel
+
+
+def reject_required_nulls(entity: Type[SQLModel], changes: Dict[str, Any]) -> None:
+    """Raise ValueError for an explicit null in a non-nullable column, before it reaches the UPDATE"""
+    columns = entity.__table__.columns
+    for name, value in changes.items():
+        if value is None and name in columns and not columns[name].nullable:
+            raise ValueError(f"{name} cannot be null")
@@ -2,7 +2,7 @@
 User repository implementation for infrastructure layer.
 """
 
-from typing import Optional, List
+from typing import Dict, Iterable, List, Optional
 from sqlmodel import Session, select
 from datetime import datetime
 from app.domain.repositories.user_repository import UserRepositoryInterface
@@ -33,6 +33,14 @@ class UserRepository(UserRepositoryInterface):
         result = self.session.exec(statement).first()
         return UserMapper.to_domain(result) if result else None
     
+    async def get_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        """Get users by ID with one query, keyed by ID."""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return {}
+        statement = select(UserEntity).where(UserEntity.id.in_(user_ids))
+        return {entity.id: UserMapper.to_domain(entity) for entity in self.session.exec(statement).all()}
+    
     async def get_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
         statement = select(UserEntity).where(UserEntity.username == username)
@@ -0,0 +1,9 @@
+# Infrastructure text search
+from app.infrastructure.search.text_search import (
+    SEARCHABLE_COLUMNS,
+    TextSearch,
+    LikeTextSearch,
+    TrigramTextSearch,
+    Fts5TextSearch,
+    get_text_search,
+)
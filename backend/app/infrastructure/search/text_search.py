@@ -0,0 +1,145 @@
+"""
+Substring text search backed by database-specific indexes.
+
+``ILIKE '%term%'`` cannot be served by a B-tree index, so every text filter
+goes through a ``TextSearch`` backend that knows which index the current
+database offers for substring matching:
+
+- PostgreSQL: ``pg_trgm`` GIN indexes, which serve ``ILIKE '%term%'`` directly
+- SQLite: FTS5 shadow tables using the trigram tokenizer, kept in sync by triggers
+- Anything else: plain ``ILIKE``
+
+The indexes and shadow tables are created by migration 0002.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Tuple, Type
+from sqlalchemy import ColumnElement, column, desc, func, literal, literal_column, or_, select, table
+from sqlalchemy.sql import Select
+
+# Columns covered by a trigram index (PostgreSQL) or the FTS5 shadow table (SQLite)
+SEARCHABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "schools": ("name", "city", "email", "principal_name"),
+    "students": ("first_name", "last_name", "email"),
+    "invoices": ("invoice_number", "description"),
+}
+
+# Trigram indexes cannot answer terms shorter than a single trigram
+MIN_TRIGRAM_LENGTH = 3
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so the term is matched literally"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def fts_table_name(table_name: str) -> str:
+    """Name of the FTS5 shadow table for a table"""
+    return f"{table_name}_fts"
+
+
+class TextSearch(ABC):
+    """Builds case-insensitive substring conditions for entity columns"""
+
+    @abstractmethod
+    def contains(self, entity: Type[Any], column_name: str, term: str) -> ColumnElement[bool]:
+        """Condition matching rows whose column contains the term"""
+        pass
+
+    @abstractmethod
+    def candidates(self, entity: Type[Any], term: str, limit: int) -> Select:
+        """
+        Select ``(id, relevance)`` for rows where any searchable column contains the term.
+
+        Rows are ordered best match first; relevance is only comparable within one backend.
+        """
+        pass
+
+    def searchable_columns(self, entity: Type[Any]) -> Tuple[str, ...]:
+        """Searchable columns of an entity"""
+        return SEARCHABLE_COLUMNS[entity.__tablename__]
+
+    def matches_any(self, entity: Type[Any], term: str) -> ColumnElement[bool]:
+        """Condition matching rows where any searchable column contains the term"""
+        return or_(*(self.contains(entity, name, term) for name in self.searchable_columns(entity)))
+
+
+class LikeTextSearch(TextSearch):
+    """Plain ILIKE matching, used when the database offers no substring index"""
+
+    def contains(self, entity: Type[Any], column_name: str, term: str) -> ColumnElement[bool]:
+        return getattr(entity, column_name).ilike(f"%{escape_like(term)}%", escape="\\")
+
+    def candidates(self, entity: Type[Any], term: str, limit: int) -> Select:
+        return (
+            select(entity.id, literal(0.0).label("relevance"))
+            .where(self.matches_any(entity, term))
+            .order_by(entity.id)
+            .limit(limit)
+        )
+
+
+class TrigramTextSearch(LikeTextSearch):
+    """PostgreSQL pg_trgm: GIN trigram indexes serve ILIKE and rank by word similarity"""
+
+    def candidates(self, entity: Type[Any], term: str, limit: int) -> Select:
+        relevance = func.greatest(
+            *(func.word_similarity(term, getattr(entity, name)) for name in self.searchable_columns(entity))
+        ).label("relevance")
+        return (
+            select(entity.id, relevance)
+            .where(self.matches_any(entity, term))
+            .order_by(desc(relevance), entity.id)
+            .limit(limit)
+        )
+
+
+class Fts5TextSearch(LikeTextSearch):
+    """SQLite FTS5 trigram shadow tables, falling back to LIKE for short terms"""
+
+    @staticmethod
+    def _phrase(term: str) -> str:
+        """Quote a term as an FTS5 phrase so it is matched as a literal substring"""
+        return '"' + term.replace('"', '""') + '"'
+
+    def _match(self, entity: Type[Any], column_names: Tuple[str, ...], term: str) -> Tuple[Any, ColumnElement[bool]]:
+        name = fts_table_name(entity.__tablename__)
+        fts = table(name, column("rowid"))
+        query = "{" + " ".join(column_names) + "} : " + self._phrase(term)
+        return fts, literal_column(name).op("MATCH")(query)
+
+    def _uses_index(self, entity: Type[Any], column_names: Tuple[str, ...], term: str) -> bool:
+        indexed = set(self.searchable_columns(entity))
+        return len(term) >= MIN_TRIGRAM_LENGTH and all(name in indexed for name in column_names)
+
+    def contains(self, entity: Type[Any], column_name: str, term: str) -> ColumnElement[bool]:
+        if not self._uses_index(entity, (column_name,), term):
+            return super().contains(entity, column_name, term)
+        fts, match = self._match(entity, (column_name,), term)
+        return entity.id.in_(select(fts.c.rowid).where(match))
+
+    def candidates(self, entity: Type[Any], term: str, limit: int) -> Select:
+        column_names = self.searchable_columns(entity)
+        if not self._uses_index(entity, column_names, term):
+            return super().candidates(entity, term, limit)
+        fts, match = self._match(entity, column_names, term)
+        # bm25() is lower for better matches
+        rank = func.bm25(literal_column(fts.name))
+        return (
+            select(fts.c.rowid.label("id"), (-rank).label("relevance"))
+            .where(match)
+            .order_by(rank)
+            .limit(limit)
+        )
+
+
+_BACKENDS: Dict[str, TextSearch] = {
+    "postgresql": TrigramTextSearch(),
+    "sqlite": Fts5TextSearch(),
+}
+_FALLBACK = LikeTextSearch()
+
+
+def get_text_search(dialect_name: str) -> TextSearch:
+    """Get the text search backend for a database dialect"""
+    return _BACKENDS.get(dialect_name, _FALLBACK)
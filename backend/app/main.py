@@ -1,9 +1,20 @@
+from time import perf_counter
+
+_imports_started = perf_counter()
+
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
-from app.infrastructure.database.connection import create_db_and_tables
-from app.infrastructure.database.seed_data import seed_data
+from app.core.dependencies import is_superuser_token
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, MetricsReporter, metrics_exporter
+from app.core.profiling import RequestProfilerMiddleware
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.startup import StartupTimer, logger as startup_logger
+from app.infrastructure.database.connection import engine, warm_up_pool
+from app.infrastructure.database.setup import setup_database, verify_schema
+from app.infrastructure.jobs.scheduler import scheduler
 from app.presentation.api.v1.api import api_router
 
 # Import persistence entities so SQLModel can register them
@@ -11,16 +22,39 @@ from app.infrastructure.persistence.school_entity import SchoolEntity
 from app.infrastructure.persistence.student_entity import StudentEntity
 from app.infrastructure.persistence.invoice_entity import InvoiceEntity
 from app.infrastructure.persistence.user_entity import UserEntity
+from app.infrastructure.persistence.billing_run_entity import BillingRunEntity
+from app.infrastructure.persistence.invoice_archive_run_entity import InvoiceArchiveRunEntity
+
+IMPORT_SECONDS = perf_counter() - _imports_started
+
+# Event loop lag sampling and metrics snapshots of this worker
+metrics_reporter = MetricsReporter(metrics_exporter, lag_interval_ms=settings.EVENT_LOOP_LAG_INTERVAL_MS)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
-    create_db_and_tables()
-    await seed_data()
+    timer = StartupTimer()
+    timer.record("imports", IMPORT_SECONDS)
+    if settings.STARTUP_SCHEMA_MODE == "verify":
+        with timer.phase("schema check"):
+            verify_schema(engine)
+    else:
+        await setup_database(engine, timer=timer)
+    with timer.phase("pool warm-up"):
+        warm_up_pool(settings.DB_POOL_WARMUP_CONNECTIONS)
+    if settings.SCHEDULER_ENABLED:
+        with timer.phase("scheduler"):
+            await scheduler.start()
+    if settings.METRICS_ENABLED:
+        await metrics_reporter.start()
+    app.state.startup = timer
+    startup_logger.info(timer.summary())
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    await scheduler.stop()
+    await metrics_reporter.stop()
 
 
 def create_app() -> FastAPI:
@@ -42,6 +76,30 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Profile single requests on demand (superusers only); inside the query
+    # tracking below so profiles can report the request's queries
+    if settings.PROFILER_ENABLED:
+        app.add_middleware(
+            RequestProfilerMiddleware,
+            authorize=is_superuser_token,
+            max_concurrent=settings.PROFILER_MAX_CONCURRENT,
+            interval_ms=settings.PROFILER_INTERVAL_MS,
+            max_seconds=settings.PROFILER_MAX_SECONDS,
+        )
+
+    # Track queries per request and flag likely N+1 patterns
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        expose_headers=settings.DEBUG,
+        budget=settings.REQUEST_QUERY_BUDGET,
+        n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+    )
+
+    # Per-route latency, status codes and requests in flight (outermost, so it
+    # times the whole request)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
     # Include API routes
     app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -50,6 +108,12 @@ def create_app() -> FastAPI:
         """Health check endpoint for Docker health checks"""
         return {"status": "healthy", "service": "mattilda-backend"}
 
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        def metrics():
+            """Prometheus metrics of every worker of this host"""
+            return PlainTextResponse(metrics_exporter.collect(), media_type=METRICS_CONTENT_TYPE)
+
     return app
 
 
@@ -2,8 +2,11 @@ from fastapi import APIRouter
 from app.presentation.api.v1.school_controller import router as school_router
 from app.presentation.api.v1.student_controller import router as student_router
 from app.presentation.api.v1.invoice_controller import router as invoice_router
+from app.presentation.api.v1.billing_run_controller import router as billing_run_router
 from app.presentation.api.v1.cache_controller import router as cache_router
 from app.presentation.api.v1.auth_controller import router as auth_router
+from app.presentation.api.v1.search_controller import router as search_router
+from app.presentation.api.v1.diagnostics_controller import router as diagnostics_router
 
 api_router = APIRouter()
 
@@ -12,4 +15,7 @@ api_router.include_router(auth_router)
 api_router.include_router(school_router)
 api_router.include_router(student_router)
 api_router.include_router(invoice_router)
+api_router.include_router(billing_run_router)
+api_router.include_router(search_router)
 api_router.include_router(cache_router)
+api_router.include_router(diagnostics_router)
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Depends
+from sqlmodel import Session
+from app.infrastructure.database.connection import get_session
+from app.infrastructure.repositories.billing_run_repository import BillingRunRepository
+from app.infrastructure.repositories.school_repository import SchoolRepository
+from app.application.services.billing_run_service import BillingRunService
+from app.application.dtos.billing_run_dto import BillingRunCreateDTO, BillingRunResponseDTO
+from app.core.cache import invalidate_cache_pattern
+from app.core.dependencies import get_current_active_user
+from app.domain.models.user import User
+
+router = APIRouter(prefix="/billing-runs", tags=["billing runs"])
+
+
+def get_billing_run_service(session: Session = Depends(get_session)) -> BillingRunService:
+    """Dependency to get billing run service"""
+    return BillingRunService(BillingRunRepository(session), SchoolRepository(session))
+
+
+@router.post("/", response_model=BillingRunResponseDTO)
+async def create_billing_run(
+    billing_run: BillingRunCreateDTO,
+    current_user: User = Depends(get_current_active_user),
+    billing_run_service: BillingRunService = Depends(get_billing_run_service)
+):
+    """Generate invoices for every matching student of a school (requires authentication, idempotent per run_id)"""
+    try:
+        result = await billing_run_service.run_billing(billing_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not result.replayed and result.invoice_count:
+        # Invalidate invoice and related caches
+        invalidate_cache_pattern("api:get_invoices")
+        invalidate_cache_pattern("api:search")
+        invalidate_cache_pattern("api:get_student_account_statement")
+        invalidate_cache_pattern("api:get_school_account_statement")
+    return result
+
+
+@router.get("/{run_id}", response_model=BillingRunResponseDTO)
+async def get_billing_run(
+    run_id: str,
+    current_user: User = Depends(get_current_active_user),
+    billing_run_service: BillingRunService = Depends(get_billing_run_service)
+):
+    """Get a billing run summary by run ID (requires authentication)"""
+    billing_run = await billing_run_service.get_billing_run(run_id)
+    if not billing_run:
+        raise HTTPException(status_code=404, detail="Billing run not found")
+    return billing_run
@@ -0,0 +1,127 @@
+"""
+Diagnostics endpoints for inspecting runtime performance (admin only).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from app.core.profiling import profile_store
+from app.infrastructure.database.connection import query_recorder
+from app.infrastructure.jobs.scheduler import scheduler
+from app.core.dependencies import get_current_superuser
+from app.domain.models.user import User
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/queries/slow")
+async def get_slow_queries(
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get the most recent slow queries with sampled parameters and EXPLAIN plans."""
+    return {
+        "status": "success",
+        "threshold_ms": query_recorder.threshold_ms,
+        "data": query_recorder.slow_queries()
+    }
+
+
+@router.get("/queries/stats")
+async def get_query_stats(
+    limit: int = Query(20, ge=1, le=100, description="Number of statements to return"),
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get per-statement latency totals, highest total time first."""
+    return {
+        "status": "success",
+        "data": query_recorder.statement_stats(limit)
+    }
+
+
+@router.delete("/queries")
+async def reset_query_stats(
+    current_user: User = Depends(get_current_superuser)
+):
+    """Clear the slow query log and statement statistics."""
+    cleared = query_recorder.reset()
+    return {
+        "status": "success",
+        "message": f"Cleared {cleared} slow query entries",
+        "entries_cleared": cleared
+    }
+
+
+@router.get("/jobs")
+async def get_job_stats(
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get the scheduled jobs with their run counts, failures, timeouts and durations."""
+    return {
+        "status": "success",
+        "scheduler_running": scheduler.started,
+        "leader": scheduler.leading,
+        "data": scheduler.stats()
+    }
+
+
+@router.get("/startup")
+async def get_startup_breakdown(
+    request: Request,
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get how long this worker's startup phases took."""
+    timer = getattr(request.app.state, "startup", None)
+    return {
+        "status": "success",
+        "data": timer.to_dict() if timer else None
+    }
+
+
+@router.get("/profiles")
+async def list_profiles(
+    current_user: User = Depends(get_current_superuser)
+):
+    """List the stored request profiles, newest first (request with X-Profile: 1 or ?profile=1 to capture one)."""
+    return {
+        "status": "success",
+        "data": profile_store.list()
+    }
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get a request profile with its sampled stacks, database queries and cache activity."""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {
+        "status": "success",
+        "data": profile
+    }
+
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded(
+    profile_id: str,
+    current_user: User = Depends(get_current_superuser)
+):
+    """Get a request profile as folded stacks (input for flamegraph.pl, speedscope or inferno)."""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.folded())
+
+
+@router.delete("/profiles")
+async def clear_profiles(
+    current_user: User = Depends(get_current_superuser)
+):
+    """Delete every stored request profile."""
+    cleared = profile_store.clear()
+    return {
+        "status": "success",
+        "message": f"Deleted {cleared} profiles",
+        "profiles_deleted": cleared
+    }
@@ -1,24 +1,41 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Body, HTTPException, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
 from datetime import date
 from app.infrastructure.database.connection import get_session
 from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.student_repository import StudentRepository
 from app.application.services.invoice_service import InvoiceService
 from app.application.dtos.invoice_dto import InvoiceCreateDTO, InvoiceUpdateDTO, InvoiceResponseDTO, PaymentRecordDTO, InvoiceFilterDTO
 from app.domain.enums import InvoiceStatus, PaymentMethod
+from app.domain.exceptions import InvoiceNotPayableError
+from app.application.dtos.bulk_dto import BulkCreateResultDTO
+from app.application.dtos.payment_import_dto import PaymentImportResultDTO
+from app.core.config import settings
 from app.core.pagination import PaginationParams, PaginatedResponse
+from app.core.fields import parse_fields
+from app.core.streaming import iter_lines
 from app.core.cache import cache_api_response, invalidate_cache_pattern
 from app.core.dependencies import get_current_active_user, get_current_user_optional
 from app.domain.models.user import User
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
+# Content types accepted by the payment import when no format is given
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
 
 def get_invoice_service(session: Session = Depends(get_session)) -> InvoiceService:
     """Dependency to get invoice service"""
     invoice_repository = InvoiceRepository(session)
-    return InvoiceService(invoice_repository)
+    student_repository = StudentRepository(session)
+    return InvoiceService(invoice_repository, student_repository)
 
 
 @router.get("/", response_model=PaginatedResponse[InvoiceResponseDTO])
@@ -26,6 +43,9 @@ def get_invoice_service(session: Session = Depends(get_session)) -> InvoiceServi
 async def get_invoices(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Items per page"),
+    include_total: bool = Query(True, description="Compute total and pages (false skips counting)"),
+    cursor: Optional[str] = Query(None, description="Continue after a previous page's next_cursor (keyset pagination)"),
+    fields: Optional[str] = Query(None, description="Comma separated response fields to return (sparse fieldset)"),
     invoice_number: Optional[str] = Query(None, description="Filter by invoice number (partial match)"),
     student_id: Optional[int] = Query(None, description="Filter by student ID"),
     school_id: Optional[int] = Query(None, description="Filter by school ID"),
@@ -48,7 +68,7 @@ async def get_invoices(
     invoice_service: InvoiceService = Depends(get_invoice_service)
 ):
     """Get invoices with optional filtering and pagination (requires authentication)"""
-    pagination = PaginationParams(page=page, size=size)
+    pagination = PaginationParams(page=page, size=size, include_total=include_total, cursor=cursor)
     
     # Create filter DTO
     filters = InvoiceFilterDTO(
@@ -72,27 +92,66 @@ async def get_invoices(
         payment_method=payment_method
     )
     
-    # Check if any filters are applied
-    if any(v is not None for v in filters.model_dump().values()):
-        return await invoice_service.get_invoices_with_filters(filters, pagination)
-    else:
-        return await invoice_service.get_all_invoices(pagination)
+    try:
+        # Sparse fieldset: only the requested columns are selected, no DTO validation
+        field_list = parse_fields(fields, InvoiceResponseDTO.model_fields)
+        if field_list:
+            result = await invoice_service.get_invoices_projection(filters, pagination, field_list)
+            return JSONResponse(content=jsonable_encoder(result))
+        
+        # Check if any filters are applied
+        if any(v is not None for v in filters.model_dump().values()):
+            return await invoice_service.get_invoices_with_filters(filters, pagination)
+        else:
+            return await invoice_service.get_all_invoices(pagination)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{invoice_id}", response_model=InvoiceResponseDTO)
 @cache_api_response()
 async def get_invoice(
-    invoice_id: int, 
+    invoice_id: int,
+    fields: Optional[str] = Query(None, description="Comma separated response fields to return (sparse fieldset)"),
     current_user: User = Depends(get_current_active_user),
     invoice_service: InvoiceService = Depends(get_invoice_service)
 ):
     """Get an invoice by ID (requires authentication)"""
+    try:
+        field_list = parse_fields(fields, InvoiceResponseDTO.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if field_list:
+        invoice = await invoice_service.get_invoice_projection(invoice_id, field_list)
+        if not invoice:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        return JSONResponse(content=jsonable_encoder(invoice))
+    
     invoice = await invoice_service.get_invoice_by_id(invoice_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     return invoice
 
 
+@router.post("/bulk", response_model=BulkCreateResultDTO)
+async def bulk_create_invoices(
+    rows: List[Dict[str, Any]] = Body(..., description="Invoice create payloads"),
+    current_user: User = Depends(get_current_active_user),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """Create many invoices in one transaction, reporting per-row errors (requires authentication)"""
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_ROWS} rows per request")
+    result = await invoice_service.bulk_create_invoices(rows)
+    # Invalidate once for the whole batch
+    if result.created:
+        invalidate_cache_pattern("api:get_invoices")
+        invalidate_cache_pattern("api:search")
+        invalidate_cache_pattern("api:get_student_account_statement")
+        invalidate_cache_pattern("api:get_school_account_statement")
+    return result
+
+
 @router.post("/", response_model=InvoiceResponseDTO)
 async def create_invoice(
     invoice: InvoiceCreateDTO,
@@ -103,6 +162,7 @@ async def create_invoice(
     result = await invoice_service.create_invoice(invoice)
     # Invalidate invoice and related caches
     invalidate_cache_pattern("api:get_invoices")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern("api:get_student_account_statement")
     invalidate_cache_pattern("api:get_school_account_statement")
     return result
@@ -115,11 +175,15 @@ async def update_invoice(
     invoice_service: InvoiceService = Depends(get_invoice_service)
 ):
     """Update an invoice by ID"""
-    invoice = await invoice_service.update_invoice(invoice_id, invoice_update)
+    try:
+        invoice = await invoice_service.update_invoice(invoice_id, invoice_update)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     # Invalidate invoice and related caches
     invalidate_cache_pattern("api:get_invoices")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern(f"api:get_invoice:{invoice_id}")
     invalidate_cache_pattern("api:get_student_account_statement")
     invalidate_cache_pattern("api:get_school_account_statement")
@@ -137,28 +201,64 @@ async def delete_invoice(
         raise HTTPException(status_code=404, detail="Invoice not found")
     # Invalidate invoice and related caches
     invalidate_cache_pattern("api:get_invoices")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern(f"api:get_invoice:{invoice_id}")
     invalidate_cache_pattern("api:get_student_account_statement")
     invalidate_cache_pattern("api:get_school_account_statement")
     return {"message": "Invoice deleted successfully"}
 
 
+@router.post("/payments/import", response_model=PaymentImportResultDTO)
+async def import_payments(
+    request: Request,
+    file_format: Optional[str] = Query(None, alias="format", description="csv or ndjson (default: from Content-Type)"),
+    current_user: User = Depends(get_current_active_user),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """
+    Apply a streamed CSV or NDJSON file of payments (requires authentication).
+
+    Rows reference invoices by ``invoice_id`` or ``invoice_number`` and carry
+    ``payment_date``, ``payment_method`` and optional ``notes``.
+    """
+    if not file_format:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        file_format = IMPORT_CONTENT_TYPES.get(content_type, content_type)
+    try:
+        result = await invoice_service.import_payments(
+            iter_lines(request.stream()), file_format, settings.PAYMENT_IMPORT_BATCH_SIZE
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result.matched:
+        # Invalidate once for the whole import
+        invalidate_cache_pattern("api:get_invoices")
+        invalidate_cache_pattern("api:get_invoice")
+        invalidate_cache_pattern("api:search")
+        invalidate_cache_pattern("api:get_student_account_statement")
+        invalidate_cache_pattern("api:get_school_account_statement")
+    return result
+
+
 @router.post("/{invoice_id}/payment", response_model=InvoiceResponseDTO)
 async def record_payment(
     invoice_id: int,
     payment: PaymentRecordDTO,
     invoice_service: InvoiceService = Depends(get_invoice_service)
 ):
-    """Record a payment for an invoice"""
+    """Record a payment for an invoice (409 if it is already paid or cancelled)"""
     try:
         invoice = await invoice_service.record_payment(invoice_id, payment)
         if not invoice:
             raise HTTPException(status_code=404, detail="Invoice not found")
         # Invalidate invoice and related caches (payment changes financial data)
         invalidate_cache_pattern("api:get_invoices")
+        invalidate_cache_pattern("api:search")
         invalidate_cache_pattern(f"api:get_invoice:{invoice_id}")
         invalidate_cache_pattern("api:get_student_account_statement")
         invalidate_cache_pattern("api:get_school_account_statement")
         return invoice
+    except InvoiceNotPayableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,14 +1,19 @@
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
 from datetime import date
 from app.infrastructure.database.connection import get_session
 from app.infrastructure.repositories.school_repository import SchoolRepository
 from app.infrastructure.repositories.student_repository import StudentRepository
 from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.invoice_archive_repository import InvoiceArchiveRepository
 from app.application.services.school_service import SchoolService
 from app.application.dtos.school_dto import SchoolCreateDTO, SchoolUpdateDTO, SchoolResponseDTO, SchoolFilterDTO, SchoolAccountStatementDTO
+from app.core.config import settings
 from app.core.pagination import PaginationParams, PaginatedResponse
+from app.core.fields import parse_fields
 from app.core.cache import cache_api_response, cache_static_data, invalidate_cache_pattern
 from app.core.dependencies import get_current_active_user, get_current_user_optional
 from app.domain.models.user import User
@@ -21,7 +26,8 @@ def get_school_service(session: Session = Depends(get_session)) -> SchoolService
     school_repository = SchoolRepository(session)
     student_repository = StudentRepository(session)
     invoice_repository = InvoiceRepository(session)
-    return SchoolService(school_repository, student_repository, invoice_repository)
+    archive_repository = InvoiceArchiveRepository(session, settings.ARCHIVE_DIR)
+    return SchoolService(school_repository, student_repository, invoice_repository, archive_repository)
 
 
 @router.get("/", response_model=PaginatedResponse[SchoolResponseDTO])
@@ -29,6 +35,9 @@ def get_school_service(session: Session = Depends(get_session)) -> SchoolService
 async def get_schools(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Items per page"),
+    include_total: bool = Query(True, description="Compute total and pages (false skips counting)"),
+    cursor: Optional[str] = Query(None, description="Continue after a previous page's next_cursor (keyset pagination)"),
+    fields: Optional[str] = Query(None, description="Comma separated response fields to return (sparse fieldset)"),
     name: Optional[str] = Query(None, description="Filter by school name (partial match)"),
     address: Optional[str] = Query(None, description="Filter by address (partial match)"),
     city: Optional[str] = Query(None, description="Filter by city (partial match)"),
@@ -42,7 +51,7 @@ async def get_schools(
     school_service: SchoolService = Depends(get_school_service)
 ):
     """Get schools with optional filtering and pagination (public endpoint with optional auth)"""
-    pagination = PaginationParams(page=page, size=size)
+    pagination = PaginationParams(page=page, size=size, include_total=include_total, cursor=cursor)
     
     # Create filter DTO
     filters = SchoolFilterDTO(
@@ -57,21 +66,41 @@ async def get_schools(
         is_active=is_active
     )
     
-    # Check if any filters are applied
-    if any(v is not None for v in filters.model_dump().values()):
-        return await school_service.get_schools_with_filters(filters, pagination)
-    else:
-        return await school_service.get_all_schools(pagination)
+    try:
+        # Sparse fieldset: only the requested columns are selected, no DTO validation
+        field_list = parse_fields(fields, SchoolResponseDTO.model_fields)
+        if field_list:
+            result = await school_service.get_schools_projection(filters, pagination, field_list)
+            return JSONResponse(content=jsonable_encoder(result))
+        
+        # Check if any filters are applied
+        if any(v is not None for v in filters.model_dump().values()):
+            return await school_service.get_schools_with_filters(filters, pagination)
+        else:
+            return await school_service.get_all_schools(pagination)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{school_id}", response_model=SchoolResponseDTO)
 @cache_static_data()
 async def get_school(
-    school_id: int, 
+    school_id: int,
+    fields: Optional[str] = Query(None, description="Comma separated response fields to return (sparse fieldset)"),
     current_user: Optional[User] = Depends(get_current_user_optional),
     school_service: SchoolService = Depends(get_school_service)
 ):
     """Get a school by ID (public endpoint with optional auth)"""
+    try:
+        field_list = parse_fields(fields, SchoolResponseDTO.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if field_list:
+        school = await school_service.get_school_projection(school_id, field_list)
+        if not school:
+            raise HTTPException(status_code=404, detail="School not found")
+        return JSONResponse(content=jsonable_encoder(school))
+    
     school = await school_service.get_school_by_id(school_id)
     if not school:
         raise HTTPException(status_code=404, detail="School not found")
@@ -88,6 +117,7 @@ async def create_school(
     result = await school_service.create_school(school)
     # Invalidate school-related caches
     invalidate_cache_pattern("api:get_schools")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern("static:get_school")
     return result
 
@@ -100,11 +130,15 @@ async def update_school(
     school_service: SchoolService = Depends(get_school_service)
 ):
     """Update a school by ID (requires authentication)"""
-    school = await school_service.update_school(school_id, school_update)
+    try:
+        school = await school_service.update_school(school_id, school_update)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not school:
         raise HTTPException(status_code=404, detail="School not found")
     # Invalidate school-related caches
     invalidate_cache_pattern("api:get_schools")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern(f"static:get_school:{school_id}")
     invalidate_cache_pattern("api:get_school_account_statement")
     return school
@@ -122,6 +156,7 @@ async def delete_school(
         raise HTTPException(status_code=404, detail="School not found")
     # Invalidate school-related caches
     invalidate_cache_pattern("api:get_schools")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern(f"static:get_school:{school_id}")
     invalidate_cache_pattern("api:get_school_account_statement")
     return {"message": "School deleted successfully"}
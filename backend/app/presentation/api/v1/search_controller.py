@@ -0,0 +1,34 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlmodel import Session
+from app.infrastructure.database.connection import get_session
+from app.infrastructure.repositories.search_repository import SearchRepository
+from app.application.services.search_service import SearchService
+from app.application.dtos.search_dto import SearchResponseDTO
+from app.core.cache import cache_api_response
+from app.core.dependencies import get_current_active_user
+from app.domain.models.user import User
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+def get_search_service(session: Session = Depends(get_session)) -> SearchService:
+    """Dependency to get search service"""
+    return SearchService(SearchRepository(session))
+
+
+@router.get("/", response_model=SearchResponseDTO)
+@cache_api_response()
+async def search(
+    q: str = Query(..., min_length=1, max_length=100, description="Text to search for (partial match)"),
+    types: Optional[str] = Query(None, description="Comma separated entity types: student, school, invoice"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    current_user: User = Depends(get_current_active_user),
+    search_service: SearchService = Depends(get_search_service)
+):
+    """Search students, schools and invoices with ranked results (requires authentication)"""
+    entity_types = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    try:
+        return await search_service.search(q, entity_types, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
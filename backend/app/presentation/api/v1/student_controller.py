@@ -1,10 +1,13 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Body, HTTPException, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
 from datetime import date
 from app.infrastructure.database.connection import get_session
 from app.infrastructure.repositories.student_repository import StudentRepository
 from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.invoice_archive_repository import InvoiceArchiveRepository
 from app.infrastructure.repositories.school_repository import SchoolRepository
 from app.application.services.student_service import StudentService
 from app.application.dtos.student_dto import (
@@ -14,7 +17,11 @@ from app.application.dtos.student_dto import (
     StudentFilterDTO,
     StudentAccountStatementDTO
 )
+from app.application.dtos.bulk_dto import BulkCreateResultDTO
+from app.core.config import settings
 from app.core.pagination import PaginationParams, PaginatedResponse
+from app.core.fields import parse_fields
+from app.core.params import parse_ids
 from app.core.cache import cache_api_response, cache_static_data, invalidate_cache_pattern
 from app.core.dependencies import get_current_active_user, get_current_user_optional
 from app.domain.models.user import User
@@ -27,7 +34,8 @@ def get_student_service(session: Session = Depends(get_session)) -> StudentServi
     student_repository = StudentRepository(session)
     invoice_repository = InvoiceRepository(session)
     school_repository = SchoolRepository(session)
-    return StudentService(student_repository, invoice_repository, school_repository)
+    archive_repository = InvoiceArchiveRepository(session, settings.ARCHIVE_DIR)
+    return StudentService(student_repository, invoice_repository, school_repository, archive_repository)
 
 
 @router.get("/", response_model=PaginatedResponse[StudentResponseDTO])
@@ -35,6 +43,9 @@ def get_student_service(session: Session = Depends(get_session)) -> StudentServi
 async def get_students(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Items per page"),
+    include_total: bool = Query(True, description="Compute total and pages (false skips counting)"),
+    cursor: Optional[str] = Query(None, description="Continue after a previous page's next_cursor (keyset pagination)"),
+    fields: Optional[str] = Query(None, description="Comma separated response fields to return (sparse fieldset)"),
     first_name: Optional[str] = Query(None, description="Filter by first name (partial match)"),
     last_name: Optional[str] = Query(None, description="Filter by last name (partial match)"),
     email: Optional[str] = Query(None, description="Filter by email (partial match)"),
@@ -45,11 +56,17 @@ async def get_students(
     enrollment_date: Optional[date] = Query(None, description="Filter by exact enrollment date"),
     address: Optional[str] = Query(None, description="Filter by address (partial match)"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    ids: Optional[str] = Query(None, description="Comma separated student IDs to fetch in one request (at most 100)"),
     current_user: Optional[User] = Depends(get_current_user_optional),
     student_service: StudentService = Depends(get_student_service)
 ):
     """Get students with optional filtering and pagination (public endpoint with optional auth)"""
-    pagination = PaginationParams(page=page, size=size)
+    pagination = PaginationParams(page=page, size=size, include_total=include_total, cursor=cursor)
+    
+    try:
+        id_list = parse_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Create filter DTO
     filters = StudentFilterDTO(
@@ -62,30 +79,70 @@ async def get_students(
         school_id=school_id,
         enrollment_date=enrollment_date,
         address=address,
-        is_active=is_active
+        is_active=is_active,
+        ids=id_list
     )
     
-    # Check if any filters are applied
-    if any(v is not None for v in filters.model_dump().values()):
-        return await student_service.get_students_with_filters(filters, pagination)
-    else:
-        return await student_service.get_all_students(pagination)
+    try:
+        # Sparse fieldset: only the requested columns are selected, no DTO validation
+        field_list = parse_fields(fields, StudentResponseDTO.model_fields)
+        if field_list:
+            result = await student_service.get_students_projection(filters, pagination, field_list)
+            return JSONResponse(content=jsonable_encoder(result))
+        
+        # Check if any filters are applied
+        if any(v is not None for v in filters.model_dump().values()):
+            return await student_service.get_students_with_filters(filters, pagination)
+        else:
+            return await student_service.get_all_students(pagination)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{student_id}", response_model=StudentResponseDTO)
 @cache_static_data()
 async def get_student(
-    student_id: int, 
+    student_id: int,
+    fields: Optional[str] = Query(None, description="Comma separated response fields to return (sparse fieldset)"),
     current_user: Optional[User] = Depends(get_current_user_optional),
     student_service: StudentService = Depends(get_student_service)
 ):
     """Get a student by ID (public endpoint with optional auth)"""
+    try:
+        field_list = parse_fields(fields, StudentResponseDTO.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if field_list:
+        student = await student_service.get_student_projection(student_id, field_list)
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
+        return JSONResponse(content=jsonable_encoder(student))
+    
     student = await student_service.get_student_by_id(student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
 
 
+@router.post("/bulk", response_model=BulkCreateResultDTO)
+async def bulk_create_students(
+    rows: List[Dict[str, Any]] = Body(..., description="Student create payloads"),
+    current_user: User = Depends(get_current_active_user),
+    student_service: StudentService = Depends(get_student_service)
+):
+    """Create many students in one transaction, reporting per-row errors (requires authentication)"""
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_ROWS} rows per request")
+    result = await student_service.bulk_create_students(rows)
+    # Invalidate once for the whole batch
+    if result.created:
+        invalidate_cache_pattern("api:get_students")
+        invalidate_cache_pattern("api:search")
+        invalidate_cache_pattern("static:get_student")
+        invalidate_cache_pattern("api:get_school_account_statement")
+    return result
+
+
 @router.post("/", response_model=StudentResponseDTO)
 async def create_student(
     student: StudentCreateDTO,
@@ -96,6 +153,7 @@ async def create_student(
     result = await student_service.create_student(student)
     # Invalidate student and school-related caches
     invalidate_cache_pattern("api:get_students")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern("static:get_student")
     invalidate_cache_pattern("api:get_school_account_statement")
     return result
@@ -109,11 +167,15 @@ async def update_student(
     student_service: StudentService = Depends(get_student_service)
 ):
     """Update a student by ID (requires authentication)"""
-    student = await student_service.update_student(student_id, student_update)
+    try:
+        student = await student_service.update_student(student_id, student_update)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     # Invalidate student and related caches
     invalidate_cache_pattern("api:get_students")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern(f"static:get_student:{student_id}")
     invalidate_cache_pattern("api:get_student_account_statement")
     invalidate_cache_pattern("api:get_school_account_statement")
@@ -132,6 +194,7 @@ async def delete_student(
         raise HTTPException(status_code=404, detail="Student not found")
     # Invalidate student and related caches
     invalidate_cache_pattern("api:get_students")
+    invalidate_cache_pattern("api:search")
     invalidate_cache_pattern(f"static:get_student:{student_id}")
     invalidate_cache_pattern("api:get_student_account_statement")
     invalidate_cache_pattern("api:get_school_account_statement")
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the API with weighted scenarios.
+
+By default the application from ``create_app()`` runs in-process, with its
+lifespan, on httpx's ASGI transport. It uses a throwaway SQLite database (or
+the one in DATABASE_URL), filled with the seeded synthetic dataset when it has
+fewer invoices than requested. With --url, the load goes to a running server
+instead, for example ``uvicorn app.main:app --workers 4``; load its database
+first with ``python -m app.infrastructure.database.synthetic_data``.
+
+The client authenticates once. Workers then pick scenarios by weight until
+--duration or --iterations runs out. Latency is reported per route (numeric
+path segments become ``{id}``), with percentiles and a histogram, and per
+scenario.
+
+    python -m benchmarks.load --duration 60 --concurrency 8
+    python -m benchmarks.load --url http://127.0.0.1:8000 --duration 120 --concurrency 32
+    python -m benchmarks.load --scenario student_statement=30 --scenario login_storm=0 --json report.json
+
+The in-process app runs database calls on the event loop, so it serializes
+requests: it shows per-request latency, and a uvicorn run shows throughput.
+"""
+
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open ended)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def route_of(method: str, path: str) -> str:
+    """Route label of a request: method and path with numeric segments as {id}"""
+    return f"{method} {NUMERIC_SEGMENT.sub('/{id}', path)}"
+
+
+@dataclass
+class LatencyStats:
+    """Latency samples (ms) and status codes of one route or scenario"""
+    samples: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    def add(self, elapsed_ms: float, status: int = 200) -> None:
+        self.samples.append(elapsed_ms)
+        self.statuses[status] += 1
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if status >= 400)
+
+    def histogram(self) -> List[int]:
+        """Samples per bucket of BUCKETS_MS, plus one for slower samples"""
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for sample in self.samples:
+            counts[bisect.bisect_left(BUCKETS_MS, sample)] += 1
+        return counts
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        samples = self.samples
+        return {
+            "count": len(samples),
+            "errors": self.errors,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "rps": len(samples) / seconds if seconds else 0.0,
+            "p50_ms": percentile(samples, 0.50),
+            "p90_ms": percentile(samples, 0.90),
+            "p99_ms": percentile(samples, 0.99),
+            "max_ms": max(samples),
+            "histogram": dict(zip([f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], self.histogram())),
+        }
+
+
+@dataclass
+class Targets:
+    """Ids the scenarios pick from, discovered through the API"""
+    school_ids: List[int]
+    student_ids: List[int]
+    invoice_ids: List[int]
+    invoice_total: int
+    history_start: date
+
+
+class LoadSession:
+    """An authenticated client that records the latency of every request per route"""
+
+    def __init__(self, client, prefix: str, username: str, password: str):
+        self.client = client
+        self.prefix = prefix
+        self.credentials = {"username": username, "password": password}
+        self.headers: Dict[str, str] = {}
+        self.routes: Dict[str, LatencyStats] = defaultdict(LatencyStats)
+        self.created = itertools.count(1)
+        self.run_tag = f"{os.getpid()}{int(perf_counter() * 1000) % 100000}"
+
+    async def request(self, method: str, path: str, *, authenticated: bool = True, **kwargs):
+        started = perf_counter()
+        response = await self.client.request(
+            method, self.prefix + path, headers=self.headers if authenticated else None, **kwargs
+        )
+        self.routes[route_of(method, path)].add((perf_counter() - started) * 1000, response.status_code)
+        return response
+
+    async def get(self, path: str, **params):
+        return await self.request("GET", path, params={key: value for key, value in params.items() if value is not None})
+
+    async def post(self, path: str, body: dict, authenticated: bool = True):
+        return await self.request("POST", path, json=body, authenticated=authenticated)
+
+    async def login(self) -> None:
+        response = await self.post("/auth/login", self.credentials, authenticated=False)
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def sample_ids(self, path: str, pages: int = 5, size: int = 100) -> tuple:
+        """Ids spread over the whole table (a few pages at even offsets) and the table's total"""
+        first = (await self.get(path, size=size, fields="id")).json()
+        total, last_page = first["total"] or 0, first["pages"] or 1
+        ids = [item["id"] for item in first["items"]]
+        for page in sorted({1 + index * (last_page - 1) // max(1, pages - 1) for index in range(pages)} - {1}):
+            ids.extend(item["id"] for item in (await self.get(path, size=size, fields="id", page=page)).json()["items"])
+        return ids, total
+
+    async def discover(self) -> Targets:
+        school_ids, _ = await self.sample_ids("/schools/", pages=1)
+        student_ids, _ = await self.sample_ids("/students/")
+        invoice_ids, invoice_total = await self.sample_ids("/invoices/")
+        if not (school_ids and student_ids and invoice_ids):
+            raise SystemExit("The database has no schools, students or invoices to load test")
+        oldest = (await self.get("/invoices/", size=1, page=invoice_total or 1, fields="invoice_date")).json()["items"]
+        history_start = date.fromisoformat(oldest[0]["invoice_date"]) if oldest else date.today() - timedelta(days=365)
+        self.routes.clear()  # discovery is not part of the measurement
+        return Targets(school_ids, student_ids, invoice_ids, invoice_total, min(history_start, date.today()))
+
+
+Scenario = Callable[[LoadSession, Targets, random.Random], Awaitable[None]]
+SCENARIOS: Dict[str, Scenario] = {}
+DEFAULT_WEIGHTS: Dict[str, float] = {}
+
+
+def scenario(name: str, weight: float):
+    def register(function: Scenario) -> Scenario:
+        SCENARIOS[name] = function
+        DEFAULT_WEIGHTS[name] = weight
+        return function
+    return register
+
+
+def random_range(targets: Targets, rng: random.Random, max_days: int = 180) -> tuple:
+    span = max(1, (date.today() - targets.history_start).days)
+    start = targets.history_start + timedelta(days=rng.randrange(span))
+    return start, min(date.today(), start + timedelta(days=rng.randint(7, max_days)))
+
+
+@scenario("invoice_filters", 30)
+async def invoice_filters(session: LoadSession, targets: Targets, rng: random.Random) -> None:
+    """A filtered, first-page invoice list as the dashboard issues them"""
+    date_from, date_to = random_range(targets, rng)
+    filters = rng.choice((
+        {"school_id": rng.choice(targets.school_ids), "status": rng.choice(("pending", "overdue"))},
+        {"student_id": rng.choice(targets.student_ids)},
+        {"invoice_date_from": date_from.isoformat(), "invoice_date_to": date_to.isoformat()},
+        {"status": "paid", "payment_method": rng.choice(("cash", "credit_card", "bank_transfer", "check"))},
+        {"total_amount_min": rng.choice((100, 500, 1000)), "status": "pending"},
+    ))
+    await session.get("/invoices/", size=rng.choice((10, 20, 50)), **filters)
+
+
+@scenario("deep_pagination", 10)
+async def deep_pagination(session: LoadSession, targets: Targets, rng: random.Random) -> None:
+    """A far offset page, then a walk of a few keyset (cursor) pages"""
+    size = 50
+    last_page = max(1, -(-targets.invoice_total // size))
+    await session.get("/invoices/", size=size, page=rng.randint(max(1, int(last_page * 0.8)), last_page))
+
+    cursor = None
+    for _ in range(rng.randint(3, 8)):
+        body = (await session.get("/invoices/", size=size, include_total="false", cursor=cursor)).json()
+        cursor = body.get("next_cursor")
+        if not cursor:
+            break
+
+
+@scenario("detail_reads", 15)
+async def detail_reads(session: LoadSession, targets: Targets, rng: random.Random) -> None:
+    await session.get(f"/invoices/{rng.choice(targets.invoice_ids)}")
+    await session.get(f"/students/{rng.choice(targets.student_ids)}")
+
+
+@scenario("student_statement", 15)
+async def student_statement(session: LoadSession, targets: Targets, rng: random.Random) -> None:
+    date_from, date_to = random_range(targets, rng, max_days=365)
+    await session.get(
+        f"/students/{rng.choice(targets.student_ids)}/account-statement",
+        date_from=date_from.isoformat(), date_to=date_to.isoformat(),
+    )
+
+
+@scenario("school_statement", 5)
+async def school_statement(session: LoadSession, targets: Targets, rng: random.Random) -> None:
+    date_from, date_to = random_range(targets, rng, max_days=365)
+    await session.get(
+        f"/schools/{rng.choice(targets.school_ids)}/account-statement",
+        date_from=date_from.isoformat(), date_to=date_to.isoformat(),
+    )
+
+
+@scenario("login_storm", 5)
+async def login_storm(session: LoadSession, targets: Targets, rng: random.Random) -> None:
+    """A burst of concurrent logins (password hashing dominates)"""
+    await asyncio.gather(*(
+        session.post("/auth/login", session.credentials, authenticated=False) for _ in range(rng.randint(3, 8))
+    ))
+
+
+@scenario("write_invalidate", 10)
+async def write_invalidate(session: LoadSession, targets: Targets, rng: random.Random) -> None:
+    """Create an invoice, pay it, and read what the writes invalidated"""
+    student_id = rng.choice(targets.student_ids)
+    student = (await session.get(f"/students/{student_id}")).json()
+    if "school_id" not in student:
+        return
+    today = date.today()
+    amount = round(rng.uniform(50, 1500), 2)
+    created = await session.post("/invoices/", {
+        "invoice_number": f"LOAD-{session.run_tag}-{next(session.created):07d}",
+        "student_id": student_id,
+        "school_id": student["school_id"],
+        "amount": amount,
+        "tax_amount": 0.0,
+        "description": "Load test invoice",
+        "invoice_date": today.isoformat(),
+        "due_date": (today + timedelta(days=30)).isoformat(),
+    })
+    await session.get("/invoices/", student_id=student_id, size=20)
+    if created.status_code == 200 and rng.random() < 0.5:
+        await session.post(
+            f"/invoices/{created.json()['id']}/payment",
+            {"payment_date": today.isoformat(), "payment_method": rng.choice(("cash", "bank_transfer"))},
+        )
+    await session.get(f"/students/{student_id}/account-statement")
+
+
+async def drive(session: LoadSession, weights: Dict[str, float], concurrency: int, duration: float,
+                iterations: Optional[int], seed: int) -> Dict[str, Any]:
+    """Run the scenarios from ``concurrency`` workers; returns the report"""
+    await session.login()
+    targets = await session.discover()
+    names = [name for name, weight in weights.items() if weight > 0]
+    scenario_weights = [weights[name] for name in names]
+    scenarios: Dict[str, LatencyStats] = defaultdict(LatencyStats)
+    remaining = itertools.count() if iterations is None else iter(range(iterations))
+    started = perf_counter()
+    deadline = started + duration
+
+    async def worker(number: int) -> None:
+        rng = random.Random(seed * 1000 + number)
+        while perf_counter() < deadline and next(remaining, None) is not None:
+            name = rng.choices(names, scenario_weights)[0]
+            scenario_started = perf_counter()
+            try:
+                await SCENARIOS[name](session, targets, rng)
+                scenarios[name].add((perf_counter() - scenario_started) * 1000)
+            except Exception as e:  # a failed scenario must not stop the run
+                scenarios[name].add((perf_counter() - scenario_started) * 1000, 599)
+                print(f"⚠️  {name}: {type(e).__name__}: {e}", file=sys.stderr)
+
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    seconds = perf_counter() - started
+    requests = sum(len(stats.samples) for stats in session.routes.values())
+    return {
+        "seconds": seconds,
+        "concurrency": concurrency,
+        "requests": requests,
+        "rps": requests / seconds if seconds else 0.0,
+        "targets": {"schools": len(targets.school_ids), "students": len(targets.student_ids), "invoices": targets.invoice_total},
+        "routes": {route: stats.summary(seconds) for route, stats in sorted(session.routes.items())},
+        "scenarios": {name: stats.summary(seconds) for name, stats in sorted(scenarios.items())},
+    }
+
+
+def load_synthetic_data(schools: int, students: int, invoices: int, seed: int) -> None:
+    """Fill the application database with the synthetic dataset unless it already holds enough invoices"""
+    from sqlmodel import Session, func, select
+    from app.infrastructure.database.connection import engine
+    from app.infrastructure.database.synthetic_data import DatasetSpec, load_dataset
+    from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+
+    with Session(engine) as session:
+        existing = session.exec(select(func.count()).select_from(InvoiceEntity)).one()
+    if existing >= invoices:
+        print(f"📦 Using the {existing} invoices already in the database")
+        return
+    students_per_school = max(1, students // schools)
+    spec = DatasetSpec(schools, students_per_school, max(1, invoices // (schools * students_per_school)), seed=seed)
+    result = load_dataset(engine, spec)
+    print(f"📦 Loaded {result.schools} schools, {result.students} students and {result.invoices} invoices in {result.seconds:.1f}s")
+
+
+async def run(args, weights: Dict[str, float]) -> Dict[str, Any]:
+    import httpx
+    from app.core.config import settings
+
+    username = args.username or settings.ADMIN_USERNAME
+    password = args.password or settings.ADMIN_PASSWORD
+    timeout = httpx.Timeout(60.0)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            session = LoadSession(client, settings.API_V1_STR, username, password)
+            return await drive(session, weights, args.concurrency, args.duration, args.iterations, args.seed)
+
+    from app.main import create_app
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        load_synthetic_data(args.schools, args.students, args.invoices, args.seed)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=timeout) as client:
+            session = LoadSession(client, settings.API_V1_STR, username, password)
+            return await drive(session, weights, args.concurrency, args.duration, args.iterations, args.seed)
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"\n🚀 {report['requests']} requests in {report['seconds']:.1f}s ({report['rps']:.1f} req/s), "
+        f"concurrency {report['concurrency']}\n"
+    )
+    for title, rows in (("route", report["routes"]), ("scenario", report["scenarios"])):
+        width = max([len(title)] + [len(name) for name in rows])
+        print(f"{title:<{width}} {'count':>7} {'errors':>7} {'req/s':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        print("-" * (width + 64))
+        for name, row in rows.items():
+            print(
+                f"{name:<{width}} {row['count']:>7} {row['errors']:>7} {row['rps']:>7.1f} {row['p50_ms']:>9.1f} "
+                f"{row['p90_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+            )
+        print()
+
+    print("Latency histogram per route (requests per bucket, upper bound in ms)\n")
+    width = max(len(route) for route in report["routes"])
+    labels = [str(bound) for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+    print(f"{'route':<{width}} " + " ".join(f"{label:>6}" for label in labels))
+    for route, row in report["routes"].items():
+        print(f"{route:<{width}} " + " ".join(f"{count or '.':>6}" for count in row["histogram"].values()))
+    failed = {route: row["statuses"] for route, row in report["routes"].items() if row["errors"]}
+    if failed:
+        print("\n⚠️  Error responses: " + "; ".join(f"{route} {statuses}" for route, statuses in failed.items()))
+
+
+def parse_weights(overrides: List[str]) -> Dict[str, float]:
+    weights = dict(DEFAULT_WEIGHTS)
+    for override in overrides:
+        name, _, weight = override.partition("=")
+        if name not in SCENARIOS or not weight:
+            raise SystemExit(f"Invalid --scenario {override!r}; scenarios: {', '.join(SCENARIOS)}")
+        weights[name] = float(weight)
+    if not any(weight > 0 for weight in weights.values()):
+        raise SystemExit("Every scenario has weight 0")
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with weighted scenarios")
+    parser.add_argument("--url", help="Base URL of a running server (default: run create_app() in-process)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--iterations", type=int, help="Stop after this many scenario runs")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent workers")
+    parser.add_argument("--scenario", action="append", default=[], metavar="NAME=WEIGHT",
+                        help=f"Override a scenario weight ({', '.join(f'{k}={v:g}' for k, v in DEFAULT_WEIGHTS.items())})")
+    parser.add_argument("--schools", type=int, default=20, help="Schools in the synthetic dataset (in-process)")
+    parser.add_argument("--students", type=int, default=2_000, help="Students in the synthetic dataset (in-process)")
+    parser.add_argument("--invoices", type=int, default=50_000, help="Invoices in the synthetic dataset (in-process)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the data and the scenarios")
+    parser.add_argument("--username", help="Login user (default: ADMIN_USERNAME)")
+    parser.add_argument("--password", help="Login password (default: ADMIN_PASSWORD)")
+    parser.add_argument("--json", type=Path, help="Also write the report to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the application's warnings (slow queries, N+1)")
+    args = parser.parse_args()
+    weights = parse_weights(args.scenario)
+    if not args.verbose:
+        logging.getLogger("app").setLevel(logging.ERROR)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    if not args.url and "DATABASE_URL" not in os.environ:
+        database = Path(tempfile.mkdtemp()) / "load.db"
+        os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ.setdefault("DEBUG", "false")
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+    report = asyncio.run(run(args, weights))
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n✅ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
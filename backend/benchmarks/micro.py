@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the request hot path, compared against a JSON baseline.
+
+Times the cache key and cache decorator, the entity/domain mappers, domain
+validation, response DTOs, pagination, JWT verification and statement
+aggregation on a seeded synthetic dataset. Results are compared with the
+baseline file (written on the first run) and the run fails when a benchmark is
+slower than the baseline by more than --threshold.
+
+    python -m benchmarks.micro                      # compare with .benchmarks/micro.json
+    python -m benchmarks.micro --save               # record a new baseline
+    python -m benchmarks.micro --filter mapper --threshold 0.3
+
+Baselines are machine specific: record them on the machine that compares.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import statistics
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = BACKEND_DIR / ".benchmarks" / "micro.json"
+DEFAULT_THRESHOLD = 0.2
+
+# name -> (setup, is_async); setup(fixtures) returns the callable to time
+BENCHMARKS: Dict[str, Tuple[Callable[["Fixtures"], Callable[[], Any]], bool]] = {}
+
+
+def benchmark(name: str, is_async: bool = False):
+    """Register a benchmark; the decorated function builds the callable that is timed"""
+    def register(setup):
+        BENCHMARKS[name] = (setup, is_async)
+        return setup
+    return register
+
+
+@dataclass
+class Result:
+    """Timing of one benchmark in nanoseconds per call"""
+    best_ns: float
+    median_ns: float
+    number: int
+    repeats: int
+
+
+@dataclass
+class Comparison:
+    name: str
+    current: Result
+    baseline: Optional[Result]
+    threshold: float
+
+    @property
+    def ratio(self) -> Optional[float]:
+        return self.current.median_ns / self.baseline.median_ns if self.baseline else None
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio is not None and self.ratio > 1 + self.threshold
+
+
+@dataclass
+class Fixtures:
+    """Seeded synthetic rows as entities, domain models and DTOs"""
+    school_entities: List[Any] = field(default_factory=list)
+    student_entities: List[Any] = field(default_factory=list)
+    invoice_entities: List[Any] = field(default_factory=list)
+    invoice_values: List[dict] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, schools: int = 2, students_per_school: int = 25, invoices_per_student: int = 24, seed: int = 7) -> "Fixtures":
+        from app.infrastructure.database.synthetic_data import (
+            INVOICE_COLUMNS, SCHOOL_COLUMNS, STUDENT_COLUMNS, DatasetGenerator, DatasetSpec, parse_row,
+        )
+        from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+        from app.infrastructure.persistence.school_entity import SchoolEntity
+        from app.infrastructure.persistence.student_entity import StudentEntity
+
+        generator = DatasetGenerator(DatasetSpec(schools, students_per_school, invoices_per_student, years=2, seed=seed, skew=0))
+        fixtures = cls()
+        fixtures.school_entities = [SchoolEntity(**parse_row(SCHOOL_COLUMNS, row)) for row in generator.schools()]
+        for student, invoices in generator.students():
+            fixtures.student_entities.append(StudentEntity(**parse_row(STUDENT_COLUMNS, student)))
+            for row in invoices:
+                values = parse_row(INVOICE_COLUMNS, row)
+                fixtures.invoice_values.append(values)
+                fixtures.invoice_entities.append(InvoiceEntity(**values))
+        return fixtures
+
+    @property
+    def invoices(self) -> list:
+        from app.infrastructure.mappers.invoice_mapper import InvoiceMapper
+        return [InvoiceMapper.to_domain(entity) for entity in self.invoice_entities]
+
+    @property
+    def students(self) -> list:
+        from app.infrastructure.mappers.student_mapper import StudentMapper
+        return [StudentMapper.to_domain(entity) for entity in self.student_entities]
+
+    @property
+    def schools(self) -> list:
+        from app.infrastructure.mappers.school_mapper import SchoolMapper
+        return [SchoolMapper.to_domain(entity) for entity in self.school_entities]
+
+
+class MemoryRepository:
+    """Just enough of the repositories for the statement services, served from memory"""
+
+    def __init__(self, rows: list, match: Callable[[Any, dict], bool]):
+        self.by_id = {row.id: row for row in rows}
+        self.rows = rows
+        self.match = match
+
+    async def get_by_id(self, row_id: int):
+        return self.by_id.get(row_id)
+
+    async def get_with_filters(self, filters: dict, skip: int = 0, limit: int = 100, count_mode=None, after=None):
+        from app.domain.repositories.page import Page
+        items = [row for row in self.rows if self.match(row, filters)]
+        return Page(items[skip:skip + limit], None, len(items) > skip + limit)
+
+    async def count_by_school_id(self, school_id: int) -> int:
+        return sum(1 for row in self.rows if row.school_id == school_id)
+
+
+def _invoice_matches(invoice, filters: dict) -> bool:
+    return (
+        invoice.student_id == filters["student_id"]
+        and filters["invoice_date_from"] <= invoice.invoice_date <= filters["invoice_date_to"]
+    )
+
+
+# --- cache -----------------------------------------------------------------
+
+@benchmark("cache.generate_key")
+def bench_generate_key(fixtures: Fixtures):
+    from app.core.cache import _generate_cache_key
+    return lambda: _generate_cache_key(school_id=3, status="PENDING", page=2, size=20, search=None)
+
+
+@benchmark("cache.simple_cache_hit", is_async=True)
+def bench_simple_cache_hit(fixtures: Fixtures):
+    from cachetools import TTLCache
+    from app.core.cache import simple_cache
+
+    @simple_cache(TTLCache(maxsize=1000, ttl=300), "bench")
+    async def list_invoices(school_id: int, status: str, page: int, size: int):
+        return [school_id, status, page, size]
+
+    return lambda: list_invoices(school_id=3, status="PENDING", page=2, size=20)
+
+
+@benchmark("cache.simple_cache_miss", is_async=True)
+def bench_simple_cache_miss(fixtures: Fixtures):
+    from cachetools import TTLCache
+    from app.core.cache import simple_cache
+
+    @simple_cache(TTLCache(maxsize=1000, ttl=300), "bench")
+    async def list_invoices(school_id: int, status: str, page: int, size: int):
+        return [school_id, status, page, size]
+
+    pages = itertools.count(1)
+    return lambda: list_invoices(school_id=3, status="PENDING", page=next(pages), size=20)
+
+
+# --- mappers ---------------------------------------------------------------
+
+@benchmark("mapper.invoice.to_domain")
+def bench_invoice_to_domain(fixtures: Fixtures):
+    from app.infrastructure.mappers.invoice_mapper import InvoiceMapper
+    entity = fixtures.invoice_entities[0]
+    return lambda: InvoiceMapper.to_domain(entity)
+
+
+@benchmark("mapper.invoice.to_entity")
+def bench_invoice_to_entity(fixtures: Fixtures):
+    from app.infrastructure.mappers.invoice_mapper import InvoiceMapper
+    invoice = fixtures.invoices[0]
+    return lambda: InvoiceMapper.to_entity(invoice)
+
+
+@benchmark("mapper.student.to_domain")
+def bench_student_to_domain(fixtures: Fixtures):
+    from app.infrastructure.mappers.student_mapper import StudentMapper
+    entity = fixtures.student_entities[0]
+    return lambda: StudentMapper.to_domain(entity)
+
+
+@benchmark("mapper.student.to_entity")
+def bench_student_to_entity(fixtures: Fixtures):
+    from app.infrastructure.mappers.student_mapper import StudentMapper
+    student = fixtures.students[0]
+    return lambda: StudentMapper.to_entity(student)
+
+
+@benchmark("mapper.school.to_domain")
+def bench_school_to_domain(fixtures: Fixtures):
+    from app.infrastructure.mappers.school_mapper import SchoolMapper
+    entity = fixtures.school_entities[0]
+    return lambda: SchoolMapper.to_domain(entity)
+
+
+@benchmark("mapper.school.to_entity")
+def bench_school_to_entity(fixtures: Fixtures):
+    from app.infrastructure.mappers.school_mapper import SchoolMapper
+    school = fixtures.schools[0]
+    return lambda: SchoolMapper.to_entity(school)
+
+
+# --- domain validation -----------------------------------------------------
+
+@benchmark("domain.invoice.validate")
+def bench_invoice_validate(fixtures: Fixtures):
+    from app.domain.models.invoice import Invoice
+    values = fixtures.invoice_values[0]
+    return lambda: Invoice(**values)
+
+
+@benchmark("domain.student.validate")
+def bench_student_validate(fixtures: Fixtures):
+    from app.domain.models.student import Student
+    values = asdict(fixtures.students[0])
+    return lambda: Student(**values)
+
+
+@benchmark("domain.school.validate")
+def bench_school_validate(fixtures: Fixtures):
+    from app.domain.models.school import School
+    values = asdict(fixtures.schools[0])
+    return lambda: School(**values)
+
+
+# --- response DTOs and pagination ------------------------------------------
+
+@benchmark("dto.invoice_response")
+def bench_invoice_response(fixtures: Fixtures):
+    from app.application.services.invoice_service import InvoiceService
+    service, invoice = InvoiceService(None), fixtures.invoices[0]
+    return lambda: service._to_response_dto(invoice)
+
+
+@benchmark("dto.student_response")
+def bench_student_response(fixtures: Fixtures):
+    from app.application.services.student_service import StudentService
+    service, student = StudentService(None), fixtures.students[0]
+    return lambda: service._to_response_dto(student)
+
+
+@benchmark("dto.school_response", is_async=True)
+def bench_school_response(fixtures: Fixtures):
+    from app.application.services.school_service import SchoolService
+    students = MemoryRepository(fixtures.students, lambda row, filters: True)
+    service, school = SchoolService(None, students), fixtures.schools[0]
+    return lambda: service._to_response_dto(school)
+
+
+@benchmark("pagination.create_page_of_20")
+def bench_paginated_response(fixtures: Fixtures):
+    from app.application.dtos.invoice_dto import InvoiceResponseDTO
+    from app.application.services.invoice_service import InvoiceService
+    from app.core.pagination import PaginatedResponse, PaginationParams
+    service = InvoiceService(None)
+    items = [service._to_response_dto(invoice) for invoice in fixtures.invoices[:20]]
+    pagination = PaginationParams(page=3, size=20)
+    return lambda: PaginatedResponse[InvoiceResponseDTO].create(items, 1200, pagination)
+
+
+# --- auth ------------------------------------------------------------------
+
+@benchmark("auth.verify_token")
+def bench_verify_token(fixtures: Fixtures):
+    from app.core.auth import create_access_token, verify_token
+    token = create_access_token({"sub": "admin"})
+    return lambda: verify_token(token)
+
+
+# --- statements ------------------------------------------------------------
+
+@benchmark("statement.student_24_invoices", is_async=True)
+def bench_student_statement(fixtures: Fixtures):
+    from app.application.services.student_service import StudentService
+    invoices, students, schools = fixtures.invoices, fixtures.students, fixtures.schools
+    service = StudentService(
+        MemoryRepository(students, lambda row, filters: True),
+        MemoryRepository(invoices, _invoice_matches),
+        MemoryRepository(schools, lambda row, filters: True),
+    )
+    student = students[0]
+    date_from = min(invoice.invoice_date for invoice in invoices)
+    return lambda: service.get_student_account_statement(student.id, date_from)
+
+
+@benchmark("statement.school_25_students", is_async=True)
+def bench_school_statement(fixtures: Fixtures):
+    from app.application.services.school_service import SchoolService
+    invoices, students, schools = fixtures.invoices, fixtures.students, fixtures.schools
+    service = SchoolService(
+        MemoryRepository(schools, lambda row, filters: True),
+        MemoryRepository(students, lambda row, filters: row.school_id == filters["school_id"]),
+        MemoryRepository(invoices, _invoice_matches),
+    )
+    school = schools[0]
+    date_from = min(invoice.invoice_date for invoice in invoices)
+    return lambda: service.get_school_account_statement(school.id, date_from)
+
+
+# --- runner ----------------------------------------------------------------
+
+class Timer:
+    """Times batches of calls to a benchmark (awaited in one event loop run when async)"""
+
+    def __init__(self, function: Callable[[], Any], is_async: bool):
+        self.function = function
+        self.loop = asyncio.new_event_loop() if is_async else None
+        self.number = 1
+
+    def run(self, number: int) -> float:
+        function = self.function
+        if self.loop is None:
+            started = perf_counter()
+            for _ in range(number):
+                function()
+            return perf_counter() - started
+
+        async def calls():
+            for _ in range(number):
+                await function()
+
+        started = perf_counter()
+        self.loop.run_until_complete(calls())
+        return perf_counter() - started
+
+    def calibrate(self, min_time: float) -> None:
+        """Find a number of calls that takes at least ``min_time`` seconds"""
+        while True:
+            elapsed = self.run(self.number)
+            if elapsed >= min_time:
+                return
+            self.number *= 10 if elapsed < min_time / 10 else 2
+
+    def sample(self) -> float:
+        """Nanoseconds per call of one batch"""
+        return self.run(self.number) / self.number * 1e9
+
+    def close(self) -> None:
+        if self.loop is not None:
+            self.loop.close()
+
+
+def run_benchmarks(
+    fixtures: Optional[Fixtures] = None, pattern: Optional[str] = None, repeats: int = 7, min_time: float = 0.05,
+    names: Optional[List[str]] = None,
+) -> Dict[str, Result]:
+    """
+    Run the registered benchmarks whose name contains ``pattern`` (or the given names).
+
+    Batches are taken round-robin, one per benchmark per round, so a slow spell of
+    the machine spreads over every benchmark instead of skewing a few of them.
+    """
+    fixtures = fixtures or Fixtures.build()
+    names = names or [name for name in BENCHMARKS if not pattern or pattern in name]
+    timers = {}
+    try:
+        for name in names:
+            setup, is_async = BENCHMARKS[name]
+            timers[name] = Timer(setup(fixtures), is_async)
+            timers[name].calibrate(min_time)
+        samples: Dict[str, List[float]] = {name: [] for name in names}
+        for _ in range(repeats):
+            for name, timer in timers.items():
+                samples[name].append(timer.sample())
+    finally:
+        for timer in timers.values():
+            timer.close()
+    return {
+        name: Result(min(samples[name]), statistics.median(samples[name]), timers[name].number, repeats)
+        for name in names
+    }
+
+
+def confirm_regressions(
+    comparisons: List["Comparison"], fixtures: Fixtures, reruns: int = 2, repeats: int = 7, min_time: float = 0.05
+) -> None:
+    """Re-measure apparent regressions, keeping the faster result (filters out noisy runs)"""
+    for _ in range(reruns):
+        suspects = {comparison.name: comparison for comparison in comparisons if comparison.regressed}
+        if not suspects:
+            return
+        for name, result in run_benchmarks(fixtures, repeats=repeats, min_time=min_time, names=list(suspects)).items():
+            if result.median_ns < suspects[name].current.median_ns:
+                suspects[name].current = result
+
+
+def environment() -> Dict[str, str]:
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, results: Dict[str, Result], previous: Optional[dict] = None) -> None:
+    """Write results as the baseline, keeping baseline entries of benchmarks that were not run"""
+    entries = dict((previous or {}).get("results", {}))
+    entries.update({name: asdict(result) for name, result in results.items()})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "results": dict(sorted(entries.items())),
+    }, indent=2) + "\n")
+
+
+def compare(results: Dict[str, Result], baseline: Optional[dict], threshold: float) -> List[Comparison]:
+    """Each result next to its baseline entry (None for benchmarks the baseline does not have)"""
+    entries = (baseline or {}).get("results", {})
+    return [
+        Comparison(name, result, Result(**entries[name]) if name in entries else None, threshold)
+        for name, result in results.items()
+    ]
+
+
+def format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} µs"
+    return f"{ns:.0f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the request hot path")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Record the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown (0.2 = 20%%)")
+    parser.add_argument("--repeats", type=int, default=7, help="Timed runs per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timed run")
+    parser.add_argument("--reruns", type=int, default=2, help="Re-measurements of an apparent regression")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    fixtures = Fixtures.build()
+    results = run_benchmarks(fixtures, args.filter, args.repeats, args.min_time)
+    if not results:
+        raise SystemExit(f"No benchmark matches {args.filter!r}")
+
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get("environment") != environment():
+        print(f"⚠️  Baseline recorded on {baseline.get('environment')}, now {environment()}\n")
+
+    comparisons = compare(results, baseline, args.threshold)
+    if not args.save:
+        confirm_regressions(comparisons, fixtures, args.reruns, args.repeats, args.min_time)
+    print(f"{'benchmark':<32} {'best':>10} {'median':>10} {'baseline':>10} {'change':>8}")
+    print("-" * 74)
+    for comparison in comparisons:
+        current, previous = comparison.current, comparison.baseline
+        change = f"{(comparison.ratio - 1) * 100:+.1f}%" if previous else "new"
+        flag = "  ❌" if comparison.regressed else ""
+        print(
+            f"{comparison.name:<32} {format_ns(current.best_ns):>10} {format_ns(current.median_ns):>10} "
+            f"{format_ns(previous.median_ns) if previous else '-':>10} {change:>8}{flag}"
+        )
+
+    if args.save or baseline is None:
+        save_baseline(args.baseline, results, baseline)
+        print(f"\n✅ Baseline written to {args.baseline}")
+        return
+
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"\n✅ No regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark full vs sparse fieldset responses on GET /api/v1/invoices/?size=100.
+
+Runs the application in-process against a throwaway SQLite database (or the
+database in DATABASE_URL), tops the invoices table up to --invoices rows and
+times each variant with the API response cache cleared before every request.
+
+    python -m benchmarks.sparse_fields --requests 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from time import perf_counter
+
+VARIANTS = {
+    "full": "",
+    "4 fields": "id,invoice_number,status,total_amount",
+    "1 field": "id",
+}
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def top_up_invoices(target: int) -> int:
+    """Copy seeded invoices until the table holds ``target`` rows"""
+    from sqlmodel import Session, func, select
+    from app.infrastructure.database.connection import engine
+    from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+
+    with Session(engine) as session:
+        existing = session.exec(select(func.count()).select_from(InvoiceEntity)).one()
+        templates = session.exec(select(InvoiceEntity).limit(20)).all()
+        if not templates:
+            raise SystemExit("No seeded invoices to copy")
+
+        for number in range(existing, target):
+            template = templates[number % len(templates)]
+            values = template.model_dump(exclude={"id", "created_at", "updated_at"})
+            values["invoice_number"] = f"BENCH-{number:07d}"
+            values["invoice_date"] = template.invoice_date + timedelta(days=number % 365)
+            values["due_date"] = values["invoice_date"] + timedelta(days=30)
+            session.add(InvoiceEntity(**values))
+        session.commit()
+        return max(existing, target)
+
+
+def run(requests: int, size: int, invoices: int) -> None:
+    from fastapi.testclient import TestClient
+    from app.core.cache import api_cache
+    from app.core.config import settings
+    from app.main import app
+
+    with TestClient(app) as client:
+        total = top_up_invoices(invoices)
+        token = client.post(
+            f"{settings.API_V1_STR}/auth/login",
+            json={"username": settings.ADMIN_USERNAME, "password": settings.ADMIN_PASSWORD},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"📦 {total} invoices, {requests} requests per variant, size={size}\n")
+        print(f"{'variant':<10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'bytes':>9}")
+        print("-" * 50)
+
+        baseline = None
+        for name, fields in VARIANTS.items():
+            url = f"{settings.API_V1_STR}/invoices/?size={size}" + (f"&fields={fields}" if fields else "")
+            samples = []
+            for attempt in range(requests + 5):
+                api_cache.clear()
+                started = perf_counter()
+                response = client.get(url, headers=headers)
+                elapsed = (perf_counter() - started) * 1000
+                response.raise_for_status()
+                if attempt >= 5:  # warm-up
+                    samples.append(elapsed)
+
+            mean = statistics.mean(samples)
+            baseline = baseline or mean
+            print(
+                f"{name:<10} {mean:>9.2f} {statistics.median(samples):>9.2f} "
+                f"{percentile(samples, 0.95):>9.2f} {len(response.content):>9}"
+                f"   ({baseline / mean:.2f}x)"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sparse fieldsets on the invoice list")
+    parser.add_argument("--requests", type=int, default=100, help="Timed requests per variant")
+    parser.add_argument("--size", type=int, default=100, help="Page size")
+    parser.add_argument("--invoices", type=int, default=1000, help="Minimum number of invoices in the table")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    if "DATABASE_URL" not in os.environ:
+        database = Path(tempfile.mkdtemp()) / "benchmark.db"
+        os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ.setdefault("DEBUG", "false")
+    os.environ.setdefault("DB_ECHO", "false")
+
+    run(args.requests, args.size, args.invoices)
+
+
+if __name__ == "__main__":
+    main()
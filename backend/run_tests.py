@@ -73,10 +73,24 @@ def run_specific_test(test_path, verbose=False):
     return run_command(cmd, f"Running Specific Test: {test_path}")
 
 
+def run_benchmarks(threshold=None, save_baseline=False, filter_name=None):
+    """Run the microbenchmarks and compare them with the stored baseline"""
+    cmd = ["python", "-m", "benchmarks.micro"]
+    if threshold is not None:
+        cmd.extend(["--threshold", str(threshold)])
+    if save_baseline:
+        cmd.append("--save")
+    if filter_name:
+        cmd.extend(["--filter", filter_name])
+    
+    return run_command(cmd, "Running Microbenchmarks")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Test runner for mattilda-test project")
     parser.add_argument(
         "action", 
+        nargs="?",
         choices=["domain", "all", "coverage", "specific"],
         help="Type of tests to run"
     )
@@ -89,8 +103,29 @@ def main():
         "--test-path", 
         help="Path to specific test (for 'specific' action)"
     )
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Run the microbenchmarks and fail on regressions against the baseline"
+    )
+    parser.add_argument(
+        "--bench-threshold",
+        type=float,
+        help="Allowed slowdown against the baseline (default: 0.2 = 20%%)"
+    )
+    parser.add_argument(
+        "--bench-filter",
+        help="Only run benchmarks whose name contains this"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Record the benchmark results as the new baseline"
+    )
     
     args = parser.parse_args()
+    if not args.action and not args.bench:
+        parser.error("choose a test suite and/or --bench")
     
     # Change to project directory
     project_root = Path(__file__).parent
@@ -100,7 +135,7 @@ def main():
     print("🧪 Mattilda Test Runner")
     print(f"Project root: {project_root}")
     
-    success = False
+    success = True
     
     if args.action == "domain":
         success = run_domain_tests(args.verbose)
@@ -114,6 +149,9 @@ def main():
             sys.exit(1)
         success = run_specific_test(args.test_path, args.verbose)
     
+    if args.bench:
+        success = run_benchmarks(args.bench_threshold, args.save_baseline, args.bench_filter) and success
+    
     if success:
         print("\n✅ Tests completed successfully!")
         sys.exit(0)
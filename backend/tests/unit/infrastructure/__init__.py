@@ -0,0 +1 @@
+# Infrastructure test package
@@ -0,0 +1,99 @@
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session
+from app.infrastructure.database.migrations import MIGRATIONS, run_migrations
+
+# Register entities with the metadata
+from app.infrastructure.persistence.school_entity import SchoolEntity
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.persistence.user_entity import UserEntity
+from app.infrastructure.persistence.billing_run_entity import BillingRunEntity
+from app.infrastructure.persistence.invoice_archive_run_entity import InvoiceArchiveRunEntity
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine shared across connections"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def migrated_engine(engine):
+    """SQLite engine with all tables created and migrations applied"""
+    SQLModel.metadata.create_all(bind=engine)
+    run_migrations(engine, MIGRATIONS)
+    return engine
+
+
+@pytest.fixture
+def session(migrated_engine):
+    """Session bound to the migrated engine"""
+    with Session(migrated_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def statements(session):
+    """Statements executed through the session's engine"""
+    executed = []
+    engine = session.get_bind()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def make_school(**overrides) -> SchoolEntity:
+    values = {
+        "name": "Lincoln High School",
+        "address": "123 Main St",
+        "city": "Springfield",
+        "state": "IL",
+        "zip_code": "62701",
+        "phone_number": "555-0100",
+        "email": "office@lincoln.edu",
+        "principal_name": "Jane Doe",
+        "established_year": 1950,
+    }
+    values.update(overrides)
+    return SchoolEntity(**values)
+
+
+def make_student(school_id: int, **overrides) -> StudentEntity:
+    values = {
+        "first_name": "John",
+        "last_name": "Smith",
+        "email": "john.smith@example.com",
+        "phone_number": "555-0101",
+        "date_of_birth": date(2010, 5, 1),
+        "grade_level": 8,
+        "school_id": school_id,
+        "enrollment_date": date(2020, 9, 1),
+        "address": "1 Elm St",
+    }
+    values.update(overrides)
+    return StudentEntity(**values)
+
+
+def make_invoice(student_id: int, school_id: int, **overrides) -> InvoiceEntity:
+    values = {
+        "invoice_number": "INV-2024-001",
+        "student_id": student_id,
+        "school_id": school_id,
+        "amount": 100.0,
+        "tax_amount": 10.0,
+        "total_amount": 110.0,
+        "description": "Tuition fee",
+        "invoice_date": date(2024, 1, 15),
+        "due_date": date(2024, 2, 15),
+    }
+    values.update(overrides)
+    return InvoiceEntity(**values)
@@ -0,0 +1,116 @@
+import pytest
+from datetime import date
+from sqlmodel import select
+from app.application.dtos.billing_run_dto import BillingRunCreateDTO
+from app.application.services.billing_run_service import BillingRunService
+from app.domain.enums import InvoiceStatus
+from app.domain.models.billing_run import BillingRun
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.repositories.billing_run_repository import BillingRunRepository
+from app.infrastructure.repositories.school_repository import SchoolRepository
+from tests.unit.infrastructure.conftest import make_school, make_student
+
+
+def run_request(school_id: int, **overrides) -> BillingRunCreateDTO:
+    values = {
+        "run_id": "2024-fall-tuition",
+        "school_id": school_id,
+        "amount": 500.0,
+        "tax_amount": 80.0,
+        "description": "Fall tuition",
+        "invoice_date": date(2024, 9, 1),
+        "due_date": date(2024, 9, 30),
+    }
+    values.update(overrides)
+    return BillingRunCreateDTO(**values)
+
+
+@pytest.fixture
+def school_id(session):
+    """School with three active grade 8 students, one grade 9 student and one inactive student"""
+    school = make_school()
+    other_school = make_school(name="Other School")
+    session.add_all([school, other_school])
+    session.commit()
+    session.add_all([make_student(school.id, email=f"s{i}@example.com") for i in range(3)])
+    session.add(make_student(school.id, email="ninth@example.com", grade_level=9))
+    session.add(make_student(school.id, email="inactive@example.com", is_active=False))
+    session.add(make_student(other_school.id, email="other@example.com"))
+    session.commit()
+    return school.id
+
+
+@pytest.fixture
+def service(session):
+    return BillingRunService(BillingRunRepository(session), SchoolRepository(session))
+
+
+class TestBillingRun:
+    """Test suite for server-side billing runs"""
+
+    def test_template_is_validated_as_an_invoice(self):
+        """Test that the run's invoice template goes through the invoice invariants"""
+        with pytest.raises(ValueError, match="Due date cannot be before invoice date"):
+            BillingRun(
+                run_id="r1", school_id=1, amount=10.0, tax_amount=0.0, description="Fee",
+                invoice_date=date(2024, 2, 1), due_date=date(2024, 1, 1)
+            )
+        with pytest.raises(ValueError, match="Invoice amount must be positive"):
+            BillingRun(
+                run_id="r1", school_id=1, amount=0.0, tax_amount=0.0, description="Fee",
+                invoice_date=date(2024, 1, 1), due_date=date(2024, 1, 1)
+            )
+
+    @pytest.mark.asyncio
+    async def test_generates_one_invoice_per_matching_student(self, session, service, school_id):
+        """Test that a run invoices every active student of the school with sequential numbers"""
+        result = await service.run_billing(run_request(school_id))
+
+        assert result.invoice_count == 4
+        assert result.total_amount == 580.0
+        assert not result.replayed
+        invoices = session.exec(select(InvoiceEntity).order_by(InvoiceEntity.student_id)).all()
+        assert len(invoices) == 4
+        assert {invoice.school_id for invoice in invoices} == {school_id}
+        assert all(invoice.status == InvoiceStatus.PENDING for invoice in invoices)
+        assert all(invoice.total_amount == 580.0 for invoice in invoices)
+        assert [invoice.invoice_number for invoice in invoices] == [
+            "INV-00000001", "INV-00000002", "INV-00000003", "INV-00000004"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_filters_and_numbers_continue_across_runs(self, session, service, school_id):
+        """Test that grade and active filters apply and invoice numbers stay unique across runs"""
+        await service.run_billing(run_request(school_id, run_id="grade-9", grade_level=9))
+        result = await service.run_billing(run_request(school_id, run_id="everyone", active_only=False))
+
+        assert result.invoice_count == 5
+        numbers = session.exec(select(InvoiceEntity.invoice_number)).all()
+        assert len(numbers) == len(set(numbers)) == 6
+
+    @pytest.mark.asyncio
+    async def test_is_idempotent_per_run_id(self, session, service, school_id):
+        """Test that repeating a run ID returns the original run without new invoices"""
+        await service.run_billing(run_request(school_id))
+
+        replay = await service.run_billing(run_request(school_id, amount=999.0))
+
+        assert replay.replayed
+        assert replay.invoice_count == 4
+        assert replay.amount == 500.0
+        assert len(session.exec(select(InvoiceEntity)).all()) == 4
+
+    @pytest.mark.asyncio
+    async def test_inserts_invoices_with_one_statement(self, session, service, school_id, statements):
+        """Test that the invoices of a run are created with one INSERT ... SELECT"""
+        await service.run_billing(run_request(school_id))
+
+        inserts = [statement for statement in statements if statement.startswith("INSERT INTO invoices")]
+        assert len(inserts) == 1
+        assert "SELECT" in inserts[0]
+
+    @pytest.mark.asyncio
+    async def test_unknown_school(self, service):
+        """Test that a run for a missing school is rejected"""
+        with pytest.raises(ValueError, match="School with ID 999 not found"):
+            await service.run_billing(run_request(999))
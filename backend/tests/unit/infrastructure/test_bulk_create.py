@@ -0,0 +1,130 @@
+import pytest
+from sqlmodel import select
+from app.application.services.invoice_service import InvoiceService
+from app.application.services.student_service import StudentService
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.school_repository import SchoolRepository
+from app.infrastructure.repositories.student_repository import StudentRepository
+from tests.unit.infrastructure.conftest import make_school, make_student
+
+
+def student_row(school_id: int, **overrides) -> dict:
+    row = {
+        "first_name": "Ana",
+        "last_name": "Lopez",
+        "email": "ana@example.com",
+        "date_of_birth": "2011-03-01",
+        "grade_level": 7,
+        "school_id": school_id,
+        "enrollment_date": "2021-09-01",
+        "address": "2 Oak St",
+    }
+    row.update(overrides)
+    return row
+
+
+def invoice_row(student_id: int, school_id: int, **overrides) -> dict:
+    row = {
+        "invoice_number": "INV-BULK-1",
+        "student_id": student_id,
+        "school_id": school_id,
+        "amount": 100.0,
+        "tax_amount": 16.0,
+        "description": "Tuition fee",
+        "invoice_date": "2024-01-15",
+        "due_date": "2024-02-15",
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def school_id(session):
+    school = make_school()
+    session.add(school)
+    session.commit()
+    return school.id
+
+
+class TestBulkCreateStudents:
+    """Test suite for bulk student creation"""
+
+    @pytest.mark.asyncio
+    async def test_creates_valid_rows_and_reports_invalid_ones(self, session, school_id):
+        """Test that valid rows are created and each invalid row is reported by index"""
+        service = StudentService(StudentRepository(session), None, SchoolRepository(session))
+        rows = [
+            student_row(school_id),
+            student_row(school_id, grade_level=13),
+            {"first_name": "Missing fields"},
+            student_row(999),
+            student_row(school_id, email="other@example.com"),
+        ]
+
+        result = await service.bulk_create_students(rows)
+
+        assert result.created == 2
+        assert result.failed == 3
+        assert [error.index for error in result.errors] == [1, 2, 3]
+        assert result.errors[0].errors == ["Grade level must be between 1 and 12"]
+        assert any(message.startswith("last_name:") for message in result.errors[1].errors)
+        assert result.errors[2].errors == ["School with ID 999 not found"]
+        stored = session.exec(select(StudentEntity.id).order_by(StudentEntity.id)).all()
+        assert stored == result.ids
+
+    @pytest.mark.asyncio
+    async def test_inserts_in_one_transaction(self, session, school_id, statements):
+        """Test that a batch of students is created with one INSERT"""
+        service = StudentService(StudentRepository(session), None, SchoolRepository(session))
+        rows = [student_row(school_id, email=f"s{i}@example.com") for i in range(50)]
+
+        result = await service.bulk_create_students(rows)
+
+        assert result.created == 50
+        inserts = [statement for statement in statements if statement.startswith("INSERT")]
+        assert len(inserts) == 1
+
+
+class TestBulkCreateInvoices:
+    """Test suite for bulk invoice creation"""
+
+    @pytest.mark.asyncio
+    async def test_checks_student_and_school(self, session, school_id):
+        """Test that rows with a missing student or a student of another school are rejected"""
+        other_school = make_school(name="Other School")
+        session.add(other_school)
+        session.commit()
+        student = make_student(school_id)
+        session.add(student)
+        session.commit()
+        service = InvoiceService(InvoiceRepository(session), StudentRepository(session))
+        rows = [
+            invoice_row(student.id, school_id),
+            invoice_row(student.id, other_school.id, invoice_number="INV-BULK-2"),
+            invoice_row(999, school_id, invoice_number="INV-BULK-3"),
+            invoice_row(student.id, school_id, invoice_number="INV-BULK-4", amount=-5),
+        ]
+
+        result = await service.bulk_create_invoices(rows)
+
+        assert result.created == 1
+        assert [error.index for error in result.errors] == [1, 2, 3]
+        assert "does not belong to school" in result.errors[0].errors[0]
+        assert result.errors[1].errors == ["Student with ID 999 not found"]
+        assert result.errors[2].errors == ["Invoice amount must be positive"]
+        invoice = session.get(InvoiceEntity, result.ids[0])
+        assert invoice.total_amount == 116.0
+        assert invoice.status.value == "pending"
+
+    @pytest.mark.asyncio
+    async def test_nothing_valid_creates_nothing(self, session, school_id):
+        """Test that a batch without valid rows creates nothing"""
+        service = InvoiceService(InvoiceRepository(session), StudentRepository(session))
+
+        result = await service.bulk_create_invoices([invoice_row(999, school_id)])
+
+        assert result.created == 0
+        assert result.ids == []
+        assert session.exec(select(InvoiceEntity)).all() == []
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import inspect
+from app.core.startup import StartupTimer
+from app.infrastructure.database.migrations import LATEST_VERSION
+from app.infrastructure.database.setup import schema_version, setup_database, verify_schema
+
+
+class TestSchemaVersion:
+    """Test suite for the schema version check"""
+
+    def test_verify_refuses_an_unmigrated_database(self, engine):
+        """Test that verifying a database without migrations fails"""
+        with engine.connect() as connection:
+            assert schema_version(connection) is None
+        with pytest.raises(RuntimeError, match=f"needs {LATEST_VERSION}"):
+            verify_schema(engine)
+
+    def test_verify_accepts_the_latest_version(self, migrated_engine):
+        """Test that a fully migrated database passes verification"""
+        assert verify_schema(migrated_engine) == LATEST_VERSION
+
+
+class TestSetupDatabase:
+    """Test suite for the one-off database setup"""
+
+    @pytest.mark.asyncio
+    async def test_creates_and_migrates_with_a_timed_breakdown(self, engine):
+        """Test that setup creates and migrates the schema, can be repeated and times each phase"""
+        timer = StartupTimer()
+
+        await setup_database(engine, seed=False, timer=timer)
+        await setup_database(engine, seed=False)  # idempotent
+
+        assert "invoices" in inspect(engine).get_table_names()
+        assert verify_schema(engine) == LATEST_VERSION
+        assert [name for name, _ in timer.phases] == ["setup lock", "tables", "migrations"]
+        assert timer.summary().startswith(f"Startup took {timer.total_ms:.1f} ms (setup lock ")
@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from app.application.services.school_service import SchoolService
+from app.core.dataloader import DataLoader
+from app.core.pagination import PaginationParams
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.school_repository import SchoolRepository
+from app.infrastructure.repositories.student_repository import StudentRepository
+from tests.unit.infrastructure.conftest import make_school, make_student
+
+
+@pytest.fixture
+def school_ids(session):
+    """Three schools with two, one and no students"""
+    schools = [make_school(name=f"School {i}") for i in range(3)]
+    session.add_all(schools)
+    session.commit()
+    session.add_all([
+        make_student(schools[0].id, email="a@example.com"),
+        make_student(schools[0].id, email="b@example.com"),
+        make_student(schools[1].id, email="c@example.com"),
+    ])
+    session.commit()
+    return [school.id for school in schools]
+
+
+class TestDataLoader:
+    """Test suite for the batching DataLoader"""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_loads_of_the_same_tick(self):
+        """Test that loads issued in the same tick become one batch and results are memoized"""
+        calls = []
+
+        async def batch_load(keys):
+            calls.append(sorted(keys))
+            return {key: key * 10 for key in keys if key != 3}
+
+        loader = DataLoader(batch_load)
+        results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3))
+
+        assert results == [10, 20, 10, None]
+        assert calls == [[1, 2, 3]]
+        assert await loader.load(2) == 20
+        assert loader.batch_count == 1
+
+    @pytest.mark.asyncio
+    async def test_keeps_a_reference_to_dispatches_in_flight(self):
+        """Test that a running dispatch is referenced until it finishes"""
+        release = asyncio.Event()
+
+        async def batch_load(keys):
+            await release.wait()
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+        pending = asyncio.gather(loader.load(1), loader.load(2))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert len(loader._dispatch_tasks) == 1
+        release.set()
+        assert await pending == [1, 2]
+        await asyncio.sleep(0)
+        assert loader._dispatch_tasks == set()
+
+    @pytest.mark.asyncio
+    async def test_prime_and_clear(self):
+        """Test that primed values skip the batch and cleared keys are loaded again"""
+        calls = []
+
+        async def batch_load(keys):
+            calls.append(list(keys))
+            return {key: "loaded" for key in keys}
+
+        loader = DataLoader(batch_load)
+        loader.prime(1, "primed")
+        assert await loader.load(1) == "primed"
+        assert calls == []
+
+        loader.clear(1)
+        assert await loader.load(1) == "loaded"
+        assert calls == [[1]]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_memoized(self):
+        """Test that a failed batch is retried on the next load"""
+        attempts = []
+
+        async def batch_load(keys):
+            attempts.append(keys)
+            if len(attempts) == 1:
+                raise RuntimeError("database unavailable")
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+        with pytest.raises(RuntimeError):
+            await loader.load(1)
+
+        assert await loader.load(1) == 1
+
+
+class TestRepositoryLoaders:
+    """Test suite for the repositories' request-scoped loaders"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_get_by_id_is_one_query(self, session, school_ids, statements):
+        """Test that concurrent lookups by ID run as one IN query"""
+        repository = SchoolRepository(session)
+
+        schools = await asyncio.gather(*(repository.get_by_id(school_id) for school_id in school_ids + [999]))
+
+        assert [school.name for school in schools[:3]] == ["School 0", "School 1", "School 2"]
+        assert schools[3] is None
+        assert len(statements) == 1
+        assert " IN (" in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_identity_map_is_shared_per_session(self, session, school_ids, statements):
+        """Test that repositories on the same session share loaded rows"""
+        await SchoolRepository(session).get_by_id(school_ids[0])
+        await SchoolRepository(session).get_by_id(school_ids[0])
+
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_refresh_the_identity_map(self, session, school_ids):
+        """Test that updates and deletes are visible to later lookups"""
+        repository = StudentRepository(session)
+        student_id = (await repository.get_with_filters({"school_id": school_ids[1]})).items[0].id
+        await repository.get_by_id(student_id)
+
+        await repository.update_fields(student_id, {"grade_level": 9})
+        assert (await repository.get_by_id(student_id)).grade_level == 9
+
+        await repository.delete(student_id)
+        assert await repository.get_by_id(student_id) is None
+        assert await repository.count_by_school_id(school_ids[1]) == 0
+
+    @pytest.mark.asyncio
+    async def test_school_list_counts_students_with_one_group_by(self, session, school_ids, statements):
+        """Test that the school list counts students with one GROUP BY instead of a query per school"""
+        service = SchoolService(SchoolRepository(session), StudentRepository(session), InvoiceRepository(session))
+
+        result = await service.get_all_schools(PaginationParams(page=1, size=10))
+
+        assert [school.student_count for school in result.items] == [2, 1, 0]
+        count_queries = [statement for statement in statements if "GROUP BY students.school_id" in statement]
+        assert len(count_queries) == 1
+        assert not [statement for statement in statements if "WHERE students.school_id = ?" in statement]
+
+    @pytest.mark.asyncio
+    async def test_students_filter_by_ids(self, session, school_ids):
+        """Test that students can be filtered by a list of IDs"""
+        repository = StudentRepository(session)
+        all_ids = [student.id for student in (await repository.get_all()).items]
+
+        page = await repository.get_with_filters({"ids": all_ids[:2]})
+
+        assert [student.id for student in page.items] == all_ids[:2]
@@ -0,0 +1,43 @@
+import os
+import pytest
+from app.core.import_profile import (
+    DEFERRED_MODULES, ImportRecord, by_package, import_cost_ms, imported_modules, parse_importtime, profile_imports
+)
+
+# Cold import budget of app.main; generous so only real regressions fail (about 1.5 s when written)
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "4000"))
+APP_ENV = {"DATABASE_URL": "sqlite://", "SCHEDULER_ENABLED": "false"}
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     app.core.config
+import time:       300 |        420 |   app.core
+import time:        80 |        500 | app
+"""
+
+
+class TestImportProfile:
+    """Test suite for the import-time profiler"""
+
+    def test_parses_the_importtime_report(self):
+        """Test that the -X importtime report is parsed and grouped by package"""
+        records = parse_importtime(REPORT)
+
+        assert records[0] == ImportRecord("app.core.config", 120, 120, 2)
+        assert records[-1] == ImportRecord("app", 80, 500, 0)
+        assert import_cost_ms(records, "app") == 0.5
+        assert by_package(records, level=2) == [("app.core", 420), ("app", 80)]
+
+    def test_app_defers_seeding_migrations_and_crypto(self):
+        """Test that importing app.main does not import the deferred modules"""
+        modules = imported_modules(profile_imports("app.main", APP_ENV))
+
+        assert "app.main" in modules
+        assert [name for name in DEFERRED_MODULES if name in modules] == []
+
+    @pytest.mark.slow
+    def test_cold_import_stays_within_budget(self):
+        """Test that a cold import of app.main stays within the time budget"""
+        # Best of three fresh interpreters, to ignore one-off scheduling noise
+        cost_ms = min(import_cost_ms(profile_imports("app.main", APP_ENV), "app.main") for _ in range(3))
+
+        assert cost_ms < IMPORT_BUDGET_MS, f"Importing app.main took {cost_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
@@ -0,0 +1,61 @@
+from sqlalchemy import text
+from app.infrastructure.database.instrumentation import QueryRecorder
+
+
+class TestQueryRecorder:
+    """Test suite for the slow query recorder"""
+
+    def test_fast_queries_are_aggregated_but_not_logged(self, engine):
+        """Test that statements under the threshold only update the stats"""
+        recorder = QueryRecorder(threshold_ms=10_000)
+        recorder.install(engine)
+
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+
+        assert recorder.slow_queries() == []
+        stats = {entry["statement"]: entry for entry in recorder.statement_stats()}
+        assert stats["SELECT 1"]["count"] == 3
+
+    def test_slow_query_captures_plan_and_parameters(self, engine):
+        """Test that slow statements are buffered with parameters and EXPLAIN plan"""
+        recorder = QueryRecorder(threshold_ms=0, param_sample_rate=1.0)
+        recorder.install(engine)
+
+        with engine.connect() as connection:
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+            connection.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 7})
+        recorder.wait_for_plans()
+
+        slow = recorder.slow_queries()[0]
+        assert slow["statement"].startswith("SELECT name FROM items")
+        assert "7" in slow["parameters"]
+        assert slow["explain_error"] is None
+        assert any("items" in line for line in slow["plan"])
+
+    def test_ring_buffer_keeps_newest_entries(self):
+        """Test that the slow query log is bounded"""
+        recorder = QueryRecorder(threshold_ms=0, log_size=2, explain=False)
+
+        for i in range(5):
+            recorder.record(f"SELECT {i}", None, 1.0)
+
+        assert [entry["statement"] for entry in recorder.slow_queries()] == ["SELECT 4", "SELECT 3"]
+
+    def test_parameters_are_sampled(self):
+        """Test that parameters are omitted when not sampled"""
+        recorder = QueryRecorder(threshold_ms=0, explain=False, param_sample_rate=0.0)
+
+        recorder.record("SELECT :id", {"id": 1}, 5.0)
+
+        assert recorder.slow_queries()[0]["parameters"] is None
+
+    def test_reset_clears_buffer_and_stats(self):
+        """Test reset"""
+        recorder = QueryRecorder(threshold_ms=0, explain=False)
+        recorder.record("SELECT 1", None, 1.0)
+
+        assert recorder.reset() == 1
+        assert recorder.slow_queries() == []
+        assert recorder.statement_stats() == []
@@ -0,0 +1,167 @@
+import threading
+import pytest
+from datetime import date
+from sqlmodel import Session
+from app.application.services.school_service import SchoolService
+from app.application.services.student_service import StudentService
+from app.domain.enums import InvoiceStatus, PaymentMethod
+from app.infrastructure.archive.parquet_archive import InvoiceArchiver, archive_files, archive_horizon, partition_dir
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.repositories.invoice_archive_repository import InvoiceArchiveRepository
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.school_repository import SchoolRepository
+from app.infrastructure.repositories.student_repository import StudentRepository
+from tests.unit.infrastructure.conftest import make_invoice, make_school, make_student
+
+pyarrow = pytest.importorskip("pyarrow")
+import pyarrow.parquet  # noqa: E402
+
+HORIZON = date(2024, 1, 1)
+
+
+@pytest.fixture
+def school_id(session):
+    """Two students with paid, cancelled and pending invoices on both sides of 2024-01-01"""
+    school = make_school()
+    session.add(school)
+    session.commit()
+    first, second = make_student(school.id), make_student(school.id, email="second@example.com")
+    session.add_all([first, second])
+    session.commit()
+    paid = {"status": InvoiceStatus.PAID, "payment_date": date(2022, 3, 1), "payment_method": PaymentMethod.CASH}
+    session.add_all([
+        make_invoice(first.id, school.id, invoice_number="INV-1", invoice_date=date(2022, 2, 1), **paid),
+        make_invoice(first.id, school.id, invoice_number="INV-2", invoice_date=date(2023, 5, 1), status=InvoiceStatus.CANCELLED),
+        make_invoice(first.id, school.id, invoice_number="INV-3", invoice_date=date(2023, 6, 1)),
+        make_invoice(first.id, school.id, invoice_number="INV-4"),
+        make_invoice(second.id, school.id, invoice_number="INV-5", invoice_date=date(2023, 2, 1), amount=200.0, total_amount=210.0, **paid),
+    ])
+    session.commit()
+    return school.id
+
+
+def services(session, root):
+    archive = InvoiceArchiveRepository(session, str(root))
+    student_service = StudentService(StudentRepository(session), InvoiceRepository(session), SchoolRepository(session), archive)
+    school_service = SchoolService(SchoolRepository(session), StudentRepository(session), InvoiceRepository(session), archive)
+    return student_service, school_service
+
+
+def totals(statement):
+    return (
+        statement.total_charges, statement.total_payments, statement.paid_amount,
+        statement.pending_amount, statement.total_invoices,
+    )
+
+
+class TestInvoiceArchiver:
+    """Test suite for archiving settled invoices to Parquet files"""
+
+    def test_moves_settled_invoices_into_partitioned_zstd_files(self, session, school_id, tmp_path):
+        """Test that settled invoices past the horizon move to zstd files partitioned by school and year"""
+        result = InvoiceArchiver(session, str(tmp_path), batch_size=2).archive(HORIZON)
+
+        assert (result.invoices, result.batches) == (3, 2)
+        remaining = sorted(row.invoice_number for row in session.query(InvoiceEntity).all())
+        assert remaining == ["INV-3", "INV-4"]
+
+        files = archive_files(tmp_path)
+        assert len(files) == result.files
+        assert {path.parent for path in files} == {partition_dir(tmp_path, school_id, 2022), partition_dir(tmp_path, school_id, 2023)}
+        metadata = pyarrow.parquet.ParquetFile(files[0]).metadata
+        assert metadata.row_group(0).column(0).compression == "ZSTD"
+        rows = pyarrow.parquet.read_table(partition_dir(tmp_path, school_id, 2022)).to_pylist()
+        assert rows[0]["invoice_number"] == "INV-1"
+        assert (rows[0]["status"], rows[0]["payment_method"]) == ("paid", "cash")
+
+    @pytest.mark.asyncio
+    async def test_statements_are_unchanged_by_archiving(self, session, school_id, tmp_path):
+        """Test that student and school statements report the same totals after archiving"""
+        student_service, school_service = services(session, tmp_path)
+        student_id = session.query(InvoiceEntity).filter_by(invoice_number="INV-1").one().student_id
+        period = (date(2022, 1, 1), date(2024, 12, 31))
+        student_before = await student_service.get_student_account_statement(student_id, *period)
+        school_before = await school_service.get_school_account_statement(school_id, *period)
+
+        InvoiceArchiver(session, str(tmp_path)).archive(HORIZON)
+        student_after = await student_service.get_student_account_statement(student_id, *period)
+        school_after = await school_service.get_school_account_statement(school_id, *period)
+
+        assert totals(student_after) == totals(student_before)
+        assert student_after.archived_invoices == 2
+        assert totals(school_after) == totals(school_before)
+        assert (school_after.paid_invoices, school_after.pending_invoices) == (school_before.paid_invoices, school_before.pending_invoices)
+        assert school_after.students_with_invoices == 2
+        assert school_after.archived_invoices == 3
+
+    @pytest.mark.asyncio
+    async def test_ranges_after_the_watermark_skip_the_archive(self, session, school_id, tmp_path):
+        """Test that periods starting at the watermark are answered from the database alone"""
+        archive = InvoiceArchiveRepository(session, str(tmp_path))
+        assert await archive.get_watermark() is None
+
+        InvoiceArchiver(session, str(tmp_path)).archive(HORIZON)
+        student_service, _ = services(session, tmp_path)
+        student_id = session.query(InvoiceEntity).filter_by(invoice_number="INV-4").one().student_id
+        statement = await student_service.get_student_account_statement(student_id, date(2024, 1, 1), date(2024, 12, 31))
+
+        assert await archive.get_watermark() == HORIZON
+        assert statement.archived_invoices == 0
+        assert statement.total_invoices == 1
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_files_are_ignored_and_removed(self, session, school_id, tmp_path):
+        """Test that files of an uncommitted batch are never read and are removed by the next run"""
+        InvoiceArchiver(session, str(tmp_path)).archive(HORIZON)
+        committed = archive_files(tmp_path)[0]
+        orphan = committed.with_name("part-0123456789abcdef0123456789abcdef-0000.parquet")
+        orphan.write_bytes(committed.read_bytes())
+
+        archive = InvoiceArchiveRepository(session, str(tmp_path))
+        student_totals = await archive.get_school_totals_by_student(school_id, date(2022, 1, 1), date(2023, 12, 31))
+        assert sum(totals.invoice_count for totals in student_totals.values()) == 3
+
+        result = InvoiceArchiver(session, str(tmp_path)).archive(HORIZON)
+        assert (result.orphans_removed, result.invoices) == (1, 0)
+        assert not orphan.exists()
+
+    def test_overlapping_runs_do_not_remove_files_in_progress(self, session, school_id, tmp_path):
+        """Test that a run started during another waits instead of removing its unfinished batch"""
+        written, release = threading.Event(), threading.Event()
+
+        class PausedArchiver(InvoiceArchiver):
+            @staticmethod
+            def _write(*args):
+                path = InvoiceArchiver._write(*args)
+                written.set()
+                release.wait(5)
+                return path
+
+        results = {}
+        engine = session.get_bind()
+
+        def run(name, archiver_class):
+            with Session(engine) as own_session:
+                results[name] = archiver_class(own_session, str(tmp_path)).archive(HORIZON)
+
+        first = threading.Thread(target=run, args=("first", PausedArchiver))
+        second = threading.Thread(target=run, args=("second", InvoiceArchiver))
+        first.start()
+        assert written.wait(5)
+        second.start()
+        second.join(0.2)
+
+        assert second.is_alive()
+        assert len(archive_files(tmp_path)) == 1
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert (results["first"].invoices, results["second"].invoices) == (3, 0)
+        assert results["second"].orphans_removed == 0
+        rows = sum(pyarrow.parquet.read_table(path).num_rows for path in archive_files(tmp_path))
+        assert rows == 3
+
+    def test_horizon_keeps_whole_years(self):
+        """Test that the horizon keeps the retention years whole"""
+        assert archive_horizon(date(2026, 10, 19), 3) == date(2023, 1, 1)
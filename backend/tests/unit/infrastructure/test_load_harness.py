@@ -0,0 +1,37 @@
+import pytest
+from benchmarks.load import DEFAULT_WEIGHTS, LatencyStats, parse_weights, route_of
+
+
+class TestLoadHarness:
+    """Test suite for the load harness"""
+
+    def test_groups_requests_by_route_template(self):
+        """Test that request paths are grouped by route template"""
+        assert route_of("GET", "/students/42/account-statement") == "GET /students/{id}/account-statement"
+        assert route_of("POST", "/invoices/7/payment") == "POST /invoices/{id}/payment"
+        assert route_of("GET", "/invoices/") == "GET /invoices/"
+
+    def test_summarizes_latency_and_statuses(self):
+        """Test that the summary reports throughput, percentiles, errors and the latency histogram"""
+        stats = LatencyStats()
+        for elapsed_ms in (0.5, 3, 3, 40, 7000):
+            stats.add(elapsed_ms)
+        stats.add(12, status=409)
+
+        summary = stats.summary(seconds=2)
+
+        assert summary["count"] == 6 and summary["errors"] == 1
+        assert summary["rps"] == 3
+        assert summary["p50_ms"] == 3 and summary["max_ms"] == 7000
+        assert summary["histogram"]["<=1ms"] == 1
+        assert summary["histogram"]["<=5ms"] == 2
+        assert summary["histogram"][">5000ms"] == 1
+
+    def test_scenario_weights_can_be_overridden(self):
+        """Test that scenario weights can be overridden and unknown scenarios are rejected"""
+        weights = parse_weights(["login_storm=0", "school_statement=20"])
+
+        assert weights["login_storm"] == 0 and weights["school_statement"] == 20
+        assert weights["invoice_filters"] == DEFAULT_WEIGHTS["invoice_filters"]
+        with pytest.raises(SystemExit):
+            parse_weights(["unknown=1"])
@@ -0,0 +1,154 @@
+import json
+import os
+import subprocess
+import sys
+from time import time
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.core.cache import RegionCache, api_cache, invalidate_cache_pattern
+from app.core.metrics import (
+    CACHE_EVICTIONS,
+    CACHE_INVALIDATIONS,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsExporter,
+    MetricsMiddleware,
+    Registry,
+)
+
+
+def value_of(metric, *labels):
+    return dict(metric.samples()).get(labels, 0.0)
+
+
+@pytest.fixture
+def dead_pid():
+    """Pid of a process that has exited"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def registry():
+    registry = Registry()
+    Counter("jobs_total", "Jobs", ("queue",), registry=registry)
+    Gauge("jobs_running", "Running jobs", registry=registry)
+    Histogram("job_seconds", "Job time", buckets=(0.1, 1.0), registry=registry)
+    return registry
+
+
+def write_worker(directory, pid, jobs, running, written_at=None):
+    """Snapshot of another worker"""
+    snapshot = {
+        "pid": pid,
+        "written_at": written_at or time(),
+        "metrics": {
+            "jobs_total": [[["default"], jobs]],
+            "jobs_running": [[[], running]],
+            "job_seconds": [[[], [1.0, 0.0, 1.0, 5.05]]],
+        },
+    }
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"worker-{pid}.json").write_text(json.dumps(snapshot))
+
+
+class TestMetrics:
+    """Test suite for the Prometheus metrics"""
+
+    def test_middleware_records_route_templates_and_statuses(self):
+        """Test that requests are labelled by route template and scrapes are not recorded"""
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            if item_id == 0:
+                raise HTTPException(status_code=404)
+            return {"id": item_id}
+
+        @app.get("/metrics")
+        async def metrics():
+            return {}
+
+        app.add_middleware(MetricsMiddleware)
+        client = TestClient(app)
+        before = {labels: value_of(HTTP_REQUESTS, *labels) for labels in (
+            ("GET", "/items/{item_id}", "200"), ("GET", "/items/{item_id}", "404"), ("GET", "unmatched", "404"), ("GET", "/metrics", "200")
+        )}
+
+        for path in ("/items/1", "/items/2", "/items/0", "/nowhere", "/metrics"):
+            client.get(path)
+
+        assert value_of(HTTP_REQUESTS, "GET", "/items/{item_id}", "200") - before[("GET", "/items/{item_id}", "200")] == 2
+        assert value_of(HTTP_REQUESTS, "GET", "/items/{item_id}", "404") - before[("GET", "/items/{item_id}", "404")] == 1
+        assert value_of(HTTP_REQUESTS, "GET", "unmatched", "404") - before[("GET", "unmatched", "404")] == 1
+        assert value_of(HTTP_REQUESTS, "GET", "/metrics", "200") == before[("GET", "/metrics", "200")]
+        assert value_of(HTTP_REQUESTS_IN_PROGRESS) == 0
+
+    def test_workers_are_merged(self, registry, tmp_path, dead_pid):
+        """Test that counters and histograms sum over every worker and gauges over live ones"""
+        registry.metrics["jobs_total"].inc("default", amount=2)
+        registry.metrics["jobs_running"].set(1)
+        registry.metrics["job_seconds"].observe(0.05)
+        write_worker(tmp_path, os.getppid(), jobs=3, running=4)
+        write_worker(tmp_path, dead_pid, jobs=5, running=100)
+
+        text = MetricsExporter(registry, str(tmp_path)).collect()
+
+        assert 'jobs_total{queue="default"} 10.0' in text
+        assert "jobs_running 5.0" in text
+        assert 'job_seconds_bucket{le="0.1"} 3.0' in text
+        assert 'job_seconds_bucket{le="1.0"} 3.0' in text
+        assert 'job_seconds_bucket{le="+Inf"} 5.0' in text
+        assert "job_seconds_count 5.0" in text
+        assert "# TYPE job_seconds histogram" in text
+
+    def test_stale_gauges_are_ignored(self, registry, tmp_path):
+        """Test that a worker that stopped writing snapshots no longer counts in gauges"""
+        write_worker(tmp_path, os.getppid(), jobs=3, running=4, written_at=time() - 3600)
+
+        text = MetricsExporter(registry, str(tmp_path)).collect()
+
+        assert 'jobs_total{queue="default"} 3.0' in text
+        assert "\njobs_running " not in text
+
+    def test_exited_workers_are_archived(self, registry, tmp_path, dead_pid):
+        """Test that snapshots of exited workers are folded into the archive without losing totals"""
+        exporter = MetricsExporter(registry, str(tmp_path))
+        write_worker(tmp_path, dead_pid, jobs=5, running=100)
+        write_worker(tmp_path, os.getppid(), jobs=3, running=4)
+
+        assert exporter.archive_exited_workers() == 1
+        write_worker(tmp_path, dead_pid + 1_000_000, jobs=1, running=0)
+        assert exporter.archive_exited_workers() == 1
+
+        assert not (tmp_path / f"worker-{dead_pid}.json").exists()
+        text = exporter.collect()
+        assert 'jobs_total{queue="default"} 9.0' in text
+        assert "jobs_running 4.0" in text
+
+    def test_cache_evictions_and_invalidations(self):
+        """Test that evictions are counted by reason, invalidations by region, and clear() is neither"""
+        clock = [0.0]
+        cache = RegionCache("test", maxsize=2, ttl=10, timer=lambda: clock[0])
+        capacity, expired = value_of(CACHE_EVICTIONS, "test", "capacity"), value_of(CACHE_EVICTIONS, "test", "expired")
+
+        for key in ("a", "b", "c"):
+            cache[key] = 1
+        clock[0] = 20
+        cache["d"] = 1
+        cache["e"] = 1
+        cache.clear()
+
+        assert value_of(CACHE_EVICTIONS, "test", "capacity") - capacity == 1
+        assert value_of(CACHE_EVICTIONS, "test", "expired") - expired == 2
+
+        invalidations = value_of(CACHE_INVALIDATIONS, "api")
+        api_cache["api:metrics-test:1"] = 1
+        api_cache["api:metrics-test:2"] = 1
+        assert invalidate_cache_pattern("api:metrics-test:") == 2
+        assert value_of(CACHE_INVALIDATIONS, "api") - invalidations == 2
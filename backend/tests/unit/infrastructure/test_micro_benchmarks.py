@@ -0,0 +1,36 @@
+from benchmarks.micro import BENCHMARKS, Fixtures, Result, compare, load_baseline, run_benchmarks, save_baseline
+
+
+def result(median_ns: float) -> Result:
+    return Result(best_ns=median_ns * 0.9, median_ns=median_ns, number=100, repeats=7)
+
+
+class TestMicroBenchmarks:
+    """Test suite for the hot-path microbenchmarks"""
+
+    def test_flags_only_slowdowns_above_the_threshold(self):
+        """Test that only benchmarks slower than the baseline by more than the threshold regress"""
+        baseline = {"results": {"fast": vars(result(100)), "slow": vars(result(100))}}
+
+        comparisons = {c.name: c for c in compare({"fast": result(115), "slow": result(130), "new": result(5)}, baseline, 0.2)}
+
+        assert not comparisons["fast"].regressed
+        assert comparisons["slow"].regressed
+        assert comparisons["new"].baseline is None and not comparisons["new"].regressed
+
+    def test_saving_keeps_entries_of_benchmarks_not_run(self, tmp_path):
+        """Test that saving a partial run keeps the baseline of the other benchmarks"""
+        path = tmp_path / "micro.json"
+        save_baseline(path, {"a": result(100), "b": result(200)})
+        save_baseline(path, {"a": result(150)}, load_baseline(path))
+
+        entries = load_baseline(path)["results"]
+        assert entries["a"]["median_ns"] == 150
+        assert entries["b"]["median_ns"] == 200
+
+    def test_every_benchmark_runs(self):
+        """Test that every registered benchmark runs on a small dataset"""
+        results = run_benchmarks(Fixtures.build(schools=1, students_per_school=3, invoices_per_student=4), repeats=1, min_time=0.001)
+
+        assert set(results) == set(BENCHMARKS)
+        assert all(result.median_ns > 0 for result in results.values())
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+from app.infrastructure.database.migrations import MIGRATIONS, LATEST_VERSION
+from app.infrastructure.database.migrations.runner import Migration, run_migrations
+
+
+def _index_names(engine, table_name):
+    return {index["name"] for index in inspect(engine).get_indexes(table_name)}
+
+
+class TestMigrationRunner:
+    """Test suite for the versioned migration runner"""
+
+    def test_applies_all_migrations_once(self, engine):
+        """Test that every registered migration is applied and recorded once"""
+        SQLModel.metadata.create_all(bind=engine)
+
+        applied = run_migrations(engine, MIGRATIONS)
+        assert applied == [m.version for m in sorted(MIGRATIONS, key=lambda m: m.version)]
+
+        # Second run is a no-op
+        assert run_migrations(engine, MIGRATIONS) == []
+
+        with engine.connect() as connection:
+            versions = connection.execute(text("SELECT max(version) FROM schema_migrations")).scalar()
+        assert versions == LATEST_VERSION
+
+    def test_creates_indexes_on_existing_tables(self, engine):
+        """Test that indexes are added to tables created before they were declared"""
+        SQLModel.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX idx_students_school_id"))
+            connection.execute(text("DROP INDEX idx_invoices_student_id_invoice_date"))
+            connection.execute(text("DROP INDEX idx_invoices_school_id_status_due_date"))
+            connection.execute(text("DROP INDEX idx_invoices_invoice_date_id"))
+
+        run_migrations(engine, MIGRATIONS)
+
+        assert "idx_students_school_id" in _index_names(engine, "students")
+        assert {
+            "idx_invoices_student_id_invoice_date",
+            "idx_invoices_school_id_status_due_date",
+            "idx_invoices_invoice_date_id",
+        } <= _index_names(engine, "invoices")
+
+    def test_migrations_run_in_version_order(self, engine):
+        """Test that migrations are applied by version, not registration order"""
+        calls = []
+        migrations = [
+            Migration(version=2, description="second", upgrade=lambda c: calls.append(2)),
+            Migration(version=1, description="first", upgrade=lambda c: calls.append(1)),
+        ]
+
+        run_migrations(engine, migrations)
+
+        assert calls == [1, 2]
+
+    def test_failed_migration_is_not_recorded(self, engine):
+        """Test that a failing migration rolls back and can be retried"""
+        def broken(connection):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            run_migrations(engine, [Migration(version=1, description="broken", upgrade=broken)])
+
+        assert run_migrations(engine, [Migration(version=1, description="fixed", upgrade=lambda c: None)]) == [1]
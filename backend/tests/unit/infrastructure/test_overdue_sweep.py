@@ -0,0 +1,106 @@
+import pytest
+from datetime import date
+from app.application.services.student_service import StudentService
+from app.core.cache import api_cache
+from app.domain.enums import InvoiceStatus
+from app.infrastructure.jobs.overdue_sweep import sweep_overdue_invoices
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.school_repository import SchoolRepository
+from app.infrastructure.repositories.student_repository import StudentRepository
+from tests.unit.infrastructure.conftest import make_invoice, make_school, make_student
+
+
+@pytest.fixture
+def student_id(session):
+    """Student with a pending invoice due 2024-02-15, one due 2024-03-15 and a paid one due 2024-01-15"""
+    school = make_school()
+    session.add(school)
+    session.commit()
+    student = make_student(school.id)
+    session.add(student)
+    session.commit()
+    session.add_all([
+        make_invoice(student.id, school.id, invoice_number="INV-1"),
+        make_invoice(student.id, school.id, invoice_number="INV-2", due_date=date(2024, 3, 15)),
+        make_invoice(
+            student.id, school.id, invoice_number="INV-3", due_date=date(2024, 1, 20), status=InvoiceStatus.PAID
+        ),
+    ])
+    session.commit()
+    return student.id
+
+
+def statuses(session):
+    session.expire_all()
+    rows = session.query(InvoiceEntity).order_by(InvoiceEntity.invoice_number).all()
+    return [row.status for row in rows]
+
+
+class TestOverdueSweep:
+    """Test suite for the stored overdue status and its sweep"""
+
+    @pytest.mark.asyncio
+    async def test_flags_pending_invoices_past_due_with_set_based_updates(self, session, student_id, statements):
+        """Test that the sweep flags pending invoices past due with set-based UPDATEs, no per-row reads"""
+        updated = await InvoiceRepository(session).mark_overdue(date(2024, 3, 1))
+
+        assert updated == 1
+        assert len(statements) == 2
+        assert all(statement.startswith("UPDATE invoices SET status=?") for statement in statements)
+        assert statuses(session) == [InvoiceStatus.OVERDUE, InvoiceStatus.PENDING, InvoiceStatus.PAID]
+
+    @pytest.mark.asyncio
+    async def test_is_idempotent(self, session, student_id):
+        """Test that a second sweep on the same day changes nothing"""
+        repository = InvoiceRepository(session)
+
+        assert await repository.mark_overdue(date(2024, 4, 1)) == 2
+        assert await repository.mark_overdue(date(2024, 4, 1)) == 0
+
+    @pytest.mark.asyncio
+    async def test_sweep_clears_invoices_no_longer_past_due(self, session, student_id):
+        """Test that the sweep sets overdue invoices due on or after its date back to pending"""
+        repository = InvoiceRepository(session)
+        await repository.mark_overdue(date(2024, 4, 1))
+
+        assert await repository.mark_overdue(date(2024, 3, 1)) == 1
+        assert statuses(session) == [InvoiceStatus.OVERDUE, InvoiceStatus.PENDING, InvoiceStatus.PAID]
+
+    @pytest.mark.asyncio
+    async def test_extending_the_due_date_clears_overdue(self, session, student_id):
+        """Test that moving an overdue invoice's due date to the future sets it back to pending"""
+        repository = InvoiceRepository(session)
+        await repository.mark_overdue(date(2024, 4, 1))
+        first, second = session.query(InvoiceEntity).order_by(InvoiceEntity.invoice_number).limit(2).all()
+
+        extended = await repository.update_fields(first.id, {"due_date": date(2999, 1, 1)})
+        described = await repository.update_fields(second.id, {"description": "Lab fee"})
+
+        assert extended.status == InvoiceStatus.PENDING and not extended.is_overdue()
+        assert described.status == InvoiceStatus.OVERDUE
+        page = await repository.get_with_filters({"status": InvoiceStatus.OVERDUE})
+        assert [invoice.invoice_number for invoice in page.items] == ["INV-2"]
+
+    def test_job_invalidates_cached_invoice_responses(self, session, student_id):
+        """Test that the job invalidates only cached responses showing invoice statuses"""
+        api_cache["api:get_invoices:stale"] = "cached"
+        api_cache["api:get_schools:unrelated"] = "cached"
+        try:
+            assert sweep_overdue_invoices(session.get_bind(), date(2024, 3, 1)) == 1
+
+            assert "api:get_invoices:stale" not in api_cache
+            assert "api:get_schools:unrelated" in api_cache
+        finally:
+            api_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_statement_counts_stored_overdue_status(self, session, student_id):
+        """Test that statements list invoices flagged by the sweep as overdue"""
+        await InvoiceRepository(session).mark_overdue(date(2024, 3, 1))
+        service = StudentService(StudentRepository(session), InvoiceRepository(session), SchoolRepository(session))
+
+        statement = await service.get_student_account_statement(student_id, date(2024, 1, 1), date(2024, 12, 31))
+
+        assert [invoice.invoice_number for invoice in statement.overdue_invoices] == ["INV-1", "INV-2"]
+        assert statement.pending_invoices == []
@@ -0,0 +1,257 @@
+import pytest
+from datetime import date
+from app.core.cache import count_cache
+from app.core.fields import parse_fields, select_fields
+from app.core.pagination import PaginatedResponse, PaginationParams, decode_cursor, encode_cursor
+from app.domain.models.student import Student
+from app.domain.repositories.page import CountMode
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.repositories import pagination
+from app.infrastructure.repositories.student_repository import StudentRepository
+from tests.unit.infrastructure.conftest import make_invoice, make_school, make_student
+
+
+@pytest.fixture
+def repository(session):
+    """Student repository over one school with five students (four in grade 8)"""
+    school = make_school()
+    session.add(school)
+    session.commit()
+    session.add_all([
+        make_student(school.id, email=f"student{i}@example.com", grade_level=9 if i == 0 else 8)
+        for i in range(5)
+    ])
+    session.commit()
+    return StudentRepository(session)
+
+
+class TestFetchPage:
+    """Test suite for the pagination count modes"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("count_mode", [CountMode.EXACT, CountMode.WINDOW])
+    async def test_counting_modes_agree(self, repository, count_mode):
+        """Test that exact and window counts return the same page"""
+        page = await repository.get_with_filters({"grade_level": 8}, offset=2, limit=3, count_mode=count_mode)
+
+        assert page.total == 4
+        assert len(page.items) == 2
+        assert page.has_next is False
+
+    @pytest.mark.asyncio
+    async def test_window_mode_uses_one_query(self, repository, statements):
+        """Test that the window mode returns the total with the page"""
+        page = await repository.get_all(offset=0, limit=2, count_mode=CountMode.WINDOW)
+
+        assert page.total == 5
+        assert page.has_next is True
+        assert len(statements) == 1
+        assert "OVER ()" in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_window_mode_past_the_end_falls_back_to_count(self, repository):
+        """Test that an empty page past the end still reports the total"""
+        page = await repository.get_all(offset=10, limit=2, count_mode=CountMode.WINDOW)
+
+        assert page.items == []
+        assert page.total == 5
+
+    @pytest.mark.asyncio
+    async def test_none_mode_fetches_one_extra_row(self, repository, statements):
+        """Test that the count-free mode computes has_next without a total"""
+        first = await repository.get_all(offset=0, limit=4, count_mode=CountMode.NONE)
+        last = await repository.get_all(offset=4, limit=4, count_mode=CountMode.NONE)
+
+        assert first.total is None
+        assert len(first.items) == 4
+        assert first.has_next is True
+        assert len(last.items) == 1
+        assert last.has_next is False
+        assert not any("count(" in statement.lower() for statement in statements)
+
+
+class TestCountStrategy:
+    """Test suite for cached and estimated totals"""
+
+    @pytest.fixture(autouse=True)
+    def empty_count_cache(self):
+        count_cache.clear()
+        yield
+        count_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_filtered_counts_are_cached_per_filter(self, repository, statements):
+        """Test that repeated filters reuse the cached total"""
+        first = await repository.get_with_filters({"grade_level": 8}, count_mode=CountMode.AUTO)
+        await repository.get_with_filters({"grade_level": 8}, offset=2, count_mode=CountMode.AUTO)
+        other = await repository.get_with_filters({"grade_level": 9}, count_mode=CountMode.AUTO)
+
+        assert first.total == 4
+        assert other.total == 1
+        assert first.total_is_estimate is False
+        assert sum("count(*)" in statement for statement in statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_cached_counts(self, repository):
+        """Test that creating a row refreshes the cached total"""
+        assert (await repository.get_all(count_mode=CountMode.AUTO)).total == 5
+
+        school_id = (await repository.get_all()).items[0].school_id
+        await repository.create(Student(
+            first_name="New",
+            last_name="Student",
+            email="new.student@example.com",
+            phone_number="555-0199",
+            date_of_birth=date(2010, 1, 1),
+            grade_level=8,
+            school_id=school_id,
+            enrollment_date=date(2020, 9, 1),
+            address="2 Elm St",
+        ))
+
+        assert (await repository.get_all(count_mode=CountMode.AUTO)).total == 6
+
+    @pytest.mark.asyncio
+    async def test_large_unfiltered_lists_use_the_estimate(self, repository, monkeypatch):
+        """Test that unfiltered totals above the threshold come from the planner"""
+        monkeypatch.setattr(pagination, "estimate_count", lambda session, entity_class: 2_500_000)
+
+        unfiltered = await repository.get_all(count_mode=CountMode.AUTO)
+        filtered = await repository.get_with_filters({"grade_level": 8}, count_mode=CountMode.AUTO)
+
+        assert unfiltered.total == 2_500_000
+        assert unfiltered.total_is_estimate is True
+        assert filtered.total == 4
+        assert filtered.total_is_estimate is False
+
+    def test_estimate_is_unavailable_on_sqlite(self, session):
+        """Test that non-PostgreSQL databases fall back to counting"""
+        assert pagination.estimate_count(session, StudentEntity) is None
+
+
+class TestKeysetPagination:
+    """Test suite for cursor based pagination"""
+
+    @pytest.fixture
+    def invoices(self, session):
+        """Invoice repository with several invoices sharing dates"""
+        school = make_school()
+        session.add(school)
+        session.commit()
+        student = make_student(school.id)
+        session.add(student)
+        session.commit()
+        dates = [date(2024, 3, 1), date(2024, 1, 1), date(2024, 2, 1), date(2024, 1, 1), date(2024, 2, 1)]
+        session.add_all([
+            make_invoice(student.id, school.id, invoice_number=f"INV-{i}", invoice_date=invoice_date, due_date=date(2024, 4, 1))
+            for i, invoice_date in enumerate(dates)
+        ])
+        session.commit()
+        return InvoiceRepository(session)
+
+    @pytest.mark.asyncio
+    async def test_cursor_walk_matches_sort_order(self, invoices, statements):
+        """Test that following cursors visits every row once in (invoice_date, id) order"""
+        seen = []
+        after = None
+        while True:
+            page = await invoices.get_all(limit=2, count_mode=CountMode.NONE, after=after)
+            seen.extend(page.items)
+            if not page.has_next:
+                break
+            after = decode_cursor(encode_cursor(page.next_key))
+
+        assert [(invoice.invoice_date, invoice.id) for invoice in seen] == sorted(
+            (invoice.invoice_date, invoice.id) for invoice in seen
+        )
+        assert len({invoice.id for invoice in seen}) == 5
+        assert any("(invoices.invoice_date, invoices.id) > (?, ?)" in statement for statement in statements)
+
+    @pytest.mark.asyncio
+    async def test_cursor_page_keeps_full_total(self, invoices):
+        """Test that a total requested with a cursor counts the whole result"""
+        first = await invoices.get_all(limit=2, count_mode=CountMode.WINDOW)
+        second = await invoices.get_all(limit=2, count_mode=CountMode.WINDOW, after=first.next_key)
+
+        assert second.total == 5
+        assert second.has_next is True
+
+    def test_invalid_cursor_is_rejected(self):
+        """Test that malformed cursors raise ValueError"""
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            PaginationParams(cursor="not a cursor").after
+
+    @pytest.mark.asyncio
+    async def test_cursor_with_wrong_key_length_is_rejected(self, invoices):
+        """Test that a cursor from another sort key is rejected"""
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            await invoices.get_all(after=[1])
+
+
+class TestSparseFields:
+    """Test suite for sparse fieldsets and column projection"""
+
+    def test_parse_fields(self):
+        """Test that fields are split, deduplicated and validated"""
+        assert parse_fields(None, ["id", "name"]) is None
+        assert parse_fields(" , ", ["id", "name"]) is None
+        assert parse_fields("name, id,name", ["id", "name"]) == ["name", "id"]
+        with pytest.raises(ValueError, match="Unknown fields: age"):
+            parse_fields("id,age", ["id", "name"])
+
+    def test_select_fields_renames_attributes(self):
+        """Test that projected attributes are returned under response field names"""
+        row = {"id": 1, "phone_number": "555-0100"}
+        assert select_fields(row, ["phone", "id"], {"id": "id", "phone": "phone_number"}) == {"phone": "555-0100", "id": 1}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("count_mode", [CountMode.EXACT, CountMode.WINDOW, CountMode.NONE])
+    async def test_projection_selects_only_requested_columns(self, repository, statements, count_mode):
+        """Test that projected pages select the requested columns plus the sort key"""
+        page = await repository.get_projection({"grade_level": 8}, ["email"], limit=3, count_mode=count_mode)
+
+        assert page.items == [{"email": f"student{i}@example.com"} for i in range(1, 4)]
+        assert page.has_next is True
+        assert page.next_key is not None
+        page_query = [statement for statement in statements if "students.email" in statement][0]
+        assert "students.first_name" not in page_query
+
+    @pytest.mark.asyncio
+    async def test_projection_by_id(self, repository):
+        """Test that a single row can be projected"""
+        student_id = (await repository.get_all(limit=1)).items[0].id
+
+        assert await repository.get_projection_by_id(student_id, ["id", "phone_number"]) == {
+            "id": student_id,
+            "phone_number": "555-0101",
+        }
+        assert await repository.get_projection_by_id(999, ["id"]) is None
+
+
+class TestPaginatedResponse:
+    """Test suite for paginated responses with and without totals"""
+
+    def test_response_with_total(self):
+        """Test that pages are derived from the total"""
+        response = PaginatedResponse.create([1, 2], 12, PaginationParams(page=1, size=5))
+
+        assert response.pages == 3
+        assert response.has_next is True
+
+    def test_response_without_total(self):
+        """Test that skipped counts leave total and pages empty"""
+        pagination = PaginationParams(page=2, size=5, include_total=False)
+        response = PaginatedResponse.create([1, 2], None, pagination, has_next=False)
+
+        assert pagination.count_mode == CountMode.NONE
+        assert response.total is None
+        assert response.pages is None
+        assert response.has_next is False
+        assert response.has_previous is True
+
+    def test_response_next_cursor(self):
+        """Test that the next page's cursor encodes the last sort key"""
+        response = PaginatedResponse.create([1], 3, PaginationParams(size=1), True, (date(2024, 1, 1), 7))
+
+        assert decode_cursor(response.next_cursor) == ["2024-01-01", 7]
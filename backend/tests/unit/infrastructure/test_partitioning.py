@@ -0,0 +1,153 @@
+import os
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, event, text
+from sqlmodel import SQLModel, Session
+from app.application.services.student_service import StudentService
+from app.infrastructure.database.migrations import MIGRATIONS, run_migrations
+from app.infrastructure.database.partitioning import (
+    PartitionRange, convert_to_partitioned, detect_interval, ensure_partitions, list_partitions,
+    partition_for, partition_ranges, periods_ahead
+)
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.school_repository import SchoolRepository
+from app.infrastructure.repositories.student_repository import StudentRepository
+from tests.unit.infrastructure.conftest import make_invoice, make_school, make_student
+
+# Throwaway PostgreSQL database for the conversion tests (its tables are dropped)
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+class TestPartitionRanges:
+    """Test suite for partition naming and bounds"""
+
+    def test_yearly_and_monthly_bounds(self):
+        """Test that a date maps to its yearly or monthly partition"""
+        assert partition_for(date(2024, 6, 15), "year") == PartitionRange("invoices_y2024", date(2024, 1, 1), date(2025, 1, 1))
+        assert partition_for(date(2024, 12, 31), "month") == PartitionRange(
+            "invoices_m2024_12", date(2024, 12, 1), date(2025, 1, 1)
+        )
+
+    def test_ranges_are_contiguous(self):
+        """Test that the partitions covering a period leave no gaps"""
+        ranges = partition_ranges(date(2023, 11, 20), date(2024, 2, 1), "month")
+
+        assert [partition.name for partition in ranges] == [
+            "invoices_m2023_11", "invoices_m2023_12", "invoices_m2024_01", "invoices_m2024_02"
+        ]
+        assert all(previous.end == following.start for previous, following in zip(ranges, ranges[1:]))
+
+    def test_periods_ahead_and_interval_detection(self):
+        """Test that future partitions are listed and the interval is read back from their names"""
+        names = [partition.name for partition in periods_ahead(date(2024, 5, 1), 2, "year")]
+
+        assert names == ["invoices_y2024", "invoices_y2025", "invoices_y2026"]
+        assert detect_interval(names + ["invoices_default"]) == "year"
+        assert detect_interval(["invoices_default"]) is None
+
+    def test_unknown_interval(self):
+        """Test that an unsupported interval is rejected"""
+        with pytest.raises(ValueError, match="Unknown partition interval"):
+            partition_for(date(2024, 1, 1), "week")
+
+
+class TestOutsidePostgres:
+    """Test suite for partitioning on databases other than PostgreSQL"""
+
+    def test_ensure_is_a_no_op_and_convert_is_refused(self, migrated_engine):
+        """Test that ensuring partitions does nothing and converting is refused on SQLite"""
+        with migrated_engine.begin() as connection:
+            assert ensure_partitions(connection, ahead=2) == []
+            with pytest.raises(ValueError, match="requires PostgreSQL"):
+                convert_to_partitioned(connection, "year", ahead=2)
+
+
+class TestPruningFriendlyQueries:
+    """Test suite for queries that let PostgreSQL prune partitions"""
+
+    @pytest.mark.asyncio
+    async def test_statement_bounds_the_partition_key(self, session):
+        """Test that statement queries bound invoice_date on both sides"""
+        school = make_school()
+        session.add(school)
+        session.commit()
+        student = make_student(school.id)
+        session.add(student)
+        session.commit()
+        session.add(make_invoice(student.id, school.id))
+        session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        service = StudentService(StudentRepository(session), InvoiceRepository(session), SchoolRepository(session))
+        event.listen(session.get_bind(), "before_cursor_execute", record)
+        try:
+            await service.get_student_account_statement(student.id, date(2024, 1, 1), date(2024, 12, 31))
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", record)
+
+        invoice_queries = [statement for statement in statements if "FROM invoices" in statement]
+        assert invoice_queries
+        assert all(
+            "invoices.invoice_date >= " in statement and "invoices.invoice_date <= " in statement
+            for statement in invoice_queries
+        )
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+class TestPostgresPartitioning:
+    """Test suite for converting the invoices table on PostgreSQL"""
+
+    @pytest.fixture
+    def pg_engine(self):
+        """Engine on TEST_POSTGRES_URL with the tables recreated and migrated"""
+        engine = create_engine(POSTGRES_URL)
+        SQLModel.metadata.drop_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS schema_migrations, sequence_counters"))
+        SQLModel.metadata.create_all(bind=engine)
+        run_migrations(engine, MIGRATIONS)
+        yield engine
+        SQLModel.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    def test_convert_keeps_rows_and_routes_new_ones(self, pg_engine):
+        """Test that conversion keeps existing rows, prunes by date and routes later rows to new partitions"""
+        with Session(pg_engine) as session:
+            school = make_school()
+            session.add(school)
+            session.commit()
+            student = make_student(school.id)
+            session.add(student)
+            session.commit()
+            session.add_all([
+                make_invoice(student.id, school.id, invoice_date=date(2022, 3, 1), due_date=date(2022, 4, 1)),
+                make_invoice(student.id, school.id),
+            ])
+            session.commit()
+
+        with pg_engine.begin() as connection:
+            convert_to_partitioned(connection, "year", ahead=1, today=date(2024, 6, 1))
+        with pg_engine.begin() as connection:
+            assert list_partitions(connection) == [
+                "invoices_default", "invoices_y2022", "invoices_y2023", "invoices_y2024", "invoices_y2025"
+            ]
+            assert connection.execute(text("SELECT count(*) FROM invoices_y2022")).scalar() == 1
+            plan = "\n".join(row[0] for row in connection.execute(text(
+                "EXPLAIN SELECT * FROM invoices WHERE invoice_date >= '2024-01-01' AND invoice_date <= '2024-12-31'"
+            )))
+            assert "invoices_y2024" in plan and "invoices_y2022" not in plan
+
+            # Rows past the last partition land in the default one and move on the next ensure
+            connection.execute(text(
+                "INSERT INTO invoices (invoice_number, student_id, school_id, amount, tax_amount, total_amount, "
+                "description, invoice_date, due_date, status, created_at, updated_at) "
+                "SELECT 'INV-2026', student_id, school_id, amount, tax_amount, total_amount, description, "
+                "'2026-02-01', '2026-03-01', status, created_at, updated_at FROM invoices LIMIT 1"
+            ))
+            assert ensure_partitions(connection, ahead=0, today=date(2026, 1, 1)) == ["invoices_y2026"]
+            assert connection.execute(text("SELECT count(*) FROM invoices_y2026")).scalar() == 1
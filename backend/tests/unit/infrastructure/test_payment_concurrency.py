@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel, Session
+from app.application.dtos.invoice_dto import PaymentRecordDTO
+from app.application.services.invoice_service import InvoiceService
+from app.domain.enums import InvoiceStatus, PaymentMethod
+from app.domain.exceptions import InvoiceNotPayableError
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from tests.unit.infrastructure.conftest import make_invoice, make_school, make_student
+
+PARALLEL_PAYMENTS = 200
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """File backed SQLite engine, so every thread gets its own connection"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'payments.db'}", connect_args={"timeout": 30})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def create_invoice(engine, **overrides) -> int:
+    with Session(engine) as session:
+        school = make_school()
+        session.add(school)
+        session.commit()
+        student = make_student(school.id)
+        session.add(student)
+        session.commit()
+        invoice = make_invoice(student.id, school.id, **overrides)
+        session.add(invoice)
+        session.commit()
+        return invoice.id
+
+
+def pay(engine, invoice_id: int, attempt: int):
+    """Record one payment with its own session, as a request would"""
+    payment = PaymentRecordDTO(payment_date=date(2024, 2, 1), payment_method=PaymentMethod.CASH, notes=f"attempt {attempt}")
+    with Session(engine) as session:
+        service = InvoiceService(InvoiceRepository(session))
+        try:
+            return asyncio.run(service.record_payment(invoice_id, payment))
+        except InvoiceNotPayableError as e:
+            return e
+
+
+class TestRecordPayment:
+    """Test suite for atomic payment recording"""
+
+    def test_parallel_payments_succeed_exactly_once(self, file_engine):
+        """Test that of many concurrent payments for one invoice exactly one succeeds"""
+        invoice_id = create_invoice(file_engine)
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            results = list(executor.map(lambda attempt: pay(file_engine, invoice_id, attempt), range(PARALLEL_PAYMENTS)))
+
+        successes = [result for result in results if not isinstance(result, InvoiceNotPayableError)]
+        rejections = [result for result in results if isinstance(result, InvoiceNotPayableError)]
+        assert len(successes) == 1
+        assert len(rejections) == PARALLEL_PAYMENTS - 1
+        assert all(rejection.status == InvoiceStatus.PAID for rejection in rejections)
+
+        with Session(file_engine) as session:
+            invoice = session.get(InvoiceEntity, invoice_id)
+            assert invoice.status == InvoiceStatus.PAID
+            assert invoice.notes == successes[0].notes
+
+    def test_cancelled_and_missing_invoices(self, file_engine):
+        """Test that paying a cancelled invoice is rejected and a missing one returns None"""
+        invoice_id = create_invoice(file_engine, status=InvoiceStatus.CANCELLED)
+
+        rejection = pay(file_engine, invoice_id, 0)
+
+        assert isinstance(rejection, InvoiceNotPayableError)
+        assert str(rejection) == "Cannot pay a cancelled invoice"
+        assert pay(file_engine, 999, 0) is None
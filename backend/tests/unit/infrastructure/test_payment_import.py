@@ -0,0 +1,160 @@
+import pytest
+from app.application.services.invoice_service import InvoiceService
+from app.core.streaming import batched, iter_lines
+from app.domain.enums import InvoiceStatus, PaymentMethod
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from tests.unit.infrastructure.conftest import make_invoice, make_school, make_student
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+@pytest.fixture
+def invoice_ids(session):
+    """Invoices INV-1 (pending), INV-2 (overdue), INV-3 (paid), INV-4 (cancelled) and two INV-DUP"""
+    school = make_school()
+    session.add(school)
+    session.commit()
+    student = make_student(school.id)
+    session.add(student)
+    session.commit()
+    invoices = [
+        make_invoice(student.id, school.id, invoice_number="INV-1"),
+        make_invoice(student.id, school.id, invoice_number="INV-2", status=InvoiceStatus.OVERDUE),
+        make_invoice(student.id, school.id, invoice_number="INV-3", status=InvoiceStatus.PAID),
+        make_invoice(student.id, school.id, invoice_number="INV-4", status=InvoiceStatus.CANCELLED),
+        make_invoice(student.id, school.id, invoice_number="INV-DUP"),
+        make_invoice(student.id, school.id, invoice_number="INV-DUP"),
+    ]
+    session.add_all(invoices)
+    session.commit()
+    return [invoice.id for invoice in invoices]
+
+
+@pytest.fixture
+def service(session):
+    return InvoiceService(InvoiceRepository(session))
+
+
+class TestIterLines:
+    """Test suite for splitting an upload stream into lines"""
+
+    @pytest.mark.asyncio
+    async def test_joins_lines_split_across_chunks(self):
+        """Test that lines split across chunks are joined and blank lines skipped with their numbers kept"""
+        lines = await collect(iter_lines(stream(b"a,b\r\n1,", b"2\n\n3,4")))
+
+        assert lines == [(1, "a,b"), (2, "1,2"), (4, "3,4")]
+
+    @pytest.mark.asyncio
+    async def test_rejects_overlong_lines(self):
+        """Test that a line over the byte limit stops the stream"""
+        with pytest.raises(ValueError, match="Line 2 is longer than 8 bytes"):
+            await collect(iter_lines(stream(b"short\n", b"x" * 20), max_line_bytes=8))
+
+    @pytest.mark.asyncio
+    async def test_batched(self):
+        """Test that lines are grouped into batches of the given size"""
+        batches = await collect(batched(iter_lines(stream(b"1\n2\n3\n")), 2))
+
+        assert [[line for _, line in batch] for batch in batches] == [["1", "2"], ["3"]]
+
+
+class TestImportPayments:
+    """Test suite for the streaming payment reconciliation import"""
+
+    @pytest.mark.asyncio
+    async def test_csv_import_reports_every_outcome(self, session, service, invoice_ids):
+        """Test that a CSV import pays matching invoices and reports every other outcome by line"""
+        body = (
+            "invoice_id,invoice_number,payment_date,payment_method,notes\n"
+            f"{invoice_ids[0]},,2024-02-01,bank_transfer,Bank ref 1\n"
+            ",INV-2,2024-02-02,cash,\n"
+            ",INV-3,2024-02-03,cash,\n"
+            ",INV-4,2024-02-03,cash,\n"
+            ",INV-DUP,2024-02-03,cash,\n"
+            "999,,2024-02-03,cash,\n"
+            f"{invoice_ids[0]},,2024-02-04,cash,\n"
+            f"{invoice_ids[1]},,not-a-date,cash,\n"
+        ).encode()
+
+        result = await service.import_payments(iter_lines(stream(body)), "csv", batch_size=3)
+
+        assert (result.rows, result.matched, result.already_paid, result.unmatched, result.invalid) == (8, 2, 2, 3, 1)
+        assert [(issue.line, issue.outcome) for issue in result.issues] == [
+            (4, "already_paid"), (5, "unmatched"), (6, "unmatched"), (7, "unmatched"), (8, "already_paid"), (9, "invalid")
+        ]
+        assert result.issues[2].reason == "Invoice number matches 2 invoices"
+        assert result.issues[5].reason.startswith("payment_date:")
+
+        session.expire_all()
+        first = session.get(InvoiceEntity, invoice_ids[0])
+        assert first.status == InvoiceStatus.PAID
+        assert first.payment_method == PaymentMethod.BANK_TRANSFER
+        assert first.notes == "Bank ref 1"
+        assert session.get(InvoiceEntity, invoice_ids[1]).status == InvoiceStatus.PAID
+        assert session.get(InvoiceEntity, invoice_ids[3]).status == InvoiceStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_ndjson_import(self, session, service, invoice_ids):
+        """Test that NDJSON rows are matched and non-object or incomplete rows reported invalid"""
+        body = (
+            b'{"invoice_number": "INV-1", "payment_date": "2024-02-01", "payment_method": "check"}\n'
+            b'[1, 2]\n'
+            b'{"payment_date": "2024-02-01", "payment_method": "check"}\n'
+        )
+
+        result = await service.import_payments(iter_lines(stream(body)), "ndjson")
+
+        assert (result.rows, result.matched, result.invalid) == (3, 1, 2)
+        assert result.issues[0].reason == "Expected a JSON object"
+
+    @pytest.mark.asyncio
+    async def test_malformed_csv_line_is_a_row_error(self, service, invoice_ids):
+        """Test that a line the CSV parser rejects is reported as invalid without stopping the import"""
+        body = (
+            "invoice_number,payment_date,payment_method\n"
+            f'INV-1,2024-02-01,"{"x" * 200_000}\n'
+            "INV-2,2024-02-01,cash\n"
+        ).encode()
+
+        result = await service.import_payments(iter_lines(stream(body), max_line_bytes=1 << 20), "csv")
+
+        assert (result.rows, result.matched, result.invalid) == (2, 1, 1)
+        assert result.issues[0].line == 2
+        assert "field larger than field limit" in result.issues[0].reason
+
+    @pytest.mark.asyncio
+    async def test_one_select_and_one_update_per_batch(self, session, service, invoice_ids, statements):
+        """Test that each batch runs one lookup SELECT and one UPDATE"""
+        body = "".join(
+            f'{{"invoice_id": {invoice_id}, "payment_date": "2024-02-01", "payment_method": "cash"}}\n'
+            for invoice_id in invoice_ids
+        ).encode()
+        result = await service.import_payments(iter_lines(stream(body)), "ndjson", batch_size=3)
+
+        assert result.matched == 4
+        assert [statement.split()[0] for statement in statements] == ["SELECT", "UPDATE", "SELECT", "UPDATE"]
+
+    @pytest.mark.asyncio
+    async def test_stream_errors_stop_the_import(self, service, invoice_ids):
+        """Test that an undecodable line stops the import and keeps the batches already applied"""
+        body = stream(b"invoice_number,payment_date,payment_method\nINV-1,2024-02-01,cash\n", b"\xff\xfe\n")
+
+        result = await service.import_payments(iter_lines(body), "csv", batch_size=1)
+
+        assert result.matched == 1
+        assert result.error == "Line 3 is not valid utf-8"
+
+    @pytest.mark.asyncio
+    async def test_unknown_format(self, service):
+        """Test that an unsupported format is rejected"""
+        with pytest.raises(ValueError, match="Unknown import format"):
+            await service.import_payments(iter_lines(stream(b"")), "xml")
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.core.query_budget import QueryBudgetMiddleware, assert_max_queries, capture_request_queries
+from app.infrastructure.database.instrumentation import QueryRecorder, RequestQueryStats, query_shape
+
+
+@pytest.fixture
+def client(engine):
+    """A minimal app whose routes run a known number of queries"""
+    QueryRecorder(threshold_ms=10_000).install(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, parent_id INTEGER)"))
+        connection.execute(text("INSERT INTO items (id, parent_id) VALUES (1, NULL), (2, 1), (3, 1), (4, 1)"))
+
+    app = FastAPI()
+
+    @app.get("/batched")
+    def batched():
+        with engine.connect() as connection:
+            rows = connection.execute(text("SELECT id FROM items WHERE parent_id = 1")).all()
+        return {"count": len(rows)}
+
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        with engine.connect() as connection:
+            ids = [row[0] for row in connection.execute(text("SELECT id FROM items")).all()]
+            for item_id in ids:
+                connection.execute(text("SELECT parent_id FROM items WHERE id = :id"), {"id": item_id})
+        return {"count": len(ids)}
+
+    app.add_middleware(QueryBudgetMiddleware, expose_headers=True, budget=3, n_plus_one_threshold=3)
+    return TestClient(app)
+
+
+class TestQueryShape:
+    """Test suite for query shape normalization"""
+
+    def test_in_lists_collapse_to_one_shape(self):
+        """Test that IN lists of different lengths share a shape"""
+        assert query_shape("SELECT * FROM t WHERE id IN (?, ?)") == query_shape("SELECT *  FROM t\nWHERE id IN (?)")
+
+    def test_repeated_shapes_respect_threshold(self):
+        """Test that only shapes at or above the threshold are reported"""
+        stats = RequestQueryStats()
+        for _ in range(3):
+            stats.add("SELECT 1", 1.0)
+        stats.add("SELECT 2", 1.0)
+
+        assert stats.repeated_shapes(3) == [("SELECT 1", 3)]
+        assert stats.count == 4
+
+
+class TestQueryBudgetMiddleware:
+    """Test suite for per-request query tracking"""
+
+    def test_headers_report_query_count(self, client):
+        """Test that debug headers expose the request's query count"""
+        response = client.get("/batched")
+
+        assert response.headers["X-DB-Query-Count"] == "1"
+        assert response.headers["X-DB-N-Plus-One"] == "0"
+        assert float(response.headers["X-DB-Time-Ms"]) >= 0
+
+    def test_n_plus_one_is_flagged(self, client, caplog):
+        """Test that repeated query shapes are logged as likely N+1"""
+        with capture_request_queries() as captured:
+            response = client.get("/n-plus-one")
+
+        assert response.headers["X-DB-N-Plus-One"] == "1"
+        _, path, stats = captured[0]
+        assert path == "/n-plus-one"
+        assert stats.count == 5
+        assert "Possible N+1 on GET /n-plus-one" in caplog.text
+        assert "Query budget exceeded" in caplog.text
+
+    def test_assert_max_queries(self, client):
+        """Test that the helper passes within budget and fails with the query shapes otherwise"""
+        with assert_max_queries(1):
+            client.get("/batched")
+
+        with pytest.raises(AssertionError, match="ran 5 queries"):
+            with assert_max_queries(2):
+                client.get("/n-plus-one")
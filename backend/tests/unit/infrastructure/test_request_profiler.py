@@ -0,0 +1,123 @@
+import re
+import time
+import pytest
+from cachetools import TTLCache
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.core.cache import invalidate_cache_pattern, simple_cache
+from app.core.profiling import ProfileSlots, ProfileStore, RequestProfile, RequestProfilerMiddleware, StackSampler
+from app.core.query_budget import QueryBudgetMiddleware
+from app.infrastructure.database.instrumentation import QueryRecorder
+
+ADMIN = {"Authorization": "Bearer admin-token"}
+
+
+async def authorize(token: str) -> bool:
+    return token == "admin-token"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path / "profiles"), keep=3)
+
+
+@pytest.fixture
+def client(engine, store):
+    """A minimal app behind the query tracking and profiling middleware"""
+    QueryRecorder(threshold_ms=10_000).install(engine)
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    @simple_cache(cache, "api")
+    async def cached_total(size: int):
+        return size * 2
+
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work(size: int = 3):
+        with engine.connect() as connection:
+            for _ in range(size):
+                connection.execute(text("SELECT 1"))
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:  # CPU time for the sampler to see
+            sum(range(1000))
+        invalidate_cache_pattern("api:nothing-matches")
+        return {"total": await cached_total(size)}
+
+    app.add_middleware(RequestProfilerMiddleware, authorize=authorize, store=store, interval_ms=1)
+    app.add_middleware(QueryBudgetMiddleware)
+    return TestClient(app)
+
+
+class TestRequestProfiler:
+    """Test suite for on-demand request profiling"""
+
+    def test_superuser_request_is_profiled(self, client, store):
+        """Test that a flagged request stores its stacks, queries and cache activity"""
+        response = client.get("/work?size=4", headers={**ADMIN, "X-Profile": "1"})
+
+        assert response.headers["X-Profile-Status"] == "captured"
+        profile = store.get(response.headers["X-Profile-Id"])
+        assert profile.status_code == 200 and profile.path == "/work"
+        assert profile.db["queries"] == 4
+        assert profile.cache["misses"] == {"api": 1}
+        assert profile.samples > 0
+        assert profile.error is None
+        # Qualified names need Python 3.11, plain function names before
+        assert any(re.search(r"test_request_profiler:(client\.<locals>\.)?work(;|$)", stack) for stack in profile.stacks)
+
+    def test_folded_output_has_one_line_per_stack(self, client, store):
+        """Test that the folded format is 'frame;frame count' under the request's root frame"""
+        response = client.get("/work?profile=1", headers=ADMIN)
+
+        profile = store.get(response.headers["X-Profile-Id"])
+        lines = profile.folded().splitlines()
+        assert len(lines) == len(profile.stacks) + (1 if profile.waiting_samples else 0)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("GET /work;") and int(count) > 0
+
+    def test_sampler_failure_is_recorded(self, client, store, monkeypatch):
+        """Test that a failing sampler leaves the request alone and says why on the profile"""
+        def fail(self, frame):
+            raise RuntimeError("no frames")
+
+        monkeypatch.setattr(StackSampler, "_stack", fail)
+        response = client.get("/work", headers={**ADMIN, "X-Profile": "1"})
+
+        assert response.status_code == 200
+        profile = store.get(response.headers["X-Profile-Id"])
+        assert profile.error == "RuntimeError: no frames"
+        assert profile.samples == 0
+
+    def test_other_users_are_not_profiled(self, client, store):
+        """Test that the flag is ignored without a superuser token"""
+        for headers in ({"X-Profile": "1"}, {"X-Profile": "1", "Authorization": "Bearer someone"}):
+            response = client.get("/work", headers=headers)
+
+            assert response.status_code == 200
+            assert "X-Profile-Id" not in response.headers
+        assert store.list() == []
+
+    def test_busy_when_every_slot_is_taken(self, client, store):
+        """Test that a request runs unprofiled when the concurrency limit is reached"""
+        held = ProfileSlots(str(store.directory), 1).acquire()
+        try:
+            response = client.get("/work", headers={**ADMIN, "X-Profile": "1"})
+        finally:
+            ProfileSlots(str(store.directory), 1).release(held)
+
+        assert response.status_code == 200
+        assert response.headers["X-Profile-Status"] == "busy"
+        assert store.list() == []
+
+    def test_store_keeps_the_newest_profiles(self, store):
+        """Test that old profiles are pruned and unknown ids are rejected"""
+        for number in range(5):
+            store.save(RequestProfile(f"{number:012x}", "GET", "/", "", "", 1.0))
+            time.sleep(0.01)
+
+        assert [summary["id"] for summary in store.list()] == [f"{number:012x}" for number in (4, 3, 2)]
+        assert store.get("../../etc/passwd") is None
+        assert store.clear() == 3
@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+import pytest
+from datetime import datetime
+from app.core.metrics import SCHEDULER_JOB_DURATION, SCHEDULER_JOB_RUNS, SCHEDULER_JOB_SKIPPED
+from app.core.scheduler import CronTrigger, IntervalTrigger, Scheduler
+from app.infrastructure.jobs.leader import FileLeaderLock
+
+
+class StaticLeader:
+    """Leader lock with a fixed outcome"""
+
+    def __init__(self, leading: bool):
+        self.leading = leading
+        self.released = False
+
+    def acquire(self) -> bool:
+        return self.leading
+
+    def release(self) -> None:
+        self.released = True
+
+
+class TestTriggers:
+    """Test suite for interval and cron triggers"""
+
+    def test_interval_runs_on_start_then_every_interval(self):
+        """Test that an interval trigger fires on start and then every interval"""
+        trigger = IntervalTrigger(60)
+        now = datetime(2024, 1, 1, 12, 0, 0)
+
+        assert trigger.next_run(None, now) == now
+        assert trigger.next_run(now, now) == datetime(2024, 1, 1, 12, 1, 0)
+
+    @pytest.mark.parametrize("expression, now, expected", [
+        ("*/15 * * * *", datetime(2024, 1, 1, 12, 7, 30), datetime(2024, 1, 1, 12, 15)),
+        ("0 3 * * *", datetime(2024, 1, 1, 3, 0), datetime(2024, 1, 2, 3, 0)),
+        ("30 2 1 * *", datetime(2024, 1, 31, 12, 0), datetime(2024, 2, 1, 2, 30)),
+        ("0 9 * * 1-5", datetime(2024, 1, 5, 10, 0), datetime(2024, 1, 8, 9, 0)),
+        ("0 0 29 2 *", datetime(2024, 3, 1), datetime(2028, 2, 29)),
+    ])
+    def test_cron_next_run(self, expression, now, expected):
+        """Test that a cron trigger fires on the next matching minute"""
+        assert CronTrigger(expression).next_run(None, now) == expected
+
+    @pytest.mark.parametrize("expression", ["* * * *", "61 * * * *", "*/0 * * * *", "a * * * *"])
+    def test_cron_rejects_invalid_expressions(self, expression):
+        """Test that malformed or out-of-range cron expressions are rejected"""
+        with pytest.raises(ValueError):
+            CronTrigger(expression)
+
+
+class TestScheduler:
+    """Test suite for the in-process job scheduler"""
+
+    @pytest.mark.asyncio
+    async def test_records_runs_failures_and_timeouts(self):
+        """Test that runs, failures and timeouts are recorded per job"""
+        def ok():
+            pass
+
+        def broken():
+            raise RuntimeError("boom")
+
+        def slow():
+            time.sleep(0.2)
+
+        scheduler = Scheduler()
+        jobs = [
+            scheduler.add_job("ok", ok, IntervalTrigger(60)),
+            scheduler.add_job("broken", broken, IntervalTrigger(60)),
+            scheduler.add_job("slow", slow, IntervalTrigger(60), timeout=0.01),
+        ]
+        for job in jobs:
+            await scheduler.run_job(job)
+
+        stats = {job["name"]: job for job in scheduler.stats()}
+        assert (stats["ok"]["runs"], stats["ok"]["failures"]) == (1, 0)
+        assert stats["broken"]["last_error"] == "RuntimeError: boom"
+        assert (stats["slow"]["failures"], stats["slow"]["timeouts"]) == (1, 1)
+        assert stats["slow"]["last_duration_ms"] < 150
+
+    @pytest.mark.asyncio
+    async def test_blocking_jobs_run_off_the_event_loop(self):
+        """Test that a blocking job runs in a thread while the event loop keeps going"""
+        release = threading.Event()
+        ticks = []
+
+        def blocking():
+            release.wait(2)
+
+        async def tick():
+            for _ in range(3):
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+            release.set()
+
+        scheduler = Scheduler()
+        job = scheduler.add_job("blocking", blocking, IntervalTrigger(60), timeout=1)
+        await asyncio.gather(scheduler.run_job(job), tick())
+
+        assert ticks == [1, 1, 1]
+        assert (job.runs, job.failures) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_runs_are_skipped_while_a_timed_out_run_continues(self):
+        """Test that a job is not started again while its timed-out run is still going"""
+        release = threading.Event()
+
+        def stuck():
+            release.wait(2)
+
+        scheduler = Scheduler()
+        job = scheduler.add_job("stuck", stuck, IntervalTrigger(60), timeout=0.01)
+        await scheduler.run_job(job)
+        await scheduler.run_job(job)
+
+        assert (job.timeouts, job.skipped, job.running) == (1, 1, True)
+        release.set()
+        for _ in range(100):
+            if not job.running:
+                break
+            await asyncio.sleep(0.01)
+        assert not job.running
+
+    @pytest.mark.asyncio
+    async def test_followers_skip_runs(self):
+        """Test that a worker without the leader lock skips runs"""
+        runs = []
+
+        def job():
+            runs.append(1)
+
+        scheduler = Scheduler(leader=StaticLeader(False))
+        await scheduler.run_job(scheduler.add_job("job", job, IntervalTrigger(60)))
+
+        assert runs == []
+        assert scheduler.jobs["job"].skipped == 1
+
+    @pytest.mark.asyncio
+    async def test_runs_and_skips_are_exported_as_metrics(self):
+        """Test that run outcomes, durations and skips are exported as metrics"""
+        release = threading.Event()
+
+        def broken():
+            raise RuntimeError("boom")
+
+        scheduler = Scheduler()
+        ok = scheduler.add_job("metrics_ok", lambda: None, IntervalTrigger(60))
+        failing = scheduler.add_job("metrics_broken", broken, IntervalTrigger(60))
+        stuck = scheduler.add_job("metrics_stuck", lambda: release.wait(2), IntervalTrigger(60), timeout=0.01)
+        for job in (ok, ok, failing, stuck, stuck):
+            await scheduler.run_job(job)
+        release.set()
+        scheduler.leader = StaticLeader(False)
+        await scheduler.run_job(ok)
+
+        runs = dict(SCHEDULER_JOB_RUNS.samples())
+        assert runs[("metrics_ok", "success")] == 2
+        assert runs[("metrics_broken", "failure")] == 1
+        assert runs[("metrics_stuck", "timeout")] == 1
+        skipped = dict(SCHEDULER_JOB_SKIPPED.samples())
+        assert skipped[("metrics_stuck", "still_running")] == 1
+        assert skipped[("metrics_ok", "follower")] == 1
+        durations = dict(SCHEDULER_JOB_DURATION.samples())
+        *buckets, total_seconds = durations[("metrics_stuck",)]
+        assert sum(durations[("metrics_ok",)][:-1]) == 2
+        assert sum(buckets) == 1 and total_seconds < 0.15  # measured until the timeout
+
+    @pytest.mark.asyncio
+    async def test_start_runs_interval_jobs_and_stop_releases_leadership(self):
+        """Test that start runs the jobs and stop gives up leadership"""
+        ran = threading.Event()
+
+        def job():
+            ran.set()
+
+        leader = StaticLeader(True)
+        scheduler = Scheduler(leader=leader)
+        scheduler.add_job("job", job, IntervalTrigger(3600))
+
+        await scheduler.start()
+        assert await asyncio.to_thread(ran.wait, 1)
+        await scheduler.stop()
+
+        assert not scheduler.started
+        assert leader.released
+
+    def test_duplicate_job_names(self):
+        """Test that a job name can only be registered once"""
+        def job():
+            pass
+
+        scheduler = Scheduler()
+        scheduler.add_job("job", job, IntervalTrigger(60))
+        with pytest.raises(ValueError, match="already registered"):
+            scheduler.add_job("job", job, IntervalTrigger(60))
+
+
+class TestFileLeaderLock:
+    """Test suite for the flock-based leader lock"""
+
+    def test_only_one_holder_at_a_time(self, tmp_path):
+        """Test that only one holder leads until it releases the lock"""
+        path = str(tmp_path / "scheduler.lock")
+        first, second = FileLeaderLock(path), FileLeaderLock(path)
+
+        assert first.acquire()
+        assert first.acquire()
+        assert not second.acquire()
+
+        first.release()
+        assert second.acquire()
+        second.release()
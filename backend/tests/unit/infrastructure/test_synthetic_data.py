@@ -0,0 +1,87 @@
+import pytest
+from datetime import date
+from sqlalchemy import func, select
+from sqlmodel import Session
+from app.domain.enums import InvoiceStatus
+from app.domain.repositories.page import CountMode
+from app.infrastructure.database.synthetic_data import (
+    INVOICE_COLUMNS, DatasetGenerator, DatasetSpec, load_dataset, school_sizes, validate_rows
+)
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from tests.unit.infrastructure.conftest import make_school
+
+TODAY = date(2024, 6, 15)
+SPEC = DatasetSpec(schools=4, students_per_school=10, invoices_per_student=6, years=2, seed=7)
+
+
+def generate(spec=SPEC):
+    generator = DatasetGenerator(spec, TODAY)
+    schools = generator.schools()
+    students, invoices = [], []
+    for student, student_invoices in generator.students():
+        students.append(student)
+        invoices.extend(student_invoices)
+    return schools, students, invoices
+
+
+class TestDatasetGenerator:
+    """Test suite for the seeded synthetic dataset generator"""
+
+    def test_school_sizes_are_skewed_and_complete(self):
+        """Test that students are spread over schools by a Zipf skew and none are lost"""
+        sizes = school_sizes(1000, 10, 1.1)
+
+        assert sum(sizes) == 1000
+        assert sizes == sorted(sizes, reverse=True)
+        assert sizes[0] > 5 * sizes[-1] >= 5
+        assert school_sizes(100, 4, 0) == [25, 25, 25, 25]
+
+    def test_same_seed_same_rows(self):
+        """Test that a seed always generates the same rows and another seed different ones"""
+        assert generate() == generate()
+        assert generate(DatasetSpec(schools=4, students_per_school=10, invoices_per_student=6, years=2, seed=8)) != generate()
+
+    def test_rows_pass_domain_validation_and_follow_due_dates(self):
+        """Test that generated rows pass domain validation and statuses agree with due dates"""
+        schools, students, invoices = generate()
+        validate_rows(schools, students, invoices)
+
+        assert (len(schools), len(students), len(invoices)) == (4, 40, 240)
+        rows = [dict(zip(INVOICE_COLUMNS, row)) for row in invoices]
+        for row in rows:
+            if row["status"] == InvoiceStatus.OVERDUE.name:
+                assert row["due_date"] < TODAY.isoformat()
+            if row["status"] == InvoiceStatus.PENDING.name:
+                assert row["due_date"] >= TODAY.isoformat()
+            assert (row["status"] == InvoiceStatus.PAID.name) == (row["payment_method"] is not None)
+        assert {row["invoice_date"][:4] for row in rows} == {"2023", "2024"}
+
+
+class TestLoadDataset:
+    """Test suite for loading a generated dataset"""
+
+    @pytest.mark.asyncio
+    async def test_loads_after_existing_rows_and_keeps_search_in_sync(self, migrated_engine):
+        """Test that loading appends after existing rows, keeps students in their school and indexes the text search"""
+        with Session(migrated_engine) as session:
+            session.add(make_school())
+            session.commit()
+
+        result = load_dataset(migrated_engine, SPEC, batch_size=50, today=TODAY, validate=True)
+
+        assert (result.schools, result.students, result.invoices) == (4, 40, 240)
+        assert result.first_ids == (2, 1, 1)
+        with Session(migrated_engine) as session:
+            assert session.exec(select(func.count()).select_from(InvoiceEntity)).one()[0] == 240
+            orphans = session.exec(
+                select(func.count()).select_from(InvoiceEntity)
+                .join(StudentEntity, StudentEntity.id == InvoiceEntity.student_id)
+                .where(StudentEntity.school_id != InvoiceEntity.school_id)
+            ).one()[0]
+            assert orphans == 0
+
+            # Rows map to domain models and the text search index covers them
+            page = await InvoiceRepository(session).get_with_filters({"invoice_number": "SYN-000000123"}, 0, 10, CountMode.NONE)
+            assert [invoice.invoice_number for invoice in page.items] == ["SYN-000000123"]
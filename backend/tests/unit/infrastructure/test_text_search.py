@@ -0,0 +1,108 @@
+import pytest
+from sqlmodel import select
+from app.infrastructure.persistence.school_entity import SchoolEntity
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.repositories.search_repository import SearchRepository, score_match
+from app.infrastructure.repositories.student_repository import StudentRepository
+from app.infrastructure.search.text_search import (
+    Fts5TextSearch,
+    LikeTextSearch,
+    TrigramTextSearch,
+    escape_like,
+    get_text_search,
+)
+from tests.unit.infrastructure.conftest import make_invoice, make_school, make_student
+
+
+@pytest.fixture
+def seeded(session):
+    """Two schools with a few students and invoices"""
+    lincoln = make_school()
+    riverside = make_school(name="Riverside Academy", city="Riverdale", email="info@riverside.edu")
+    session.add_all([lincoln, riverside])
+    session.commit()
+
+    students = [
+        make_student(lincoln.id, first_name="Alexander", last_name="Smith", email="alex@example.com"),
+        make_student(lincoln.id, first_name="Maria", last_name="Alexis", email="maria@example.com"),
+        make_student(riverside.id, first_name="Bob", last_name="Jones", email="bob@example.com"),
+    ]
+    session.add_all(students)
+    session.commit()
+
+    session.add(make_invoice(students[0].id, lincoln.id, invoice_number="INV-2024-777", description="Riverside field trip"))
+    session.commit()
+    return session
+
+
+class TestTextSearchBackends:
+    """Test suite for text search backend selection and conditions"""
+
+    def test_backend_per_dialect(self):
+        """Test that each dialect gets its index-backed implementation"""
+        assert isinstance(get_text_search("postgresql"), TrigramTextSearch)
+        assert isinstance(get_text_search("sqlite"), Fts5TextSearch)
+        assert type(get_text_search("mysql")) is LikeTextSearch
+
+    def test_escape_like_wildcards(self):
+        """Test that LIKE wildcards in the term are matched literally"""
+        assert escape_like("50%_off") == "50\\%\\_off"
+
+    def test_fts_condition_matches_substring_case_insensitive(self, seeded):
+        """Test FTS5-backed substring filter"""
+        condition = Fts5TextSearch().contains(StudentEntity, "first_name", "LEX")
+        names = seeded.exec(select(StudentEntity.first_name).where(condition)).all()
+        assert names == ["Alexander"]
+
+    def test_short_terms_fall_back_to_like(self, seeded):
+        """Test that terms shorter than a trigram still match"""
+        condition = Fts5TextSearch().contains(StudentEntity, "first_name", "bo")
+        names = seeded.exec(select(StudentEntity.first_name).where(condition)).all()
+        assert names == ["Bob"]
+
+    def test_shadow_table_follows_updates(self, seeded):
+        """Test that triggers keep the FTS5 shadow table in sync"""
+        student = seeded.exec(select(StudentEntity).where(StudentEntity.first_name == "Bob")).one()
+        student.first_name = "Roberto"
+        seeded.add(student)
+        seeded.commit()
+
+        condition = Fts5TextSearch().contains(StudentEntity, "first_name", "bert")
+        assert seeded.exec(select(StudentEntity.id).where(condition)).all() == [student.id]
+        condition = Fts5TextSearch().contains(StudentEntity, "first_name", "Bob")
+        assert seeded.exec(select(StudentEntity.id).where(condition)).all() == []
+
+    @pytest.mark.asyncio
+    async def test_repository_filters_route_through_search(self, seeded):
+        """Test that repository text filters use the search backend"""
+        repository = StudentRepository(seeded)
+        page = await repository.get_with_filters({"last_name": "alexis"})
+        assert page.total == 1
+        assert page.items[0].first_name == "Maria"
+
+
+class TestUnifiedSearch:
+    """Test suite for the ranked unified search"""
+
+    def test_score_prefers_exact_and_shorter_matches(self):
+        """Test ranking heuristics"""
+        assert score_match("ana", ["Ana"]) > score_match("ana", ["Anastasia"])
+        assert score_match("ana", ["Anastasia"]) > score_match("ana", ["Mariana"])
+        assert score_match("zzz", ["Ana"]) == 0
+
+    @pytest.mark.asyncio
+    async def test_search_ranks_across_entity_types(self, seeded):
+        """Test that matches from all entity types are merged and ranked"""
+        hits = await SearchRepository(seeded).search("riverside", ["student", "school", "invoice"])
+        assert [(hit.entity_type, hit.title) for hit in hits] == [
+            ("school", "Riverside Academy"),
+            ("invoice", "INV-2024-777"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_search_respects_entity_types_and_limit(self, seeded):
+        """Test type filtering and result limit"""
+        hits = await SearchRepository(seeded).search("alexander", ["student"], limit=1)
+        assert len(hits) == 1
+        assert hits[0].entity_type == "student"
+        assert hits[0].title == "Alexander Smith"
@@ -0,0 +1,130 @@
+import pytest
+from datetime import date
+from app.application.dtos.invoice_dto import InvoiceUpdateDTO
+from app.application.services.invoice_service import InvoiceService
+from app.domain.models.school import School
+from app.infrastructure.persistence.invoice_entity import InvoiceEntity
+from app.infrastructure.persistence.student_entity import StudentEntity
+from app.infrastructure.repositories.invoice_repository import InvoiceRepository
+from app.infrastructure.repositories.school_repository import SchoolRepository
+from app.infrastructure.repositories.student_repository import StudentRepository
+from tests.unit.infrastructure.conftest import make_invoice, make_school, make_student
+
+
+@pytest.fixture
+def invoice_id(session):
+    school = make_school()
+    session.add(school)
+    session.commit()
+    student = make_student(school.id)
+    session.add(student)
+    session.commit()
+    invoice = make_invoice(student.id, school.id)
+    session.add(invoice)
+    session.commit()
+    return invoice.id
+
+
+class TestCreate:
+    """Test suite for single-statement inserts"""
+
+    @pytest.mark.asyncio
+    async def test_create_is_one_insert_returning(self, session, statements):
+        """Test that creating a school is one INSERT ... RETURNING"""
+        school = School(
+            name="Roosevelt Middle School", address="9 Pine St", city="Springfield", state="IL",
+            zip_code="62702", phone_number="555-0200", email="office@roosevelt.edu",
+            principal_name="John Roe", established_year=1975
+        )
+
+        created = await SchoolRepository(session).create(school)
+
+        assert created.id is not None
+        assert created.name == "Roosevelt Middle School"
+        assert created.created_at is not None
+        assert len(statements) == 1
+        assert statements[0].startswith("INSERT INTO schools")
+        assert "RETURNING" in statements[0]
+
+
+class TestUpdateFields:
+    """Test suite for partial updates with UPDATE ... RETURNING"""
+
+    @pytest.mark.asyncio
+    async def test_writes_only_changed_columns_in_one_statement(self, session, invoice_id, statements):
+        """Test that only the given columns are written, in one statement"""
+        updated = await InvoiceRepository(session).update_fields(invoice_id, {"description": "Lab fee"})
+
+        assert updated.description == "Lab fee"
+        assert updated.amount == 100.0
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE invoices SET description=?, updated_at=?")
+        assert "RETURNING" in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_recalculates_total_in_sql(self, session, invoice_id):
+        """Test that changing an amount recalculates the stored total"""
+        updated = await InvoiceRepository(session).update_fields(invoice_id, {"tax_amount": 25.0})
+
+        assert updated.total_amount == 125.0
+        session.expire_all()
+        assert session.get(InvoiceEntity, invoice_id).total_amount == 125.0
+
+    @pytest.mark.asyncio
+    async def test_invalid_result_is_rolled_back(self, session, invoice_id):
+        """Test that an update breaking a domain invariant is rolled back"""
+        with pytest.raises(ValueError, match="Due date cannot be before invoice date"):
+            await InvoiceRepository(session).update_fields(invoice_id, {"due_date": date(2023, 1, 1)})
+
+        session.expire_all()
+        assert session.get(InvoiceEntity, invoice_id).due_date == date(2024, 2, 15)
+
+    @pytest.mark.asyncio
+    async def test_null_in_required_column_is_rejected(self, session, invoice_id, statements):
+        """Test that a null in a required invoice column is rejected before the UPDATE"""
+        for changes in ({"amount": None}, {"tax_amount": None}, {"description": None}):
+            with pytest.raises(ValueError, match="cannot be null"):
+                await InvoiceRepository(session).update_fields(invoice_id, changes)
+
+        assert statements == []
+        assert (await InvoiceRepository(session).update_fields(invoice_id, {"notes": None})).notes is None
+
+    @pytest.mark.asyncio
+    async def test_null_in_required_school_column_is_rejected(self, session, invoice_id, statements):
+        """Test that a null in a required school column is rejected before the UPDATE"""
+        school_id = session.get(InvoiceEntity, invoice_id).school_id
+        statements.clear()
+
+        with pytest.raises(ValueError, match="name cannot be null"):
+            await SchoolRepository(session).update_fields(school_id, {"name": None})
+
+        assert statements == []
+        assert (await SchoolRepository(session).update_fields(school_id, {"city": "Chicago"})).name is not None
+
+    @pytest.mark.asyncio
+    async def test_null_in_required_student_column_is_rejected(self, session, invoice_id, statements):
+        """Test that a null in a required student column is rejected before the UPDATE"""
+        student_id = session.get(InvoiceEntity, invoice_id).student_id
+        statements.clear()
+
+        for changes in ({"first_name": None}, {"email": None}):
+            with pytest.raises(ValueError, match="cannot be null"):
+                await StudentRepository(session).update_fields(student_id, changes)
+
+        assert statements == []
+        assert session.get(StudentEntity, student_id).first_name is not None
+
+    @pytest.mark.asyncio
+    async def test_missing_row(self, session):
+        """Test that updating a missing invoice returns None"""
+        assert await InvoiceRepository(session).update_fields(999, {"description": "Lab fee"}) is None
+
+    @pytest.mark.asyncio
+    async def test_service_update_skips_the_read(self, session, invoice_id, statements):
+        """Test that the service updates without reading the invoice first"""
+        service = InvoiceService(InvoiceRepository(session))
+
+        result = await service.update_invoice(invoice_id, InvoiceUpdateDTO(amount=200.0))
+
+        assert result.total_amount == 210.0
+        assert [statement.split()[0] for statement in statements] == ["UPDATE"]